@@ -0,0 +1,29 @@
+"""create notification log table
+
+Revision ID: 16760a58c9ef
+Revises: f6f009132212
+Create Date: 2022-12-19 11:02:37.415206
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "16760a58c9ef"
+down_revision = "f6f009132212"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_log",
+        sa.Column("blocknumber", sa.Integer(), nullable=False),
+        sa.Column("notifications", postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("blocknumber"),
+    )
+
+
+def downgrade():
+    op.drop_table("notification_log")
@@ -10,7 +10,12 @@ from src.challenges.challenge import (
     ChallengeUpdater,
     FullEventMetadata,
 )
-from src.challenges.challenge_event_bus import ChallengeEventBus
+from src.challenges.challenge_event_bus import (
+    REDIS_IN_FLIGHT_DEADLINES_KEY,
+    REDIS_IN_FLIGHT_PREFIX,
+    REDIS_QUEUE_PREFIX,
+    ChallengeEventBus,
+)
 from src.models.indexing.block import Block
 from src.models.rewards.challenge import Challenge, ChallengeType
 from src.models.rewards.user_challenge import UserChallenge
@@ -487,3 +492,77 @@ def test_catches_exceptions_in_single_processor(app):
         # Make sure broken manager didn't do anything
         challenge_2_state = broken_manager.get_user_challenge_state(session, ["1"])
         assert len(challenge_2_state) == 0
+
+
+def test_requeues_unacknowledged_events(app):
+    """Ensure events dequeued by a consumer that never acknowledged them are processed"""
+    setup_challenges(app)
+    with app.app_context():
+        db = get_db()
+
+    redis_conn = redis.Redis.from_url(url=REDIS_URL)
+
+    bus = ChallengeEventBus(redis_conn)
+    with db.scoped_session() as session:
+        mgr = ChallengeManager("test_challenge_1", DefaultUpdater())
+        TEST_EVENT = "TEST_EVENT"
+        bus.register_listener(TEST_EVENT, mgr)
+        with bus.use_scoped_dispatch_queue():
+            bus.dispatch(TEST_EVENT, 100, 1)
+            bus.dispatch(TEST_EVENT, 100, 2)
+            bus.dispatch(TEST_EVENT, 100, 3)
+
+        # a consumer dequeues the first two events and crashes
+        crashed_in_flight_key = f"{REDIS_IN_FLIGHT_PREFIX}:crashed"
+        bus._dequeue_script(
+            keys=[
+                REDIS_QUEUE_PREFIX,
+                crashed_in_flight_key,
+                REDIS_IN_FLIGHT_DEADLINES_KEY,
+            ],
+            args=[2, 0],
+        )
+        assert redis_conn.llen(REDIS_QUEUE_PREFIX) == 1
+
+        (count, did_error) = bus.process_events(session)
+        assert count == 3
+        assert did_error == False
+        state = mgr.get_user_challenge_state(session, ["1", "2", "3"])
+        assert len(state) == 3
+
+        # every event was acknowledged
+        assert redis_conn.llen(REDIS_QUEUE_PREFIX) == 0
+        assert redis_conn.zcard(REDIS_IN_FLIGHT_DEADLINES_KEY) == 0
+        assert not redis_conn.exists(crashed_in_flight_key)
+
+
+def test_processes_managers_concurrently(app):
+    """Ensure managers given a db process their events in sessions of their own"""
+    setup_challenges(app)
+    with app.app_context():
+        db = get_db()
+
+    redis_conn = redis.Redis.from_url(url=REDIS_URL)
+
+    bus = ChallengeEventBus(redis_conn)
+    correct_manager = ChallengeManager("test_challenge_1", DefaultUpdater())
+    broken_manager = ChallengeManager("test_challenge_2", BrokenUpdater())
+    TEST_EVENT = "TEST_EVENT"
+    bus.register_listener(TEST_EVENT, correct_manager)
+    bus.register_listener(TEST_EVENT, broken_manager)
+    with bus.use_scoped_dispatch_queue():
+        bus.dispatch(TEST_EVENT, 101, 1)
+        bus.dispatch(TEST_EVENT, 101, 2)
+
+    with db.scoped_session() as session:
+        (count, did_error) = bus.process_events(session, db=db)
+        assert count == 2
+        assert did_error == False
+
+    with db.scoped_session() as session:
+        challenge_1_state = correct_manager.get_user_challenge_state(
+            session, ["1", "2"]
+        )
+        assert len(challenge_1_state) == 2
+        challenge_2_state = broken_manager.get_user_challenge_state(session, ["1", "2"])
+        assert len(challenge_2_state) == 0
@@ -0,0 +1,54 @@
+from integration_tests.utils import populate_mock_db
+from src.api.v1.helpers import (
+    decode_follower_count_cursor,
+    get_next_follower_count_cursor,
+)
+from src.models.users.user import User
+from src.queries.get_followers_for_user import get_followers_for_user
+from src.utils.db_session import get_db
+
+
+def test_get_followers_for_user_cursor_skips_unpopulated_users(app):
+    """Tests that a page with a follower left out of the results still has a next cursor"""
+    with app.app_context():
+        db = get_db()
+
+        test_entities = {
+            "users": [{"user_id": i} for i in range(1, 6)],
+            "follows": [
+                {"follower_user_id": i, "followee_user_id": 1} for i in range(2, 6)
+            ],
+            "aggregate_user": [
+                {"user_id": 2, "follower_count": 30},
+                {"user_id": 3, "follower_count": 20},
+                {"user_id": 4, "follower_count": 10},
+                {"user_id": 5, "follower_count": 0},
+            ],
+        }
+        populate_mock_db(db, test_entities)
+
+        # the follower in the middle of the first page is dropped from the results
+        with db.scoped_session() as session:
+            session.query(User).filter(User.user_id == 3).update(
+                {"handle": None, "handle_lc": None}
+            )
+
+        users, sort_keys = get_followers_for_user(
+            {"followee_user_id": 1, "limit": 3, "offset": 0}
+        )
+        assert [user["user_id"] for user in users] == [2, 4]
+        assert sort_keys == [(30, 2), (20, 3), (10, 4)]
+
+        next_cursor = get_next_follower_count_cursor(sort_keys, 3)
+        assert next_cursor is not None
+
+        users, sort_keys = get_followers_for_user(
+            {
+                "followee_user_id": 1,
+                "limit": 3,
+                "cursor": decode_follower_count_cursor(next_cursor),
+            }
+        )
+        assert [user["user_id"] for user in users] == [5]
+        assert sort_keys == [(0, 5)]
+        assert get_next_follower_count_cursor(sort_keys, 3) is None
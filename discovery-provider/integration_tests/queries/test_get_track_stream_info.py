@@ -0,0 +1,78 @@
+from integration_tests.utils import populate_mock_db
+from src.models.users.user import User
+from src.queries.get_track_stream_info import get_track_stream_info
+from src.utils.db_session import get_db
+from src.utils.entity_cache import (
+    TRACK_STREAM,
+    USER,
+    get_cache_versions,
+    get_entity_ids_to_invalidate,
+    remove_cached_entities,
+    set_cached_entities,
+)
+from src.utils.redis_connection import get_redis
+
+
+def test_get_track_stream_info(app):
+    with app.app_context():
+        db = get_db()
+        redis = get_redis()
+
+        test_entities = {
+            "users": [
+                {"user_id": 1, "creator_node_endpoint": "https://cn1.io,https://cn2.io"}
+            ],
+            "tracks": [
+                {"track_id": 1, "owner_id": 1},
+                {
+                    "track_id": 2,
+                    "owner_id": 1,
+                    "is_premium": True,
+                    "premium_conditions": {"nft_collection": "collection"},
+                },
+            ],
+        }
+        populate_mock_db(db, test_entities)
+
+        stream_info = get_track_stream_info(1)
+        assert stream_info["track_id"] == 1
+        assert stream_info["owner_id"] == 1
+        assert stream_info["is_premium"] == False
+        assert stream_info["is_delete"] == False
+        assert stream_info["is_deactivated"] == False
+        assert stream_info["creator_node_endpoint"] == "https://cn1.io,https://cn2.io"
+
+        premium_stream_info = get_track_stream_info(2)
+        assert premium_stream_info["is_premium"] == True
+        assert premium_stream_info["premium_conditions"] == {
+            "nft_collection": "collection"
+        }
+
+        assert get_track_stream_info(3) is None
+
+        # the owner's replica set changes, the cached lookup is stale until the
+        # indexer invalidates it
+        with db.scoped_session() as session:
+            session.query(User).filter(User.user_id == 1).update(
+                {"creator_node_endpoint": "https://cn3.io"}
+            )
+            entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+                session, {USER: {1}}
+            )
+        assert (
+            get_track_stream_info(1)["creator_node_endpoint"]
+            == "https://cn1.io,https://cn2.io"
+        )
+
+        remove_cached_entities(redis, entity_ids_to_invalidate)
+        assert get_track_stream_info(1)["creator_node_endpoint"] == "https://cn3.io"
+        assert get_track_stream_info(2)["creator_node_endpoint"] == "https://cn3.io"
+
+        # a lookup that read the db before an invalidation is not cached
+        remove_cached_entities(redis, {TRACK_STREAM: {1}})
+        cache_versions = get_cache_versions(redis, TRACK_STREAM, [1])
+        remove_cached_entities(redis, {TRACK_STREAM: {1}})
+        set_cached_entities(
+            redis, TRACK_STREAM, {1: {"track_id": 1, "is_delete": True}}, cache_versions
+        )
+        assert get_track_stream_info(1)["is_delete"] == False
@@ -0,0 +1,161 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from integration_tests.utils import populate_mock_db
+from src.models.social.follow import Follow
+from src.models.social.repost import Repost
+from src.models.social.save import Save
+from src.models.social.subscription import Subscription
+from src.tasks.entity_manager.entity_manager import fetch_existing_entities
+from src.tasks.entity_manager.utils import EntityType, get_record_key
+from src.utils.db_session import get_db
+
+logger = logging.getLogger(__name__)
+
+# Number of follows, saves, reposts and subscriptions looked up per block
+BENCHMARK_ACTION_COUNTS = [10, 100, 1000, 10000]
+
+
+def test_fetch_existing_social_records(app):
+    "Tests social records are looked up by their full composite key"
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "follows": [
+            {"follower_user_id": 1, "followee_user_id": 2},
+            {"follower_user_id": 2, "followee_user_id": 1, "is_current": False},
+        ],
+        "saves": [
+            {"user_id": 1, "save_item_id": 1, "save_type": "track"},
+            {"user_id": 1, "save_item_id": 1, "save_type": "playlist"},
+        ],
+        "reposts": [
+            {"user_id": 1, "repost_item_id": 2, "repost_type": "playlist"},
+        ],
+        "subscriptions": [
+            {"subscriber_id": 1, "user_id": 3},
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    entities_to_fetch = defaultdict(set)
+    entities_to_fetch[EntityType.FOLLOW] = {
+        (1, EntityType.USER, 2),
+        (2, EntityType.USER, 1),
+        (1, EntityType.USER, 3),
+    }
+    entities_to_fetch[EntityType.SAVE] = {
+        (1, EntityType.TRACK, 1),
+        (1, EntityType.TRACK, 2),
+    }
+    entities_to_fetch[EntityType.REPOST] = {
+        (1, EntityType.PLAYLIST, 2),
+        (1, EntityType.TRACK, 2),
+    }
+    entities_to_fetch[EntityType.SUBSCRIPTION] = {
+        (1, EntityType.USER, 3),
+        (3, EntityType.USER, 1),
+    }
+
+    with db.scoped_session() as session:
+        existing_entities = fetch_existing_entities(session, entities_to_fetch)
+
+    assert list(existing_entities[EntityType.FOLLOW].keys()) == [
+        get_record_key(1, EntityType.USER, 2)
+    ]
+    assert list(existing_entities[EntityType.SAVE].keys()) == [
+        get_record_key(1, EntityType.TRACK, 1)
+    ]
+    assert list(existing_entities[EntityType.REPOST].keys()) == [
+        get_record_key(1, EntityType.PLAYLIST, 2)
+    ]
+    assert list(existing_entities[EntityType.SUBSCRIPTION].keys()) == [
+        get_record_key(1, EntityType.USER, 3)
+    ]
+
+
+def test_benchmark_fetch_existing_social_records(app):
+    """
+    Benchmarks looking up the social records touched by a block as the number of
+    social actions in the block grows. Half of the looked up keys exist.
+    """
+    with app.app_context():
+        db = get_db()
+
+    latencies = {}
+    for num_actions in BENCHMARK_ACTION_COUNTS:
+        with db.scoped_session() as session:
+            session.query(Follow).delete()
+            session.query(Save).delete()
+            session.query(Repost).delete()
+            session.query(Subscription).delete()
+
+            now = datetime.now()
+            for i in range(num_actions // 2):
+                session.add(
+                    Follow(
+                        follower_user_id=i,
+                        followee_user_id=i + 1,
+                        is_current=True,
+                        is_delete=False,
+                        created_at=now,
+                    )
+                )
+                session.add(
+                    Save(
+                        user_id=i,
+                        save_item_id=i + 1,
+                        save_type="track",
+                        is_current=True,
+                        is_delete=False,
+                        created_at=now,
+                    )
+                )
+                session.add(
+                    Repost(
+                        user_id=i,
+                        repost_item_id=i + 1,
+                        repost_type="playlist",
+                        is_current=True,
+                        is_delete=False,
+                        created_at=now,
+                    )
+                )
+                session.add(
+                    Subscription(
+                        subscriber_id=i,
+                        user_id=i + 1,
+                        is_current=True,
+                        is_delete=False,
+                        created_at=now,
+                    )
+                )
+
+        entities_to_fetch = defaultdict(set)
+        for i in range(num_actions):
+            entities_to_fetch[EntityType.FOLLOW].add((i, EntityType.USER, i + 1))
+            entities_to_fetch[EntityType.SAVE].add((i, EntityType.TRACK, i + 1))
+            entities_to_fetch[EntityType.REPOST].add((i, EntityType.PLAYLIST, i + 1))
+            entities_to_fetch[EntityType.SUBSCRIPTION].add((i, EntityType.USER, i + 1))
+
+        with db.scoped_session() as session:
+            start_time = time.perf_counter()
+            existing_entities = fetch_existing_entities(session, entities_to_fetch)
+            latencies[num_actions] = time.perf_counter() - start_time
+
+        for entity_type in [
+            EntityType.FOLLOW,
+            EntityType.SAVE,
+            EntityType.REPOST,
+            EntityType.SUBSCRIPTION,
+        ]:
+            assert len(existing_entities[entity_type]) == num_actions // 2
+
+    for num_actions, latency in latencies.items():
+        logger.info(
+            f"test_fetch_existing_entities.py | {num_actions} social actions per type "
+            f"fetched in {latency * 1000:.1f}ms"
+        )
@@ -0,0 +1,140 @@
+from unittest import mock
+from unittest.mock import create_autospec
+
+from integration_tests.utils import populate_mock_db
+from src.models.users.associated_wallet import WalletChain
+from src.models.users.user_balance import UserBalance
+from src.models.users.user_balance_change import UserBalanceChange
+from src.queries.get_balances import IMMEDIATE_REFRESH_REDIS_PREFIX
+from src.solana.solana_client_manager import SolanaClientManager
+from src.tasks.cache_user_balance import get_associated_token_account, refresh_user_ids
+from src.utils.db_session import get_db
+from src.utils.eth_call_batcher import EthCallBatcher
+from src.utils.redis_connection import get_redis
+from src.utils.spl_audio import SPL_TO_WEI
+
+BLOCKNUMBER = 10
+SOL_WALLET = "Fipj4SLmTBmS7BSgDqeMPb7F86YWUUKajvDgQUWaHwWf"
+SOL_WALLET_WITHOUT_TOKEN_ACCOUNT = "9LzCMqDgTKYz9Drzqnpgee3SGa89up3a247ypMj2xrqM"
+
+
+def get_mock_contract(address):
+    contract = mock.MagicMock()
+    contract.address = address
+    contract.encodeABI.side_effect = lambda fn_name, args: f"{fn_name}:{args[0]}"
+    return contract
+
+
+def get_token_account_info(amount):
+    return {"data": {"parsed": {"info": {"tokenAmount": {"amount": amount}}}}}
+
+
+def test_refresh_user_ids(app):
+    with app.app_context():
+        db = get_db()
+        redis = get_redis()
+
+    # populate_mock_db gives the user at index i the bank account 0x{i}
+    test_entities = {
+        "users": [
+            {"user_id": user_id, "wallet": f"owner{user_id}"} for user_id in range(1, 6)
+        ],
+        "associated_wallets": [
+            {"user_id": 1, "wallet": "eth1", "chain": WalletChain.eth},
+            {"user_id": 1, "wallet": SOL_WALLET, "chain": WalletChain.sol},
+            {
+                "user_id": 3,
+                "wallet": SOL_WALLET_WITHOUT_TOKEN_ACCOUNT,
+                "chain": WalletChain.sol,
+            },
+        ],
+    }
+    populate_mock_db(db, test_entities)
+    redis.sadd(IMMEDIATE_REFRESH_REDIS_PREFIX, *range(1, 6))
+
+    eth_results = {
+        "balanceOf:owner1": hex(100),
+        "balanceOf:eth1": hex(10),
+        "getTotalDelegatorStake:eth1": hex(20),
+        "totalStakedFor:eth1": hex(30),
+        # calls to an address without code, or that failed, skip the user
+        "balanceOf:owner2": "0x",
+        "balanceOf:owner3": hex(1),
+        "balanceOf:owner4": hex(2),
+        "balanceOf:owner5": None,
+    }
+    eth_call_batcher = create_autospec(EthCallBatcher)
+    eth_call_batcher.call.side_effect = lambda calls, blocknumber: [
+        eth_results[data] for _, data in calls
+    ]
+
+    sol_account_infos = {
+        get_associated_token_account(SOL_WALLET): get_token_account_info("5"),
+        # token accounts that do not exist yet hold no wAUDIO
+        get_associated_token_account(SOL_WALLET_WITHOUT_TOKEN_ACCOUNT): None,
+        "0x0": get_token_account_info("7"),
+        "0x1": get_token_account_info("0"),
+        "0x2": get_token_account_info("3"),
+        # the bank account of user 4 is missing
+        "0x3": None,
+        "0x4": get_token_account_info("0"),
+    }
+    solana_client_manager = create_autospec(SolanaClientManager)
+    solana_client_manager.get_multiple_accounts.side_effect = lambda accounts: [
+        sol_account_infos[account] for account in accounts
+    ]
+
+    eth_web3 = mock.MagicMock()
+    eth_web3.toChecksumAddress.side_effect = lambda wallet: wallet
+    eth_web3.eth.block_number = BLOCKNUMBER
+
+    refresh_user_ids(
+        redis,
+        db,
+        get_mock_contract("token"),
+        get_mock_contract("delegate_manager"),
+        get_mock_contract("staking"),
+        eth_web3,
+        eth_call_batcher,
+        solana_client_manager,
+    )
+
+    # every balance was fetched in one batch of eth calls at the same block
+    eth_call_batcher.call.assert_called_once()
+    assert eth_call_batcher.call.call_args.args[1] == BLOCKNUMBER
+    solana_client_manager.get_multiple_accounts.assert_called_once()
+
+    with db.scoped_session() as session:
+        user_balances = {
+            user_balance.user_id: user_balance
+            for user_balance in session.query(UserBalance).all()
+        }
+        balance_changes = {
+            change.user_id: change for change in session.query(UserBalanceChange).all()
+        }
+
+        assert user_balances.keys() == {1, 2, 3, 4, 5}
+        assert balance_changes.keys() == {1, 3}
+
+        # owner balance plus the token, delegated and staked balances of the
+        # associated eth wallet
+        assert user_balances[1].balance == "100"
+        assert user_balances[1].associated_wallets_balance == "60"
+        assert user_balances[1].waudio == "7"
+        assert user_balances[1].associated_sol_wallets_balance == "5"
+        assert balance_changes[1].blocknumber == BLOCKNUMBER
+        assert balance_changes[1].current_balance == str(160 + 12 * SPL_TO_WEI)
+        assert balance_changes[1].previous_balance == "0"
+
+        assert user_balances[3].balance == "1"
+        assert user_balances[3].associated_wallets_balance == "0"
+        assert user_balances[3].waudio == "3"
+        assert user_balances[3].associated_sol_wallets_balance == "0"
+        assert balance_changes[3].current_balance == str(1 + 3 * SPL_TO_WEI)
+
+        # users whose balances could not be fetched keep their previous balance
+        for user_id in [2, 4, 5]:
+            assert user_balances[user_id].balance == "0"
+            assert user_balances[user_id].associated_wallets_balance == "0"
+
+    assert not redis.smembers(IMMEDIATE_REFRESH_REDIS_PREFIX)
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from integration_tests.utils import populate_mock_db
+from src.eth_indexing.event_scanner import EventScanner
+from src.models.users.associated_wallet import WalletChain
+from src.tasks.cache_user_balance import get_immediate_refresh_user_ids
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+
+
+def make_transfer(from_wallet, to_wallet, block_number=1, log_index=0):
+    tx_hash = mock.Mock()
+    tx_hash.hex.return_value = f"0x{block_number}{log_index}"
+    return {
+        "event": "Transfer",
+        "logIndex": log_index,
+        "transactionHash": tx_hash,
+        "blockNumber": block_number,
+        "args": {"from": from_wallet, "to": to_wallet, "value": 1},
+    }
+
+
+def test_enqueue_balance_refreshes(app):
+    with app.app_context():
+        db = get_db()
+        redis = get_redis()
+
+    test_entries = {
+        "users": [
+            {"user_id": 1, "wallet": "0x0403be3560116a12b467855cb29a393174a59876"},
+            {"user_id": 2, "wallet": "0x0403be3560116a12b467855cb29a393174a59875"},
+            {"user_id": 3, "wallet": "0x7d12457bd24ce79b62e66e915dbc0a469a6b59ba"},
+            {"user_id": 4, "wallet": "0x7d12457bd24ce79b62e66e915dbc0a469a6b59bb"},
+        ],
+        "associated_wallets": [
+            {
+                "user_id": 3,
+                "wallet": "0x5a8f4a2be1e1e2d1d7f2b5a3e1d9e3a1f8b2c7d1",
+                "chain": WalletChain.eth,
+            },
+        ],
+    }
+    populate_mock_db(db, test_entries)
+
+    scanner = EventScanner(
+        db=db,
+        redis=redis,
+        web3=mock.Mock(),
+        contract=mock.Mock(),
+        event_type=mock.Mock(),
+        filters={},
+    )
+    scanner.enqueue_balance_refreshes(
+        [
+            # check-summed wallets match the lower cased wallets of users
+            make_transfer(
+                "0x0403bE3560116a12b467855Cb29a393174a59876",
+                "0x5A8F4a2Be1E1e2D1D7f2b5A3e1D9E3a1f8B2c7D1",
+            ),
+            make_transfer(
+                "0x0403be3560116a12b467855cb29a393174a59875",
+                "0x000000000000000000000000000000000000dead",
+                log_index=1,
+            ),
+        ]
+    )
+
+    # the owner of the associated wallet and both senders are refreshed
+    refresh_user_ids = get_immediate_refresh_user_ids(redis)
+    assert sorted(refresh_user_ids) == [1, 2, 3]
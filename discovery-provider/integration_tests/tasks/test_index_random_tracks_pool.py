@@ -0,0 +1,68 @@
+from integration_tests.utils import populate_mock_db
+from src.models.tracks.track import Track
+from src.tasks.index_random_tracks_pool import _index_random_tracks_pool
+from src.utils.db_session import get_db
+from src.utils.random_tracks_pool import (
+    get_random_tracks_pool_blocknumber,
+    invalidate_random_tracks_pool,
+    sample_random_tracks_pool,
+)
+from src.utils.redis_connection import get_redis
+from src.utils.redis_constants import random_tracks_pool_redis_key
+
+
+def get_pool_track_ids(redis):
+    return {int(track_id) for track_id in redis.smembers(random_tracks_pool_redis_key)}
+
+
+def test_index_random_tracks_pool(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+    invalidate_random_tracks_pool(redis)
+
+    entities = {
+        "tracks": [
+            {"track_id": 1},
+            {"track_id": 2},
+            {"track_id": 3, "is_unlisted": True},
+            {"track_id": 4, "is_delete": True},
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        # builds the pool the first time
+        _index_random_tracks_pool(session, redis)
+
+    assert get_pool_track_ids(redis) == {1, 2}
+    assert get_random_tracks_pool_blocknumber(redis) == 3
+    assert sorted(sample_random_tracks_pool(redis, 10)) == [1, 2]
+
+    entities = {
+        "tracks": [
+            {"track_id": 1, "is_delete": True},
+            {"track_id": 3, "is_unlisted": False},
+            {"track_id": 5},
+        ],
+    }
+    populate_mock_db(db, entities, block_offset=4)
+
+    with db.scoped_session() as session:
+        # applies the tracks changed after the last update
+        _index_random_tracks_pool(session, redis)
+
+    assert get_pool_track_ids(redis) == {2, 3, 5}
+    assert get_random_tracks_pool_blocknumber(redis) == 6
+
+    with db.scoped_session() as session:
+        session.query(Track).filter(Track.track_id == 5).update({"is_unlisted": True})
+
+    # the change is at an earlier block so it is only seen when the pool is rebuilt
+    invalidate_random_tracks_pool(redis)
+    assert sample_random_tracks_pool(redis, 10) is None
+
+    with db.scoped_session() as session:
+        _index_random_tracks_pool(session, redis)
+
+    assert get_pool_track_ids(redis) == {2, 3}
@@ -0,0 +1,268 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from integration_tests.utils import populate_mock_db
+from src.models.notifications.notification_log import NotificationLog
+from src.queries import response_name_constants as const
+from src.queries.notifications import (
+    from_notification_log_entry,
+    get_entity_notifications,
+    get_owner_info,
+    merge_playlist_updates,
+    remove_stale_notifications,
+    to_notification_log_entry,
+)
+from src.tasks.notification_log import add_notifications_to_log, prune_notification_log
+from src.utils.db_session import get_db
+
+t1 = datetime(2020, 10, 10, 10, 35, 0)
+
+
+def get_block_timestamps():
+    raise AssertionError("no playlists were updated")
+
+
+def test_add_notifications_to_log(app):
+    with app.app_context():
+        db = get_db()
+
+    test_entities = {
+        "users": [{"user_id": i + 1} for i in range(4)],
+        "tracks": [{"track_id": 1, "owner_id": 1, "created_at": t1}],
+        "follows": [
+            {
+                "follower_user_id": 2,
+                "followee_user_id": 1,
+                "blocknumber": 1,
+                "created_at": t1,
+            },
+            {
+                "follower_user_id": 3,
+                "followee_user_id": 1,
+                "blocknumber": 2,
+                "created_at": t1,
+            },
+        ],
+        "saves": [
+            {"user_id": 2, "save_item_id": 1, "blocknumber": 2, "created_at": t1},
+        ],
+        "reposts": [
+            {"user_id": 3, "repost_item_id": 1, "blocknumber": 3, "created_at": t1},
+        ],
+    }
+    populate_mock_db(db, test_entities)
+
+    with db.scoped_session() as session:
+        for block_number in range(1, 4):
+            block = SimpleNamespace(number=block_number, parentHash=None, timestamp=0)
+            add_notifications_to_log(session, None, block)
+        add_notifications_to_log(
+            session, None, SimpleNamespace(number=4), is_skipped=True
+        )
+
+    with db.scoped_session() as session:
+        notification_logs = (
+            session.query(NotificationLog).order_by(NotificationLog.blocknumber).all()
+        )
+        assert [log.blocknumber for log in notification_logs] == [1, 2, 3, 4]
+        assert notification_logs[-1].notifications == []
+
+        # test the log holds the notifications queried over the block range
+        logged_notifications = [
+            from_notification_log_entry(entry)
+            for log in notification_logs
+            for entry in log.notifications
+        ]
+        queried_notifications = get_entity_notifications(
+            session, 0, 4, get_block_timestamps
+        )
+        assert logged_notifications == queried_notifications
+        assert [
+            (
+                notification[const.notification_type],
+                notification[const.notification_blocknumber],
+            )
+            for notification in logged_notifications
+        ] == [
+            (const.notification_type_follow, 1),
+            (const.notification_type_follow, 2),
+            (const.notification_type_favorite, 2),
+            (const.notification_type_repost, 3),
+        ]
+        assert get_owner_info(logged_notifications) == {
+            const.tracks: {1: 1},
+            const.albums: {},
+            const.playlists: {},
+        }
+
+
+def test_prune_notification_log(app):
+    with app.app_context():
+        db = get_db()
+
+    with db.scoped_session() as session:
+        assert prune_notification_log(session, 3) == 0
+
+        session.add_all(
+            [
+                NotificationLog(blocknumber=blocknumber, notifications=[])
+                for blocknumber in range(1, 11)
+            ]
+        )
+        session.flush()
+
+        # blocks at or below the latest logged block - 3 are pruned
+        assert prune_notification_log(session, 3) == 7
+        assert [
+            blocknumber
+            for (blocknumber,) in session.query(NotificationLog.blocknumber).order_by(
+                NotificationLog.blocknumber
+            )
+        ] == [8, 9, 10]
+
+        assert prune_notification_log(session, 3) == 0
+
+
+def test_notification_log_entry():
+    notification = {
+        const.notification_type: const.notification_type_playlist_update,
+        const.notification_blocknumber: 1,
+        const.notification_timestamp: t1,
+        const.notification_initiator: 1,
+        const.notification_metadata: {
+            const.notification_entity_id: 1,
+            const.notification_entity_type: "playlist",
+            const.notification_playlist_update_timestamp: t1,
+            const.notification_playlist_update_users: [2],
+        },
+    }
+    entry = to_notification_log_entry(notification)
+    assert entry[const.notification_timestamp] == t1.isoformat()
+    assert from_notification_log_entry(entry) == notification
+
+
+def make_notification(notification_type, blocknumber, initiator, **metadata):
+    return {
+        const.notification_type: notification_type,
+        const.notification_blocknumber: blocknumber,
+        const.notification_timestamp: t1,
+        const.notification_initiator: initiator,
+        const.notification_metadata: metadata,
+    }
+
+
+def make_reaction(notification_type, blocknumber, user_id, track_id):
+    return make_notification(
+        notification_type,
+        blocknumber,
+        user_id,
+        **{
+            const.notification_entity_type: "track",
+            const.notification_entity_id: track_id,
+            const.notification_entity_owner_id: 1,
+        },
+    )
+
+
+def test_remove_stale_notifications(app):
+    with app.app_context():
+        db = get_db()
+
+    test_entities = {
+        "users": [{"user_id": i + 1} for i in range(4)],
+        "tracks": [
+            {"track_id": 1, "owner_id": 1},
+            {"track_id": 2, "owner_id": 1, "is_delete": True},
+        ],
+        "follows": [
+            # followed again at block 3
+            {"follower_user_id": 2, "followee_user_id": 1, "blocknumber": 3},
+            # unfollowed at block 2
+            {
+                "follower_user_id": 3,
+                "followee_user_id": 1,
+                "blocknumber": 2,
+                "is_delete": True,
+            },
+        ],
+        "saves": [
+            # unfavorited at block 2
+            {"user_id": 2, "save_item_id": 1, "blocknumber": 2, "is_delete": True},
+        ],
+        "reposts": [
+            {"user_id": 3, "repost_item_id": 1, "blocknumber": 1},
+        ],
+    }
+    populate_mock_db(db, test_entities)
+
+    def follow(blocknumber, follower_id):
+        return make_notification(
+            const.notification_type_follow,
+            blocknumber,
+            follower_id,
+            **{
+                const.notification_follower_id: follower_id,
+                const.notification_followee_id: 1,
+            },
+        )
+
+    current_notifications = [
+        follow(3, 2),
+        make_reaction(const.notification_type_repost, 1, 3, 1),
+        make_reaction(const.notification_type_remix_cosign, 1, 3, 1),
+    ]
+    stale_notifications = [
+        follow(1, 2),
+        follow(1, 3),
+        make_reaction(const.notification_type_favorite, 1, 2, 1),
+        make_reaction(const.notification_type_remix_cosign, 1, 2, 1),
+        # track 2 was deleted
+        make_notification(
+            const.notification_type_create,
+            1,
+            1,
+            **{
+                const.notification_entity_type: "track",
+                const.notification_entity_id: 2,
+                const.notification_entity_owner_id: 1,
+            },
+        ),
+    ]
+
+    with db.scoped_session() as session:
+        assert (
+            remove_stale_notifications(
+                session, current_notifications + stale_notifications
+            )
+            == current_notifications
+        )
+
+
+def test_merge_playlist_updates():
+    def playlist_update(blocknumber, playlist_id):
+        return make_notification(
+            const.notification_type_playlist_update,
+            blocknumber,
+            1,
+            **{
+                const.notification_entity_id: playlist_id,
+                const.notification_entity_type: "playlist",
+                const.notification_playlist_update_timestamp: t1,
+                const.notification_playlist_update_users: [2],
+            },
+        )
+
+    follow = make_notification(const.notification_type_follow, 2, 2)
+    notifications = [
+        playlist_update(1, 1),
+        playlist_update(1, 2),
+        follow,
+        playlist_update(3, 1),
+    ]
+
+    # test only the latest update of each playlist is kept
+    assert merge_playlist_updates(notifications) == [
+        playlist_update(1, 2),
+        follow,
+        playlist_update(3, 1),
+    ]
@@ -15,6 +15,13 @@ from src.tasks.update_track_is_available import (
     update_tracks_is_available_status,
 )
 from src.utils.db_session import get_db
+from src.utils.entity_cache import (
+    TRACK,
+    TRACK_STREAM,
+    get_cache_versions,
+    get_cached_entities,
+    set_cached_entities,
+)
 from src.utils.redis_connection import get_redis
 
 logger = logging.getLogger(__name__)
@@ -119,9 +126,25 @@ def test_update_tracks_is_available_status(mock_check_track_is_available, app):
     _seed_db_with_data(db)
     redis.sadd(ALL_UNAVAILABLE_TRACKS_REDIS_KEY, *mock_unavailable_tracks)
     mock_check_track_is_available.return_value = False
+    set_cached_entities(
+        redis,
+        TRACK,
+        {1: {"track_id": 1, "is_available": True}},
+        get_cache_versions(redis, TRACK, [1]),
+    )
+    set_cached_entities(
+        redis,
+        TRACK_STREAM,
+        {1: {"track_id": 1, "is_delete": False}},
+        get_cache_versions(redis, TRACK_STREAM, [1]),
+    )
 
     update_tracks_is_available_status(db, redis)
 
+    # Check that the cached tracks and their stream lookups were invalidated
+    assert get_cached_entities(redis, TRACK, [1]) == {}
+    assert get_cached_entities(redis, TRACK_STREAM, [1]) == {}
+
     with db.scoped_session() as session:
         tracks = (
             session.query(Track.track_id, Track.is_available)
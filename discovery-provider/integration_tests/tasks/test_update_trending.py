@@ -376,3 +376,56 @@ def test_update_track_score_query(app):
         for score in scores:
             assert score.type == udpated_strategy.trending_type.name
             assert score.version == udpated_strategy.version.name
+
+
+def test_update_track_score_query_only_writes_changes(app):
+    """Test that updating scores only rewrites the scores that changed"""
+    with app.app_context():
+        db = get_db()
+
+    # setup
+    setup_trending(db)
+    strategy = TrendingTracksStrategyEJ57D()
+
+    with db.scoped_session() as session:
+        session.execute("REFRESH MATERIALIZED VIEW aggregate_interval_plays")
+        session.execute("REFRESH MATERIALIZED VIEW trending_params")
+        strategy.update_track_score_query(session)
+        scores = {
+            (score.track_id, score.time_range): (score.score, score.created_at)
+            for score in session.query(TrackTrendingScore).all()
+        }
+        assert len(scores) == 21
+
+        # a stale score and the score of a track that is no longer trending
+        session.query(TrackTrendingScore).filter(
+            TrackTrendingScore.track_id == 1, TrackTrendingScore.time_range == "week"
+        ).update({"score": -1})
+        session.add(
+            TrackTrendingScore(
+                track_id=100,
+                type=strategy.trending_type.name,
+                version=strategy.version.name,
+                time_range="week",
+                genre="Electronic",
+                score=1000,
+                created_at=datetime.now(),
+            )
+        )
+        session.commit()
+
+        strategy.update_track_score_query(session)
+        updated_scores = {
+            (score.track_id, score.time_range): (score.score, score.created_at)
+            for score in session.query(TrackTrendingScore).all()
+        }
+
+        # the stale score is recalculated and the score without a track is deleted
+        assert len(updated_scores) == 21
+        assert updated_scores[(1, "week")][0] == scores[(1, "week")][0]
+        assert updated_scores[(1, "week")][1] > scores[(1, "week")][1]
+
+        # unchanged scores are not rewritten
+        del scores[(1, "week")]
+        del updated_scores[(1, "week")]
+        assert updated_scores == scores
@@ -0,0 +1,80 @@
+"""
+
+Benchmarks generating the trending caches of index_trending for every genre of the
+genre allowlist and time range, one query and hydration per genre and time range as
+index_trending used to, against the single read of track_trending_scores it does now.
+
+Reads the track_trending_scores of the database in the config, so run it on a node
+whose trending has been calculated. Nothing is written to the trending caches.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_index_trending.py
+
+Optional args: number of runs
+
+    PYTHONPATH=. python scripts/benchmark_index_trending.py 5
+
+"""
+import sys
+import time
+
+from src.queries.get_trending_tracks import (
+    generate_all_unpopulated_trending_from_mat_views,
+    generate_unpopulated_trending_from_mat_views,
+)
+from src.tasks.index_trending import get_genres, time_ranges, trending_strategy_factory
+from src.trending_strategies.trending_type_and_version import TrendingType
+from src.utils.db_session import get_db_read_replica
+
+NUM_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+
+def generate_per_genre(session, genres, strategy):
+    return {
+        (time_range, genre): generate_unpopulated_trending_from_mat_views(
+            session=session, genre=genre, time_range=time_range, strategy=strategy
+        )
+        for genre in genres
+        for time_range in time_ranges
+    }
+
+
+def generate_single_pass(session, genres, strategy):
+    return generate_all_unpopulated_trending_from_mat_views(
+        session=session, genres=genres, time_ranges=time_ranges, strategy=strategy
+    )
+
+
+if __name__ == "__main__":
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        genres = get_genres(session)
+        genres.append(None)  # type: ignore
+        print(f"{len(genres)} genres, {len(genres) * len(time_ranges)} caches")
+
+        for version in trending_strategy_factory.get_versions_for_type(
+            TrendingType.TRACKS
+        ):
+            strategy = trending_strategy_factory.get_strategy(
+                TrendingType.TRACKS, version
+            )
+            if not strategy.use_mat_view:
+                continue
+
+            results = {}
+            for name, generate in [
+                ("per genre", generate_per_genre),
+                ("single pass", generate_single_pass),
+            ]:
+                durations = []
+                for _ in range(NUM_RUNS):
+                    start = time.perf_counter()
+                    results[name] = generate(session, genres, strategy)
+                    durations.append(time.perf_counter() - start)
+                print(
+                    f"{version.name} {name:>12}: best {min(durations):.2f}s of {NUM_RUNS}"
+                )
+
+            # both generate the same rankings
+            assert results["per genre"] == results["single pass"]
@@ -0,0 +1,149 @@
+"""
+
+Benchmarks converting Track rows to dictionaries the old way (reflecting over
+every row with inspect() and dir()) against the cached per model serializer now
+behind helpers.query_result_to_list, and checks both produce the same output.
+
+Rows are built in memory with their owner and route relationships loaded, the
+way the joined loads in get_unpopulated_tracks return them, so no database is
+needed.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_model_serializer.py
+
+Optional args: number of tracks, number of runs
+
+    PYTHONPATH=. python scripts/benchmark_model_serializer.py 10000 5
+
+"""
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect
+from src.models.tracks.track import Track
+from src.models.tracks.track_route import TrackRoute
+from src.models.users.user import User
+from src.utils import helpers
+
+NUM_TRACKS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+NUM_RUNS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+
+def legacy_query_result_to_list(query_result):
+    results = []
+    for row in query_result:
+        results.append(legacy_model_to_dictionary(row, None))
+    return results
+
+
+def legacy_model_to_dictionary(model, exclude_keys=None):
+    """model_to_dictionary as it was before serializers were cached per model"""
+    state = inspect(model)
+    unloaded = state.unloaded
+    model_dict = {}
+
+    columns = model.__table__.columns.keys()
+    relationships = model.__mapper__.relationships.keys()
+    properties = []
+    for key in list(set(dir(model)) - set(columns) - set(relationships)):
+        if hasattr(type(model), key):
+            attr = getattr(type(model), key)
+            if not callable(attr) and isinstance(attr, property):
+                properties.append(key)
+
+    if exclude_keys is None:
+        exclude_keys = []
+    if hasattr(model, "exclude_keys"):
+        exclude_keys.extend(model.exclude_keys)
+
+    assert set(exclude_keys).issubset(set(properties).union(columns))
+
+    for key in columns:
+        if key not in exclude_keys and not key.startswith("_"):
+            model_dict[key] = getattr(model, key)
+
+    for key in properties:
+        if key not in exclude_keys and not key.startswith("_"):
+            model_dict[key] = getattr(model, key)
+
+    for key in relationships:
+        if key not in exclude_keys and not key.startswith("_"):
+            if key in unloaded:
+                continue
+            attr = getattr(model, key)
+            if isinstance(attr, list):
+                model_dict[key] = legacy_query_result_to_list(attr)
+            else:
+                model_dict[key] = legacy_model_to_dictionary(attr)
+
+    return model_dict
+
+
+def make_tracks(num_tracks):
+    now = datetime.now()
+    tracks = []
+    for i in range(num_tracks):
+        user = User(
+            user_id=i % 1000,
+            handle=f"user_{i % 1000}",
+            wallet=f"0x{i % 1000:040x}",
+            is_current=True,
+            is_verified=False,
+            created_at=now,
+            updated_at=now,
+        )
+        route = TrackRoute(
+            slug=f"track-{i}",
+            title_slug=f"track-{i}",
+            collision_id=0,
+            owner_id=user.user_id,
+            track_id=i,
+            is_current=True,
+            blockhash="0x0",
+            blocknumber=1,
+            txhash="0x0",
+        )
+        track = Track(
+            track_id=i,
+            owner_id=user.user_id,
+            title=f"Track {i}",
+            genre="Electronic",
+            tags="bench,mark",
+            track_segments=[{"duration": 6, "multihash": "Qm"}],
+            is_current=True,
+            is_delete=False,
+            is_unlisted=False,
+            created_at=now,
+            updated_at=now,
+            blocknumber=1,
+            txhash="0x0",
+        )
+        track.user = [user]
+        track._routes = [route]
+        tracks.append(track)
+    return tracks
+
+
+def time_runs(func, tracks):
+    durations = []
+    for _ in range(NUM_RUNS):
+        start_time = time.perf_counter()
+        func(tracks)
+        durations.append(time.perf_counter() - start_time)
+    return min(durations)
+
+
+if __name__ == "__main__":
+    tracks = make_tracks(NUM_TRACKS)
+
+    assert legacy_query_result_to_list(tracks) == helpers.query_result_to_list(tracks)
+
+    legacy_duration = time_runs(legacy_query_result_to_list, tracks)
+    serializer_duration = time_runs(helpers.query_result_to_list, tracks)
+
+    print(f"{NUM_TRACKS} tracks, best of {NUM_RUNS} runs")
+    print(f"model_to_dictionary (reflection):  {legacy_duration * 1000:.1f}ms")
+    print(f"model_to_dictionary (serializer): {serializer_duration * 1000:.1f}ms")
+    print(f"speedup: {legacy_duration / serializer_duration:.1f}x")
@@ -0,0 +1,164 @@
+"""
+
+Benchmarks picking random tracks with ORDER BY random() over every eligible track,
+as get_random_tracks used to, against sampling ids from the random tracks pool and
+reading those tracks by primary key, as it does now.
+
+A tracks table with NUM_TRACKS rows is created in a temporary database, a sqlite
+file by default, and the pool is built in the redis from the config under
+benchmark keys so the pool of the node is left alone.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_random_tracks.py
+
+Optional args: number of tracks, number of requests, database url
+
+    PYTHONPATH=. python scripts/benchmark_random_tracks.py 2000000 50 postgresql+psycopg2://postgres@localhost/audius_discovery
+
+"""
+import random
+import sys
+import tempfile
+import time
+
+import redis
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, func
+from src.utils import random_tracks_pool
+from src.utils.config import shared_config
+from src.utils.random_tracks_pool import (
+    POOL_OVERSAMPLE,
+    rebuild_random_tracks_pool,
+    sample_random_tracks_pool,
+)
+from src.utils.session_manager import SessionManager
+
+NUM_TRACKS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+NUM_REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+DATABASE_URL = sys.argv[3] if len(sys.argv) > 3 else None
+# default limit of the feeling lucky route
+LIMIT = 25
+INSERT_CHUNK_SIZE = 100000
+
+metadata = MetaData()
+# the columns of tracks that are filtered on, plus a payload
+benchmark_tracks = Table(
+    "benchmark_tracks",
+    metadata,
+    Column("track_id", Integer, primary_key=True),
+    Column("is_current", Boolean, nullable=False),
+    Column("is_delete", Boolean, nullable=False),
+    Column("is_unlisted", Boolean, nullable=False),
+    Column("stem_of", String),
+    Column("blocknumber", Integer, index=True),
+    Column("title", String),
+)
+
+
+class BenchmarkTrack:
+    """Stands in for the Track model in random_tracks_pool"""
+
+    track_id = benchmark_tracks.c.track_id
+    is_current = benchmark_tracks.c.is_current
+    is_delete = benchmark_tracks.c.is_delete
+    is_unlisted = benchmark_tracks.c.is_unlisted
+    stem_of = benchmark_tracks.c.stem_of
+    blocknumber = benchmark_tracks.c.blocknumber
+
+
+def create_tracks(db, num_tracks):
+    rng = random.Random(0)
+    metadata.drop_all(db._engine)
+    metadata.create_all(db._engine)
+    with db._engine.begin() as connection:
+        for start in range(1, num_tracks + 1, INSERT_CHUNK_SIZE):
+            connection.execute(
+                benchmark_tracks.insert(),
+                [
+                    {
+                        "track_id": track_id,
+                        "is_current": True,
+                        "is_delete": rng.random() < 0.05,
+                        "is_unlisted": rng.random() < 0.05,
+                        "stem_of": '{"parent_track_id": 1}'
+                        if rng.random() < 0.02
+                        else None,
+                        "blocknumber": track_id,
+                        "title": f"track {track_id}",
+                    }
+                    for track_id in range(
+                        start, min(start + INSERT_CHUNK_SIZE, num_tracks + 1)
+                    )
+                ],
+            )
+
+
+def eligible_tracks(session):
+    return random_tracks_pool.filter_eligible_tracks(session.query(benchmark_tracks))
+
+
+def order_by_random(session):
+    return eligible_tracks(session).order_by(func.random()).limit(LIMIT).all()
+
+
+def sample_pool(session, redis_handle):
+    track_ids = sample_random_tracks_pool(redis_handle, LIMIT + POOL_OVERSAMPLE)
+    tracks_by_id = {
+        track.track_id: track
+        for track in eligible_tracks(session)
+        .filter(benchmark_tracks.c.track_id.in_(track_ids))
+        .all()
+    }
+    return [
+        tracks_by_id[track_id] for track_id in track_ids if track_id in tracks_by_id
+    ][:LIMIT]
+
+
+def time_requests(db, pick_tracks, num_requests):
+    latencies = []
+    with db.scoped_session() as session:
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            tracks = pick_tracks(session)
+            latencies.append(time.perf_counter() - start)
+            assert len(tracks) == LIMIT
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+if __name__ == "__main__":
+    random_tracks_pool.Track = BenchmarkTrack
+    random_tracks_pool.random_tracks_pool_redis_key = "benchmark:random_tracks:pool"
+    random_tracks_pool.random_tracks_pool_build_redis_key = (
+        "benchmark:random_tracks:pool:build"
+    )
+    random_tracks_pool.random_tracks_pool_blocknumber_redis_key = (
+        "benchmark:random_tracks:pool:blocknumber"
+    )
+    redis_handle = redis.Redis.from_url(url=shared_config["redis"]["url"])
+    with tempfile.NamedTemporaryFile(suffix=".db") as database_file:
+        db = SessionManager(DATABASE_URL or f"sqlite:///{database_file.name}", {})
+
+        start = time.perf_counter()
+        create_tracks(db, NUM_TRACKS)
+        print(f"created {NUM_TRACKS} tracks in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        with db.scoped_session() as session:
+            pool_size = rebuild_random_tracks_pool(session, redis_handle)
+        print(
+            f"built a pool of {pool_size} tracks in {time.perf_counter() - start:.1f}s"
+        )
+
+        for name, pick_tracks in [
+            ("order by random()", order_by_random),
+            ("random tracks pool", lambda session: sample_pool(session, redis_handle)),
+        ]:
+            median, p99 = time_requests(db, pick_tracks, NUM_REQUESTS)
+            print(f"{name:>20}: median {median * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms")
+
+        redis_handle.delete(
+            random_tracks_pool.random_tracks_pool_redis_key,
+            random_tracks_pool.random_tracks_pool_blocknumber_redis_key,
+        )
+        metadata.drop_all(db._engine)
@@ -0,0 +1,183 @@
+"""
+
+Benchmarks computing related artists on a synthetic follow graph, building a
+datasketch MinHash per artist and querying and rescoring artists one at a time as
+update_related_artist_minhash used to, against the vectorized signatures and the
+query and rescore phase spread across a process pool it does now.
+
+Followers are drawn mostly from a community of the artist so the LSH forest finds
+related artists. Nothing is read from or written to the database. Querying every
+artist the previous way takes hours on the default graph, so it is timed on a
+sample of artists and extrapolated.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_related_artists.py
+
+Optional args: number of artists, number of follow edges, number of processes,
+number of artists queried the previous way
+
+    PYTHONPATH=. python scripts/benchmark_related_artists.py 10000 5000000 8 1000
+
+"""
+import datetime
+import sys
+import time
+
+import numpy as np
+from datasketch import MinHash, MinHashLSHForest
+from src.queries.get_related_artists_minhash import (
+    MIN_FOLLOWER_REQUIREMENT,
+    compute_signatures,
+    num_perm,
+    query_related_artists,
+    top_k,
+)
+
+NUM_ARTISTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+NUM_EDGES = int(sys.argv[2]) if len(sys.argv) > 2 else 50000000
+NUM_PROCESSES = int(sys.argv[3]) if len(sys.argv) > 3 else None
+NUM_SAMPLED_ARTISTS = int(sys.argv[4]) if len(sys.argv) > 4 else 2000
+NUM_COMMUNITIES = 500
+# share of the followers of an artist from outside its community
+NOISE = 0.2
+
+
+def create_follow_graph(num_artists, num_edges):
+    """Returns the artist ids, the offsets of their followers and the followers"""
+    rng = np.random.default_rng(0)
+    num_users = max(num_edges // 10, 1)
+    community_size = max(num_users // NUM_COMMUNITIES, 1)
+
+    # a few artists have most of the followers
+    weights = 1 / np.arange(1, num_artists + 1) ** 0.8
+    follower_counts = np.maximum((weights / weights.sum() * num_edges).astype(int), 1)
+    rng.shuffle(follower_counts)
+
+    follower_id_chunks = []
+    for artist, follower_count in enumerate(follower_counts.tolist()):
+        community_start = (artist % NUM_COMMUNITIES) * community_size
+        num_noise = int(follower_count * NOISE)
+        follower_id_chunks.append(
+            np.concatenate(
+                [
+                    rng.integers(
+                        community_start,
+                        community_start + community_size,
+                        follower_count - num_noise,
+                    ),
+                    rng.integers(0, num_users, num_noise),
+                ]
+            )
+        )
+
+    offsets = np.zeros(num_artists + 1, dtype=np.int64)
+    np.cumsum(follower_counts, out=offsets[1:])
+    user_ids = np.arange(1, num_artists + 1, dtype=np.int64)
+    return (user_ids, offsets, np.concatenate(follower_id_chunks))
+
+
+def build_minhash_per_artist(user_ids, offsets, follower_ids):
+    forest = MinHashLSHForest(num_perm=num_perm)
+    user_mh = {}
+    for i, user_id in enumerate(user_ids.tolist()):
+        ids = [
+            str(id).encode("utf8")
+            for id in follower_ids[offsets[i] : offsets[i + 1]].tolist()
+        ]
+        mh = MinHash(num_perm=num_perm)
+        mh.update_batch(ids)
+        user_mh[user_id] = mh
+        forest.add(user_id, mh)
+    forest.index()
+    return (user_mh, forest)
+
+
+def query_per_artist(user_mh, forest, query_user_ids):
+    rows = []
+    for user_id in query_user_ids:
+        mh = user_mh[user_id]
+        created_at = datetime.datetime.now()
+        artist_rows = []
+        for other_id in forest.query(mh, top_k * 5):
+            if other_id == user_id:
+                continue
+            mh2 = user_mh[other_id]
+            union = MinHash.union(mh, mh2)
+            intersection_size = mh.count() + mh2.count() - union.count()
+            score = intersection_size * intersection_size / mh2.count()
+            artist_rows.append((user_id, other_id, score, created_at))
+        rows.extend(sorted(artist_rows, key=lambda x: x[2], reverse=True)[:top_k])
+    return rows
+
+
+def build_vectorized(user_ids, offsets, follower_ids):
+    prototype = MinHash(num_perm=num_perm)
+    signatures = compute_signatures(
+        offsets, follower_ids, prototype.permutations, prototype.hashfunc
+    )
+    forest = MinHashLSHForest(num_perm=num_perm)
+    for user_id, hashvalues in zip(user_ids.tolist(), signatures):
+        forest.add(
+            user_id,
+            MinHash(
+                num_perm=num_perm,
+                hashvalues=hashvalues,
+                permutations=prototype.permutations,
+            ),
+        )
+    forest.index()
+    return (signatures, prototype.permutations, forest)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    (user_ids, offsets, follower_ids) = create_follow_graph(NUM_ARTISTS, NUM_EDGES)
+    print(
+        f"created {NUM_ARTISTS} artists with {len(follower_ids)} follows in {time.perf_counter() - start:.1f}s"
+    )
+
+    start = time.perf_counter()
+    (user_mh, previous_forest) = build_minhash_per_artist(
+        user_ids, offsets, follower_ids
+    )
+    previous_build = time.perf_counter() - start
+    query_user_ids = [
+        user_id
+        for user_id, mh in user_mh.items()
+        if mh.count() >= MIN_FOLLOWER_REQUIREMENT
+    ]
+    sampled_user_ids = query_user_ids[:NUM_SAMPLED_ARTISTS]
+    start = time.perf_counter()
+    previous_rows = query_per_artist(user_mh, previous_forest, sampled_user_ids)
+    previous_query = (
+        (time.perf_counter() - start)
+        * len(query_user_ids)
+        / max(len(sampled_user_ids), 1)
+    )
+    del user_mh, previous_forest
+    print(
+        f"   per artist: build {previous_build:.1f}s, query {previous_query:.1f}s for {len(query_user_ids)} artists (extrapolated from {len(sampled_user_ids)})"
+    )
+
+    start = time.perf_counter()
+    (signatures, permutations, forest) = build_vectorized(
+        user_ids, offsets, follower_ids
+    )
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    rows = [
+        row
+        for chunk in query_related_artists(
+            user_ids, signatures, permutations, forest, NUM_PROCESSES
+        )
+        for row in chunk
+    ]
+    query = time.perf_counter() - start
+    print(f"   vectorized: build {build:.1f}s, query {query:.1f}s")
+
+    # both compute the same related artists
+    sampled = set(sampled_user_ids)
+    assert {row[:3] for row in rows if row[0] in sampled} == {
+        row[:3] for row in previous_rows
+    }
@@ -0,0 +1,87 @@
+"""
+
+Benchmarks how many sessions per second SessionManager.scoped_session can open
+when tagging SQL with the caller's function name through inspect.stack(), as it
+used to, and through sys._getframe(), as it does now.
+
+Sessions are opened from a stack NUM_FRAMES deep to resemble a request going
+through flask and the query layers, and a select is run in each so the tag is
+written into the SQL comment. An in-memory sqlite database is used so no
+postgres is needed.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_scoped_session.py
+
+Optional args: number of sessions, stack depth
+
+    PYTHONPATH=. python scripts/benchmark_scoped_session.py 5000 40
+
+"""
+import inspect
+import sys
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from src.utils.session_manager import SessionManager
+
+NUM_SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+NUM_FRAMES = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+
+class LegacySessionManager(SessionManager):
+    @contextmanager
+    def scoped_session(self, expire_on_commit=True):
+        """scoped_session as it was before callers were tagged with sys._getframe"""
+        session = self._session_factory()
+        session.expire_on_commit = expire_on_commit
+
+        try:
+            session.info["src"] = inspect.stack()[2][3]  # get caller's function name
+        except Exception:
+            pass
+
+        try:
+            yield session
+            session.commit()
+        except:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+def open_sessions(db, num_sessions):
+    for _ in range(num_sessions):
+        with db.scoped_session() as session:
+            session.execute(text("SELECT 1"))
+
+
+def open_sessions_from_stack(db, num_sessions, depth):
+    if depth > 0:
+        return open_sessions_from_stack(db, num_sessions, depth - 1)
+    return open_sessions(db, num_sessions)
+
+
+def time_sessions(db):
+    start_time = time.perf_counter()
+    open_sessions_from_stack(db, NUM_SESSIONS, NUM_FRAMES)
+    return time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    db = SessionManager("sqlite://", {})
+    legacy_db = LegacySessionManager("sqlite://", {})
+
+    # warm up both engines' connection pools
+    open_sessions(db, 10)
+    open_sessions(legacy_db, 10)
+
+    legacy_duration = time_sessions(legacy_db)
+    duration = time_sessions(db)
+
+    print(f"{NUM_SESSIONS} sessions opened {NUM_FRAMES} frames deep")
+    print(f"inspect.stack(): {NUM_SESSIONS / legacy_duration:.0f} sessions/s")
+    print(f"sys._getframe(): {NUM_SESSIONS / duration:.0f} sessions/s")
+    print(f"speedup: {legacy_duration / duration:.1f}x")
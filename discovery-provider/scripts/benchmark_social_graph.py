@@ -0,0 +1,102 @@
+"""
+
+Benchmarks the in memory SocialGraph: memory used per million follows, time to
+build it and the latency of the follow queries the API answers from it.
+
+Follows are generated in memory with a skewed followee distribution so a few
+users have most of the followers, like artists on Audius, so no database is
+needed.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_social_graph.py
+
+Optional args: number of follows, number of users
+
+    PYTHONPATH=. python scripts/benchmark_social_graph.py 10000000 2000000
+
+"""
+import sys
+import time
+
+import numpy as np
+from src.utils.social_graph import SocialGraph
+
+NUM_FOLLOWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+NUM_USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+NUM_QUERIES = 1000
+# users in a page of populate_user_metadata
+PAGE_SIZE = 100
+
+
+def make_follows(num_follows, num_users):
+    rng = np.random.default_rng(0)
+    follower_ids = rng.integers(1, num_users, num_follows, dtype=np.int32)
+    followee_ids = np.minimum(rng.zipf(1.5, num_follows), num_users - 1).astype(
+        np.int32
+    )
+    # spread the popular followees across the id space
+    followee_ids = (followee_ids * 7919) % num_users + 1
+    return follower_ids, followee_ids
+
+
+def time_queries(name, query, user_ids):
+    start_time = time.perf_counter()
+    for user_id in user_ids:
+        query(int(user_id))
+    duration = time.perf_counter() - start_time
+    print(f"{name}: {duration / len(user_ids) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    follower_ids, followee_ids = make_follows(NUM_FOLLOWS, NUM_USERS)
+
+    start_time = time.perf_counter()
+    graph = SocialGraph(follower_ids, followee_ids, 0)
+    build_duration = time.perf_counter() - start_time
+
+    print(f"{graph.num_follows} follows between {NUM_USERS} users")
+    print(f"build: {build_duration:.2f}s")
+    print(f"memory: {graph.nbytes / 2**20:.1f}MB")
+    mb_per_million_follows = graph.nbytes / graph.num_follows * 1e6 / 2**20
+    print(f"memory per million follows: {mb_per_million_follows:.1f}MB")
+
+    rng = np.random.default_rng(1)
+    user_ids = rng.integers(1, NUM_USERS, NUM_QUERIES)
+    other_user_ids = rng.integers(1, NUM_USERS, NUM_QUERIES)
+    pages = [
+        rng.integers(1, NUM_USERS, PAGE_SIZE).tolist() for _ in range(NUM_QUERIES // 10)
+    ]
+    # the users with the most followers
+    followee_counts = np.bincount(followee_ids)
+    popular_user_ids = np.argsort(followee_counts)[-NUM_QUERIES:]
+
+    time_queries(
+        "does_follow",
+        lambda user_id: graph.does_follow(user_id, int(other_user_ids[0])),
+        user_ids,
+    )
+    time_queries(
+        f"get_follower_counts ({PAGE_SIZE} users)",
+        lambda i: graph.get_follower_counts(pages[i]),
+        range(len(pages)),
+    )
+    time_queries(
+        "get_follow_intersection (popular followee)",
+        lambda user_id: graph.get_follow_intersection(
+            int(popular_user_ids[-1]), user_id
+        ),
+        user_ids,
+    )
+    time_queries(
+        f"get_followee_follow_counts ({PAGE_SIZE} users)",
+        lambda i: graph.get_followee_follow_counts(int(user_ids[i]), pages[i]),
+        range(len(pages)),
+    )
+    time_queries(
+        f"get_followee_follow_counts ({PAGE_SIZE} popular users)",
+        lambda i: graph.get_followee_follow_counts(
+            int(user_ids[i]), popular_user_ids[-PAGE_SIZE:].tolist()
+        ),
+        range(len(pages)),
+    )
@@ -0,0 +1,155 @@
+"""
+
+Benchmarks fetching and parsing the transactions of solana plays the old way (a
+thread pool making one getTransaction call per transaction, each with its own
+retries) against batched getTransaction JSON-RPC requests that only retry the
+transactions that failed.
+
+Both are driven against a local mock solana RPC server that adds a fixed latency
+to every HTTP request and can answer a share of the getTransaction calls with a
+null result, as RPC nodes do for transactions they have not caught up to.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_solana_plays_fetch.py
+
+Optional args: number of transactions, per request latency in ms, share of calls
+that fail
+
+    PYTHONPATH=. python scripts/benchmark_solana_plays_fetch.py 2000 20 0.05
+
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import base58
+from src.solana.solana_client_manager import SolanaClientManager
+from src.tasks.index_solana_plays import (
+    SECP_PROGRAM,
+    SIGNER_GROUP,
+    TRACK_LISTEN_PROGRAM,
+    TX_SIGNATURES_PROCESSING_SIZE,
+    fetch_sol_plays_batched,
+    fetch_sol_plays_from_thread_pool,
+)
+from src.utils.helpers import split_list
+
+NUM_TXS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+LATENCY_SECONDS = (int(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+FAILURE_RATE = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+
+def tx_sig(i):
+    return f"sig{i}"
+
+
+def encode_field(value: bytes):
+    return len(value).to_bytes(4, "little") + value
+
+
+def play_tx(sig):
+    i = int(sig[3:])
+    data = (
+        b"\x00"
+        + encode_field(str(i % 1000).encode())
+        + encode_field(str(i).encode())
+        + encode_field(
+            json.dumps(
+                {"source": "relay", "location": {"city": "Berlin", "country": "DE"}}
+            ).encode()
+        )
+        + (1640126543 + i).to_bytes(8, "little")
+    )
+    return {
+        "slot": 111753419 + i,
+        "meta": {"err": None},
+        "transaction": {
+            "message": {
+                "accountKeys": [SECP_PROGRAM, SIGNER_GROUP, TRACK_LISTEN_PROGRAM],
+                "instructions": [
+                    {"programIdIndex": 2, "data": base58.b58encode(data).decode()}
+                ],
+            }
+        },
+    }
+
+
+class MockRpcHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):  # silence request logging
+        pass
+
+    def handle_call(self, call):
+        if call["method"] != "getTransaction":
+            return {
+                "jsonrpc": "2.0",
+                "id": call["id"],
+                "error": {"code": -32601, "message": "Method not found"},
+            }
+        failed = random.random() < FAILURE_RATE
+        return {
+            "jsonrpc": "2.0",
+            "id": call["id"],
+            "result": None if failed else play_tx(call["params"][0]),
+        }
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(LATENCY_SECONDS)
+        if isinstance(body, list):
+            response = [self.handle_call(call) for call in body]
+        else:
+            response = self.handle_call(body)
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def run(name, fetch, tx_sigs):
+    plays = []
+    start = time.time()
+    # in batches of the size process_solana_plays parses at once
+    for tx_sig_batch_records in split_list(tx_sigs, TX_SIGNATURES_PROCESSING_SIZE):
+        plays.extend(fetch(tx_sig_batch_records))
+    elapsed = time.time() - start
+    assert len(plays) == len(tx_sigs)
+    print(f"{name:<30} {elapsed:8.2f}s  {len(tx_sigs) / elapsed:10.1f} txs/s")
+    return plays
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockRpcHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    solana_client_manager = SolanaClientManager(endpoint)
+    tx_sigs = [tx_sig(i) for i in range(NUM_TXS)]
+    print(
+        f"{NUM_TXS} txs, {LATENCY_SECONDS * 1000:.0f}ms per request, {FAILURE_RATE:.0%} of calls fail"
+    )
+
+    thread_pool_plays = run(
+        "per tx getTransaction",
+        lambda batch: fetch_sol_plays_from_thread_pool(solana_client_manager, batch),
+        tx_sigs,
+    )
+    batched_plays = run(
+        "batched getTransaction",
+        lambda batch: fetch_sol_plays_batched(solana_client_manager, batch),
+        tx_sigs,
+    )
+    # both parse the same plays
+    assert sorted(thread_pool_plays, key=lambda play: play[-1]) == sorted(
+        batched_plays, key=lambda play: play[-1]
+    )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+
+Benchmarks fetching every tx receipt in a block the old way (a new thread pool
+per block making one eth_getTransactionReceipt call per tx) against
+TxReceiptFetcher (eth_getBlockReceipts / batched JSON-RPC over a keep-alive session).
+
+Both are driven against a local mock JSON-RPC server that adds a fixed latency
+to every HTTP request, which is what dominates indexing busy EntityManager blocks.
+
+To run:
+
+    PYTHONPATH=. python scripts/benchmark_tx_receipt_fetcher.py
+
+Optional args: number of blocks, txs per block, per request latency in ms
+
+    PYTHONPATH=. python scripts/benchmark_tx_receipt_fetcher.py 20 200 5
+
+"""
+import concurrent.futures
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.utils.tx_receipt_fetcher import TxReceiptFetcher
+from web3 import HTTPProvider, Web3
+from web3.datastructures import AttributeDict
+
+NUM_BLOCKS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+TXS_PER_BLOCK = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+LATENCY_SECONDS = (int(sys.argv[3]) if len(sys.argv) > 3 else 5) / 1000
+
+
+def tx_hash(block_number, i):
+    return "0x" + f"{block_number:08x}{i:08x}".rjust(64, "0")
+
+
+def block_hash(block_number):
+    return "0x" + f"{block_number:08x}".rjust(64, "f")
+
+
+def receipt(tx):
+    return {
+        "transactionHash": tx,
+        "transactionIndex": "0x0",
+        "blockHash": block_hash(int(tx[-16:-8], 16)),
+        "blockNumber": hex(int(tx[-16:-8], 16)),
+        "cumulativeGasUsed": "0x5208",
+        "gasUsed": "0x5208",
+        "status": "0x1",
+        "logs": [],
+    }
+
+
+class MockRpcHandler(BaseHTTPRequestHandler):
+    supports_block_receipts = True
+
+    def log_message(self, *args):  # silence request logging
+        pass
+
+    def handle_call(self, call):
+        method, params = call["method"], call["params"]
+        if method == "eth_getTransactionReceipt":
+            return {"jsonrpc": "2.0", "id": call["id"], "result": receipt(params[0])}
+        if method == "eth_getBlockReceipts" and self.supports_block_receipts:
+            block_number = int(params[0][-8:], 16)
+            return {
+                "jsonrpc": "2.0",
+                "id": call["id"],
+                "result": [
+                    receipt(tx_hash(block_number, i)) for i in range(TXS_PER_BLOCK)
+                ],
+            }
+        return {
+            "jsonrpc": "2.0",
+            "id": call["id"],
+            "error": {"code": -32601, "message": "Method not found"},
+        }
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(LATENCY_SECONDS)
+        if isinstance(body, list):
+            response = [self.handle_call(call) for call in body]
+        else:
+            response = self.handle_call(body)
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def make_blocks():
+    return [
+        AttributeDict(
+            {
+                "number": block_number,
+                "hash": block_hash(block_number),
+                "transactions": [
+                    {"hash": tx_hash(block_number, i)} for i in range(TXS_PER_BLOCK)
+                ],
+            }
+        )
+        for block_number in range(1, NUM_BLOCKS + 1)
+    ]
+
+
+def fetch_per_tx(web3, block):
+    receipts = {}
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(web3.eth.get_transaction_receipt, tx["hash"])
+            for tx in block.transactions
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            tx_receipt = future.result()
+            receipts[web3.toHex(tx_receipt.transactionHash)] = tx_receipt
+    return receipts
+
+
+def run(name, fetch, blocks):
+    start = time.time()
+    for block in blocks:
+        assert len(fetch(block)) == TXS_PER_BLOCK
+    elapsed = time.time() - start
+    print(
+        f"{name:<40} {elapsed:8.2f}s  {NUM_BLOCKS / elapsed:8.1f} blocks/s  "
+        f"{NUM_BLOCKS * TXS_PER_BLOCK / elapsed:10.1f} receipts/s"
+    )
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockRpcHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    blocks = make_blocks()
+    print(
+        f"{NUM_BLOCKS} blocks x {TXS_PER_BLOCK} txs, {LATENCY_SECONDS * 1000:.0f}ms per request"
+    )
+
+    web3 = Web3(HTTPProvider(endpoint))
+    run("per tx eth_getTransactionReceipt", lambda b: fetch_per_tx(web3, b), blocks)
+
+    MockRpcHandler.supports_block_receipts = False
+    fetcher = TxReceiptFetcher(endpoint)
+    run("TxReceiptFetcher (batched)", fetcher.fetch_block_receipts, blocks)
+
+    MockRpcHandler.supports_block_receipts = True
+    fetcher = TxReceiptFetcher(endpoint)
+    run("TxReceiptFetcher (eth_getBlockReceipts)", fetcher.fetch_block_receipts, blocks)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
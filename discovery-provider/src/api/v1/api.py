@@ -17,6 +17,7 @@ from src.api.v1.tracks import ns as tracks_ns
 from src.api.v1.transactions import full_ns as full_transactions_ns
 from src.api.v1.users import full_ns as full_users_ns
 from src.api.v1.users import ns as users_ns
+from src.api_helpers import output_signed_json
 
 
 class ApiWithHTTPS(Api):
@@ -32,6 +33,7 @@ class ApiWithHTTPS(Api):
 
 bp = Blueprint("api_v1", __name__, url_prefix="/v1")
 api_v1 = ApiWithHTTPS(bp, version="1.0", description="Audius V1 API")
+api_v1.representation("application/json")(output_signed_json)
 api_v1.add_namespace(models_ns)
 api_v1.add_namespace(users_ns)
 api_v1.add_namespace(playlists_ns)
@@ -43,6 +45,7 @@ api_v1.add_namespace(resolve_ns)
 
 bp_full = Blueprint("api_v1_full", __name__, url_prefix="/v1/full")
 api_v1_full = ApiWithHTTPS(bp_full, version="1.0")
+api_v1_full.representation("application/json")(output_signed_json)
 api_v1_full.add_namespace(models_ns)
 api_v1_full.add_namespace(full_tracks_ns)
 api_v1_full.add_namespace(full_playlists_ns)
@@ -1,8 +1,11 @@
+import base64
+import binascii
+import json
 import logging
 from datetime import datetime
-from typing import Dict, cast
+from typing import Dict, List, Optional, Tuple, cast
 
-from flask_restx import reqparse
+from flask_restx import fields, reqparse
 from src import api_helpers
 from src.api.v1.models.common import full_response
 from src.models.rewards.challenge import ChallengeType
@@ -382,6 +385,52 @@ def decode_with_abort(identifier: str, namespace) -> int:
     return cast(int, decoded)
 
 
+def encode_follower_count_cursor(follower_count: int, user_id: int) -> str:
+    """Encodes the sort key of the last user in a page as an opaque cursor"""
+    cursor = json.dumps([follower_count, user_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(cursor.encode("utf-8")).decode("utf-8")
+
+
+def decode_follower_count_cursor(cursor: str) -> Optional[Tuple[int, int]]:
+    try:
+        follower_count, user_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        return None
+    if type(follower_count) is not int or type(user_id) is not int:
+        return None
+    return follower_count, user_id
+
+
+def get_follower_count_cursor_with_abort(args, namespace) -> Optional[Tuple[int, int]]:
+    cursor = args.get("cursor")
+    if not cursor:
+        return None
+    decoded = decode_follower_count_cursor(cursor)
+    if decoded is None:
+        abort_bad_request_param("cursor", namespace)
+    return decoded
+
+
+def get_next_follower_count_cursor(
+    sort_keys: List[Tuple[int, int]], limit
+) -> Optional[str]:
+    """
+    Returns the cursor for the page after the rows with the (follower_count, user_id)
+    sort_keys, or None if it was the last page. The keys are of every row the page
+    query returned, since users may be left out of the page's results.
+    """
+    if not sort_keys or len(sort_keys) < limit:
+        return None
+    return encode_follower_count_cursor(*sort_keys[-1])
+
+
+def cursor_success_response(users, next_cursor):
+    response, status = success_response(users)
+    # added before the response is marshalled and signed, so the cursor is signed
+    response["next_cursor"] = next_cursor
+    return response, status
+
+
 def make_response(name, namespace, modelType):
     return namespace.model(
         name,
@@ -395,6 +444,22 @@ def make_full_response(name, namespace, modelType):
     return namespace.clone(name, full_response, {"data": modelType})
 
 
+def make_cursor_response(name, namespace, modelType):
+    return namespace.model(
+        name,
+        {
+            "data": modelType,
+            "next_cursor": fields.String,
+        },
+    )
+
+
+def make_full_cursor_response(name, namespace, modelType):
+    return namespace.clone(
+        name, full_response, {"data": modelType, "next_cursor": fields.String}
+    )
+
+
 def to_dict(multi_dict):
     """Converts a multi dict into a dict where only list entries are not flat"""
     return {
@@ -495,6 +560,13 @@ pagination_with_current_user_parser.add_argument(
     "user_id", required=False, description="The user ID of the user making the request"
 )
 
+cursor_pagination_with_current_user_parser = pagination_with_current_user_parser.copy()
+cursor_pagination_with_current_user_parser.add_argument(
+    "cursor",
+    required=False,
+    description="The next_cursor of the previous page, used in place of offset",
+)
+
 search_parser = reqparse.RequestParser(argument_class=DescriptiveArgument)
 search_parser.add_argument("query", required=True, description="The search query")
 
@@ -625,7 +697,14 @@ trending_parser.remove_argument("offset")
 
 
 def success_response(entity):
-    return api_helpers.success_response(entity, 200, False)
+    # Signed by output_signed_json once the response is marshalled, so the
+    # signature covers the response as sent. Models without a signature field
+    # drop it and are sent unsigned.
+    response, status = api_helpers.success_response(
+        entity, 200, False, sign_response=False
+    )
+    response["signature"] = None
+    return response, status
 
 
 DEFAULT_LIMIT = 100
@@ -0,0 +1,82 @@
+import json
+
+import src.api_helpers
+from eth_account.messages import encode_defunct
+from flask import Flask
+from flask_restx import Namespace, fields, marshal
+from src.api.v1.helpers import (
+    cursor_success_response,
+    decode_follower_count_cursor,
+    encode_follower_count_cursor,
+    get_next_follower_count_cursor,
+    make_full_cursor_response,
+)
+from src.api_helpers import output_signed_json
+from src.utils.config import shared_config
+from web3 import Web3
+from web3.auto import w3
+
+
+def test_follower_count_cursor_round_trip():
+    cursor = encode_follower_count_cursor(1500, 42)
+
+    assert decode_follower_count_cursor(cursor) == (1500, 42)
+
+
+def test_decode_follower_count_cursor_invalid():
+    assert decode_follower_count_cursor("not a cursor") is None
+    assert decode_follower_count_cursor(encode_follower_count_cursor("1", 2)) is None
+    assert decode_follower_count_cursor("WzEsMiwzXQ==") is None  # [1,2,3]
+
+
+def test_get_next_follower_count_cursor():
+    sort_keys = [(10, 3), (2, 1), (2, 2)]
+
+    next_cursor = get_next_follower_count_cursor(sort_keys, 3)
+    assert decode_follower_count_cursor(next_cursor) == (2, 2)
+
+    # a short page is the last page
+    assert get_next_follower_count_cursor(sort_keys, 4) is None
+    assert get_next_follower_count_cursor([], 3) is None
+
+
+def test_cursor_success_response_signs_cursor(monkeypatch):
+    monkeypatch.setattr(
+        src.api_helpers,
+        "get_response_metadata",
+        lambda: {
+            "latest_indexed_block": 10,
+            "latest_chain_block": 12,
+            "latest_indexed_slot_plays": 100,
+            "latest_chain_slot_plays": 101,
+        },
+    )
+    app = Flask(__name__)
+    model = make_full_cursor_response(
+        "full_cursor_test_response", Namespace("test"), fields.Raw
+    )
+    next_cursor = encode_follower_count_cursor(2, 2)
+
+    with app.test_request_context():
+        response_dictionary, status = cursor_success_response(
+            [{"user_id": 2}], next_cursor
+        )
+        response = output_signed_json(marshal(response_dictionary, model), status)
+
+    response_dictionary = json.loads(response.get_data())
+    assert response_dictionary["next_cursor"] == next_cursor
+
+    # the signature covers the whole response, cursor included
+    signature = response_dictionary.pop("signature")
+    signed_body = json.dumps(
+        response_dictionary,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        cls=app.json_encoder,
+    )
+    wallet = w3.eth.account.recover_message(
+        encode_defunct(primitive=Web3.keccak(text=signed_body)),
+        signature=signature,
+    )
+    assert wallet == shared_config["delegate"]["owner_wallet"]
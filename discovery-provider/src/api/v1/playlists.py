@@ -7,6 +7,8 @@ from src.api.v1.helpers import (
     abort_bad_path_param,
     abort_bad_request_param,
     current_user_parser,
+    cursor_pagination_with_current_user_parser,
+    cursor_success_response,
     decode_with_abort,
     extend_playlist,
     extend_track,
@@ -14,10 +16,12 @@ from src.api.v1.helpers import (
     full_trending_parser,
     get_current_user_id,
     get_default_max,
+    get_follower_count_cursor_with_abort,
+    get_next_follower_count_cursor,
+    make_full_cursor_response,
     make_full_response,
     make_response,
     pagination_parser,
-    pagination_with_current_user_parser,
     search_parser,
     success_response,
     trending_parser,
@@ -262,7 +266,7 @@ class Top(Resource):
         return success_response(playlists)
 
 
-playlist_favorites_response = make_full_response(
+playlist_favorites_response = make_full_cursor_response(
     "following_response", full_ns, fields.List(fields.Nested(user_model_full))
 )
 
@@ -275,28 +279,31 @@ class FullTrackFavorites(Resource):
         params={"playlist_id": "A Playlist ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(cursor_pagination_with_current_user_parser)
     @full_ns.marshal_with(playlist_favorites_response)
     @cache(ttl_sec=5)
     def get(self, playlist_id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = cursor_pagination_with_current_user_parser.parse_args()
         decoded_id = decode_with_abort(playlist_id, full_ns)
         limit = get_default_max(args.get("limit"), 10, 100)
         offset = get_default_max(args.get("offset"), 0)
+        cursor = get_follower_count_cursor_with_abort(args, full_ns)
         current_user_id = get_current_user_id(args)
         args = {
             "save_playlist_id": decoded_id,
             "current_user_id": current_user_id,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
         }
-        users = get_savers_for_playlist(args)
+        users, sort_keys = get_savers_for_playlist(args)
+        next_cursor = get_next_follower_count_cursor(sort_keys, limit)
         users = list(map(extend_user, users))
 
-        return success_response(users)
+        return cursor_success_response(users, next_cursor)
 
 
-playlist_reposts_response = make_full_response(
+playlist_reposts_response = make_full_cursor_response(
     "following_response", full_ns, fields.List(fields.Nested(user_model_full))
 )
 
@@ -309,24 +316,27 @@ class FullPlaylistReposts(Resource):
         params={"playlist_id": "A Playlist ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(cursor_pagination_with_current_user_parser)
     @full_ns.marshal_with(playlist_reposts_response)
     @cache(ttl_sec=5)
     def get(self, playlist_id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = cursor_pagination_with_current_user_parser.parse_args()
         decoded_id = decode_with_abort(playlist_id, full_ns)
         limit = get_default_max(args.get("limit"), 10, 100)
         offset = get_default_max(args.get("offset"), 0)
+        cursor = get_follower_count_cursor_with_abort(args, full_ns)
         current_user_id = get_current_user_id(args)
         args = {
             "repost_playlist_id": decoded_id,
             "current_user_id": current_user_id,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
         }
-        users = get_reposters_for_playlist(args)
+        users, sort_keys = get_reposters_for_playlist(args)
+        next_cursor = get_next_follower_count_cursor(sort_keys, limit)
         users = list(map(extend_user, users))
-        return success_response(users)
+        return cursor_success_response(users, next_cursor)
 
 
 trending_response = make_response(
@@ -13,6 +13,8 @@ from src.api.v1.helpers import (
     abort_bad_request_param,
     abort_not_found,
     current_user_parser,
+    cursor_pagination_with_current_user_parser,
+    cursor_success_response,
     decode_ids_array,
     decode_with_abort,
     extend_track,
@@ -23,6 +25,9 @@ from src.api.v1.helpers import (
     get_current_user_id,
     get_default_max,
     get_encoded_track_id,
+    get_follower_count_cursor_with_abort,
+    get_next_follower_count_cursor,
+    make_full_cursor_response,
     make_full_response,
     make_response,
     pagination_parser,
@@ -54,11 +59,11 @@ from src.queries.get_stems_of import get_stems_of
 from src.queries.get_subsequent_tracks import get_subsequent_tracks
 from src.queries.get_top_followee_saves import get_top_followee_saves
 from src.queries.get_top_followee_windowed import get_top_followee_windowed
+from src.queries.get_track_stream_info import get_track_stream_info
 from src.queries.get_track_stream_signature import (
     CID_STREAM_ENABLED,
     get_track_stream_signature,
 )
-from src.queries.get_track_user_creator_node import get_track_user_creator_node
 from src.queries.get_tracks import RouteArgs, get_tracks
 from src.queries.get_tracks_including_unlisted import get_tracks_including_unlisted
 from src.queries.get_trending import get_full_trending, get_trending
@@ -418,28 +423,14 @@ class TrackStream(Resource):
         https://developer.mozilla.org/en-US/docs/Web/HTTP/Range_requests
         """
         decoded_id = decode_with_abort(track_id, ns)
-        args = {"track_id": decoded_id}
-        creator_nodes = get_track_user_creator_node(args)
-        if creator_nodes is None:
-            abort_not_found(track_id, ns)
-        creator_nodes = creator_nodes.split(",")
-        if not creator_nodes:
-            abort_not_found(track_id, ns)
-
         # before redirecting to content node,
         # make sure the track isn't deleted and the user isn't deactivated
-        args = {
-            "id": [decoded_id],
-            "with_users": True,
-            "skip_unlisted_filter": True,
-        }
-        tracks = get_tracks(args)
-
-        if not tracks:
+        track = get_track_stream_info(decoded_id)
+        if not track or track["is_delete"] or track["is_deactivated"]:
             abort_not_found(track_id, ns)
 
-        track = tracks[0]
-        if track["is_delete"] or track["user"]["is_deactivated"]:
+        creator_nodes = (track["creator_node_endpoint"] or "").split(",")
+        if not creator_nodes[0]:
             abort_not_found(track_id, ns)
 
         request_args = stream_parser.parse_args()
@@ -875,7 +866,7 @@ class FullTrendingIds(Resource):
         return success_response(res)
 
 
-track_favorites_response = make_full_response(
+track_favorites_response = make_full_cursor_response(
     "track_favorites_response_full",
     full_ns,
     fields.List(fields.Nested(user_model_full)),
@@ -890,14 +881,15 @@ class FullTrackFavorites(Resource):
         params={"track_id": "A Track ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(cursor_pagination_with_current_user_parser)
     @full_ns.marshal_with(track_favorites_response)
     @cache(ttl_sec=5)
     def get(self, track_id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = cursor_pagination_with_current_user_parser.parse_args()
         decoded_id = decode_with_abort(track_id, full_ns)
         limit = get_default_max(args.get("limit"), 10, 100)
         offset = get_default_max(args.get("offset"), 0)
+        cursor = get_follower_count_cursor_with_abort(args, full_ns)
         current_user_id = get_current_user_id(args)
 
         args = {
@@ -905,14 +897,16 @@ class FullTrackFavorites(Resource):
             "current_user_id": current_user_id,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
         }
-        users = get_savers_for_track(args)
+        users, sort_keys = get_savers_for_track(args)
+        next_cursor = get_next_follower_count_cursor(sort_keys, limit)
         users = list(map(extend_user, users))
 
-        return success_response(users)
+        return cursor_success_response(users, next_cursor)
 
 
-track_reposts_response = make_full_response(
+track_reposts_response = make_full_cursor_response(
     "track_reposts_response_full", full_ns, fields.List(fields.Nested(user_model_full))
 )
 
@@ -925,14 +919,15 @@ class FullTrackReposts(Resource):
         params={"track_id": "A Track ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(cursor_pagination_with_current_user_parser)
     @full_ns.marshal_with(track_reposts_response)
     @cache(ttl_sec=5)
     def get(self, track_id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = cursor_pagination_with_current_user_parser.parse_args()
         decoded_id = decode_with_abort(track_id, full_ns)
         limit = get_default_max(args.get("limit"), 10, 100)
         offset = get_default_max(args.get("offset"), 0)
+        cursor = get_follower_count_cursor_with_abort(args, full_ns)
         current_user_id = get_current_user_id(args)
 
         args = {
@@ -940,10 +935,12 @@ class FullTrackReposts(Resource):
             "current_user_id": current_user_id,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
         }
-        users = get_reposters_for_track(args)
+        users, sort_keys = get_reposters_for_track(args)
+        next_cursor = get_next_follower_count_cursor(sort_keys, limit)
         users = list(map(extend_user, users))
-        return success_response(users)
+        return cursor_success_response(users, next_cursor)
 
 
 track_stems_response = make_full_response(
@@ -10,6 +10,8 @@ from src.api.v1.helpers import (
     abort_bad_request_param,
     abort_not_found,
     current_user_parser,
+    cursor_pagination_with_current_user_parser,
+    cursor_success_response,
     decode_with_abort,
     extend_activity,
     extend_challenge_response,
@@ -26,6 +28,10 @@ from src.api.v1.helpers import (
     format_sort_method,
     get_current_user_id,
     get_default_max,
+    get_follower_count_cursor_with_abort,
+    get_next_follower_count_cursor,
+    make_cursor_response,
+    make_full_cursor_response,
     make_full_response,
     make_response,
     pagination_parser,
@@ -994,10 +1000,10 @@ class BulkUsersSubscribers(FullBulkUsersSubscribers):
         return super()._post()
 
 
-followers_response = make_response(
+followers_response = make_cursor_response(
     "followers_response", ns, fields.List(fields.Nested(user_model))
 )
-full_followers_response = make_full_response(
+full_followers_response = make_full_cursor_response(
     "full_followers_response", full_ns, fields.List(fields.Nested(user_model_full))
 )
 
@@ -1010,19 +1016,22 @@ class FullFollowerUsers(Resource):
     @cache(ttl_sec=5)
     def _get(self, id):
         decoded_id = decode_with_abort(id, full_ns)
-        args = pagination_with_current_user_parser.parse_args()
+        args = cursor_pagination_with_current_user_parser.parse_args()
         limit = get_default_max(args.get("limit"), 10, 100)
         offset = get_default_max(args.get("offset"), 0)
+        cursor = get_follower_count_cursor_with_abort(args, full_ns)
         current_user_id = get_current_user_id(args)
         args = {
             "followee_user_id": decoded_id,
             "current_user_id": current_user_id,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
         }
-        users = get_followers_for_user(args)
+        users, sort_keys = get_followers_for_user(args)
+        next_cursor = get_next_follower_count_cursor(sort_keys, limit)
         users = list(map(extend_user, users))
-        return success_response(users)
+        return cursor_success_response(users, next_cursor)
 
     @full_ns.doc(
         id="""Get Followers""",
@@ -1030,7 +1039,7 @@ class FullFollowerUsers(Resource):
         params={"id": "A User ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(cursor_pagination_with_current_user_parser)
     @full_ns.marshal_with(full_followers_response)
     def get(self, id):
         return self._get(id)
@@ -1044,16 +1053,16 @@ class FollowerUsers(FullFollowerUsers):
         params={"id": "A User ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @ns.expect(pagination_with_current_user_parser)
+    @ns.expect(cursor_pagination_with_current_user_parser)
     @ns.marshal_with(followers_response)
     def get(self, id):
         return super()._get(id)
 
 
-following_response = make_response(
+following_response = make_cursor_response(
     "following_response", ns, fields.List(fields.Nested(user_model))
 )
-following_response_full = make_full_response(
+following_response_full = make_full_cursor_response(
     "following_response_full", full_ns, fields.List(fields.Nested(user_model_full))
 )
 
@@ -1066,19 +1075,22 @@ class FullFollowingUsers(Resource):
     @cache(ttl_sec=5)
     def _get(self, id):
         decoded_id = decode_with_abort(id, full_ns)
-        args = pagination_with_current_user_parser.parse_args()
+        args = cursor_pagination_with_current_user_parser.parse_args()
         limit = get_default_max(args.get("limit"), 10, 100)
         offset = get_default_max(args.get("offset"), 0)
+        cursor = get_follower_count_cursor_with_abort(args, full_ns)
         current_user_id = get_current_user_id(args)
         args = {
             "follower_user_id": decoded_id,
             "current_user_id": current_user_id,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
         }
-        users = get_followees_for_user(args)
+        users, sort_keys = get_followees_for_user(args)
+        next_cursor = get_next_follower_count_cursor(sort_keys, limit)
         users = list(map(extend_user, users))
-        return success_response(users)
+        return cursor_success_response(users, next_cursor)
 
     @full_ns.doc(
         id="""Get Followings""",
@@ -1086,7 +1098,7 @@ class FullFollowingUsers(Resource):
         params={"id": "A User ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(cursor_pagination_with_current_user_parser)
     @full_ns.marshal_with(following_response_full)
     def get(self, id):
         return self._get(id)
@@ -1100,7 +1112,7 @@ class FollowingUsers(FullFollowingUsers):
         params={"id": "A User ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @ns.expect(pagination_with_current_user_parser)
+    @ns.expect(cursor_pagination_with_current_user_parser)
     @ns.marshal_with(following_response)
     def get(self, id):
         return super()._get(id)
@@ -1,12 +1,15 @@
 import datetime
 import json
 import logging
+import time
 
 import redis
 
 # pylint: disable=no-name-in-module
+from eth_account import Account
 from eth_account.messages import encode_defunct
-from flask import jsonify
+from flask import Response, current_app, jsonify, make_response
+from flask_restx.representations import output_json
 from src.queries.get_health import get_latest_chain_block_set_if_nx
 from src.queries.get_sol_plays import get_sol_play_health_info
 
@@ -23,6 +26,13 @@ web3_connection = web3_provider.get_web3()
 logger = logging.getLogger(__name__)
 disc_prov_version = helpers.get_discovery_provider_version()
 
+# Block and slot metadata included in every response is refreshed at most this often
+RESPONSE_METADATA_TTL_SEC = 1
+response_metadata_cache = {"metadata": None, "expires_at": 0.0}
+
+# Account of the delegate private key, loaded on first use
+signer_account = None
+
 
 # Subclass JSONEncoder
 class DateTimeEncoder(json.JSONEncoder):
@@ -43,48 +53,107 @@ def success_response(
     response_entity=None, status=200, to_json=True, sign_response=True
 ):
     starting_response_dictionary = {"data": response_entity}
+    if to_json:
+        return signed_json_response(starting_response_dictionary, sign_response), status
     response_dictionary = response_dict_with_metadata(
         starting_response_dictionary, sign_response
     )
-    response = jsonify(response_dictionary) if to_json else response_dictionary
-    return response, status
+    return response_dictionary, status
 
 
-# Create a response dict with metadata fields of success, latest_indexed_block, latest_chain_block,
-# version, and owner_wallet
-def response_dict_with_metadata(response_dictionary, sign_response):
-    response_dictionary["success"] = True
+def signed_json_response(response_dictionary, sign_response):
+    """
+    Serializes the response once and signs the exact bytes sent in the body,
+    instead of serializing it for the signature and again in jsonify
+    """
+    response_dictionary = response_dict_with_metadata(response_dictionary, False)
+    if sign_response:
+        body = signed_json_body(response_dictionary)
+    else:
+        body = json_body(response_dictionary)
+
+    return Response(body, mimetype="application/json")
+
+
+def output_signed_json(data, code, headers=None):
+    """
+    JSON representation of the v1 APIs. Marshalled responses with a signature
+    field are signed after marshalling, over the bytes sent in the body
+    """
+    if not isinstance(data, dict) or "signature" not in data:
+        return output_json(data, code, headers)
+
+    response_dictionary = dict(data)
+    del response_dictionary["signature"]
+    response = make_response(signed_json_body(response_dictionary), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def json_body(response_dictionary):
+    return json.dumps(
+        response_dictionary,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        cls=current_app.json_encoder,
+    ).encode("utf-8")
+
+
+def signed_json_body(response_dictionary):
+    response_dictionary["timestamp"] = get_signature_timestamp()
+    body = json_body(response_dictionary)
+
+    # the signature covers every other key, so it is appended to the signed object
+    signature = sign_bytes(body)
+    return body[:-1] + f',"signature":"{signature}"}}'.encode("utf-8")
+
+
+def get_response_metadata():
+    """
+    Returns the latest indexed and chain blocks and play slots, cached in process
+    for RESPONSE_METADATA_TTL_SEC so they are not read from redis on every response
+    """
+    now = time.monotonic()
+    if response_metadata_cache["expires_at"] > now:
+        return response_metadata_cache["metadata"]
 
-    # Include block difference information
     latest_indexed_block = redis_conn.get(most_recent_indexed_block_redis_key)
     latest_chain_block, _ = get_latest_chain_block_set_if_nx(
         redis_conn, web3_connection
     )
-    response_dictionary["latest_indexed_block"] = (
-        int(latest_indexed_block) if latest_indexed_block else None
-    )
-    response_dictionary["latest_chain_block"] = (
-        int(latest_chain_block) if latest_chain_block else None
-    )
 
     # Include plays slot difference information
     play_info = get_sol_play_health_info(redis_conn, datetime.datetime.utcnow())
     play_db_tx = play_info["tx_info"]["db_tx"]
     play_chain_tx = play_info["tx_info"]["chain_tx"]
-    response_dictionary["latest_indexed_slot_plays"] = (
-        play_db_tx["slot"] if play_db_tx else None
-    )
-    response_dictionary["latest_chain_slot_plays"] = (
-        play_chain_tx["slot"] if play_chain_tx else None
-    )
+
+    metadata = {
+        "latest_indexed_block": (
+            int(latest_indexed_block) if latest_indexed_block else None
+        ),
+        "latest_chain_block": int(latest_chain_block) if latest_chain_block else None,
+        "latest_indexed_slot_plays": play_db_tx["slot"] if play_db_tx else None,
+        "latest_chain_slot_plays": play_chain_tx["slot"] if play_chain_tx else None,
+    }
+    response_metadata_cache["metadata"] = metadata
+    response_metadata_cache["expires_at"] = now + RESPONSE_METADATA_TTL_SEC
+    return metadata
+
+
+# Create a response dict with metadata fields of success, latest_indexed_block, latest_chain_block,
+# version, and owner_wallet
+def response_dict_with_metadata(response_dictionary, sign_response):
+    response_dictionary["success"] = True
+
+    # Include block and plays slot difference information
+    response_dictionary.update(get_response_metadata())
 
     response_dictionary["version"] = disc_prov_version
     response_dictionary["signer"] = shared_config["delegate"]["owner_wallet"]
 
     if sign_response:
-        # generate timestamp with format HH:MM:SS.sssZ
-        timestamp = datetime.datetime.now().isoformat(timespec="milliseconds") + "Z"
-        response_dictionary["timestamp"] = timestamp
+        response_dictionary["timestamp"] = get_signature_timestamp()
 
         signature = generate_signature(response_dictionary)
         response_dictionary["signature"] = signature
@@ -92,6 +161,11 @@ def response_dict_with_metadata(response_dictionary, sign_response):
     return response_dictionary
 
 
+def get_signature_timestamp():
+    # generate timestamp with format HH:MM:SS.sssZ
+    return datetime.datetime.now().isoformat(timespec="milliseconds") + "Z"
+
+
 # Generate signature and timestamp using data
 def generate_signature(data):
     # convert sorted dictionary to string with no white spaces
@@ -102,17 +176,24 @@ def generate_signature(data):
         separators=(",", ":"),
         cls=DateTimeEncoder,
     )
+    return sign_bytes(to_sign_str.encode("utf-8"))
 
-    # generate hash for if data contains unicode chars
-    to_sign_hash = Web3.keccak(text=to_sign_str).hex()
+
+def sign_bytes(to_sign_bytes):
+    global signer_account  # pylint: disable=W0603
+    if signer_account is None:
+        # deriving the public key is an elliptic curve multiplication,
+        # so the account is only loaded once
+        signer_account = Account.from_key(shared_config["delegate"]["private_key"])
+
+    # generate hash of the utf-8 encoded data
+    to_sign_hash = Web3.keccak(primitive=to_sign_bytes)
 
     # generate SignableMessage for sign_message()
-    encoded_to_sign = encode_defunct(hexstr=to_sign_hash)
+    encoded_to_sign = encode_defunct(primitive=to_sign_hash)
 
     # sign to get signature
-    signed_message = w3.eth.account.sign_message(
-        encoded_to_sign, private_key=shared_config["delegate"]["private_key"]
-    )
+    signed_message = signer_account.sign_message(encoded_to_sign)
     return signed_message.signature.hex()
 
 
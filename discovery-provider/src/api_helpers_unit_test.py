@@ -0,0 +1,148 @@
+import json
+from datetime import datetime
+
+import src.api_helpers
+from eth_account.messages import encode_defunct
+from flask import Flask
+from flask_restx import Namespace, fields, marshal
+from src.api.v1.helpers import make_full_response, make_response
+from src.api.v1.helpers import success_response as v1_success_response
+from src.api_helpers import get_response_metadata, output_signed_json, success_response
+from src.utils.config import shared_config
+from src.utils.redis_constants import most_recent_indexed_block_redis_key
+from web3 import Web3
+from web3.auto import w3
+
+response_metadata = {
+    "latest_indexed_block": 10,
+    "latest_chain_block": 12,
+    "latest_indexed_slot_plays": 100,
+    "latest_chain_slot_plays": 101,
+}
+
+
+def test_success_response_signs_body(monkeypatch):
+    monkeypatch.setattr(
+        src.api_helpers, "get_response_metadata", lambda: response_metadata
+    )
+    app = Flask(__name__)
+
+    with app.app_context():
+        response, status = success_response(
+            [{"title": "ünïcode", "created_at": datetime(2022, 9, 15, 12)}]
+        )
+
+    assert status == 200
+    assert response.mimetype == "application/json"
+
+    response_dictionary = json.loads(response.get_data())
+    assert response_dictionary["data"][0]["title"] == "ünïcode"
+    assert response_dictionary["latest_chain_block"] == 12
+    assert response_dictionary["success"]
+
+    # the signature covers the body as sent, without the signature itself
+    signature = response_dictionary.pop("signature")
+    signed_body = json.dumps(
+        response_dictionary,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        cls=app.json_encoder,
+    )
+    wallet = w3.eth.account.recover_message(
+        encode_defunct(primitive=Web3.keccak(text=signed_body)),
+        signature=signature,
+    )
+    assert wallet == shared_config["delegate"]["owner_wallet"]
+
+
+def test_success_response_unsigned(monkeypatch):
+    monkeypatch.setattr(
+        src.api_helpers, "get_response_metadata", lambda: response_metadata
+    )
+
+    response_dictionary, _ = success_response(
+        {"id": 1}, to_json=False, sign_response=False
+    )
+
+    assert response_dictionary["data"] == {"id": 1}
+    assert response_dictionary["latest_indexed_slot_plays"] == 100
+    assert "signature" not in response_dictionary
+
+
+def recover_body_signer(response_dictionary, app):
+    signature = response_dictionary.pop("signature")
+    signed_body = json.dumps(
+        response_dictionary,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        cls=app.json_encoder,
+    )
+    return w3.eth.account.recover_message(
+        encode_defunct(primitive=Web3.keccak(text=signed_body)),
+        signature=signature,
+    )
+
+
+def test_output_signed_json_signs_marshalled_response(monkeypatch):
+    monkeypatch.setattr(
+        src.api_helpers, "get_response_metadata", lambda: response_metadata
+    )
+    app = Flask(__name__)
+    ns = Namespace("test")
+    full_model = make_full_response("full_test_response", ns, fields.Raw)
+    model = make_response("test_response", ns, fields.Raw)
+
+    with app.test_request_context():
+        response_dictionary, status = v1_success_response({"title": "ünïcode"})
+        assert response_dictionary["signature"] is None
+
+        # fields outside of the model, like signer, are not sent or signed
+        full_response = output_signed_json(
+            marshal(response_dictionary, full_model), status
+        )
+        response = output_signed_json(marshal(response_dictionary, model), status)
+
+    full_response_dictionary = json.loads(full_response.get_data())
+    assert full_response.status_code == 200
+    assert full_response_dictionary["data"] == {"title": "ünïcode"}
+    assert full_response_dictionary["timestamp"]
+    assert "signer" not in full_response_dictionary
+    assert (
+        recover_body_signer(full_response_dictionary, app)
+        == shared_config["delegate"]["owner_wallet"]
+    )
+
+    # models without a signature field are sent unsigned
+    assert json.loads(response.get_data()) == {"data": {"title": "ünïcode"}}
+
+
+def test_get_response_metadata_cached(monkeypatch, redis_mock):
+    monkeypatch.setattr(src.api_helpers, "redis_conn", redis_mock)
+    monkeypatch.setattr(
+        src.api_helpers,
+        "get_latest_chain_block_set_if_nx",
+        lambda redis, web3: (12, "0x12"),
+    )
+    monkeypatch.setattr(
+        src.api_helpers,
+        "get_sol_play_health_info",
+        lambda redis, time: {"tx_info": {"db_tx": None, "chain_tx": {"slot": 101}}},
+    )
+    monkeypatch.setitem(src.api_helpers.response_metadata_cache, "expires_at", 0.0)
+
+    redis_mock.set(most_recent_indexed_block_redis_key, 10)
+    assert get_response_metadata() == {
+        "latest_indexed_block": 10,
+        "latest_chain_block": 12,
+        "latest_indexed_slot_plays": None,
+        "latest_chain_slot_plays": 101,
+    }
+
+    # served from process memory until the cache expires
+    redis_mock.set(most_recent_indexed_block_redis_key, 11)
+    assert get_response_metadata()["latest_indexed_block"] == 10
+
+    monkeypatch.setitem(src.api_helpers.response_metadata_cache, "expires_at", 0.0)
+    assert get_response_metadata()["latest_indexed_block"] == 11
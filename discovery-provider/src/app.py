@@ -39,6 +39,7 @@ from src.queries import (
 from src.solana.anchor_program_indexer import AnchorProgramIndexer
 from src.solana.solana_client_manager import SolanaClientManager
 from src.tasks import celery_app
+from src.tasks.index_random_tracks_pool import INDEX_RANDOM_TRACKS_POOL_LOCK
 from src.tasks.index_reactions import INDEX_REACTIONS_LOCK
 from src.tasks.update_track_is_available import UPDATE_TRACK_IS_AVAILABLE_LOCK
 from src.utils import helpers
@@ -46,7 +47,11 @@ from src.utils.cid_metadata_client import CIDMetadataClient
 from src.utils.config import ConfigIni, config_files, shared_config
 from src.utils.eth_manager import EthManager
 from src.utils.multi_provider import MultiProvider
-from src.utils.redis_metrics import METRICS_INTERVAL, SYNCHRONIZE_METRICS_INTERVAL
+from src.utils.redis_metrics import (
+    METRICS_INTERVAL,
+    SYNCHRONIZE_METRICS_INTERVAL,
+    remove_legacy_metrics,
+)
 from src.utils.session_manager import SessionManager
 from web3 import HTTPProvider, Web3
 from werkzeug.middleware.proxy_fix import ProxyFix
@@ -184,7 +189,10 @@ def create_celery(test_config=None):
     eth_abi_values = helpers.load_eth_abi_values()
 
     # Initialize Solana web3 provider
-    solana_client_manager = SolanaClientManager(shared_config["solana"]["endpoint"])
+    solana_client_manager = SolanaClientManager(
+        shared_config["solana"]["endpoint"],
+        shared_config["solana"].getboolean("hedge_rpc_requests", fallback=False),
+    )
 
     global registry
     global user_factory
@@ -406,6 +414,7 @@ def configure_celery(celery, test_config=None):
             "src.tasks.index_aggregate_tips",
             "src.tasks.index_reactions",
             "src.tasks.update_track_is_available",
+            "src.tasks.index_random_tracks_pool",
         ],
         beat_schedule={
             "update_discovery_provider": {
@@ -530,6 +539,10 @@ def configure_celery(celery, test_config=None):
             "index_profile_challenge_backfill": {
                 "task": "index_profile_challenge_backfill",
                 "schedule": timedelta(minutes=1),
+            },
+            "index_random_tracks_pool": {
+                "task": "index_random_tracks_pool",
+                "schedule": timedelta(seconds=5),
             }
             # UNCOMMENT BELOW FOR MIGRATION DEV WORK
             # "index_solana_user_data": {
@@ -565,6 +578,7 @@ def configure_celery(celery, test_config=None):
         shared_config,
         redis_inst,
         eth_abi_values,
+        db,
     )
 
     # Initialize Anchor Indexer
@@ -613,6 +627,9 @@ def configure_celery(celery, test_config=None):
     redis_inst.delete("index_trending_lock")
     redis_inst.delete(INDEX_REACTIONS_LOCK)
     redis_inst.delete(UPDATE_TRACK_IS_AVAILABLE_LOCK)
+    redis_inst.delete(INDEX_RANDOM_TRACKS_POOL_LOCK)
+
+    remove_legacy_metrics(redis_inst)
 
     logger.info("Redis instance initialized!")
 
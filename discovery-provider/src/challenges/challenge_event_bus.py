@@ -1,8 +1,11 @@
+import concurrent.futures
 import json
 import logging
+import time
+import uuid
 from collections import defaultdict
 from contextlib import contextmanager
-from typing import Any, DefaultDict, Dict, List, Tuple, TypedDict
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple, TypedDict
 
 from sqlalchemy.orm.session import Session
 from src.challenges.challenge import ChallengeManager, EventMetadata
@@ -25,9 +28,54 @@ from src.challenges.trending_challenge import (
     trending_underground_track_challenge_manager,
 )
 from src.utils.redis_connection import get_redis
+from src.utils.session_manager import SessionManager
 
 logger = logging.getLogger(__name__)
 REDIS_QUEUE_PREFIX = "challenges-event-queue"
+# Events being processed are kept in a list per consumer until they are
+# acknowledged, the lists are scored by the time they are reclaimed at
+REDIS_IN_FLIGHT_PREFIX = f"{REDIS_QUEUE_PREFIX}:in-flight"
+REDIS_IN_FLIGHT_DEADLINES_KEY = f"{REDIS_QUEUE_PREFIX}:in-flight-deadlines"
+# Seconds before the events of a consumer that did not acknowledge them, say
+# because it crashed, are put back at the front of the queue
+IN_FLIGHT_TIMEOUT_SEC = 3600
+# Number of events pushed per RPUSH when flushing
+ENQUEUE_CHUNK_SIZE = 1000
+# Number of challenge managers processing events at once
+MAX_CONCURRENT_MANAGERS = 5
+
+# Moves up to ARGV[1] events from the front of the queue to the in flight list of
+# the consumer, which is reclaimed at ARGV[2]. LMPOP is not available before
+# redis 7 and would not move the events atomically.
+DEQUEUE_SCRIPT = """
+local events = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #events == 0 then
+    return events
+end
+redis.call('LTRIM', KEYS[1], #events, -1)
+for i = 1, #events, 1000 do
+    redis.call('RPUSH', KEYS[2], unpack(events, i, math.min(i + 999, #events)))
+end
+redis.call('ZADD', KEYS[3], ARGV[2], KEYS[2])
+return events
+"""
+
+# Puts the events of the in flight lists due before ARGV[1] back at the front of
+# the queue, in the order they were dequeued
+RECLAIM_SCRIPT = """
+local in_flight_keys = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+local num_events = 0
+for _, in_flight_key in ipairs(in_flight_keys) do
+    local events = redis.call('LRANGE', in_flight_key, 0, -1)
+    for i = #events, 1, -1 do
+        redis.call('LPUSH', KEYS[1], events[i])
+    end
+    num_events = num_events + #events
+    redis.call('DEL', in_flight_key)
+    redis.call('ZREM', KEYS[2], in_flight_key)
+end
+return num_events
+"""
 
 
 class InternalEvent(TypedDict):
@@ -41,7 +89,7 @@ class ChallengeEventBus:
     """`ChallengeEventBus` supports:
     - dispatching challenge events to a Redis queue
     - registering challenge managers to listen to the events.
-    - consuming items from the Redis queue
+    - consuming items from the Redis queue, at least once
     - fetching the manager for a given challenge
     """
 
@@ -55,6 +103,8 @@ class ChallengeEventBus:
         self._redis = redis
         self._managers = {}
         self._in_memory_queue: List[Dict] = []
+        self._dequeue_script = redis.register_script(DEQUEUE_SCRIPT)
+        self._reclaim_script = redis.register_script(RECLAIM_SCRIPT)
 
     def register_listener(self, event: ChallengeEvent, listener: ChallengeManager):
         """Registers a listener (`ChallengeManager`) to listen for a particular event type."""
@@ -118,6 +168,7 @@ class ChallengeEventBus:
         logger.info(
             f"ChallengeEventBus: Flushing {len(self._in_memory_queue)} events from in-memory queue"
         )
+        events_json = []
         for event in self._in_memory_queue:
             try:
                 event_json = self._event_to_json(
@@ -126,24 +177,60 @@ class ChallengeEventBus:
                     event["user_id"],
                     event.get("extra", {}),
                 )
-                logger.info(f"ChallengeEventBus: dispatch {event_json}")
-                self._redis.rpush(REDIS_QUEUE_PREFIX, event_json)
+                logger.debug(f"ChallengeEventBus: dispatch {event_json}")
+                events_json.append(event_json)
             except Exception as e:
-                logger.warning(f"ChallengeEventBus: error enqueuing to Redis: {e}")
+                logger.warning(f"ChallengeEventBus: error serializing event: {e}")
         self._in_memory_queue.clear()
+        if not events_json:
+            return
+
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for start in range(0, len(events_json), ENQUEUE_CHUNK_SIZE):
+                pipe.rpush(
+                    REDIS_QUEUE_PREFIX, *events_json[start : start + ENQUEUE_CHUNK_SIZE]
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"ChallengeEventBus: error enqueuing to Redis: {e}")
 
-    def process_events(self, session: Session, max_events=1000) -> Tuple[int, bool]:
+    def process_events(
+        self,
+        session: Session,
+        max_events=1000,
+        db: Optional[SessionManager] = None,
+    ) -> Tuple[int, bool]:
         """Dequeues `max_events` from Redis queue and processes them, forwarding to listening ChallengeManagers.
         Returns (num_processed_events, did_error).
         Will return -1 as num_processed_events if an error prevented any events from
         being processed (i.e. some error deserializing from Redis)
+
+        Events are acknowledged once processed, events of a consumer that stopped
+        before are processed again. If `db` is given, the managers process their
+        events concurrently, each in a session of its own, rather than in `session`.
         """
+        in_flight_key = f"{REDIS_IN_FLIGHT_PREFIX}:{uuid.uuid4().hex}"
+        events_json = []
         try:
-            # get the first max_events elements.
-            events_json = self._redis.lrange(REDIS_QUEUE_PREFIX, 0, max_events)
+            now = int(time.time())
+            num_reclaimed = self._reclaim_script(
+                keys=[REDIS_QUEUE_PREFIX, REDIS_IN_FLIGHT_DEADLINES_KEY], args=[now]
+            )
+            if num_reclaimed:
+                logger.warning(
+                    f"ChallengeEventBus: requeued {num_reclaimed} unacknowledged events"
+                )
+            # move the first max_events elements to the in flight list
+            events_json = self._dequeue_script(
+                keys=[
+                    REDIS_QUEUE_PREFIX,
+                    in_flight_key,
+                    REDIS_IN_FLIGHT_DEADLINES_KEY,
+                ],
+                args=[max_events, now + IN_FLIGHT_TIMEOUT_SEC],
+            )
             logger.info(f"ChallengeEventBus: dequeued {len(events_json)} events")
-            # trim the first from the front of the list
-            self._redis.ltrim(REDIS_QUEUE_PREFIX, len(events_json), -1)
             events_dicts = list(map(self._json_to_event, events_json))
 
             # Consolidate event types for processing
@@ -164,26 +251,84 @@ class ChallengeEventBus:
                 )
         except Exception as e:
             logger.warning(f"ChallengeEventBus: error processing from Redis: {e}")
+            if events_json:
+                # drop events that cannot be deserialized rather than retrying them
+                self._acknowledge(in_flight_key)
             return (-1, True)
 
-        did_error = False
+        # map of {manager: [(event_type, [EventMetadata])]}, each manager
+        # processes its event types in order
+        manager_events: DefaultDict[
+            ChallengeManager, List[Tuple[ChallengeEvent, List[EventMetadata]]]
+        ] = defaultdict(lambda: [])
         for (event_type, event_dicts) in event_user_dict.items():
-            listeners = self._listeners[event_type]
-            for listener in listeners:
-                try:
-                    listener.process(session, event_type, event_dicts)
-                except Exception as e:
-                    # We really shouldn't see errors from a ChallengeManager (they should handle on their own),
-                    # but in case we do, swallow it and continue on
-                    logger.warning(
-                        f"ChallengeEventBus: manager [{listener.challenge_id} unexpectedly propogated error: [{e}]"
-                    )
-                    did_error = True
+            for listener in self._listeners[event_type]:
+                manager_events[listener].append((event_type, event_dicts))
 
+        if db is None:
+            did_error = False
+            for (manager, events) in manager_events.items():
+                did_error |= self._process_manager_events(session, manager, events)
+        else:
+            did_error = self._process_managers_concurrently(db, manager_events)
+
+        self._acknowledge(in_flight_key)
         return (len(events_json), did_error)
 
     # Helpers
 
+    def _process_manager_events(
+        self,
+        session: Session,
+        manager: ChallengeManager,
+        events: List[Tuple[ChallengeEvent, List[EventMetadata]]],
+    ) -> bool:
+        did_error = False
+        for (event_type, event_dicts) in events:
+            try:
+                manager.process(session, event_type, event_dicts)
+            except Exception as e:
+                # We really shouldn't see errors from a ChallengeManager (they should handle on their own),
+                # but in case we do, swallow it and continue on
+                logger.warning(
+                    f"ChallengeEventBus: manager [{manager.challenge_id} unexpectedly propogated error: [{e}]"
+                )
+                did_error = True
+        return did_error
+
+    def _process_managers_concurrently(
+        self,
+        db: SessionManager,
+        manager_events: Dict[
+            ChallengeManager, List[Tuple[ChallengeEvent, List[EventMetadata]]]
+        ],
+    ) -> bool:
+        def process_in_session(manager, events):
+            with db.scoped_session() as session:
+                return self._process_manager_events(session, manager, events)
+
+        did_error = False
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_MANAGERS
+        ) as executor:
+            futures = [
+                executor.submit(process_in_session, manager, events)
+                for (manager, events) in manager_events.items()
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    did_error |= future.result()
+                except Exception as e:
+                    logger.warning(f"ChallengeEventBus: error processing events: {e}")
+                    did_error = True
+        return did_error
+
+    def _acknowledge(self, in_flight_key: str):
+        pipe = self._redis.pipeline()
+        pipe.delete(in_flight_key)
+        pipe.zrem(REDIS_IN_FLIGHT_DEADLINES_KEY, in_flight_key)
+        pipe.execute()
+
     def _event_to_json(self, event: str, block_number: int, user_id: int, extra: Dict):
         event_dict = {
             "event": event,
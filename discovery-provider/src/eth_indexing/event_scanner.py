@@ -1,7 +1,7 @@
 import datetime
 import logging
 import time
-from typing import Any, Iterable, Tuple, Type, TypedDict, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypedDict, Union
 
 from eth_abi.codec import ABICodec
 from src.models.indexing.eth_block import EthBlock
@@ -9,6 +9,7 @@ from src.models.users.associated_wallet import AssociatedWallet
 from src.models.users.user import User
 from src.queries.get_balances import enqueue_immediate_balance_refresh
 from src.utils.helpers import redis_set_and_dump
+from src.utils.json_rpc_client import JsonRpcClient
 from web3 import Web3
 from web3._utils.events import get_event_data
 
@@ -42,6 +43,9 @@ ETH_BLOCK_TAIL_OFFSET = 1
 # the block number to start with if first time scanning
 # this should be the first block during and after which $AUDIO transfer events started occurring
 MIN_SCAN_START_BLOCK = 11103292
+# Max number of eth_getBlockByNumber calls sent in one batched JSON-RPC request
+BLOCK_TIMESTAMPS_BATCH_SIZE = 500
+BLOCK_TIMESTAMPS_REQUEST_TIMEOUT_SECONDS = 30
 
 
 class TransferEvent(TypedDict):
@@ -90,6 +94,9 @@ class EventScanner:
         self.filters = filters
         self.last_scanned_block = MIN_SCAN_START_BLOCK
         self.latest_chain_block = self.web3.eth.block_number
+        # Timestamps of the blocks with events, kept for the chunks scanned again
+        self.block_timestamps: Dict[int, datetime.datetime] = {}
+        self._client = JsonRpcClient(timeout=BLOCK_TIMESTAMPS_REQUEST_TIMEOUT_SECONDS)
 
     def restore(self):
         """Restore the last scan state from redis.
@@ -136,6 +143,60 @@ class EventScanner:
         last_time = block_info["timestamp"]
         return datetime.datetime.utcfromtimestamp(last_time)
 
+    def get_block_timestamps(
+        self, block_nums: Iterable[int]
+    ) -> Dict[int, Optional[datetime.datetime]]:
+        """Get the timestamps of Ethereum blocks, the ones not cached yet are fetched
+        in batched requests. Blocks not mined yet get None."""
+        block_nums = set(block_nums)
+        missing = sorted(
+            block_num
+            for block_num in block_nums
+            if block_num not in self.block_timestamps
+        )
+        for i in range(0, len(missing), BLOCK_TIMESTAMPS_BATCH_SIZE):
+            self.block_timestamps.update(
+                self._fetch_block_timestamps(
+                    missing[i : i + BLOCK_TIMESTAMPS_BATCH_SIZE]
+                )
+            )
+        return {
+            block_num: self.block_timestamps.get(block_num) for block_num in block_nums
+        }
+
+    def _fetch_block_timestamps(
+        self, block_nums: List[int]
+    ) -> Dict[int, datetime.datetime]:
+        endpoint = getattr(self.web3.provider, "endpoint_uri", None)
+        if endpoint and self._client.supports_batch(endpoint):
+            try:
+                responses = self._client.call_batch(
+                    endpoint,
+                    [
+                        ("eth_getBlockByNumber", [hex(block_num), False])
+                        for block_num in block_nums
+                    ],
+                )
+                if responses is not None:
+                    return {
+                        block_num: datetime.datetime.utcfromtimestamp(
+                            int(response["result"]["timestamp"], 16)
+                        )
+                        for block_num, response in zip(block_nums, responses)
+                        if response.get("result")
+                    }
+            except Exception as e:
+                logger.warning(
+                    f"event_scanner.py | batched block request failed, falling back to single requests {e}"
+                )
+
+        block_timestamps = {}
+        for block_num in block_nums:
+            block_timestamp = self.get_block_timestamp(block_num)
+            if block_timestamp is not None:
+                block_timestamps[block_num] = block_timestamp
+        return block_timestamps
+
     def get_suggested_scan_end_block(self):
         """Get the last mined block on Ethereum chain we are following."""
 
@@ -148,9 +209,10 @@ class EventScanner:
         return self.last_scanned_block
 
     def process_event(
-        self, block_timestamp: datetime.datetime, event: TransferEvent
+        self, block_timestamp: Optional[datetime.datetime], event: TransferEvent
     ) -> str:
-        """Record a ERC-20 transfer in our database."""
+        """Record a ERC-20 transfer, balance refreshes are enqueued per chunk by
+        enqueue_balance_refreshes"""
         # Events are keyed by their transaction hash and log index
         # One transaction may contain multiple events
         # and each one of those gets their own log index
@@ -160,24 +222,22 @@ class EventScanner:
         txhash = event["transactionHash"].hex()  # Transaction hash
         block_number = event["blockNumber"]
 
-        # Convert ERC-20 Transfer event to our internal format
-        args = event["args"]
-        transfer = {
-            "from": args["from"],
-            "to": args["to"],
-            "value": args["value"],
-            "timestamp": block_timestamp,
-        }
+        # Return a pointer that allows us to look up this event later if needed
+        return f"{block_number}-{txhash}-{log_index}"
 
-        # Add user ids from the transfer event into the balance refresh queue.
+    def enqueue_balance_refreshes(self, events: List[TransferEvent]):
+        """Add the users with a wallet in any of the transfers to the balance
+        refresh queue, with one query per wallet table and one redis call"""
         # Depending on the wallet connection, we may have the address stored as
         # lower cased, so to be safe, we refresh check-summed and lower-cased adddresses.
-        transfer_event_wallets = [
-            transfer["from"],
-            transfer["to"],
-            transfer["from"].lower(),
-            transfer["to"].lower(),
-        ]
+        transfer_event_wallets = set()
+        for event in events:
+            for wallet in (event["args"]["from"], event["args"]["to"]):
+                transfer_event_wallets.add(wallet)
+                transfer_event_wallets.add(wallet.lower())
+        if not transfer_event_wallets:
+            return
+
         with self.db.scoped_session() as session:
             user_result = (
                 session.query(User.user_id)
@@ -194,15 +254,12 @@ class EventScanner:
             ).all()
             associated_wallet_set = {user_id for [user_id] in associated_wallet_result}
 
-            user_ids = list(user_set.union(associated_wallet_set))
-            if user_ids:
-                logger.info(
-                    f"event_scanner.py | Enqueueing user ids {user_ids} to immediate balance refresh queue"
-                )
-                enqueue_immediate_balance_refresh(self.redis, user_ids)
-
-        # Return a pointer that allows us to look up this event later if needed
-        return f"{block_number}-{txhash}-{log_index}"
+        user_ids = list(user_set.union(associated_wallet_set))
+        if user_ids:
+            logger.info(
+                f"event_scanner.py | Enqueueing user ids {user_ids} to immediate balance refresh queue"
+            )
+            enqueue_immediate_balance_refresh(self.redis, user_ids)
 
     def scan_chunk(self, start_block, end_block) -> Tuple[int, list]:
         """Read and process events between to block numbers.
@@ -212,18 +269,6 @@ class EventScanner:
         :return: tuple(actual end block number, when this block was mined, processed events)
         """
 
-        block_timestamps = {}
-        get_block_timestamp = self.get_block_timestamp
-
-        # Cache block timestamps to reduce some RPC overhead
-        # Real solution might include smarter models around block
-        def get_block_mined_timestamp(block_num):
-            if block_num not in block_timestamps:
-                block_timestamps[block_num] = get_block_timestamp(block_num)
-            return block_timestamps[block_num]
-
-        all_processed = []
-
         # Callable that takes care of the underlying web3 call
         def _fetch_events(from_block, to_block):
             return _fetch_events_for_all_contracts(
@@ -241,24 +286,23 @@ class EventScanner:
         )
 
         for evt in events:
-            idx = evt[
-                "logIndex"
-            ]  # Integer of the log index position in the block, null when its pending
-
+            # Integer of the log index position in the block, null when its pending
             # We cannot avoid minor chain reorganisations, but
             # at least we must avoid blocks that are not mined yet
-            assert idx is not None, "Somehow tried to scan a pending block"
-
-            block_number = evt["blockNumber"]
+            assert evt["logIndex"] is not None, "Somehow tried to scan a pending block"
 
-            # Get UTC time when this event happened (block mined timestamp)
-            # from our in-memory cache
-            block_timestamp = get_block_mined_timestamp(block_number)
+        # Get UTC time when the events happened (block mined timestamp)
+        block_timestamps = self.get_block_timestamps(
+            evt["blockNumber"] for evt in events
+        )
+        self.enqueue_balance_refreshes(events)
 
+        all_processed = []
+        for evt in events:
             logger.debug(
                 f'event_scanner.py | Processing event {evt["event"]}, block:{evt["blockNumber"]}'
             )
-            processed = self.process_event(block_timestamp, evt)
+            processed = self.process_event(block_timestamps[evt["blockNumber"]], evt)
             all_processed.append(processed)
 
         return end_block, all_processed
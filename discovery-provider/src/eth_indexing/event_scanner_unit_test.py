@@ -0,0 +1,81 @@
+import datetime
+from unittest import mock
+
+from src.eth_indexing.event_scanner import EventScanner
+
+
+def make_scanner():
+    web3 = mock.Mock()
+    web3.provider.endpoint_uri = "http://localhost:8546"
+    web3.eth.get_block.side_effect = lambda block_num: {"timestamp": block_num * 10}
+    return EventScanner(
+        db=mock.Mock(),
+        redis=mock.Mock(),
+        web3=web3,
+        contract=mock.Mock(),
+        event_type=mock.Mock(),
+        filters={},
+    )
+
+
+def mock_node(scanner, supports_batch=True):
+    sent = []
+
+    def post(endpoint, payload):
+        sent.append(payload)
+        if not supports_batch:
+            return {"jsonrpc": "2.0", "error": {"code": -32600}}
+        return [
+            {
+                "id": call["id"],
+                # block 5 is not mined yet
+                "result": None
+                if call["params"][0] == hex(5)
+                else {"timestamp": hex(int(call["params"][0], 16) * 10)},
+            }
+            for call in payload
+        ]
+
+    scanner._client.post = post
+    return sent
+
+
+def timestamp(block_num):
+    return datetime.datetime.utcfromtimestamp(block_num * 10)
+
+
+def test_get_block_timestamps():
+    scanner = make_scanner()
+    sent = mock_node(scanner)
+
+    assert scanner.get_block_timestamps([1, 2, 2, 5]) == {
+        1: timestamp(1),
+        2: timestamp(2),
+        5: None,
+    }
+    # one batched request for the distinct blocks
+    assert [[call["params"][0] for call in payload] for payload in sent] == [
+        ["0x1", "0x2", "0x5"]
+    ]
+
+    # mined blocks are cached, the others fetched again
+    assert scanner.get_block_timestamps([1, 3, 5]) == {
+        1: timestamp(1),
+        3: timestamp(3),
+        5: None,
+    }
+    assert [call["params"][0] for call in sent[1]] == ["0x3", "0x5"]
+    scanner.web3.eth.get_block.assert_not_called()
+
+
+def test_get_block_timestamps_falls_back_to_single_requests():
+    scanner = make_scanner()
+    sent = mock_node(scanner, supports_batch=False)
+
+    assert scanner.get_block_timestamps([1, 2]) == {1: timestamp(1), 2: timestamp(2)}
+    assert scanner.web3.eth.get_block.call_count == 2
+
+    # batches are not retried while the node is cooling down
+    scanner.get_block_timestamps([3])
+    assert len(sent) == 1
+    assert scanner.web3.eth.get_block.call_count == 3
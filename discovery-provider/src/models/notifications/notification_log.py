@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer
+from sqlalchemy.dialects import postgresql
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+class NotificationLog(Base, RepresentableMixin):
+    """The notifications of each indexed block, written in the commit of the block"""
+
+    __tablename__ = "notification_log"
+
+    blocknumber = Column(Integer, primary_key=True, nullable=False)
+    notifications = Column(postgresql.JSONB(), nullable=False)  # type: ignore
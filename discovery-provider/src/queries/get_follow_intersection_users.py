@@ -8,15 +8,20 @@ from src.queries.query_helpers import (
 )
 from src.utils import helpers
 from src.utils.db_session import get_db_read_replica
+from src.utils.social_graph import get_social_graph
 
 
 def get_follow_intersection_users(followee_user_id, follower_user_id):
     users = []
     db = get_db_read_replica()
+    social_graph = get_social_graph()
     with db.scoped_session() as session:
-        query = session.query(User).filter(
-            User.is_current == True,
-            User.user_id.in_(
+        if social_graph:
+            intersection_user_ids = social_graph.get_follow_intersection(
+                followee_user_id, follower_user_id
+            ).tolist()
+        else:
+            intersection_user_ids = (
                 session.query(Follow.follower_user_id)
                 .filter(
                     Follow.followee_user_id == followee_user_id,
@@ -30,7 +35,10 @@ def get_follow_intersection_users(followee_user_id, follower_user_id):
                         Follow.is_delete == False,
                     )
                 )
-            ),
+            )
+        query = session.query(User).filter(
+            User.is_current == True,
+            User.user_id.in_(intersection_user_ids),
         )
         users = paginate_query(query).all()
         users = helpers.query_result_to_list(users)
@@ -3,10 +3,10 @@ from src.queries.get_unpopulated_users import get_unpopulated_users
 from src.queries.query_helpers import populate_user_metadata
 from src.utils.db_session import get_db_read_replica
 
-sql = text(
-    """
+base_sql = """
 SELECT
-    followee_user_id
+    followee_user_id,
+    coalesce(follower_count, 0)
 from
     follows
     left outer join aggregate_user on followee_user_id = user_id
@@ -14,29 +14,67 @@ where
     is_current = true
     and is_delete = false
     and follower_user_id = :follower_user_id
+    {cursor_filter}
 order by
-    follower_count desc,
-    user_id asc
-offset :offset
+    coalesce(follower_count, 0) desc,
+    followee_user_id asc
+{offset}
 limit :limit;
 """
+
+sql = text(base_sql.format(cursor_filter="", offset="offset :offset"))
+
+# Pages after a cursor holding the (follower_count, user_id) sort key of the last user
+cursor_sql = text(
+    base_sql.format(
+        cursor_filter="""and (
+        coalesce(follower_count, 0) < :cursor_follower_count
+        or (
+            coalesce(follower_count, 0) = :cursor_follower_count
+            and followee_user_id > :cursor_user_id
+        )
+    )""",
+        offset="",
+    )
 )
 
 
 def get_followees_for_user(args):
+    """
+    Returns the page of users and the (follower_count, user_id) sort key of each
+    row of the page, including users that are left out of the results
+    """
     users = []
     follower_user_id = args.get("follower_user_id")
     current_user_id = args.get("current_user_id")
     limit = args.get("limit")
     offset = args.get("offset")
+    cursor = args.get("cursor")
 
     db = get_db_read_replica()
     with db.scoped_session() as session:
-        rows = session.execute(
-            sql,
-            {"follower_user_id": follower_user_id, "limit": limit, "offset": offset},
-        )
-        user_ids = [r[0] for r in rows]
+        if cursor:
+            cursor_follower_count, cursor_user_id = cursor
+            rows = session.execute(
+                cursor_sql,
+                {
+                    "follower_user_id": follower_user_id,
+                    "limit": limit,
+                    "cursor_follower_count": cursor_follower_count,
+                    "cursor_user_id": cursor_user_id,
+                },
+            )
+        else:
+            rows = session.execute(
+                sql,
+                {
+                    "follower_user_id": follower_user_id,
+                    "limit": limit,
+                    "offset": offset,
+                },
+            )
+        sort_keys = [(follower_count, user_id) for user_id, follower_count in rows]
+        user_ids = [user_id for _, user_id in sort_keys]
 
         # get all users for above user_ids
         users = get_unpopulated_users(session, user_ids)
@@ -44,4 +82,4 @@ def get_followees_for_user(args):
         # bundle peripheral info into user results
         users = populate_user_metadata(session, user_ids, users, current_user_id)
 
-    return users
+    return users, sort_keys
@@ -543,7 +543,10 @@ def _load_abis():
 
 def _init_solana_client_manager():
     global solana_client_manager
-    solana_client_manager = SolanaClientManager(shared_config["solana"]["endpoint"])
+    solana_client_manager = SolanaClientManager(
+        shared_config["solana"]["endpoint"],
+        shared_config["solana"].getboolean("hedge_rpc_requests", fallback=False),
+    )
 
 
 _load_abis()
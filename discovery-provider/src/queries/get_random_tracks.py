@@ -5,8 +5,13 @@ from src.queries.query_helpers import (
     get_users_ids,
     populate_track_metadata,
 )
-from src.utils import helpers
+from src.utils import helpers, redis_connection
 from src.utils.db_session import get_db_read_replica
+from src.utils.random_tracks_pool import (
+    POOL_OVERSAMPLE,
+    filter_eligible_tracks,
+    sample_random_tracks_pool,
+)
 
 
 def get_random_tracks(args):
@@ -16,22 +21,32 @@ def get_random_tracks(args):
     current_user_id = args.get("user_id")
     db = get_db_read_replica()
     with db.scoped_session() as session:
-        # Query for random tracks
-        tracks_query = (
-            session.query(
-                Track,
-            )
-            .filter(
-                Track.is_current == True,
-                Track.is_delete == False,
-                Track.is_unlisted == False,
-                Track.stem_of == None,
-            )
-            .order_by(func.random())
-            .limit(limit)
+        # Sample from the pool of eligible track ids kept by index_random_tracks_pool
+        # and fall back to sorting every eligible track while it is built
+        sampled_track_ids = sample_random_tracks_pool(
+            redis_connection.get_redis(), limit + POOL_OVERSAMPLE
         )
+        if sampled_track_ids is None:
+            tracks_query_results = (
+                filter_eligible_tracks(session.query(Track))
+                .order_by(func.random())
+                .limit(limit)
+                .all()
+            )
+        else:
+            # tracks changed since the pool was last updated may no longer be eligible
+            tracks_by_id = {
+                track.track_id: track
+                for track in filter_eligible_tracks(session.query(Track))
+                .filter(Track.track_id.in_(sampled_track_ids))
+                .all()
+            }
+            tracks_query_results = [
+                tracks_by_id[track_id]
+                for track_id in sampled_track_ids
+                if track_id in tracks_by_id
+            ][:limit]
 
-        tracks_query_results = tracks_query.all()
         tracks = helpers.query_result_to_list(tracks_query_results)
         track_ids = list(map(lambda track: track["track_id"], tracks))
 
@@ -1,9 +1,16 @@
 import datetime
+import logging
+import os
+from typing import List, Optional, Tuple
 
+import numpy as np
+from billiard.pool import Pool
 from datasketch import MinHash, MinHashLSHForest
 from psycopg2.extras import execute_values
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
 top_k = 100
 num_perm = 256
 
@@ -12,11 +19,59 @@ num_perm = 256
 # set to 150 here
 MIN_FOLLOWER_REQUIREMENT = 150
 
+# Number of follow edges hashed into an edges x num_perm matrix at a time, the
+# matrix of a batch fits in the cpu cache
+SIGNATURE_BATCH_SIZE = 1024
+# Number of artists queried and rescored per task of the process pool
+QUERY_CHUNK_SIZE = 1000
+# Number of artists fetched per round trip of the followers cursor
+FETCH_SIZE = 2000
 
-def build_minhash(session: Session):
+# the constants datasketch's MinHash permutes hash values with, signatures
+# computed here are the same as the ones of MinHash.update_batch
+_mersenne_prime = np.uint64((1 << 61) - 1)
+_max_hash = np.uint64((1 << 32) - 1)
+_mersenne_exponent = np.uint64(61)
+
+# related artists are written to the shadow table and swapped in when complete
+# so readers see the previous related artists until then
+create_shadow_table_sql = """
+drop table if exists related_artists_shadow;
+create table related_artists_shadow (like related_artists including defaults);
+"""
+
+# indexed after the load, named after the live indexes once swapped in
+index_shadow_table_sql = """
+alter table related_artists_shadow
+    add constraint related_artists_shadow_pkey
+    primary key (user_id, related_artist_user_id);
+create index related_artists_shadow_related_artist_id_idx
+    on related_artists_shadow (related_artist_user_id, user_id);
+"""
+
+swap_shadow_table_sql = """
+drop table related_artists;
+alter table related_artists_shadow rename to related_artists;
+alter table related_artists
+    rename constraint related_artists_shadow_pkey to related_artists_pkey;
+alter index related_artists_shadow_related_artist_id_idx
+    rename to related_artists_related_artist_id_idx;
+"""
+
+# Set before the process pool is forked so its workers share it
+_query_state = None
+
+
+def load_followers(session: Session):
+    """
+    Returns the ids of the artists with tracks and their followers, the followers of
+    the artist at index i are follower_ids[offsets[i]:offsets[i + 1]]
+    """
     engine = session.get_bind()
     connection = engine.raw_connection()
-    cursor = connection.cursor()
+    # server side cursor so the follows are streamed rather than held as lists
+    cursor = connection.cursor(name="related_artists_followers")
+    cursor.itersize = FETCH_SIZE
 
     try:
         cursor.execute(
@@ -32,69 +87,222 @@ def build_minhash(session: Session):
             """
         )
 
-        forest = MinHashLSHForest(num_perm=num_perm)
-
-        user_mh = {}
-        follower_counts = {}
-
+        user_ids = []
+        follower_counts = []
+        follower_id_chunks = []
         for (user_id, follower_ids) in cursor:
-            ids = [str(id).encode("utf8") for id in follower_ids]
-            mh = MinHash(num_perm=num_perm)
-            mh.update_batch(ids)
+            user_ids.append(user_id)
+            follower_counts.append(len(follower_ids))
+            follower_id_chunks.append(np.array(follower_ids, dtype=np.int64))
 
-            user_mh[user_id] = mh
-            follower_counts[user_id] = len(follower_ids)
-            forest.add(user_id, mh)
-        forest.index()
-        return (user_mh, forest)
+        offsets = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(follower_counts, out=offsets[1:])
+        follower_ids = (
+            np.concatenate(follower_id_chunks)
+            if follower_id_chunks
+            else np.zeros(0, dtype=np.int64)
+        )
+        return (np.array(user_ids, dtype=np.int64), offsets, follower_ids)
 
     finally:
+        cursor.close()
         connection.commit()
         connection.close()
 
 
-def update_related_artist_minhash(session: Session):
+def compute_signatures(offsets, follower_ids, permutations, hashfunc):
+    """
+    Returns the MinHash hash values of every artist, row i holding the hash values
+    MinHash.update_batch computes for the followers of the artist at index i
+    """
+    num_artists = len(offsets) - 1
+    signatures = np.full((num_artists, num_perm), _max_hash, dtype=np.uint64)
+    if not num_artists:
+        return signatures
 
-    (user_mh, forest) = build_minhash(session)
+    # hash every follower once rather than once per artist they follow
+    unique_follower_ids, follower_indexes = np.unique(follower_ids, return_inverse=True)
+    follower_hashes = np.array(
+        [hashfunc(str(id).encode("utf8")) for id in unique_follower_ids.tolist()],
+        dtype=np.uint64,
+    )
 
-    engine = session.get_bind()
-    connection = engine.raw_connection()
-    cursor = connection.cursor()
+    a, b = permutations
+    num_edges = len(follower_ids)
+    for start in range(0, num_edges, SIGNATURE_BATCH_SIZE):
+        end = min(start + SIGNATURE_BATCH_SIZE, num_edges)
+        hv = follower_hashes[follower_indexes[start:end]][:, np.newaxis]
+        phv = hv * a
+        phv += b
+        # phv % _mersenne_prime without a division, since 2^61 % (2^61 - 1) = 1 the
+        # high bits are added to the low bits, which is at most 7 above the prime
+        high_bits = phv >> _mersenne_exponent
+        phv &= _mersenne_prime
+        phv += high_bits
+        np.subtract(phv, _mersenne_prime, out=phv, where=phv >= _mersenne_prime)
+        phv &= _max_hash
 
-    try:
-        cursor.execute("truncate table related_artists;")
+        # artists with followers in the batch, every artist has at least one
+        first = np.searchsorted(offsets, start, side="right") - 1
+        last = np.searchsorted(offsets, end - 1, side="right") - 1
+        segment_starts = np.maximum(offsets[first : last + 1], start) - start
+        np.minimum(
+            signatures[first : last + 1],
+            np.minimum.reduceat(phv, segment_starts, axis=0),
+            out=signatures[first : last + 1],
+        )
+    return signatures
 
-        for user_id, mh in user_mh.items():
-            if mh.count() < MIN_FOLLOWER_REQUIREMENT:
-                continue
 
-            # overfetch with rescore to improve accuracy:
-            # http://ekzhu.com/datasketch/lshforest.html#tips-for-improving-accuracy
-            similar = forest.query(mh, top_k * 5)
-            created_at = datetime.datetime.now()
+def estimate_counts(signatures):
+    """MinHash.count of each row of hash values"""
+    return np.float64(num_perm) / np.sum(signatures / float(_max_hash), axis=-1) - 1.0
 
-            rows = []
-            for other_id in similar:
-                if other_id == user_id:
-                    continue
-                mh2 = user_mh[other_id]
 
-                # default datasketch score would come from jaccard estimation
-                # score = mh.jaccard(mh2)
+def build_minhash(session: Session):
+    (user_ids, offsets, follower_ids) = load_followers(session)
 
-                # this attempts to match previous formula
-                # https://github.com/AudiusProject/audius-protocol/blob/ddda462014ecdfd588f2834d07bf0a6066c56487/discovery-provider/src/queries/get_related_artists.py#L95-L98
-                union = MinHash.union(mh, mh2)
-                intersection_size = mh.count() + mh2.count() - union.count()
-                score = intersection_size * intersection_size / mh2.count()
+    # permutations are generated once and shared by the MinHash of every artist
+    prototype = MinHash(num_perm=num_perm)
+    signatures = compute_signatures(
+        offsets, follower_ids, prototype.permutations, prototype.hashfunc
+    )
 
-                rows.append((user_id, other_id, score, created_at))
+    forest = MinHashLSHForest(num_perm=num_perm)
+    for user_id, hashvalues in zip(user_ids.tolist(), signatures):
+        forest.add(
+            user_id,
+            MinHash(
+                num_perm=num_perm,
+                hashvalues=hashvalues,
+                permutations=prototype.permutations,
+            ),
+        )
+    forest.index()
+    return (user_ids, signatures, prototype.permutations, forest)
 
-            rows = sorted(rows, key=lambda x: x[2], reverse=True)[:top_k]
 
-            insert_query = "insert into related_artists (user_id, related_artist_user_id, score, created_at) values %s"
-            execute_values(cursor, insert_query, rows, template=None, page_size=100000)
+def _query_related_artists(indexes: List[int]):
+    (
+        user_ids,
+        index_by_user_id,
+        signatures,
+        counts,
+        permutations,
+        forest,
+    ) = _query_state
+    created_at = datetime.datetime.now()
+
+    rows: List[Tuple[int, int, float, datetime.datetime]] = []
+    for i in indexes:
+        user_id = int(user_ids[i])
+        mh = MinHash(
+            num_perm=num_perm, hashvalues=signatures[i], permutations=permutations
+        )
 
+        # overfetch with rescore to improve accuracy:
+        # http://ekzhu.com/datasketch/lshforest.html#tips-for-improving-accuracy
+        similar = [
+            index_by_user_id[other_id]
+            for other_id in forest.query(mh, top_k * 5)
+            if other_id != user_id
+        ]
+        if not similar:
+            continue
+
+        # default datasketch score would come from jaccard estimation
+        # score = mh.jaccard(mh2)
+
+        # this attempts to match previous formula
+        # https://github.com/AudiusProject/audius-protocol/blob/ddda462014ecdfd588f2834d07bf0a6066c56487/discovery-provider/src/queries/get_related_artists.py#L95-L98
+        union_counts = estimate_counts(np.minimum(signatures[similar], signatures[i]))
+        other_counts = counts[similar]
+        intersection_sizes = counts[i] + other_counts - union_counts
+        scores = intersection_sizes * intersection_sizes / other_counts
+
+        for j in np.argsort(-scores, kind="stable")[:top_k]:
+            rows.append(
+                (user_id, int(user_ids[similar[j]]), float(scores[j]), created_at)
+            )
+    return rows
+
+
+def query_related_artists(
+    user_ids, signatures, permutations, forest, num_processes: Optional[int] = None
+):
+    """
+    Yields the related artist rows of the artists with enough followers a chunk of
+    artists at a time, queried and rescored across num_processes processes, every
+    cpu by default
+    """
+    global _query_state  # pylint: disable=W0603
+    counts = estimate_counts(signatures)
+    query_indexes = np.flatnonzero(counts >= MIN_FOLLOWER_REQUIREMENT).tolist()
+    chunks = [
+        query_indexes[start : start + QUERY_CHUNK_SIZE]
+        for start in range(0, len(query_indexes), QUERY_CHUNK_SIZE)
+    ]
+    num_processes = min(num_processes or os.cpu_count() or 1, max(len(chunks), 1))
+
+    index_by_user_id = {user_id: i for i, user_id in enumerate(user_ids.tolist())}
+    _query_state = (
+        user_ids,
+        index_by_user_id,
+        signatures,
+        counts,
+        permutations,
+        forest,
+    )
+    # forked after the state is set, billiard's pool can be started from the
+    # daemonic processes of the celery worker unlike the one of multiprocessing
+    pool = Pool(processes=num_processes) if num_processes > 1 else None
+    try:
+        if pool:
+            yield from pool.imap_unordered(_query_related_artists, chunks)
+        else:
+            yield from map(_query_related_artists, chunks)
     finally:
+        _query_state = None
+        if pool:
+            pool.terminate()
+            pool.join()
+
+
+def update_related_artist_minhash(
+    session: Session, num_processes: Optional[int] = None
+):
+    """
+    Recomputes the related artists into a shadow table and swaps it in for
+    related_artists
+    """
+    (user_ids, signatures, permutations, forest) = build_minhash(session)
+
+    engine = session.get_bind()
+    connection = engine.raw_connection()
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(create_shadow_table_sql)
+
+        insert_query = "insert into related_artists_shadow (user_id, related_artist_user_id, score, created_at) values %s"
+        num_rows = 0
+        for rows in query_related_artists(
+            user_ids, signatures, permutations, forest, num_processes
+        ):
+            execute_values(cursor, insert_query, rows, template=None, page_size=100000)
+            num_rows += len(rows)
+
+        cursor.execute(index_shadow_table_sql)
+        # the live table is only locked from here to the commit
+        cursor.execute(swap_shadow_table_sql)
         connection.commit()
+        logger.info(
+            f"get_related_artists_minhash.py | swapped in {num_rows} related artists"
+        )
+
+    except Exception as e:
+        connection.rollback()
+        raise e
+
+    finally:
         connection.close()
@@ -0,0 +1,45 @@
+import numpy as np
+from datasketch import MinHash
+from src.queries import get_related_artists_minhash
+from src.queries.get_related_artists_minhash import (
+    compute_signatures,
+    estimate_counts,
+    num_perm,
+)
+
+
+def test_compute_signatures_matches_minhash(monkeypatch):
+    # batches that split the followers of an artist
+    monkeypatch.setattr(get_related_artists_minhash, "SIGNATURE_BATCH_SIZE", 7)
+    followers = [
+        list(range(1, 30)),
+        [3],
+        list(range(20, 45)) + [1000, 2000],
+        [7, 8, 9, 10],
+    ]
+    offsets = np.cumsum([0] + [len(ids) for ids in followers])
+    follower_ids = np.array([id for ids in followers for id in ids])
+
+    prototype = MinHash(num_perm=num_perm)
+    signatures = compute_signatures(
+        offsets, follower_ids, prototype.permutations, prototype.hashfunc
+    )
+    counts = estimate_counts(signatures)
+
+    for i, ids in enumerate(followers):
+        mh = MinHash(num_perm=num_perm)
+        mh.update_batch([str(id).encode("utf8") for id in ids])
+        assert (signatures[i] == mh.hashvalues).all()
+        assert counts[i] == mh.count()
+
+
+def test_compute_signatures_no_artists():
+    prototype = MinHash(num_perm=num_perm)
+    signatures = compute_signatures(
+        np.zeros(1, dtype=np.int64),
+        np.zeros(0, dtype=np.int64),
+        prototype.permutations,
+        prototype.hashfunc,
+    )
+
+    assert signatures.shape == (0, num_perm)
@@ -1,21 +1,31 @@
-from sqlalchemy import desc, func
+from sqlalchemy import asc, desc, func
 from src import exceptions
 from src.models.playlists.playlist import Playlist
 from src.models.social.repost import Repost, RepostType
 from src.models.users.aggregate_user import AggregateUser
 from src.models.users.user import User
 from src.queries import response_name_constants
-from src.queries.query_helpers import add_query_pagination, populate_user_metadata
+from src.queries.query_helpers import (
+    add_follower_count_cursor,
+    add_query_pagination,
+    populate_user_metadata,
+)
 from src.utils import helpers
 from src.utils.db_session import get_db_read_replica
 
 
 def get_reposters_for_playlist(args):
+    """
+    Returns the page of users and the (follower_count, user_id) sort key of each
+    of them
+    """
     user_results = []
+    sort_keys = []
     current_user_id = args.get("current_user_id")
     repost_playlist_id = args.get("repost_playlist_id")
     limit = args.get("limit")
     offset = args.get("offset")
+    cursor = args.get("cursor")
 
     db = get_db_read_replica()
     with db.scoped_session() as session:
@@ -33,13 +43,12 @@ def get_reposters_for_playlist(args):
             )
 
         # Get all Users that reposted Playlist, ordered by follower_count desc & paginated.
+        # Replace null values from left outer join with 0 to ensure sort works correctly.
+        follower_count = func.coalesce(AggregateUser.follower_count, 0)
         query = (
             session.query(
                 User,
-                # Replace null values from left outer join with 0 to ensure sort works correctly.
-                (func.coalesce(AggregateUser.follower_count, 0)).label(
-                    response_name_constants.follower_count
-                ),
+                follower_count.label(response_name_constants.follower_count),
             )
             # Left outer join to associate users with their follower count.
             .outerjoin(AggregateUser, AggregateUser.user_id == User.user_id)
@@ -56,12 +65,21 @@ def get_reposters_for_playlist(args):
                     )
                 ),
             )
-            .order_by(desc(response_name_constants.follower_count))
+            .order_by(desc(response_name_constants.follower_count), asc(User.user_id))
         )
-        user_results = add_query_pagination(query, limit, offset).all()
+        if cursor:
+            query = add_follower_count_cursor(
+                query, follower_count, User.user_id, cursor
+            ).limit(limit)
+        else:
+            query = add_query_pagination(query, limit, offset)
+        user_results = query.all()
 
         # Fix format to return only Users objects with follower_count field.
         if user_results:
+            sort_keys = [
+                (follower_count, user.user_id) for user, follower_count in user_results
+            ]
             users, _ = zip(*user_results)
             user_results = helpers.query_result_to_list(users)
             # bundle peripheral info into user results
@@ -70,4 +88,4 @@ def get_reposters_for_playlist(args):
                 session, user_ids, user_results, current_user_id
             )
 
-    return user_results
+    return user_results, sort_keys
@@ -11,6 +11,7 @@ from src.queries.query_helpers import (
 )
 from src.utils import helpers
 from src.utils.db_session import get_db_read_replica
+from src.utils.social_graph import get_social_graph
 
 
 def get_top_followee_saves(saveType, args):
@@ -23,12 +24,15 @@ def get_top_followee_saves(saveType, args):
     db = get_db_read_replica()
     with db.scoped_session() as session:
         # Construct a subquery of all followees
-        followee_user_ids = session.query(Follow.followee_user_id).filter(
-            Follow.follower_user_id == current_user_id,
-            Follow.is_current == True,
-            Follow.is_delete == False,
-        )
-        followee_user_ids_subquery = followee_user_ids.subquery()
+        social_graph = get_social_graph()
+        if social_graph:
+            followee_user_ids = social_graph.get_followee_ids(current_user_id).tolist()
+        else:
+            followee_user_ids = session.query(Follow.followee_user_id).filter(
+                Follow.follower_user_id == current_user_id,
+                Follow.is_current == True,
+                Follow.is_delete == False,
+            )
 
         # Construct a subquery of all saves from followees aggregated by id
         save_count = (
@@ -36,11 +40,8 @@ def get_top_followee_saves(saveType, args):
                 Save.save_item_id,
                 func.count(Save.save_item_id).label(response_name_constants.save_count),
             )
-            .join(
-                followee_user_ids_subquery,
-                Save.user_id == followee_user_ids_subquery.c.followee_user_id,
-            )
             .filter(
+                Save.user_id.in_(followee_user_ids),
                 Save.is_current == True,
                 Save.is_delete == False,
                 Save.save_type == saveType,
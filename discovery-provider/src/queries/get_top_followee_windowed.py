@@ -10,6 +10,7 @@ from src.queries.query_helpers import (
 )
 from src.utils import helpers
 from src.utils.db_session import get_db_read_replica
+from src.utils.social_graph import get_social_graph
 
 
 def get_top_followee_windowed(type, window, args):
@@ -28,24 +29,24 @@ def get_top_followee_windowed(type, window, args):
     db = get_db_read_replica()
     with db.scoped_session() as session:
 
-        followee_user_ids = session.query(Follow.followee_user_id).filter(
-            Follow.follower_user_id == current_user_id,
-            Follow.is_current == True,
-            Follow.is_delete == False,
-        )
-        followee_user_ids_subquery = followee_user_ids.subquery()
+        social_graph = get_social_graph()
+        if social_graph:
+            followee_user_ids = social_graph.get_followee_ids(current_user_id).tolist()
+        else:
+            followee_user_ids = session.query(Follow.followee_user_id).filter(
+                Follow.follower_user_id == current_user_id,
+                Follow.is_current == True,
+                Follow.is_delete == False,
+            )
 
         # Queries for tracks joined against followed users and counts
         tracks_query = (
             session.query(
                 Track,
             )
-            .join(
-                followee_user_ids_subquery,
-                Track.owner_id == followee_user_ids_subquery.c.followee_user_id,
-            )
             .join(AggregateTrack, Track.track_id == AggregateTrack.track_id)
             .filter(
+                Track.owner_id.in_(followee_user_ids),
                 Track.is_current == True,
                 Track.is_delete == False,
                 Track.is_unlisted == False,
@@ -0,0 +1,60 @@
+import logging
+from typing import Dict, Optional
+
+from src.models.tracks.track import Track
+from src.models.users.user import User
+from src.utils import redis_connection
+from src.utils.db_session import get_db_read_replica
+from src.utils.entity_cache import (
+    TRACK_STREAM,
+    get_cache_versions,
+    get_cached_entities,
+    set_cached_entities,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_track_stream_info(track_id: int) -> Optional[Dict]:
+    """
+    Returns what the stream route needs to redirect to a content node for a
+    track: its cid, premium fields, deleted status and its owner's replica set
+    and deactivated status. Returns None if the track does not exist.
+
+    Checks the redis cache first, which the indexer invalidates when the track
+    or its owner changes, then falls back to a single query.
+    """
+    redis = redis_connection.get_redis()
+    cached_stream_info = get_cached_entities(redis, TRACK_STREAM, [track_id])
+    if track_id in cached_stream_info:
+        return cached_stream_info[track_id]
+
+    cache_versions = get_cache_versions(redis, TRACK_STREAM, [track_id])
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        row = (
+            session.query(
+                Track.track_id,
+                Track.owner_id,
+                Track.track_cid,
+                Track.is_premium,
+                Track.premium_conditions,
+                Track.is_delete,
+                User.is_deactivated,
+                User.creator_node_endpoint,
+            )
+            .join(User, User.user_id == Track.owner_id)
+            .filter(
+                Track.is_current == True,
+                Track.stem_of == None,
+                Track.track_id == track_id,
+                User.is_current == True,
+            )
+            .first()
+        )
+
+    if not row:
+        return None
+    stream_info = dict(row._asdict())
+    set_cached_entities(redis, TRACK_STREAM, {track_id: stream_info}, cache_versions)
+    return stream_info
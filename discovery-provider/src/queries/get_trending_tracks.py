@@ -1,6 +1,7 @@
-from typing import Optional, TypedDict
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, TypedDict
 
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 from sqlalchemy.orm.session import Session
 from src.models.tracks.track import Track
 from src.models.tracks.track_trending_score import TrackTrendingScore
@@ -81,6 +82,16 @@ def generate_unpopulated_trending(
     return (tracks, track_ids)
 
 
+def get_score_time_range(strategy, time_range):
+    """Time range of the track_trending_scores rows to read for a time range"""
+    # use all time instead of year for version EJ57D
+    if strategy.version == TrendingVersion.EJ57D and time_range == "year":
+        return "allTime"
+    if strategy.version != TrendingVersion.EJ57D and time_range == "allTime":
+        return "year"
+    return time_range
+
+
 def generate_unpopulated_trending_from_mat_views(
     session,
     genre,
@@ -90,11 +101,7 @@ def generate_unpopulated_trending_from_mat_views(
     limit=TRENDING_LIMIT,
 ):
 
-    # use all time instead of year for version EJ57D
-    if strategy.version == TrendingVersion.EJ57D and time_range == "year":
-        time_range = "allTime"
-    elif strategy.version != TrendingVersion.EJ57D and time_range == "allTime":
-        time_range = "year"
+    time_range = get_score_time_range(strategy, time_range)
 
     trending_track_ids_query = session.query(
         TrackTrendingScore.track_id, TrackTrendingScore.score
@@ -151,6 +158,113 @@ def generate_unpopulated_trending_from_mat_views(
     return (tracks, track_ids)
 
 
+def generate_all_unpopulated_trending_from_mat_views(
+    session,
+    genres,
+    time_ranges,
+    strategy,
+    exclude_premium=SHOULD_TRENDING_EXCLUDE_PREMIUM_TRACKS,
+    limit=TRENDING_LIMIT,
+) -> Dict[Tuple[str, Optional[str]], Tuple[List, List[int]]]:
+    """
+    Generates the trending of every genre in genres, None being all genres, for
+    every time range, the same as generate_unpopulated_trending_from_mat_views.
+
+    The top tracks of every genre and time range are ranked in a single read of the
+    strategy's track_trending_scores, and the tracks in any of them are fetched once.
+
+    Returns:
+        Dict of (time_range, genre) to (tracks, track_ids)
+    """
+    score_time_ranges = {
+        time_range: get_score_time_range(strategy, time_range)
+        for time_range in time_ranges
+    }
+    # The top tracks of all genres are among the top tracks of their own genre, so
+    # ranking the tracks of each genre ranks the tracks of all genres too
+    scores_query = session.query(
+        TrackTrendingScore.track_id,
+        TrackTrendingScore.genre,
+        TrackTrendingScore.time_range,
+        TrackTrendingScore.score,
+        func.row_number()
+        .over(
+            partition_by=(TrackTrendingScore.time_range, TrackTrendingScore.genre),
+            order_by=(
+                desc(TrackTrendingScore.score),
+                desc(TrackTrendingScore.track_id),
+            ),
+        )
+        .label("genre_rank"),
+    ).filter(
+        TrackTrendingScore.type == strategy.trending_type.name,
+        TrackTrendingScore.version == strategy.version.name,
+        TrackTrendingScore.time_range.in_(set(score_time_ranges.values())),
+    )
+
+    # If exclude_premium is true, then filter out track ids belonging to
+    # premium tracks before ranking them.
+    if exclude_premium:
+        scores_query = scores_query.join(
+            Track, Track.track_id == TrackTrendingScore.track_id
+        ).filter(
+            Track.is_current == True,
+            Track.is_delete == False,
+            Track.is_premium == False,
+        )
+
+    scores_subquery = scores_query.subquery()
+    ranked_scores = (
+        session.query(scores_subquery)
+        .filter(scores_subquery.c.genre_rank <= limit)
+        .all()
+    )
+
+    # (score time range, genre) to (score, track_id) sorted from the top track
+    rankings: Dict[Tuple[str, Optional[str]], List[Tuple[float, int]]] = defaultdict(
+        list
+    )
+    for score in ranked_scores:
+        rankings[(score.time_range, None)].append((score.score, score.track_id))
+        if score.genre:
+            rankings[(score.time_range, score.genre)].append(
+                (score.score, score.track_id)
+            )
+    for ranking in rankings.values():
+        ranking.sort(reverse=True)
+        del ranking[limit:]
+
+    # Get unpopulated metadata of the tracks in every ranking at once
+    all_track_ids = list(
+        {
+            track_id
+            for time_range, score_time_range in score_time_ranges.items()
+            for genre in genres
+            for _, track_id in rankings[(score_time_range, genre)]
+        }
+    )
+    tracks = get_unpopulated_tracks(
+        session, all_track_ids, exclude_premium=exclude_premium
+    )
+    tracks_by_id = {track["track_id"]: track for track in tracks}
+
+    trending = {}
+    for time_range, score_time_range in score_time_ranges.items():
+        for genre in genres:
+            track_ids = [
+                track_id for _, track_id in rankings[(score_time_range, genre)]
+            ]
+            trending[(time_range, genre)] = (
+                [
+                    tracks_by_id[track_id]
+                    for track_id in track_ids
+                    if track_id in tracks_by_id
+                ],
+                track_ids,
+            )
+    return trending
+
+
 def make_generate_unpopulated_trending(
     session: Session,
     genre: Optional[str],
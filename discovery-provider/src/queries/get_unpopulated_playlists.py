@@ -2,12 +2,17 @@ import logging  # pylint: disable=C0302
 from datetime import datetime
 
 from src.models.playlists.playlist import Playlist
-from src.utils import helpers
+from src.utils import helpers, redis_connection
+from src.utils.entity_cache import (
+    PLAYLIST,
+    get_cache_versions,
+    get_cached_entities,
+    restore_datetime_fields,
+    set_cached_entities,
+)
 
 logger = logging.getLogger(__name__)
 
-# Cache unpopulated playlists for 5 min
-
 playlist_datetime_fields = []
 for column in Playlist.__table__.c:
     if column.type.python_type == datetime:
@@ -27,21 +32,39 @@ def get_unpopulated_playlists(session, playlist_ids, filter_deleted=False):
         Array of playlists
     """
 
-    playlists_query = (
-        session.query(Playlist)
-        .filter(Playlist.is_current == True)
-        .filter(Playlist.playlist_id.in_(playlist_ids))
-    )
-    if filter_deleted:
-        playlists_query = playlists_query.filter(Playlist.is_delete == False)
+    redis = redis_connection.get_redis()
+    cached_playlists = get_cached_entities(redis, PLAYLIST, set(playlist_ids))
+    for playlist in cached_playlists.values():
+        restore_datetime_fields(playlist, playlist_datetime_fields)
+
+    # Playlists are cached regardless of the caller's filters, which are applied below
+    missing_playlist_ids = set(playlist_ids) - set(cached_playlists.keys())
+    queried_playlists = {}
+    if missing_playlist_ids:
+        cache_versions = get_cache_versions(redis, PLAYLIST, missing_playlist_ids)
+        playlists = (
+            session.query(Playlist)
+            .filter(Playlist.is_current == True)
+            .filter(Playlist.playlist_id.in_(missing_playlist_ids))
+            .all()
+        )
+        playlists = helpers.query_result_to_list(playlists)
+        queried_playlists = {
+            playlist["playlist_id"]: playlist for playlist in playlists
+        }
 
-    playlists = playlists_query.all()
-    playlists = helpers.query_result_to_list(playlists)
-    queried_playlists = {playlist["playlist_id"]: playlist for playlist in playlists}
+        # cache playlists for future use
+        set_cached_entities(redis, PLAYLIST, queried_playlists, cache_versions)
 
     playlists_response = []
     for playlist_id in playlist_ids:
-        if playlist_id in queried_playlists:
-            playlists_response.append(queried_playlists[playlist_id])
+        playlist = cached_playlists.get(playlist_id) or queried_playlists.get(
+            playlist_id
+        )
+        if not playlist:
+            continue
+        if filter_deleted and playlist["is_delete"]:
+            continue
+        playlists_response.append(playlist)
 
     return playlists_response
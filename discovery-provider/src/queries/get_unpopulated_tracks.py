@@ -2,7 +2,15 @@ import logging
 from datetime import datetime
 
 from src.models.tracks.track import Track
-from src.utils import helpers
+from src.queries.get_unpopulated_users import user_datetime_fields
+from src.utils import helpers, redis_connection
+from src.utils.entity_cache import (
+    TRACK,
+    get_cache_versions,
+    get_cached_entities,
+    restore_datetime_fields,
+    set_cached_entities,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,30 +43,41 @@ def get_unpopulated_tracks(
         Array of tracks
     """
 
-    tracks_query = (
-        session.query(Track)
-        .filter(Track.is_current == True, Track.stem_of == None)
-        .filter(Track.track_id.in_(track_ids))
-    )
-
-    if filter_unlisted:
-        tracks_query = tracks_query.filter(Track.is_unlisted == False)
-
-    if filter_deleted:
-        tracks_query = tracks_query.filter(Track.is_delete == False)
-
-    if exclude_premium:
-        tracks_query = tracks_query.filter(Track.is_premium == False)
-
-    tracks = tracks_query.all()
-    tracks = helpers.query_result_to_list(tracks)
-    queried_tracks = {track["track_id"]: track for track in tracks}
-
-    # cache tracks for future use
+    redis = redis_connection.get_redis()
+    cached_tracks = get_cached_entities(redis, TRACK, set(track_ids))
+    for track in cached_tracks.values():
+        restore_datetime_fields(track, track_datetime_fields)
+        for user in track.get("user") or []:
+            restore_datetime_fields(user, user_datetime_fields)
+
+    # Tracks are cached regardless of the caller's filters, which are applied below
+    missing_track_ids = set(track_ids) - set(cached_tracks.keys())
+    queried_tracks = {}
+    if missing_track_ids:
+        cache_versions = get_cache_versions(redis, TRACK, missing_track_ids)
+        tracks = (
+            session.query(Track)
+            .filter(Track.is_current == True, Track.stem_of == None)
+            .filter(Track.track_id.in_(missing_track_ids))
+            .all()
+        )
+        tracks = helpers.query_result_to_list(tracks)
+        queried_tracks = {track["track_id"]: track for track in tracks}
+
+        # cache tracks for future use
+        set_cached_entities(redis, TRACK, queried_tracks, cache_versions)
 
     tracks_response = []
     for track_id in track_ids:
-        if track_id in queried_tracks:
-            tracks_response.append(queried_tracks[track_id])
+        track = cached_tracks.get(track_id) or queried_tracks.get(track_id)
+        if not track:
+            continue
+        if filter_unlisted and track["is_unlisted"]:
+            continue
+        if filter_deleted and track["is_delete"]:
+            continue
+        if exclude_premium and track["is_premium"]:
+            continue
+        tracks_response.append(track)
 
     return tracks_response
@@ -2,7 +2,14 @@ import logging  # pylint: disable=C0302
 from datetime import datetime
 
 from src.models.users.user import User
-from src.utils import helpers
+from src.utils import helpers, redis_connection
+from src.utils.entity_cache import (
+    USER,
+    get_cache_versions,
+    get_cached_entities,
+    restore_datetime_fields,
+    set_cached_entities,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,18 +32,31 @@ def get_unpopulated_users(session, user_ids):
         Array of users
     """
 
-    users = (
-        session.query(User)
-        .filter(User.is_current == True, User.wallet != None, User.handle != None)
-        .filter(User.user_id.in_(user_ids))
-        .all()
-    )
-    users = helpers.query_result_to_list(users)
-    queried_users = {user["user_id"]: user for user in users}
+    redis = redis_connection.get_redis()
+    cached_users = get_cached_entities(redis, USER, set(user_ids))
+    for user in cached_users.values():
+        restore_datetime_fields(user, user_datetime_fields)
+
+    missing_user_ids = set(user_ids) - set(cached_users.keys())
+    queried_users = {}
+    if missing_user_ids:
+        cache_versions = get_cache_versions(redis, USER, missing_user_ids)
+        users = (
+            session.query(User)
+            .filter(User.is_current == True, User.wallet != None, User.handle != None)
+            .filter(User.user_id.in_(missing_user_ids))
+            .all()
+        )
+        users = helpers.query_result_to_list(users)
+        queried_users = {user["user_id"]: user for user in users}
+
+        # cache users for future use
+        set_cached_entities(redis, USER, queried_users, cache_versions)
 
     users_response = []
     for user_id in user_ids:
-        if user_id in queried_users:
-            users_response.append(queried_users[user_id])
+        user = cached_users.get(user_id) or queried_users.get(user_id)
+        if user:
+            users_response.append(user)
 
     return users_response
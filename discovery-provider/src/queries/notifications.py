@@ -1,7 +1,7 @@
 import logging  # pylint: disable=C0302
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Tuple, TypedDict
+from typing import Callable, Dict, List, Tuple, TypedDict
 
 from flask import Blueprint, request
 from redis import Redis
@@ -10,6 +10,7 @@ from sqlalchemy.orm.session import Session
 from src import api_helpers
 from src.models.indexing.block import Block
 from src.models.notifications.milestone import Milestone, MilestoneName
+from src.models.notifications.notification_log import NotificationLog
 from src.models.playlists.playlist import Playlist
 from src.models.rewards.challenge_disbursement import ChallengeDisbursement
 from src.models.social.follow import Follow
@@ -28,11 +29,13 @@ from src.queries.get_prev_track_entries import get_prev_track_entries
 from src.utils import helpers, web3_provider
 from src.utils.config import shared_config
 from src.utils.db_session import get_db_read_replica
+from src.utils.indexing_progress import get_indexing_progress_listener
 from src.utils.redis_connection import get_redis
 from src.utils.redis_constants import (
     latest_sol_aggregate_tips_slot_key,
     latest_sol_plays_slot_key,
     latest_sol_rewards_manager_slot_key,
+    most_recent_indexed_block_redis_key,
 )
 from src.utils.spl_audio import to_wei_string
 
@@ -41,69 +44,64 @@ bp = Blueprint("notifications", __name__)
 
 max_block_diff = int(shared_config["discprov"]["notifications_max_block_diff"])
 max_slot_diff = int(shared_config["discprov"]["notifications_max_slot_diff"])
+max_wait_seconds = int(shared_config["discprov"]["notifications_max_wait_seconds"])
 
 
-# pylint: disable=R0911
-def get_owner_id(session, entity_type, entity_id):
+def get_owner_ids(
+    session, entities: List[Tuple[str, int]]
+) -> Dict[Tuple[str, int], int]:
     """
-    Fetches the owner user id of the requested entity_type/entity_id
+    Fetches the owner user ids of the requested entities in one query per table
 
     Args:
-        session: (obj) The start block number for querying for notifications
-        entity_type: (string) Must be either 'track' | 'album' | 'playlist
-        entity_id: (int) The id of the 'entity_type'
+        session: (DB)
+        entities: (Array<(string, int)>) The entity_type, which must be either
+            'track' | 'album' | 'playlist', and id of each entity
 
     Returns:
-        owner_id: (int | None) The user id of the owner of the entity_type/entity_id
+        owner_ids: (Dict) (entity_type, entity_id) -> owner user id, of the entities
+            that exist and are not deleted
     """
-    if entity_type == "track":
-        owner_id_query = (
-            session.query(Track.owner_id)
+    track_ids = {
+        entity_id for entity_type, entity_id in entities if entity_type == "track"
+    }
+    collection_ids = {
+        entity_id
+        for entity_type, entity_id in entities
+        if entity_type in ("album", "playlist")
+    }
+    owner_ids: Dict[Tuple[str, int], int] = {}
+
+    if track_ids:
+        track_owners = (
+            session.query(Track.owner_id, Track.track_id)
             .filter(
-                Track.track_id == entity_id,
+                Track.track_id.in_(track_ids),
                 Track.is_delete == False,
                 Track.is_current == True,
             )
             .all()
         )
-        if not owner_id_query:
-            return None
-        owner_id = owner_id_query[0][0]
-        return owner_id
-
-    if entity_type == "album":
-        owner_id_query = (
-            session.query(Playlist.playlist_owner_id)
-            .filter(
-                Playlist.playlist_id == entity_id,
-                Playlist.is_delete == False,
-                Playlist.is_current == True,
-                Playlist.is_album == True,
+        for owner_id, track_id in track_owners:
+            owner_ids[("track", track_id)] = owner_id
+
+    if collection_ids:
+        collection_owners = (
+            session.query(
+                Playlist.playlist_owner_id, Playlist.playlist_id, Playlist.is_album
             )
-            .all()
-        )
-        if not owner_id_query:
-            return None
-        owner_id = owner_id_query[0][0]
-        return owner_id
-
-    if entity_type == "playlist":
-        owner_id_query = (
-            session.query(Playlist.playlist_owner_id)
             .filter(
-                Playlist.playlist_id == entity_id,
+                Playlist.playlist_id.in_(collection_ids),
                 Playlist.is_delete == False,
                 Playlist.is_current == True,
-                Playlist.is_album == False,
             )
             .all()
         )
-        if not owner_id_query:
-            return None
-        owner_id = owner_id_query[0][0]
-        return owner_id
+        for owner_id, playlist_id, is_album in collection_owners:
+            entity_type = "album" if is_album else "playlist"
+            owner_ids[(entity_type, playlist_id)] = owner_id
 
-    return None
+    return owner_ids
 
 
 def get_cosign_remix_notifications(session, max_block_number, remix_tracks):
@@ -277,359 +275,375 @@ def get_milestone_info(
     return milestone_info
 
 
-@bp.route("/notifications", methods=("GET",))
-# pylint: disable=R0915
-def notifications():
+def get_tier_change_notifications(session: Session, min_block_number, max_block_number):
     """
-    Fetches the notifications events that occurred between the given block numbers
+    Returns the tier change notifications of the user balance changes in the block
+    range, the block numbers of which are of eth mainnet rather than of the indexed
+    chain
+    """
+    balance_change_query = session.query(UserBalanceChange)
 
-    URL Params:
-        min_block_number: (int) The start block number for querying for notifications
-        max_block_number?: (int) The end block number for querying for notifications
-        track_id?: (Array<int>) Array of track id for fetching the track's owner id
-            and adding the track id to owner user id mapping to the `owners` response field
-            NOTE: this is added for notification for listen counts
+    # Impose min block number restriction
+    balance_change_query = balance_change_query.filter(
+        UserBalanceChange.blocknumber > min_block_number,
+        UserBalanceChange.blocknumber <= max_block_number,
+    )
 
-    Response - Json object w/ the following fields
-        notifications: Array of notifications of shape:
-            type: 'Follow' | 'Favorite' | 'Repost' | 'Create' | 'RemixCreate' | 'RemixCosign' | 'PlaylistUpdate'
-            blocknumber: (int) blocknumber of notification
-            timestamp: (string) timestamp of notification
-            initiator: (int) the user id that caused this notification
-            metadata?: (any) additional information about the notification
-                entity_id?: (int) the id of the target entity (ie. playlist id of a playlist that is reposted)
-                entity_type?: (string) the type of the target entity
-                entity_owner_id?: (int) the id of the target entity's owner (if applicable)
-                playlist_update_timestamp?: (string) timestamp of last update of a given playlist
-                playlist_update_users?: (array<int>) user ids which favorited a given playlist
+    balance_change_results = balance_change_query.all()
+    tier_change_notifications = []
+
+    for entry in balance_change_results:
+        prev = int(entry.previous_balance)
+        current = int(entry.current_balance)
+        # Check for a tier change and add to tier_change_notification
+        tier = None
+        if prev < 100000 <= current:
+            tier = "platinum"
+        elif prev < 10000 <= current:
+            tier = "gold"
+        elif prev < 100 <= current:
+            tier = "silver"
+        elif prev < 10 <= current:
+            tier = "bronze"
+
+        if tier is not None:
+            tier_change_notif = {
+                const.notification_type: const.notification_type_tier_change,
+                const.notification_blocknumber: entry.blocknumber,
+                const.notification_timestamp: datetime.now(),
+                const.notification_initiator: entry.user_id,
+                const.notification_metadata: {
+                    const.notification_tier: tier,
+                },
+            }
+            tier_change_notifications.append(tier_change_notif)
 
-        info: Dictionary of metadata w/ min_block_number & max_block_number fields
+    return tier_change_notifications
 
-        milestones: Dictionary mapping of follows/reposts/favorites (processed within the blocks params)
-            Root fields:
-                follower_counts: Contains a dictionary of user id => follower count (up to the max_block_number)
-                repost_counts: Contains a dictionary tracks/albums/playlists of id to repost count
-                favorite_counts: Contains a dictionary tracks/albums/playlists of id to favorite count
 
-        owners: Dictionary containing the mapping for track id / playlist id / album -> owner user id
-            The root keys are 'tracks', 'playlists', 'albums' and each contains the id to owner id mapping
+# pylint: disable=R0915
+def get_entity_notifications(
+    session: Session,
+    min_block_number,
+    max_block_number,
+    get_block_timestamps: Callable[[], Tuple[int, int]],
+) -> List[Dict]:
     """
+    Returns the notifications of the follows, favorites, reposts, tracks and
+    playlists indexed in the block range, sorted by block number
 
-    db = get_db_read_replica()
-    web3 = web3_provider.get_web3()
-    min_block_number = request.args.get("min_block_number", type=int)
-    max_block_number = request.args.get("max_block_number", type=int)
+    Args:
+        session: (DB)
+        min_block_number: (int) Exclusive start of the block range
+        max_block_number: (int) Inclusive end of the block range
+        get_block_timestamps: Returns the timestamps of the min and max block, only
+            called if public playlists were updated in the range
+    """
+    start_time = datetime.now()
 
-    track_ids_to_owner = []
-    try:
-        track_ids_str_list = request.args.getlist("track_id")
-        track_ids_to_owner = [int(y) for y in track_ids_str_list]
-    except Exception as e:
-        logger.error(f"Failed to retrieve track list {e}")
+    # List of notifications generated from current protocol state
+    notifications_unsorted = []
 
-    # Max block number is not explicitly required (yet)
-    if not min_block_number and min_block_number != 0:
-        return api_helpers.error_response({"msg": "Missing min block number"}, 400)
+    #
+    # Query relevant follow information
+    #
+    follow_query = session.query(Follow)
+
+    # Impose min block number restriction
+    follow_query = follow_query.filter(
+        Follow.is_current == True,
+        Follow.is_delete == False,
+        Follow.blocknumber > min_block_number,
+        Follow.blocknumber <= max_block_number,
+    )
 
-    if not max_block_number:
-        max_block_number = min_block_number + max_block_diff
-    elif (max_block_number - min_block_number) > max_block_diff:
-        max_block_number = min_block_number + max_block_diff
+    follow_results = follow_query.all()
+    # Represents all follow notifications
+    follow_notifications = []
+    for entry in follow_results:
+        follow_notif = {
+            const.notification_type: const.notification_type_follow,
+            const.notification_blocknumber: entry.blocknumber,
+            const.notification_timestamp: entry.created_at,
+            const.notification_initiator: entry.follower_user_id,
+            const.notification_metadata: {
+                const.notification_follower_id: entry.follower_user_id,
+                const.notification_followee_id: entry.followee_user_id,
+            },
+        }
+        follow_notifications.append(follow_notif)
 
-    with db.scoped_session() as session:
-        current_block_query = session.query(Block).filter_by(is_current=True)
-        current_block_query_results = current_block_query.all()
-        current_block = current_block_query_results[0]
-        current_max_block_num = current_block.number
-        if current_max_block_num < max_block_number:
-            max_block_number = current_max_block_num
+    notifications_unsorted.extend(follow_notifications)
 
-    notification_metadata = {
-        "min_block_number": min_block_number,
-        "max_block_number": max_block_number,
-    }
+    logger.info(f"notifications.py | followers at {datetime.now() - start_time}")
 
-    # Retrieve milestones statistics
-    milestone_info = {}
+    #
+    # Query relevant favorite information
+    #
+    favorites_query = session.query(Save)
+    favorites_query = favorites_query.filter(
+        Save.is_current == True,
+        Save.is_delete == False,
+        Save.blocknumber > min_block_number,
+        Save.blocknumber <= max_block_number,
+    )
+    favorite_results = favorites_query.all()
+    favorite_owner_ids = get_owner_ids(
+        session, [(entry.save_type, entry.save_item_id) for entry in favorite_results]
+    )
 
-    # Cache owner info for network entities and pass in w/results
-    owner_info = {const.tracks: {}, const.albums: {}, const.playlists: {}}
+    # ID lists to query count aggregates
+    favorited_track_ids = []
+    favorited_album_ids = []
+    favorited_playlist_ids = []
+
+    # List of favorite notifications
+    favorite_notifications = []
+    favorite_remix_tracks = []
+
+    for entry in favorite_results:
+        favorite_notif = {
+            const.notification_type: const.notification_type_favorite,
+            const.notification_blocknumber: entry.blocknumber,
+            const.notification_timestamp: entry.created_at,
+            const.notification_initiator: entry.user_id,
+        }
+        save_type = entry.save_type
+        save_item_id = entry.save_item_id
+        metadata = {
+            const.notification_entity_type: save_type,
+            const.notification_entity_id: save_item_id,
+        }
 
-    start_time = datetime.now()
-    logger.info(f"notifications.py | start_time ${start_time}")
+        # NOTE if deleted, the favorite can still exist
+        if save_type == SaveType.track:
+            owner_id = favorite_owner_ids.get(("track", save_item_id))
+            if not owner_id:
+                continue
+            metadata[const.notification_entity_owner_id] = owner_id
+            favorited_track_ids.append(save_item_id)
 
-    # List of notifications generated from current protocol state
-    notifications_unsorted = []
-    with db.scoped_session() as session:
-        #
-        # Query relevant follow information
-        #
-        follow_query = session.query(Follow)
-
-        # Impose min block number restriction
-        follow_query = follow_query.filter(
-            Follow.is_current == True,
-            Follow.is_delete == False,
-            Follow.blocknumber > min_block_number,
-            Follow.blocknumber <= max_block_number,
-        )
+            favorite_remix_tracks.append(
+                {
+                    const.notification_blocknumber: entry.blocknumber,
+                    const.notification_timestamp: entry.created_at,
+                    "user_id": entry.user_id,
+                    "item_owner_id": owner_id,
+                    "item_id": save_item_id,
+                }
+            )
 
-        follow_results = follow_query.all()
-        # Represents all follow notifications
-        follow_notifications = []
-        for entry in follow_results:
-            follow_notif = {
-                const.notification_type: const.notification_type_follow,
-                const.notification_blocknumber: entry.blocknumber,
-                const.notification_timestamp: entry.created_at,
-                const.notification_initiator: entry.follower_user_id,
-                const.notification_metadata: {
-                    const.notification_follower_id: entry.follower_user_id,
-                    const.notification_followee_id: entry.followee_user_id,
-                },
-            }
-            follow_notifications.append(follow_notif)
+        elif save_type == SaveType.album:
+            owner_id = favorite_owner_ids.get(("album", save_item_id))
+            if not owner_id:
+                continue
+            metadata[const.notification_entity_owner_id] = owner_id
+            favorited_album_ids.append(save_item_id)
 
-        notifications_unsorted.extend(follow_notifications)
+        elif save_type == SaveType.playlist:
+            owner_id = favorite_owner_ids.get(("playlist", save_item_id))
+            if not owner_id:
+                continue
+            metadata[const.notification_entity_owner_id] = owner_id
+            favorited_playlist_ids.append(save_item_id)
 
-        logger.info(f"notifications.py | followers at {datetime.now() - start_time}")
+        favorite_notif[const.notification_metadata] = metadata
+        favorite_notifications.append(favorite_notif)
+    notifications_unsorted.extend(favorite_notifications)
 
-        #
-        # Query relevant favorite information
-        #
-        favorites_query = session.query(Save)
-        favorites_query = favorites_query.filter(
-            Save.is_current == True,
-            Save.is_delete == False,
-            Save.blocknumber > min_block_number,
-            Save.blocknumber <= max_block_number,
+    if favorited_track_ids:
+        favorite_remix_notifications = get_cosign_remix_notifications(
+            session, max_block_number, favorite_remix_tracks
         )
-        favorite_results = favorites_query.all()
+        notifications_unsorted.extend(favorite_remix_notifications)
+
+    logger.info(f"notifications.py | favorites at {datetime.now() - start_time}")
+
+    #
+    # Query relevant repost information
+    #
+    repost_query = session.query(Repost)
+    repost_query = repost_query.filter(
+        Repost.is_current == True,
+        Repost.is_delete == False,
+        Repost.blocknumber > min_block_number,
+        Repost.blocknumber <= max_block_number,
+    )
+    repost_results = repost_query.all()
+    repost_owner_ids = get_owner_ids(
+        session,
+        [(entry.repost_type, entry.repost_item_id) for entry in repost_results],
+    )
 
-        # ID lists to query count aggregates
-        favorited_track_ids = []
-        favorited_album_ids = []
-        favorited_playlist_ids = []
+    # ID lists to query counts
+    reposted_track_ids = []
+    reposted_album_ids = []
+    reposted_playlist_ids = []
 
-        # List of favorite notifications
-        favorite_notifications = []
-        favorite_remix_tracks = []
+    # List of repost notifications
+    repost_notifications = []
 
-        for entry in favorite_results:
-            favorite_notif = {
-                const.notification_type: const.notification_type_favorite,
-                const.notification_blocknumber: entry.blocknumber,
-                const.notification_timestamp: entry.created_at,
-                const.notification_initiator: entry.user_id,
-            }
-            save_type = entry.save_type
-            save_item_id = entry.save_item_id
-            metadata = {
-                const.notification_entity_type: save_type,
-                const.notification_entity_id: save_item_id,
-            }
-
-            # NOTE if deleted, the favorite can still exist
-            # TODO: Can we aggregate all owner queries and perform at once...?
-            if save_type == SaveType.track:
-                owner_id = get_owner_id(session, "track", save_item_id)
-                if not owner_id:
-                    continue
-                metadata[const.notification_entity_owner_id] = owner_id
-                favorited_track_ids.append(save_item_id)
-                owner_info[const.tracks][save_item_id] = owner_id
-
-                favorite_remix_tracks.append(
-                    {
-                        const.notification_blocknumber: entry.blocknumber,
-                        const.notification_timestamp: entry.created_at,
-                        "user_id": entry.user_id,
-                        "item_owner_id": owner_id,
-                        "item_id": save_item_id,
-                    }
-                )
+    # List of repost notifications
+    repost_remix_notifications = []
+    repost_remix_tracks = []
 
-            elif save_type == SaveType.album:
-                owner_id = get_owner_id(session, "album", save_item_id)
-                if not owner_id:
-                    continue
-                metadata[const.notification_entity_owner_id] = owner_id
-                favorited_album_ids.append(save_item_id)
-                owner_info[const.albums][save_item_id] = owner_id
-
-            elif save_type == SaveType.playlist:
-                owner_id = get_owner_id(session, "playlist", save_item_id)
-                if not owner_id:
-                    continue
-                metadata[const.notification_entity_owner_id] = owner_id
-                favorited_playlist_ids.append(save_item_id)
-                owner_info[const.playlists][save_item_id] = owner_id
-
-            favorite_notif[const.notification_metadata] = metadata
-            favorite_notifications.append(favorite_notif)
-        notifications_unsorted.extend(favorite_notifications)
-
-        if favorited_track_ids:
-            favorite_remix_notifications = get_cosign_remix_notifications(
-                session, max_block_number, favorite_remix_tracks
+    for entry in repost_results:
+        repost_notif = {
+            const.notification_type: const.notification_type_repost,
+            const.notification_blocknumber: entry.blocknumber,
+            const.notification_timestamp: entry.created_at,
+            const.notification_initiator: entry.user_id,
+        }
+        repost_type = entry.repost_type
+        repost_item_id = entry.repost_item_id
+        metadata = {
+            const.notification_entity_type: repost_type,
+            const.notification_entity_id: repost_item_id,
+        }
+        if repost_type == RepostType.track:
+            owner_id = repost_owner_ids.get(("track", repost_item_id))
+            if not owner_id:
+                continue
+            metadata[const.notification_entity_owner_id] = owner_id
+            reposted_track_ids.append(repost_item_id)
+            repost_remix_tracks.append(
+                {
+                    const.notification_blocknumber: entry.blocknumber,
+                    const.notification_timestamp: entry.created_at,
+                    "user_id": entry.user_id,
+                    "item_owner_id": owner_id,
+                    "item_id": repost_item_id,
+                }
             )
-            notifications_unsorted.extend(favorite_remix_notifications)
 
-        logger.info(f"notifications.py | favorites at {datetime.now() - start_time}")
+        elif repost_type == RepostType.album:
+            owner_id = repost_owner_ids.get(("album", repost_item_id))
+            if not owner_id:
+                continue
+            metadata[const.notification_entity_owner_id] = owner_id
+            reposted_album_ids.append(repost_item_id)
 
-        #
-        # Query relevant tier change information
-        #
-        balance_change_query = session.query(UserBalanceChange)
+        elif repost_type == RepostType.playlist:
+            owner_id = repost_owner_ids.get(("playlist", repost_item_id))
+            if not owner_id:
+                continue
+            metadata[const.notification_entity_owner_id] = owner_id
+            reposted_playlist_ids.append(repost_item_id)
 
-        # Impose min block number restriction
-        balance_change_query = balance_change_query.filter(
-            UserBalanceChange.blocknumber > min_block_number,
-            UserBalanceChange.blocknumber <= max_block_number,
-        )
+        repost_notif[const.notification_metadata] = metadata
+        repost_notifications.append(repost_notif)
+
+    # Append repost notifications
+    notifications_unsorted.extend(repost_notifications)
 
-        balance_change_results = balance_change_query.all()
-        tier_change_notifications = []
-
-        for entry in balance_change_results:
-            prev = int(entry.previous_balance)
-            current = int(entry.current_balance)
-            # Check for a tier change and add to tier_change_notification
-            tier = None
-            if prev < 100000 <= current:
-                tier = "platinum"
-            elif prev < 10000 <= current:
-                tier = "gold"
-            elif prev < 100 <= current:
-                tier = "silver"
-            elif prev < 10 <= current:
-                tier = "bronze"
-
-            if tier is not None:
-                tier_change_notif = {
-                    const.notification_type: const.notification_type_tier_change,
+    # Aggregate repost counts for relevant fields
+    # Used to notify users of entity-specific milestones
+    if reposted_track_ids:
+        repost_remix_notifications = get_cosign_remix_notifications(
+            session, max_block_number, repost_remix_tracks
+        )
+        notifications_unsorted.extend(repost_remix_notifications)
+
+    # Query relevant created entity notification - tracks/albums/playlists
+    created_notifications = []
+
+    logger.info(f"notifications.py | reposts at {datetime.now() - start_time}")
+
+    #
+    # Query relevant created tracks for remix information
+    #
+    remix_created_notifications = []
+
+    # Aggregate track notifs
+    tracks_query = session.query(Track)
+    # TODO: Is it valid to use Track.is_current here? Might not be the right info...
+    tracks_query = tracks_query.filter(
+        Track.is_unlisted == False,
+        Track.is_delete == False,
+        Track.stem_of == None,
+        Track.blocknumber > min_block_number,
+        Track.blocknumber <= max_block_number,
+    )
+    tracks_query = tracks_query.filter(Track.created_at == Track.updated_at)
+    track_results = tracks_query.all()
+    for entry in track_results:
+        track_notif = {
+            const.notification_type: const.notification_type_create,
+            const.notification_blocknumber: entry.blocknumber,
+            const.notification_timestamp: entry.created_at,
+            const.notification_initiator: entry.owner_id,
+            # TODO: is entity owner id necessary for tracks?
+            const.notification_metadata: {
+                const.notification_entity_type: "track",
+                const.notification_entity_id: entry.track_id,
+                const.notification_entity_owner_id: entry.owner_id,
+            },
+        }
+        created_notifications.append(track_notif)
+
+        if entry.remix_of:
+            # Add notification to remix track owner
+            parent_remix_tracks = [
+                t["parent_track_id"] for t in entry.remix_of["tracks"]
+            ]
+            remix_track_parents = (
+                session.query(Track.owner_id, Track.track_id)
+                .filter(
+                    Track.track_id.in_(parent_remix_tracks),
+                    Track.is_unlisted == False,
+                    Track.is_delete == False,
+                    Track.is_current == True,
+                )
+                .all()
+            )
+            for remix_track_parent in remix_track_parents:
+                [
+                    remix_track_parent_owner,
+                    remix_track_parent_id,
+                ] = remix_track_parent
+                remix_notif = {
+                    const.notification_type: const.notification_type_remix_create,
                     const.notification_blocknumber: entry.blocknumber,
-                    const.notification_timestamp: datetime.now(),
-                    const.notification_initiator: entry.user_id,
+                    const.notification_timestamp: entry.created_at,
+                    const.notification_initiator: entry.owner_id,
+                    # TODO: is entity owner id necessary for tracks?
                     const.notification_metadata: {
-                        const.notification_tier: tier,
+                        const.notification_entity_type: "track",
+                        const.notification_entity_id: entry.track_id,
+                        const.notification_entity_owner_id: entry.owner_id,
+                        const.notification_remix_parent_track_user_id: remix_track_parent_owner,
+                        const.notification_remix_parent_track_id: remix_track_parent_id,
                     },
                 }
-                tier_change_notifications.append(tier_change_notif)
+                remix_created_notifications.append(remix_notif)
+
+    logger.info(f"notifications.py | remixes at {datetime.now() - start_time}")
+
+    # Handle track update notifications
+    # TODO: Consider switching blocknumber for updated at?
+    updated_tracks_query = session.query(Track)
+    updated_tracks_query = updated_tracks_query.filter(
+        Track.is_unlisted == False,
+        Track.stem_of == None,
+        Track.created_at != Track.updated_at,
+        Track.blocknumber > min_block_number,
+        Track.blocknumber <= max_block_number,
+    )
+    updated_tracks = updated_tracks_query.all()
 
-        notifications_unsorted.extend(tier_change_notifications)
+    prev_tracks = get_prev_track_entries(session, updated_tracks)
 
+    for prev_entry in prev_tracks:
+        entry = next(t for t in updated_tracks if t.track_id == prev_entry.track_id)
         logger.info(
-            f"notifications.py | balance change at {datetime.now() - start_time}"
-        )
-
-        #
-        # Query relevant repost information
-        #
-        repost_query = session.query(Repost)
-        repost_query = repost_query.filter(
-            Repost.is_current == True,
-            Repost.is_delete == False,
-            Repost.blocknumber > min_block_number,
-            Repost.blocknumber <= max_block_number,
+            f"notifications.py | single track update {entry.track_id} {entry.blocknumber} {datetime.now() - start_time}"
         )
-        repost_results = repost_query.all()
-
-        # ID lists to query counts
-        reposted_track_ids = []
-        reposted_album_ids = []
-        reposted_playlist_ids = []
 
-        # List of repost notifications
-        repost_notifications = []
-
-        # List of repost notifications
-        repost_remix_notifications = []
-        repost_remix_tracks = []
-
-        for entry in repost_results:
-            repost_notif = {
-                const.notification_type: const.notification_type_repost,
-                const.notification_blocknumber: entry.blocknumber,
-                const.notification_timestamp: entry.created_at,
-                const.notification_initiator: entry.user_id,
-            }
-            repost_type = entry.repost_type
-            repost_item_id = entry.repost_item_id
-            metadata = {
-                const.notification_entity_type: repost_type,
-                const.notification_entity_id: repost_item_id,
-            }
-            if repost_type == RepostType.track:
-                owner_id = get_owner_id(session, "track", repost_item_id)
-                if not owner_id:
-                    continue
-                metadata[const.notification_entity_owner_id] = owner_id
-                reposted_track_ids.append(repost_item_id)
-                owner_info[const.tracks][repost_item_id] = owner_id
-                repost_remix_tracks.append(
-                    {
-                        const.notification_blocknumber: entry.blocknumber,
-                        const.notification_timestamp: entry.created_at,
-                        "user_id": entry.user_id,
-                        "item_owner_id": owner_id,
-                        "item_id": repost_item_id,
-                    }
-                )
-
-            elif repost_type == RepostType.album:
-                owner_id = get_owner_id(session, "album", repost_item_id)
-                if not owner_id:
-                    continue
-                metadata[const.notification_entity_owner_id] = owner_id
-                reposted_album_ids.append(repost_item_id)
-                owner_info[const.albums][repost_item_id] = owner_id
-
-            elif repost_type == RepostType.playlist:
-                owner_id = get_owner_id(session, "playlist", repost_item_id)
-                if not owner_id:
-                    continue
-                metadata[const.notification_entity_owner_id] = owner_id
-                reposted_playlist_ids.append(repost_item_id)
-                owner_info[const.playlists][repost_item_id] = owner_id
-
-            repost_notif[const.notification_metadata] = metadata
-            repost_notifications.append(repost_notif)
-
-        # Append repost notifications
-        notifications_unsorted.extend(repost_notifications)
-
-        # Aggregate repost counts for relevant fields
-        # Used to notify users of entity-specific milestones
-        if reposted_track_ids:
-            repost_remix_notifications = get_cosign_remix_notifications(
-                session, max_block_number, repost_remix_tracks
+        # Tracks that were unlisted and turned to public
+        if prev_entry.is_unlisted == True:
+            logger.info(
+                f"notifications.py | single track update to public {datetime.now() - start_time}"
             )
-            notifications_unsorted.extend(repost_remix_notifications)
-
-        # Query relevant created entity notification - tracks/albums/playlists
-        created_notifications = []
-
-        logger.info(f"notifications.py | reposts at {datetime.now() - start_time}")
-
-        #
-        # Query relevant created tracks for remix information
-        #
-        remix_created_notifications = []
-
-        # Aggregate track notifs
-        tracks_query = session.query(Track)
-        # TODO: Is it valid to use Track.is_current here? Might not be the right info...
-        tracks_query = tracks_query.filter(
-            Track.is_unlisted == False,
-            Track.is_delete == False,
-            Track.stem_of == None,
-            Track.blocknumber > min_block_number,
-            Track.blocknumber <= max_block_number,
-        )
-        tracks_query = tracks_query.filter(Track.created_at == Track.updated_at)
-        track_results = tracks_query.all()
-        for entry in track_results:
             track_notif = {
                 const.notification_type: const.notification_type_create,
                 const.notification_blocknumber: entry.blocknumber,
@@ -644,71 +658,32 @@ def notifications():
             }
             created_notifications.append(track_notif)
 
-            if entry.remix_of:
-                # Add notification to remix track owner
-                parent_remix_tracks = [
-                    t["parent_track_id"] for t in entry.remix_of["tracks"]
-                ]
-                remix_track_parents = (
-                    session.query(Track.owner_id, Track.track_id)
-                    .filter(
-                        Track.track_id.in_(parent_remix_tracks),
-                        Track.is_unlisted == False,
-                        Track.is_delete == False,
-                        Track.is_current == True,
-                    )
-                    .all()
+        # Tracks that were not remixes and turned into remixes
+        if not prev_entry.remix_of and entry.remix_of:
+            # Add notification to remix track owner
+            parent_remix_tracks = [
+                t["parent_track_id"] for t in entry.remix_of["tracks"]
+            ]
+            remix_track_parents = (
+                session.query(Track.owner_id, Track.track_id)
+                .filter(
+                    Track.track_id.in_(parent_remix_tracks),
+                    Track.is_unlisted == False,
+                    Track.is_delete == False,
+                    Track.is_current == True,
                 )
-                for remix_track_parent in remix_track_parents:
-                    [
-                        remix_track_parent_owner,
-                        remix_track_parent_id,
-                    ] = remix_track_parent
-                    remix_notif = {
-                        const.notification_type: const.notification_type_remix_create,
-                        const.notification_blocknumber: entry.blocknumber,
-                        const.notification_timestamp: entry.created_at,
-                        const.notification_initiator: entry.owner_id,
-                        # TODO: is entity owner id necessary for tracks?
-                        const.notification_metadata: {
-                            const.notification_entity_type: "track",
-                            const.notification_entity_id: entry.track_id,
-                            const.notification_entity_owner_id: entry.owner_id,
-                            const.notification_remix_parent_track_user_id: remix_track_parent_owner,
-                            const.notification_remix_parent_track_id: remix_track_parent_id,
-                        },
-                    }
-                    remix_created_notifications.append(remix_notif)
-
-        logger.info(f"notifications.py | remixes at {datetime.now() - start_time}")
-
-        # Handle track update notifications
-        # TODO: Consider switching blocknumber for updated at?
-        updated_tracks_query = session.query(Track)
-        updated_tracks_query = updated_tracks_query.filter(
-            Track.is_unlisted == False,
-            Track.stem_of == None,
-            Track.created_at != Track.updated_at,
-            Track.blocknumber > min_block_number,
-            Track.blocknumber <= max_block_number,
-        )
-        updated_tracks = updated_tracks_query.all()
-
-        prev_tracks = get_prev_track_entries(session, updated_tracks)
-
-        for prev_entry in prev_tracks:
-            entry = next(t for t in updated_tracks if t.track_id == prev_entry.track_id)
+                .all()
+            )
             logger.info(
-                f"notifications.py | single track update {entry.track_id} {entry.blocknumber} {datetime.now() - start_time}"
+                f"notifications.py | single track update parents {remix_track_parents} {datetime.now() - start_time}"
             )
-
-            # Tracks that were unlisted and turned to public
-            if prev_entry.is_unlisted == True:
-                logger.info(
-                    f"notifications.py | single track update to public {datetime.now() - start_time}"
-                )
-                track_notif = {
-                    const.notification_type: const.notification_type_create,
+            for remix_track_parent in remix_track_parents:
+                [
+                    remix_track_parent_owner,
+                    remix_track_parent_id,
+                ] = remix_track_parent
+                remix_notif = {
+                    const.notification_type: const.notification_type_remix_create,
                     const.notification_blocknumber: entry.blocknumber,
                     const.notification_timestamp: entry.created_at,
                     const.notification_initiator: entry.owner_id,
@@ -717,72 +692,73 @@ def notifications():
                         const.notification_entity_type: "track",
                         const.notification_entity_id: entry.track_id,
                         const.notification_entity_owner_id: entry.owner_id,
+                        const.notification_remix_parent_track_user_id: remix_track_parent_owner,
+                        const.notification_remix_parent_track_id: remix_track_parent_id,
                     },
                 }
-                created_notifications.append(track_notif)
+                remix_created_notifications.append(remix_notif)
 
-            # Tracks that were not remixes and turned into remixes
-            if not prev_entry.remix_of and entry.remix_of:
-                # Add notification to remix track owner
-                parent_remix_tracks = [
-                    t["parent_track_id"] for t in entry.remix_of["tracks"]
-                ]
-                remix_track_parents = (
-                    session.query(Track.owner_id, Track.track_id)
-                    .filter(
-                        Track.track_id.in_(parent_remix_tracks),
-                        Track.is_unlisted == False,
-                        Track.is_delete == False,
-                        Track.is_current == True,
-                    )
-                    .all()
-                )
-                logger.info(
-                    f"notifications.py | single track update parents {remix_track_parents} {datetime.now() - start_time}"
-                )
-                for remix_track_parent in remix_track_parents:
-                    [
-                        remix_track_parent_owner,
-                        remix_track_parent_id,
-                    ] = remix_track_parent
-                    remix_notif = {
-                        const.notification_type: const.notification_type_remix_create,
-                        const.notification_blocknumber: entry.blocknumber,
-                        const.notification_timestamp: entry.created_at,
-                        const.notification_initiator: entry.owner_id,
-                        # TODO: is entity owner id necessary for tracks?
-                        const.notification_metadata: {
-                            const.notification_entity_type: "track",
-                            const.notification_entity_id: entry.track_id,
-                            const.notification_entity_owner_id: entry.owner_id,
-                            const.notification_remix_parent_track_user_id: remix_track_parent_owner,
-                            const.notification_remix_parent_track_id: remix_track_parent_id,
-                        },
-                    }
-                    remix_created_notifications.append(remix_notif)
+    notifications_unsorted.extend(remix_created_notifications)
 
-        notifications_unsorted.extend(remix_created_notifications)
+    logger.info(f"notifications.py | track updates at {datetime.now() - start_time}")
 
-        logger.info(
-            f"notifications.py | track updates at {datetime.now() - start_time}"
-        )
+    # Aggregate playlist/album notifs
+    collection_query = session.query(Playlist)
+    # TODO: Is it valid to use is_current here? Might not be the right info...
+    collection_query = collection_query.filter(
+        Playlist.is_delete == False,
+        Playlist.is_private == False,
+        Playlist.blocknumber > min_block_number,
+        Playlist.blocknumber <= max_block_number,
+    )
+    collection_query = collection_query.filter(
+        Playlist.created_at == Playlist.updated_at
+    )
+    collection_results = collection_query.all()
+
+    for entry in collection_results:
+        collection_notif = {
+            const.notification_type: const.notification_type_create,
+            const.notification_blocknumber: entry.blocknumber,
+            const.notification_timestamp: entry.created_at,
+            const.notification_initiator: entry.playlist_owner_id,
+        }
+        metadata = {
+            const.notification_entity_id: entry.playlist_id,
+            const.notification_entity_owner_id: entry.playlist_owner_id,
+            const.notification_collection_content: entry.playlist_contents,
+        }
 
-        # Aggregate playlist/album notifs
-        collection_query = session.query(Playlist)
-        # TODO: Is it valid to use is_current here? Might not be the right info...
-        collection_query = collection_query.filter(
-            Playlist.is_delete == False,
-            Playlist.is_private == False,
-            Playlist.blocknumber > min_block_number,
-            Playlist.blocknumber <= max_block_number,
-        )
-        collection_query = collection_query.filter(
-            Playlist.created_at == Playlist.updated_at
+        if entry.is_album:
+            metadata[const.notification_entity_type] = "album"
+        else:
+            metadata[const.notification_entity_type] = "playlist"
+        collection_notif[const.notification_metadata] = metadata
+        created_notifications.append(collection_notif)
+
+    # Playlists that were private and turned to public aka 'published'
+    # TODO: Consider switching blocknumber for updated at?
+    publish_playlists_query = session.query(Playlist)
+    publish_playlists_query = publish_playlists_query.filter(
+        Playlist.is_private == False,
+        Playlist.created_at != Playlist.updated_at,
+        Playlist.blocknumber > min_block_number,
+        Playlist.blocknumber <= max_block_number,
+    )
+    publish_playlist_results = publish_playlists_query.all()
+    for entry in publish_playlist_results:
+        prev_entry_query = (
+            session.query(Playlist)
+            .filter(
+                Playlist.playlist_id == entry.playlist_id,
+                Playlist.blocknumber < entry.blocknumber,
+            )
+            .order_by(desc(Playlist.blocknumber))
         )
-        collection_results = collection_query.all()
-
-        for entry in collection_results:
-            collection_notif = {
+        # Previous private entry indicates transition to public, triggering a notification
+        prev_entry = prev_entry_query.first()
+        if prev_entry and prev_entry.is_private == True:
+            publish_playlist_notif = {
                 const.notification_type: const.notification_type_create,
                 const.notification_blocknumber: entry.blocknumber,
                 const.notification_timestamp: entry.created_at,
@@ -792,250 +768,681 @@ def notifications():
                 const.notification_entity_id: entry.playlist_id,
                 const.notification_entity_owner_id: entry.playlist_owner_id,
                 const.notification_collection_content: entry.playlist_contents,
+                const.notification_entity_type: "playlist",
             }
-
-            if entry.is_album:
-                metadata[const.notification_entity_type] = "album"
-            else:
-                metadata[const.notification_entity_type] = "playlist"
-            collection_notif[const.notification_metadata] = metadata
-            created_notifications.append(collection_notif)
-
-        # Playlists that were private and turned to public aka 'published'
-        # TODO: Consider switching blocknumber for updated at?
-        publish_playlists_query = session.query(Playlist)
-        publish_playlists_query = publish_playlists_query.filter(
-            Playlist.is_private == False,
-            Playlist.created_at != Playlist.updated_at,
-            Playlist.blocknumber > min_block_number,
-            Playlist.blocknumber <= max_block_number,
-        )
-        publish_playlist_results = publish_playlists_query.all()
-        for entry in publish_playlist_results:
-            prev_entry_query = (
-                session.query(Playlist)
-                .filter(
-                    Playlist.playlist_id == entry.playlist_id,
-                    Playlist.blocknumber < entry.blocknumber,
-                )
-                .order_by(desc(Playlist.blocknumber))
-            )
-            # Previous private entry indicates transition to public, triggering a notification
-            prev_entry = prev_entry_query.first()
-            if prev_entry.is_private == True:
-                publish_playlist_notif = {
-                    const.notification_type: const.notification_type_create,
+            publish_playlist_notif[const.notification_metadata] = metadata
+            created_notifications.append(publish_playlist_notif)
+
+    # Playlists that had tracks added to them
+    # Get all playlists that were modified over this range
+    playlist_track_added_query = session.query(Playlist).filter(
+        Playlist.is_current == True,
+        Playlist.is_delete == False,
+        Playlist.is_private == False,
+        Playlist.blocknumber > min_block_number,
+        Playlist.blocknumber <= max_block_number,
+    )
+    playlist_track_added_results = playlist_track_added_query.all()
+    # Loop over all playlist updates and determine if there were tracks added
+    # within the notification block range
+    track_added_to_playlist_notifications = []
+    track_ids = []
+    block_timestamps = None
+    for entry in playlist_track_added_results:
+        # Get the track_ids from entry["playlist_contents"]
+        if not entry.playlist_contents["track_ids"]:
+            # skip empty playlists
+            continue
+        playlist_contents = entry.playlist_contents
+
+        if not block_timestamps:
+            block_timestamps = get_block_timestamps()
+        (min_block_timestamp, max_block_timestamp) = block_timestamps
+
+        for track in playlist_contents["track_ids"]:
+            track_id = track["track"]
+            track_timestamp = track["time"]
+            # We know that this track was added to the playlist at this specific update
+            if min_block_timestamp < track_timestamp <= max_block_timestamp:
+                track_ids.append(track_id)
+                track_added_to_playlist_notification = {
+                    const.notification_type: const.notification_type_add_track_to_playlist,
                     const.notification_blocknumber: entry.blocknumber,
-                    const.notification_timestamp: entry.created_at,
+                    const.notification_timestamp: datetime.fromtimestamp(
+                        track_timestamp
+                    ),
                     const.notification_initiator: entry.playlist_owner_id,
                 }
                 metadata = {
-                    const.notification_entity_id: entry.playlist_id,
-                    const.notification_entity_owner_id: entry.playlist_owner_id,
-                    const.notification_collection_content: entry.playlist_contents,
-                    const.notification_entity_type: "playlist",
+                    const.playlist_id: entry.playlist_id,
+                    const.track_id: track_id,
                 }
-                publish_playlist_notif[const.notification_metadata] = metadata
-                created_notifications.append(publish_playlist_notif)
-
-        # Playlists that had tracks added to them
-        # Get all playlists that were modified over this range
-        playlist_track_added_query = session.query(Playlist).filter(
-            Playlist.is_current == True,
-            Playlist.is_delete == False,
-            Playlist.is_private == False,
-            Playlist.blocknumber > min_block_number,
-            Playlist.blocknumber <= max_block_number,
+                track_added_to_playlist_notification[
+                    const.notification_metadata
+                ] = metadata
+                track_added_to_playlist_notifications.append(
+                    track_added_to_playlist_notification
+                )
+
+    tracks = (
+        session.query(Track.owner_id, Track.track_id)
+        .filter(
+            Track.track_id.in_(track_ids),
+            Track.is_unlisted == False,
+            Track.is_delete == False,
+            Track.is_current == True,
         )
-        playlist_track_added_results = playlist_track_added_query.all()
-        # Loop over all playlist updates and determine if there were tracks added
-        # within the notification block range
-        track_added_to_playlist_notifications = []
-        track_ids = []
-        for entry in playlist_track_added_results:
-            # Get the track_ids from entry["playlist_contents"]
-            if not entry.playlist_contents["track_ids"]:
-                # skip empty playlists
-                continue
-            playlist_contents = entry.playlist_contents
-
-            final_poa_block = helpers.get_final_poa_block(shared_config)
-            if final_poa_block:
-                min_block_number -= final_poa_block
-                max_block_number -= final_poa_block
-
-            min_block = web3.eth.get_block(min_block_number)
-            max_block = web3.eth.get_block(max_block_number)
-
-            for track in playlist_contents["track_ids"]:
-                track_id = track["track"]
-                track_timestamp = track["time"]
-                # We know that this track was added to the playlist at this specific update
-                if (
-                    min_block.timestamp < track_timestamp
-                    and track_timestamp <= max_block.timestamp
-                ):
-                    track_ids.append(track_id)
-                    track_added_to_playlist_notification = {
-                        const.notification_type: const.notification_type_add_track_to_playlist,
-                        const.notification_blocknumber: entry.blocknumber,
-                        const.notification_timestamp: datetime.fromtimestamp(
-                            track_timestamp
-                        ),
-                        const.notification_initiator: entry.playlist_owner_id,
-                    }
-                    metadata = {
-                        const.playlist_id: entry.playlist_id,
-                        const.track_id: track_id,
+        .all()
+    )
+    track_owner_map = {}
+    for track in tracks:
+        owner_id, track_id = track
+        track_owner_map[track_id] = owner_id
+
+    # Loop over notifications and populate their metadata
+    for notification in track_added_to_playlist_notifications:
+        track_id = notification[const.notification_metadata][const.track_id]
+        if track_id not in track_owner_map:
+            # Note: if track_id not in track_owner_map, it's because the track is either deleted, unlisted, or doesn't exist
+            # In that case, it should not trigger a notification
+            continue
+        else:
+            track_owner_id = track_owner_map[track_id]
+            if track_owner_id != notification[const.notification_initiator]:
+                # add tracks that don't belong to the playlist owner
+                notification[const.notification_metadata][
+                    const.track_owner_id
+                ] = track_owner_id
+                created_notifications.append(notification)
+
+    notifications_unsorted.extend(created_notifications)
+
+    logger.info(f"notifications.py | playlists at {datetime.now() - start_time}")
+
+    # Get playlist updates
+    today = date.today()
+    thirty_days_ago = today - timedelta(days=30)
+    thirty_days_ago_time = datetime(
+        thirty_days_ago.year, thirty_days_ago.month, thirty_days_ago.day, 0, 0, 0
+    )
+    playlist_update_query = session.query(Playlist)
+    playlist_update_query = playlist_update_query.filter(
+        Playlist.is_current == True,
+        Playlist.is_delete == False,
+        Playlist.last_added_to >= thirty_days_ago_time,
+        Playlist.blocknumber > min_block_number,
+        Playlist.blocknumber <= max_block_number,
+    )
+
+    playlist_update_results = playlist_update_query.all()
+
+    logger.info(
+        f"notifications.py | get playlist updates at {datetime.now() - start_time}, playlist updates {len(playlist_update_results)}"
+    )
+
+    # Represents all playlist update notifications
+    playlist_update_notifications = []
+    playlist_update_notifs_by_playlist_id = {}
+    for entry in playlist_update_results:
+        playlist_update_notifs_by_playlist_id[entry.playlist_id] = {
+            const.notification_type: const.notification_type_playlist_update,
+            const.notification_blocknumber: entry.blocknumber,
+            const.notification_timestamp: entry.created_at,
+            const.notification_initiator: entry.playlist_owner_id,
+            const.notification_metadata: {
+                const.notification_entity_id: entry.playlist_id,
+                const.notification_entity_type: "playlist",
+                const.notification_playlist_update_timestamp: entry.last_added_to,
+            },
+        }
+
+    # get all favorited playlists
+    # playlists may have been favorited outside the blocknumber bounds
+    # e.g. before the min_block_number
+    playlist_favorites_query = session.query(Save)
+    playlist_favorites_query = playlist_favorites_query.filter(
+        Save.is_current == True,
+        Save.is_delete == False,
+        Save.save_type == SaveType.playlist,
+        Save.save_item_id.in_(playlist_update_notifs_by_playlist_id.keys()),
+    )
+    playlist_favorites_results = playlist_favorites_query.all()
+
+    logger.info(
+        f"notifications.py | get playlist favorites {datetime.now() - start_time}, playlist favorites {len(playlist_favorites_results)}"
+    )
+
+    # dictionary of playlist id => users that favorited said playlist
+    # e.g. { playlist1: [user1, user2, ...], ... }
+    # we need this dictionary to know which users need to be notified of a playlist update
+    users_that_favorited_playlists_dict = {}
+    for result in playlist_favorites_results:
+        if result.save_item_id in users_that_favorited_playlists_dict:
+            users_that_favorited_playlists_dict[result.save_item_id].append(
+                result.user_id
+            )
+        else:
+            users_that_favorited_playlists_dict[result.save_item_id] = [result.user_id]
+
+    logger.info(
+        f"notifications.py | computed users that favorited dict {datetime.now() - start_time}"
+    )
+
+    for playlist_id in users_that_favorited_playlists_dict:
+        # TODO: We probably do not need this check because we are filtering
+        # playlist_favorites_query to only matching ids
+        if playlist_id not in playlist_update_notifs_by_playlist_id:
+            continue
+        playlist_update_notif = playlist_update_notifs_by_playlist_id[playlist_id]
+        playlist_update_notif[const.notification_metadata].update(
+            {
+                const.notification_playlist_update_users: users_that_favorited_playlists_dict[
+                    playlist_id
+                ]
+            }
+        )
+        playlist_update_notifications.append(playlist_update_notif)
+
+    notifications_unsorted.extend(playlist_update_notifications)
+
+    logger.info(
+        f"notifications.py | all playlist updates at {datetime.now() - start_time}"
+    )
+
+    return sorted(
+        notifications_unsorted,
+        key=lambda i: i[const.notification_blocknumber],
+    )
+
+
+def get_wait_seconds():
+    """The wait_seconds arg of a long-polling request, at most max_wait_seconds"""
+    wait_seconds = request.args.get("wait_seconds", 0, type=int)
+    return max(min(wait_seconds, max_wait_seconds), 0)
+
+
+def get_latest_indexed_block(redis: Redis):
+    latest_indexed_block = redis.get(most_recent_indexed_block_redis_key)
+    return int(latest_indexed_block) if latest_indexed_block else 0
+
+
+# owner info key of each entity type of favorites and reposts
+owner_info_keys = {
+    "track": const.tracks,
+    "album": const.albums,
+    "playlist": const.playlists,
+}
+
+
+def get_owner_info(notifications: List[Dict]):
+    """
+    Returns the owners of the tracks, albums and playlists favorited or reposted in
+    the notifications
+    """
+    owner_info: Dict[str, Dict[int, int]] = {
+        const.tracks: {},
+        const.albums: {},
+        const.playlists: {},
+    }
+    for notification in notifications:
+        if notification[const.notification_type] not in (
+            const.notification_type_favorite,
+            const.notification_type_repost,
+        ):
+            continue
+        metadata = notification[const.notification_metadata]
+        entity_owners = owner_info[
+            owner_info_keys[metadata[const.notification_entity_type]]
+        ]
+        entity_owners[metadata[const.notification_entity_id]] = metadata[
+            const.notification_entity_owner_id
+        ]
+    return owner_info
+
+
+def to_notification_log_entry(notification: Dict) -> Dict:
+    """Returns the notification with its timestamps as ISO strings to be stored as json"""
+    entry = {
+        **notification,
+        const.notification_timestamp: notification[
+            const.notification_timestamp
+        ].isoformat(),
+    }
+    metadata = notification.get(const.notification_metadata)
+    if metadata and const.notification_playlist_update_timestamp in metadata:
+        entry[const.notification_metadata] = {
+            **metadata,
+            const.notification_playlist_update_timestamp: metadata[
+                const.notification_playlist_update_timestamp
+            ].isoformat(),
+        }
+    return entry
+
+
+def from_notification_log_entry(entry: Dict) -> Dict:
+    """Inverse of to_notification_log_entry"""
+    notification = {
+        **entry,
+        const.notification_timestamp: datetime.fromisoformat(
+            entry[const.notification_timestamp]
+        ),
+    }
+    metadata = entry.get(const.notification_metadata)
+    if metadata and const.notification_playlist_update_timestamp in metadata:
+        notification[const.notification_metadata] = {
+            **metadata,
+            const.notification_playlist_update_timestamp: datetime.fromisoformat(
+                metadata[const.notification_playlist_update_timestamp]
+            ),
+        }
+    return notification
+
+
+def get_notification_entities(notification: Dict) -> List[Tuple[str, int]]:
+    """Returns the (entity_type, entity_id) of the tracks and collections of the notification"""
+    metadata = notification.get(const.notification_metadata) or {}
+    if (
+        notification[const.notification_type]
+        == const.notification_type_add_track_to_playlist
+    ):
+        return [
+            ("playlist", metadata[const.playlist_id]),
+            ("track", metadata[const.track_id]),
+        ]
+    if metadata.get(const.notification_entity_type) in ("track", "album", "playlist"):
+        return [
+            (
+                metadata[const.notification_entity_type],
+                metadata[const.notification_entity_id],
+            )
+        ]
+    return []
+
+
+def remove_stale_notifications(
+    session: Session, notifications: List[Dict]
+) -> List[Dict]:
+    """
+    Removes the logged notifications that get_entity_notifications would leave out
+    if queried now: follows, favorites and reposts that have since been undone or
+    redone, the cosigns of those favorites and reposts, and notifications of
+    tracks and collections that have since been deleted.
+
+    The log is written per block, so it holds the state as of each block while the
+    entity queries only return what is still current.
+    """
+    follows = [
+        notification
+        for notification in notifications
+        if notification[const.notification_type] == const.notification_type_follow
+    ]
+    favorites = [
+        notification
+        for notification in notifications
+        if notification[const.notification_type] == const.notification_type_favorite
+    ]
+    reposts = [
+        notification
+        for notification in notifications
+        if notification[const.notification_type] == const.notification_type_repost
+    ]
+
+    # (follower, followee) -> block number of the follow, if not undone
+    current_follows: Dict[Tuple, int] = {}
+    if follows:
+        follow_results = (
+            session.query(
+                Follow.follower_user_id, Follow.followee_user_id, Follow.blocknumber
+            )
+            .filter(
+                Follow.is_current == True,
+                Follow.is_delete == False,
+                Follow.follower_user_id.in_(
+                    {follow[const.notification_initiator] for follow in follows}
+                ),
+                Follow.followee_user_id.in_(
+                    {
+                        follow[const.notification_metadata][
+                            const.notification_followee_id
+                        ]
+                        for follow in follows
                     }
-                    track_added_to_playlist_notification[
-                        const.notification_metadata
-                    ] = metadata
-                    track_added_to_playlist_notifications.append(
-                        track_added_to_playlist_notification
-                    )
-
-        tracks = (
-            session.query(Track.owner_id, Track.track_id)
+                ),
+            )
+            .all()
+        )
+        current_follows = {
+            (follower_user_id, followee_user_id): blocknumber
+            for follower_user_id, followee_user_id, blocknumber in follow_results
+        }
+
+    # (user, entity type, entity id) -> block number of the save/repost, if not undone
+    current_saves: Dict[Tuple, int] = {}
+    if favorites:
+        save_results = (
+            session.query(
+                Save.user_id, Save.save_type, Save.save_item_id, Save.blocknumber
+            )
             .filter(
-                Track.track_id.in_(track_ids),
-                Track.is_unlisted == False,
-                Track.is_delete == False,
-                Track.is_current == True,
+                Save.is_current == True,
+                Save.is_delete == False,
+                Save.user_id.in_(
+                    {favorite[const.notification_initiator] for favorite in favorites}
+                ),
+                Save.save_item_id.in_(
+                    {
+                        favorite[const.notification_metadata][
+                            const.notification_entity_id
+                        ]
+                        for favorite in favorites
+                    }
+                ),
             )
             .all()
         )
-        track_owner_map = {}
-        for track in tracks:
-            owner_id, track_id = track
-            track_owner_map[track_id] = owner_id
-
-        # Loop over notifications and populate their metadata
-        for notification in track_added_to_playlist_notifications:
-            track_id = notification[const.notification_metadata][const.track_id]
-            if track_id not in track_owner_map:
-                # Note: if track_id not in track_owner_map, it's because the track is either deleted, unlisted, or doesn't exist
-                # In that case, it should not trigger a notification
-                continue
-            else:
-                track_owner_id = track_owner_map[track_id]
-                if track_owner_id != notification[const.notification_initiator]:
-                    # add tracks that don't belong to the playlist owner
-                    notification[const.notification_metadata][
-                        const.track_owner_id
-                    ] = track_owner_id
-                    created_notifications.append(notification)
+        current_saves = {
+            (user_id, SaveType(save_type).value, save_item_id): blocknumber
+            for user_id, save_type, save_item_id, blocknumber in save_results
+        }
 
-        notifications_unsorted.extend(created_notifications)
+    current_reposts: Dict[Tuple, int] = {}
+    if reposts:
+        repost_results = (
+            session.query(
+                Repost.user_id,
+                Repost.repost_type,
+                Repost.repost_item_id,
+                Repost.blocknumber,
+            )
+            .filter(
+                Repost.is_current == True,
+                Repost.is_delete == False,
+                Repost.user_id.in_(
+                    {repost[const.notification_initiator] for repost in reposts}
+                ),
+                Repost.repost_item_id.in_(
+                    {
+                        repost[const.notification_metadata][
+                            const.notification_entity_id
+                        ]
+                        for repost in reposts
+                    }
+                ),
+            )
+            .all()
+        )
+        current_reposts = {
+            (user_id, RepostType(repost_type).value, repost_item_id): blocknumber
+            for user_id, repost_type, repost_item_id, blocknumber in repost_results
+        }
 
-        logger.info(f"notifications.py | playlists at {datetime.now() - start_time}")
+    entities = {
+        entity
+        for notification in notifications
+        for entity in get_notification_entities(notification)
+    }
+    track_ids = {
+        entity_id for entity_type, entity_id in entities if entity_type == "track"
+    }
+    collection_ids = {
+        entity_id for entity_type, entity_id in entities if entity_type != "track"
+    }
+    deleted_entities = set()
+    if track_ids:
+        deleted_tracks = (
+            session.query(Track.track_id)
+            .filter(
+                Track.is_current == True,
+                Track.is_delete == True,
+                Track.track_id.in_(track_ids),
+            )
+            .all()
+        )
+        deleted_entities.update(("track", track_id) for (track_id,) in deleted_tracks)
+    if collection_ids:
+        deleted_collections = (
+            session.query(Playlist.playlist_id)
+            .filter(
+                Playlist.is_current == True,
+                Playlist.is_delete == True,
+                Playlist.playlist_id.in_(collection_ids),
+            )
+            .all()
+        )
+        deleted_entities.update(
+            (entity_type, playlist_id)
+            for (playlist_id,) in deleted_collections
+            for entity_type in ("album", "playlist")
+        )
 
-        # Get additional owner info as requested for listen counts
-        tracks_owner_query = session.query(Track).filter(
-            Track.is_current == True, Track.track_id.in_(track_ids_to_owner)
+    def get_entity_key(notification):
+        metadata = notification[const.notification_metadata]
+        return (
+            notification[const.notification_initiator],
+            metadata[const.notification_entity_type],
+            metadata[const.notification_entity_id],
         )
-        track_owner_results = tracks_owner_query.all()
-        for entry in track_owner_results:
-            owner = entry.owner_id
-            track_id = entry.track_id
-            owner_info[const.tracks][track_id] = owner
 
-        logger.info(
-            f"notifications.py | owner info at {datetime.now() - start_time}, owners {len(track_owner_results)}"
+    def is_current(notification):
+        notification_type = notification[const.notification_type]
+        blocknumber = notification[const.notification_blocknumber]
+        if notification_type == const.notification_type_follow:
+            key = (
+                notification[const.notification_initiator],
+                notification[const.notification_metadata][
+                    const.notification_followee_id
+                ],
+            )
+            return current_follows.get(key) == blocknumber
+        if notification_type == const.notification_type_favorite:
+            return current_saves.get(get_entity_key(notification)) == blocknumber
+        if notification_type == const.notification_type_repost:
+            return current_reposts.get(get_entity_key(notification)) == blocknumber
+        return True
+
+    current_notifications = [
+        notification
+        for notification in notifications
+        if is_current(notification)
+        and not any(
+            entity in deleted_entities
+            for entity in get_notification_entities(notification)
         )
+    ]
 
-        # Get playlist updates
-        today = date.today()
-        thirty_days_ago = today - timedelta(days=30)
-        thirty_days_ago_time = datetime(
-            thirty_days_ago.year, thirty_days_ago.month, thirty_days_ago.day, 0, 0, 0
+    # Cosigns are logged along with the favorite or repost of the remix
+    current_track_reactions = {
+        (*get_entity_key(notification), notification[const.notification_blocknumber])
+        for notification in current_notifications
+        if notification[const.notification_type]
+        in (const.notification_type_favorite, const.notification_type_repost)
+    }
+    return [
+        notification
+        for notification in current_notifications
+        if notification[const.notification_type] != const.notification_type_remix_cosign
+        or (
+            *get_entity_key(notification),
+            notification[const.notification_blocknumber],
         )
-        playlist_update_query = session.query(Playlist)
-        playlist_update_query = playlist_update_query.filter(
-            Playlist.is_current == True,
-            Playlist.is_delete == False,
-            Playlist.last_added_to >= thirty_days_ago_time,
-            Playlist.blocknumber > min_block_number,
-            Playlist.blocknumber <= max_block_number,
+        in current_track_reactions
+    ]
+
+
+def merge_playlist_updates(notifications: List[Dict]) -> List[Dict]:
+    """
+    Keeps only the latest playlist update of each playlist, like the playlist update
+    query over a block range. The notifications are sorted by block number.
+    """
+    latest_playlist_updates = {
+        notification[const.notification_metadata][
+            const.notification_entity_id
+        ]: notification
+        for notification in notifications
+        if notification[const.notification_type]
+        == const.notification_type_playlist_update
+    }
+    return [
+        notification
+        for notification in notifications
+        if notification[const.notification_type]
+        != const.notification_type_playlist_update
+        or latest_playlist_updates[
+            notification[const.notification_metadata][const.notification_entity_id]
+        ]
+        is notification
+    ]
+
+
+@bp.route("/notifications", methods=("GET",))
+def notifications():
+    """
+    Fetches the notifications events that occurred between the given block numbers
+
+    URL Params:
+        min_block_number: (int) The start block number for querying for notifications
+        max_block_number?: (int) The end block number for querying for notifications
+        track_id?: (Array<int>) Array of track id for fetching the track's owner id
+            and adding the track id to owner user id mapping to the `owners` response field
+            NOTE: this is added for notification for listen counts
+        wait_seconds?: (int) Long-poll, waiting up to this many seconds (at most
+            notifications_max_wait_seconds) for a block past min_block_number to
+            be indexed before responding
+
+    Response - Json object w/ the following fields
+        notifications: Array of notifications of shape:
+            type: 'Follow' | 'Favorite' | 'Repost' | 'Create' | 'RemixCreate' | 'RemixCosign' | 'PlaylistUpdate'
+            blocknumber: (int) blocknumber of notification
+            timestamp: (string) timestamp of notification
+            initiator: (int) the user id that caused this notification
+            metadata?: (any) additional information about the notification
+                entity_id?: (int) the id of the target entity (ie. playlist id of a playlist that is reposted)
+                entity_type?: (string) the type of the target entity
+                entity_owner_id?: (int) the id of the target entity's owner (if applicable)
+                playlist_update_timestamp?: (string) timestamp of last update of a given playlist
+                playlist_update_users?: (array<int>) user ids which favorited a given playlist
+
+        info: Dictionary of metadata w/ min_block_number & max_block_number fields
+
+        milestones: Dictionary mapping of follows/reposts/favorites (processed within the blocks params)
+            Root fields:
+                follower_counts: Contains a dictionary of user id => follower count (up to the max_block_number)
+                repost_counts: Contains a dictionary tracks/albums/playlists of id to repost count
+                favorite_counts: Contains a dictionary tracks/albums/playlists of id to favorite count
+
+        owners: Dictionary containing the mapping for track id / playlist id / album -> owner user id
+            The root keys are 'tracks', 'playlists', 'albums' and each contains the id to owner id mapping
+    """
+
+    db = get_db_read_replica()
+    min_block_number = request.args.get("min_block_number", type=int)
+    max_block_number = request.args.get("max_block_number", type=int)
+
+    track_ids_to_owner = []
+    try:
+        track_ids_str_list = request.args.getlist("track_id")
+        track_ids_to_owner = [int(y) for y in track_ids_str_list]
+    except Exception as e:
+        logger.error(f"Failed to retrieve track list {e}")
+
+    # Max block number is not explicitly required (yet)
+    if not min_block_number and min_block_number != 0:
+        return api_helpers.error_response({"msg": "Missing min block number"}, 400)
+
+    if not max_block_number:
+        max_block_number = min_block_number + max_block_diff
+    elif (max_block_number - min_block_number) > max_block_diff:
+        max_block_number = min_block_number + max_block_diff
+
+    wait_seconds = get_wait_seconds()
+    if wait_seconds:
+        redis = get_redis()
+        get_indexing_progress_listener(redis).wait(
+            lambda: get_latest_indexed_block(redis) > min_block_number, wait_seconds
         )
 
-        playlist_update_results = playlist_update_query.all()
+    with db.scoped_session() as session:
+        current_block_query = session.query(Block).filter_by(is_current=True)
+        current_block_query_results = current_block_query.all()
+        current_block = current_block_query_results[0]
+        current_max_block_num = current_block.number
+        if current_max_block_num < max_block_number:
+            max_block_number = current_max_block_num
 
-        logger.info(
-            f"notifications.py | get playlist updates at {datetime.now() - start_time}, playlist updates {len(playlist_update_results)}"
+    notification_metadata = {
+        "min_block_number": min_block_number,
+        "max_block_number": max_block_number,
+    }
+
+    def get_block_timestamps():
+        web3 = web3_provider.get_web3()
+        final_poa_block = helpers.get_final_poa_block(shared_config) or 0
+        return (
+            web3.eth.get_block(min_block_number - final_poa_block).timestamp,
+            web3.eth.get_block(max_block_number - final_poa_block).timestamp,
         )
 
-        # Represents all playlist update notifications
-        playlist_update_notifications = []
-        playlist_update_notifs_by_playlist_id = {}
-        for entry in playlist_update_results:
-            playlist_update_notifs_by_playlist_id[entry.playlist_id] = {
-                const.notification_type: const.notification_type_playlist_update,
-                const.notification_blocknumber: entry.blocknumber,
-                const.notification_timestamp: entry.created_at,
-                const.notification_initiator: entry.playlist_owner_id,
-                const.notification_metadata: {
-                    const.notification_entity_id: entry.playlist_id,
-                    const.notification_entity_type: "playlist",
-                    const.notification_playlist_update_timestamp: entry.last_added_to,
-                },
-            }
+    start_time = datetime.now()
+    logger.info(f"notifications.py | start_time ${start_time}")
 
-        # get all favorited playlists
-        # playlists may have been favorited outside the blocknumber bounds
-        # e.g. before the min_block_number
-        playlist_favorites_query = session.query(Save)
-        playlist_favorites_query = playlist_favorites_query.filter(
-            Save.is_current == True,
-            Save.is_delete == False,
-            Save.save_type == SaveType.playlist,
-            Save.save_item_id.in_(playlist_update_notifs_by_playlist_id.keys()),
+    with db.scoped_session() as session:
+        # The notifications the indexer wrote for every block in the range
+        notification_logs = (
+            session.query(NotificationLog.notifications)
+            .filter(
+                NotificationLog.blocknumber > min_block_number,
+                NotificationLog.blocknumber <= max_block_number,
+            )
+            .order_by(NotificationLog.blocknumber)
+            .all()
         )
-        playlist_favorites_results = playlist_favorites_query.all()
+        if len(notification_logs) == max(max_block_number - min_block_number, 0):
+            notifications_unsorted = merge_playlist_updates(
+                remove_stale_notifications(
+                    session,
+                    [
+                        from_notification_log_entry(entry)
+                        for (entries,) in notification_logs
+                        for entry in entries
+                    ],
+                )
+            )
+        else:
+            # Some blocks were indexed before the notification log, query them
+            notifications_unsorted = get_entity_notifications(
+                session, min_block_number, max_block_number, get_block_timestamps
+            )
 
         logger.info(
-            f"notifications.py | get playlist favorites {datetime.now() - start_time}, playlist favorites {len(playlist_favorites_results)}"
+            f"notifications.py | entity notifications at {datetime.now() - start_time}, logged blocks {len(notification_logs)}"
         )
 
-        # dictionary of playlist id => users that favorited said playlist
-        # e.g. { playlist1: [user1, user2, ...], ... }
-        # we need this dictionary to know which users need to be notified of a playlist update
-        users_that_favorited_playlists_dict = {}
-        for result in playlist_favorites_results:
-            if result.save_item_id in users_that_favorited_playlists_dict:
-                users_that_favorited_playlists_dict[result.save_item_id].append(
-                    result.user_id
-                )
-            else:
-                users_that_favorited_playlists_dict[result.save_item_id] = [
-                    result.user_id
-                ]
+        # Cache owner info for network entities and pass in w/results
+        owner_info = get_owner_info(notifications_unsorted)
 
-        logger.info(
-            f"notifications.py | computed users that favorited dict {datetime.now() - start_time}"
+        notifications_unsorted.extend(
+            get_tier_change_notifications(session, min_block_number, max_block_number)
         )
 
-        for playlist_id in users_that_favorited_playlists_dict:
-            # TODO: We probably do not need this check because we are filtering
-            # playlist_favorites_query to only matching ids
-            if playlist_id not in playlist_update_notifs_by_playlist_id:
-                continue
-            playlist_update_notif = playlist_update_notifs_by_playlist_id[playlist_id]
-            playlist_update_notif[const.notification_metadata].update(
-                {
-                    const.notification_playlist_update_users: users_that_favorited_playlists_dict[
-                        playlist_id
-                    ]
-                }
-            )
-            playlist_update_notifications.append(playlist_update_notif)
+        logger.info(
+            f"notifications.py | balance change at {datetime.now() - start_time}"
+        )
 
-        notifications_unsorted.extend(playlist_update_notifications)
+        # Get additional owner info as requested for listen counts
+        tracks_owner_query = session.query(Track).filter(
+            Track.is_current == True, Track.track_id.in_(track_ids_to_owner)
+        )
+        track_owner_results = tracks_owner_query.all()
+        for entry in track_owner_results:
+            owner = entry.owner_id
+            track_id = entry.track_id
+            owner_info[const.tracks][track_id] = owner
 
         logger.info(
-            f"notifications.py | all playlist updates at {datetime.now() - start_time}"
+            f"notifications.py | owner info at {datetime.now() - start_time}, owners {len(track_owner_results)}"
         )
 
+        # Retrieve milestones statistics
         milestone_info = get_milestone_info(session, min_block_number, max_block_number)
 
     # Final sort - TODO: can we sort by timestamp?
@@ -1094,6 +1501,9 @@ def solana_notifications():
     URL Params:
         min_slot_number: (int) The start slot number for querying for notifications
         max_slot_number?: (int) The end slot number for querying for notifications
+        wait_seconds?: (int) Long-poll, waiting up to this many seconds (at most
+            notifications_max_wait_seconds) for the solana indexers to index past
+            min_slot_number before responding
 
     Response - Json object w/ the following fields
         notifications: Array of notifications of shape:
@@ -1117,6 +1527,12 @@ def solana_notifications():
     if not max_slot_number or (max_slot_number - min_slot_number) > max_slot_diff:
         max_slot_number = min_slot_number + max_slot_diff
 
+    wait_seconds = get_wait_seconds()
+    if wait_seconds:
+        get_indexing_progress_listener(redis).wait(
+            lambda: get_max_slot(redis) > min_slot_number, wait_seconds
+        )
+
     max_valid_slot = get_max_slot(redis)
     max_slot_number = min(max_slot_number, max_valid_slot)
 
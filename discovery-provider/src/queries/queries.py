@@ -287,7 +287,7 @@ def get_followers_for_user_route(followee_user_id):
         "limit": limit,
         "offset": offset,
     }
-    users = get_followers_for_user(args)
+    users, _ = get_followers_for_user(args)
     return api_helpers.success_response(users)
 
 
@@ -303,7 +303,7 @@ def get_followees_for_user_route(follower_user_id):
         "limit": limit,
         "offset": offset,
     }
-    users = get_followees_for_user(args)
+    users, _ = get_followees_for_user(args)
     return api_helpers.success_response(users)
 
 
@@ -320,7 +320,7 @@ def get_reposters_for_track_route(repost_track_id):
             "limit": limit,
             "offset": offset,
         }
-        user_results = get_reposters_for_track(args)
+        user_results, _ = get_reposters_for_track(args)
         return api_helpers.success_response(user_results)
     except exceptions.NotFoundError as e:
         return api_helpers.error_response(str(e), 404)
@@ -339,7 +339,7 @@ def get_reposters_for_playlist_route(repost_playlist_id):
             "limit": limit,
             "offset": offset,
         }
-        user_results = get_reposters_for_playlist(args)
+        user_results, _ = get_reposters_for_playlist(args)
         return api_helpers.success_response(user_results)
     except exceptions.NotFoundError as e:
         return api_helpers.error_response(str(e), 404)
@@ -358,7 +358,7 @@ def get_savers_for_track_route(save_track_id):
             "limit": limit,
             "offset": offset,
         }
-        user_results = get_savers_for_track(args)
+        user_results, _ = get_savers_for_track(args)
         return api_helpers.success_response(user_results)
     except exceptions.NotFoundError as e:
         return api_helpers.error_response(str(e), 404)
@@ -377,7 +377,7 @@ def get_savers_for_playlist_route(save_playlist_id):
             "limit": limit,
             "offset": offset,
         }
-        user_results = get_savers_for_playlist(args)
+        user_results, _ = get_savers_for_playlist(args)
         return api_helpers.success_response(user_results)
     except exceptions.NotFoundError as e:
         return api_helpers.error_response(str(e), 404)
@@ -28,6 +28,7 @@ from src.queries.get_balances import get_balances
 from src.queries.get_unpopulated_users import get_unpopulated_users
 from src.trending_strategies.trending_type_and_version import TrendingVersion
 from src.utils import helpers, redis_connection
+from src.utils.social_graph import get_social_graph
 
 logger = logging.getLogger(__name__)
 
@@ -203,7 +204,18 @@ def populate_user_metadata(
     follows_current_user_set = set()
     current_user_followed_user_ids = {}
     current_user_followee_follow_count_dict = {}
-    if current_user_id:
+    social_graph = get_social_graph() if current_user_id else None
+    if social_graph:
+        for user_id in user_ids:
+            if social_graph.does_follow(current_user_id, user_id):
+                current_user_followed_user_ids[user_id] = True
+            if social_graph.does_follow(user_id, current_user_id):
+                follows_current_user_set.add(user_id)
+
+        current_user_followee_follow_count_dict = (
+            social_graph.get_followee_follow_counts(current_user_id, user_ids)
+        )
+    elif current_user_id:
         # collect all incoming and outgoing follow edges for current user.
         current_user_follow_rows = (
             session.query(Follow.follower_user_id, Follow.followee_user_id)
@@ -1107,6 +1119,21 @@ def add_query_pagination(
     return modified_query
 
 
+def add_follower_count_cursor(query_obj, follower_count, user_id, cursor):
+    """
+    Filters a query ordered by follower count desc then user id asc to the rows
+    after the (follower_count, user_id) sort key of the cursor, so a page can be
+    read with a limit instead of scanning and discarding an offset
+    """
+    cursor_follower_count, cursor_user_id = cursor
+    return query_obj.filter(
+        or_(
+            follower_count < cursor_follower_count,
+            and_(follower_count == cursor_follower_count, user_id > cursor_user_id),
+        )
+    )
+
+
 def get_genre_list(genre):
     genre_list = []
     genre_list.append(genre)
@@ -17,6 +17,12 @@ from src.solana.audius_data_transaction_handlers import ParsedTx, transaction_ha
 from src.solana.solana_client_manager import SolanaClientManager
 from src.solana.solana_program_indexer import SolanaProgramIndexer
 from src.utils.cid_metadata_client import CIDMetadataClient
+from src.utils.entity_cache import (
+    TRACK,
+    USER,
+    get_entity_ids_to_invalidate,
+    remove_cached_entities,
+)
 from src.utils.helpers import split_list
 from src.utils.session_manager import SessionManager
 
@@ -125,9 +131,13 @@ class AnchorProgramIndexer(SolanaProgramIndexer):
 
             # TODO: Find all other track/playlist/etc. models
 
-            self.process_transactions(
+            changed_entity_ids = self.process_transactions(
                 session, parsed_transactions, db_models, metadata_dictionary
             )
+            entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+                session, changed_entity_ids
+            )
+        remove_cached_entities(self._redis, entity_ids_to_invalidate)
 
     def process_transactions(
         self,
@@ -135,7 +145,8 @@ class AnchorProgramIndexer(SolanaProgramIndexer):
         processed_transactions: List[ParsedTx],
         db_models: Dict,
         metadata_dictionary: Dict,
-    ):
+    ) -> Dict[str, Set[int]]:
+        """Saves the records of the transactions, returns the changed entity ids"""
         records: List[Any] = []
         for transaction in processed_transactions:
             instructions = transaction["tx_metadata"]["instructions"]
@@ -164,6 +175,14 @@ class AnchorProgramIndexer(SolanaProgramIndexer):
         self.msg(f"Saving {records}")
         session.bulk_save_objects(records)
 
+        changed_entity_ids: Dict[str, Set[int]] = defaultdict(set)
+        for record in records:
+            if isinstance(record, User):
+                changed_entity_ids[USER].add(record.user_id)
+            elif isinstance(record, Track):
+                changed_entity_ids[TRACK].add(record.track_id)
+        return changed_entity_ids
+
     def invalidate_old_records(self, session: Session, db_models: Dict[str, Dict]):
         # Update existing record in db to is_current = False
         if db_models.get("users"):
@@ -253,7 +272,9 @@ class AnchorProgramIndexer(SolanaProgramIndexer):
         return entities
 
     async def parse_tx(self, tx_sig: str) -> ParsedTx:
-        tx_receipt = self._solana_client_manager.get_sol_tx_info(tx_sig, 5, "base64")
+        tx_receipt = await self._solana_client_manager.get_sol_tx_info_async(
+            tx_sig, 5, "base64"
+        )
         self.msg(tx_receipt)
         encoded_data = tx_receipt["result"].get("transaction")[0]
         decoded_data = base64.b64decode(encoded_data)
@@ -1,34 +1,83 @@
+import asyncio
+import concurrent.futures
+import itertools
 import logging
 import random
-import signal
 import time
-from contextlib import contextmanager
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+import aiohttp
 from solana.keypair import Keypair
 from solana.publickey import PublicKey
-from solana.rpc.api import Client, Commitment
-from solana.rpc.types import TokenAccountOpts
+from solana.rpc.api import Client
 from src.exceptions import UnsupportedVersionError
 from src.solana.solana_helpers import SPL_TOKEN_ID_PK
 from src.solana.solana_transaction_types import (
     ConfirmedSignatureForAddressResponse,
     ConfirmedTransaction,
 )
+from src.utils.async_endpoint_client import AsyncEndpointClient
 
 logger = logging.getLogger(__name__)
 
-# maximum number of times to retry get_confirmed_transaction call
+# maximum number of rounds of attempts across all endpoints
 DEFAULT_MAX_RETRIES = 5
-# number of seconds to wait between calls to get_confirmed_transaction
+# number of seconds to back off once every endpoint failed in a round
 DELAY_SECONDS = 0.2
 UNSUPPORTED_VERSION_ERROR_CODE = -32015
+# JSON-RPC errors of an endpoint that is unhealthy, behind, missing history or rate
+# limiting, which another endpoint or a later attempt may not return. Other errors
+# are specific to the transaction, so it is skipped.
+TRANSIENT_RPC_ERROR_CODES = {
+    -32001,  # block cleaned up
+    -32004,  # block not available
+    -32005,  # node unhealthy
+    -32011,  # transaction history not available
+    -32014,  # block status not available yet
+    -32016,  # min context slot not reached
+    -32429,  # rate limited
+    -32603,  # internal error
+}
+# maximum number of getTransaction calls sent in one batched JSON-RPC request
+GET_TRANSACTIONS_BATCH_SIZE = 50
+# maximum number of accounts in one getMultipleAccounts call
+GET_MULTIPLE_ACCOUNTS_BATCH_SIZE = 100
+# timeout of a single request to an endpoint
+RPC_REQUEST_TIMEOUT_SECONDS = 10
+# deadline of a call including every retry, across all endpoints
+RPC_CALL_DEADLINE_SECONDS = 30
+
+# Connection pool limits of the session shared by all requests
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_ENDPOINT = 50
 
 
 class SolanaClientManager:
-    def __init__(self, solana_endpoints) -> None:
+    """
+    Sends solana JSON-RPC requests to the healthiest of several endpoints.
+
+    Requests run on an event loop in a daemon thread with one pooled aiohttp session,
+    so the manager can be shared by the sync indexers, their thread pools and async
+    code alike. Endpoints are ranked by the latency and errors of their previous
+    requests and calls move on to the next ranked endpoint as soon as one fails. With
+    hedge_requests, the next endpoint is also asked when one has not answered within
+    its p95 latency. Every call has a deadline of RPC_CALL_DEADLINE_SECONDS.
+    """
+
+    def __init__(self, solana_endpoints, hedge_requests=False) -> None:
         self.endpoints = solana_endpoints.split(",")
         self.clients = [Client(endpoint) for endpoint in self.endpoints]
+        self.hedge_requests = hedge_requests
+        self._endpoint_client = AsyncEndpointClient(
+            "solana_client_manager",
+            MAX_CONNECTIONS,
+            MAX_CONNECTIONS_PER_ENDPOINT,
+            aiohttp.ClientTimeout(total=RPC_REQUEST_TIMEOUT_SECONDS),
+        )
+        # latency / error history the endpoints are ranked by, safe to share between threads
+        self._scoreboard = self._endpoint_client.scoreboard
+        # itertools.count is safe to share between threads
+        self._request_ids = itertools.count(1)
 
     def get_client(self, randomize=False) -> Client:
         if not self.clients:
@@ -40,47 +89,93 @@ class SolanaClientManager:
         index = random.randrange(0, len(self.clients))
         return self.clients[index]
 
+    def get_endpoint_stats(self) -> Dict[str, Dict]:
+        """Snapshot of the latency and errors of every endpoint, for logging"""
+        return self._scoreboard.get_stats()
+
     def get_sol_tx_info(
         self, tx_sig: str, retries=DEFAULT_MAX_RETRIES, encoding="json"
-    ):
-        """Fetches a solana transaction by signature with retries and a delay."""
-
-        def handle_get_sol_tx_info(client: Client, index: int):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    tx_info: ConfirmedTransaction = client.get_transaction(
-                        tx_sig, encoding
-                    )
-                    _check_error(tx_info, tx_sig)
-                    if tx_info["result"] is not None:
-                        return tx_info
-                # We currently only support "legacy" solana transactions. If we encounter
-                # a newer version, raise this specific error so that it can be handled upstream.
-                except UnsupportedVersionError as e:
-                    raise e
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_sol_tx_info | \
-                            Error fetching tx {tx_sig} from endpoint {endpoint}, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
+    ) -> ConfirmedTransaction:
+        """Fetches a solana transaction by signature."""
+        return self._run(self._get_sol_tx_info(tx_sig, retries, encoding))
+
+    async def get_sol_tx_info_async(
+        self, tx_sig: str, retries=DEFAULT_MAX_RETRIES, encoding="json"
+    ) -> ConfirmedTransaction:
+        """get_sol_tx_info for coroutines, does not block the caller's event loop"""
+        future = self._submit_with_deadline(
+            self._get_sol_tx_info(tx_sig, retries, encoding)
+        )
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.TimeoutError as e:
+            raise _deadline_exceeded() from e
+
+    async def _get_sol_tx_info(self, tx_sig: str, retries: int, encoding: str):
+        def is_valid(response):
+            # We currently only support "legacy" solana transactions. Transactions of a
+            # newer version, or that can not be fetched at all, raise this specific
+            # error so that they are skipped upstream.
+            _check_error(response, tx_sig)
+            return "error" not in response and response.get("result") is not None
+
+        return await self._call(
+            "getTransaction",
+            [tx_sig, {"encoding": encoding, "commitment": "finalized"}],
+            retries,
+            is_valid,
+        )
+
+    def get_sol_tx_infos(
+        self,
+        tx_sigs: List[str],
+        retries=DEFAULT_MAX_RETRIES,
+        encoding="json",
+        batch_size=GET_TRANSACTIONS_BATCH_SIZE,
+    ) -> Iterator[Tuple[str, ConfirmedTransaction]]:
+        """Fetches solana transactions by signature in concurrent batched JSON-RPC
+        requests of up to batch_size getTransaction calls, yielding (tx_sig, tx_info)
+        as each request completes. Only the signatures that failed are retried, with
+        the next ranked endpoint. Each request has a deadline of
+        RPC_CALL_DEADLINE_SECONDS. Raises if some signatures could not be fetched."""
+        remaining = list(tx_sigs)
+        endpoints = self._scoreboard.rank(self.endpoints)
+        for attempt in range(retries * len(endpoints)):
+            if not remaining:
+                return
+            endpoint = endpoints[attempt % len(endpoints)]
+            # back off once every endpoint was tried
+            delay = DELAY_SECONDS if attempt and not attempt % len(endpoints) else 0
+            if attempt:
                 logger.error(
-                    f"solana_client_manager.py | get_sol_tx_info | Retrying tx fetch: {tx_sig} with endpoint {endpoint}"
+                    f"solana_client_manager.py | get_sol_tx_infos | Retrying fetch of {len(remaining)} txs with endpoint {endpoint}"
+                )
+            futures = {
+                self._submit(
+                    self._get_transactions_batch(endpoint, batch, encoding, delay)
+                ): batch
+                for batch in (
+                    remaining[i : i + batch_size]
+                    for i in range(0, len(remaining), batch_size)
                 )
+            }
+            failed = []
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    tx_infos = future.result()
+                    failed.extend(
+                        tx_sig for tx_sig in futures[future] if tx_sig not in tx_infos
+                    )
+                    yield from tx_infos.items()
+            finally:
+                for future in futures:
+                    future.cancel()
+            remaining = failed
+        if remaining:
             raise Exception(
-                f"solana_client_manager.py | get_sol_tx_info | Failed to fetch {tx_sig} with endpoint {endpoint}"
+                f"solana_client_manager.py | get_sol_tx_infos | All requests failed to fetch {remaining}"
             )
 
-        return _try_all(
-            self.clients,
-            handle_get_sol_tx_info,
-            f"solana_client_manager.py | get_sol_tx_info | All requests failed to fetch {tx_sig}",
-        )
-
     def get_signatures_for_address(
         self,
         account: Union[str, Keypair, PublicKey],
@@ -88,199 +183,250 @@ class SolanaClientManager:
         until: Optional[str] = None,
         limit: Optional[int] = None,
         retries: int = DEFAULT_MAX_RETRIES,
-    ):
+    ) -> ConfirmedSignatureForAddressResponse:
         """Fetches confirmed signatures for transactions given an address."""
-
-        def handle_get_signatures_for_address(client: Client, index: int):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    transactions: ConfirmedSignatureForAddressResponse = (
-                        client.get_signatures_for_address(
-                            account, before, until, limit, Commitment("finalized")
-                        )
-                    )
-                    return transactions
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | handle_get_signatures_for_address | \
-                            Error fetching account {account} from endpoint {endpoint}, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
-                logger.error(
-                    f"solana_client_manager.py | handle_get_signatures_for_address | Retrying account fetch: {account} with endpoint {endpoint}"
-                )
-            raise Exception(
-                f"solana_client_manager.py | handle_get_signatures_for_address | Failed to fetch account {account} with endpoint {endpoint}"
-            )
-
-        return _try_all_with_timeout(
-            self.clients,
-            handle_get_signatures_for_address,
-            "solana_client_manager.py | get_signatures_for_address | All requests failed",
+        if isinstance(account, Keypair):
+            account = account.public_key
+        opts: Dict[str, Any] = {"commitment": "finalized"}
+        if before:
+            opts["before"] = before
+        if until:
+            opts["until"] = until
+        if limit:
+            opts["limit"] = limit
+        return self._run(
+            self._call("getSignaturesForAddress", [str(account), opts], retries)
         )
 
     def get_slot(self, retries=DEFAULT_MAX_RETRIES, encoding="json") -> Optional[int]:
-        def _get_slot(client: Client, index):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    response = client.get_slot(Commitment("finalized"))
-                    return response["result"]
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_slot, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
-                logger.error(
-                    f"solana_client_manager.py | get_slot | Retrying with endpoint {endpoint}"
-                )
-            raise Exception(
-                f"solana_client_manager.py | get_slot | Failed with endpoint {endpoint}"
-            )
-
-        return _try_all(
-            self.clients,
-            _get_slot,
-            "solana_client_manager.py | get_slot | All requests failed to fetch",
+        response = self._run(
+            self._call("getSlot", [{"commitment": "finalized"}], retries)
         )
+        return response["result"]
 
     def get_token_accounts_by_owner(
         self, owner: PublicKey, retries=DEFAULT_MAX_RETRIES
     ):
-        def _get_token_accounts_by_owner(client: Client, index):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    response = client.get_token_accounts_by_owner(
-                        owner,
-                        TokenAccountOpts(
-                            program_id=SPL_TOKEN_ID_PK, encoding="jsonParsed"
-                        ),
-                    )
-                    return response["result"]
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_token_accounts_by_owner, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
-                logger.error(
-                    f"solana_client_manager.py | get_token_accounts_by_owner | Retrying with endpoint {endpoint}"
-                )
-            raise Exception(
-                f"solana_client_manager.py | get_token_accounts_by_owner | Failed with endpoint {endpoint}"
+        response = self._run(
+            self._call(
+                "getTokenAccountsByOwner",
+                [
+                    str(owner),
+                    {"programId": str(SPL_TOKEN_ID_PK)},
+                    {"encoding": "jsonParsed", "commitment": "finalized"},
+                ],
+                retries,
             )
-
-        return _try_all(
-            self.clients,
-            _get_token_accounts_by_owner,
-            "solana_client_manager.py | get_token_accounts_by_owner | All requests failed to fetch",
         )
+        return response["result"]
 
     def get_account_info(self, account: PublicKey, retries=DEFAULT_MAX_RETRIES):
-        def _get_account_info(client: Client, index):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    response = client.get_account_info(account)
-                    return response["result"]
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_account_info, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
-                logger.error(
-                    f"solana_client_manager.py | get_account_info | Retrying with endpoint {endpoint}"
-                )
-            raise Exception(
-                f"solana_client_manager.py | get_account_info | Failed with endpoint {endpoint}"
+        response = self._run(
+            self._call(
+                "getAccountInfo",
+                [str(account), {"encoding": "base64", "commitment": "finalized"}],
+                retries,
             )
-
-        return _try_all(
-            self.clients,
-            _get_account_info,
-            "solana_client_manager.py | get_account_info | All requests failed to fetch",
         )
+        return response["result"]
 
+    def get_multiple_accounts(
+        self,
+        accounts: List[Union[str, PublicKey]],
+        encoding="jsonParsed",
+        retries=DEFAULT_MAX_RETRIES,
+    ) -> List[Optional[Dict]]:
+        """Fetches the info of each account, None for the accounts that do not exist,
+        in concurrent getMultipleAccounts calls of GET_MULTIPLE_ACCOUNTS_BATCH_SIZE
+        accounts."""
+        return self._run(
+            self._get_multiple_accounts(
+                [str(account) for account in accounts], encoding, retries
+            )
+        )
 
-@contextmanager
-def timeout(time):
-    # Register a function to raise a TimeoutError on the signal.
-    signal.signal(signal.SIGALRM, raise_timeout)
-    # Schedule the signal to be sent after ``time``.
-    signal.alarm(time)
+    async def _get_multiple_accounts(
+        self, accounts: List[str], encoding: str, retries: int
+    ) -> List[Optional[Dict]]:
+        responses = await asyncio.gather(
+            *(
+                self._call(
+                    "getMultipleAccounts",
+                    [
+                        accounts[i : i + GET_MULTIPLE_ACCOUNTS_BATCH_SIZE],
+                        {"encoding": encoding, "commitment": "finalized"},
+                    ],
+                    retries,
+                )
+                for i in range(0, len(accounts), GET_MULTIPLE_ACCOUNTS_BATCH_SIZE)
+            )
+        )
+        return [
+            account_info
+            for response in responses
+            for account_info in response["result"]["value"]
+        ]
 
-    try:
-        yield
-    except TimeoutError:  # pylint: disable=W0706
-        raise
-    finally:
-        # Unregister the signal so it won't be triggered
-        # if the timeout is not reached.
-        signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    def _submit(self, coro) -> concurrent.futures.Future:
+        return self._endpoint_client.submit(coro)
 
+    def _submit_with_deadline(self, coro) -> concurrent.futures.Future:
+        return self._submit(asyncio.wait_for(coro, RPC_CALL_DEADLINE_SECONDS))
 
-def raise_timeout(signum, frame):
-    raise TimeoutError
+    def _run(self, coro):
+        """Runs coro on the manager's event loop from any thread, within the deadline"""
+        future = self._submit_with_deadline(coro)
+        try:
+            return future.result()
+        except asyncio.TimeoutError as e:
+            raise _deadline_exceeded() from e
 
+    async def _post(self, endpoint: str, payload: Any) -> Any:
+        async with self._endpoint_client.get_session().post(
+            endpoint, json=payload
+        ) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
 
-def _check_error(tx, tx_sig):
-    if "error" in tx:
-        logger.error(
-            f"solana_client_manager.py | _check_unsupported_version | Transaction {tx_sig} version is unsupported"
+    async def _call(
+        self,
+        method: str,
+        params: List[Any],
+        retries: int,
+        is_valid: Callable[[Dict], bool] = lambda response: "error" not in response,
+    ) -> Dict:
+        """
+        Sends a JSON-RPC call to the ranked endpoints in up to retries rounds, backing
+        off DELAY_SECONDS between rounds. A failed request moves on to the next endpoint
+        right away, with hedge_requests a slow one does too once it has taken longer
+        than its p95 latency. Returns the first response is_valid accepts.
+        """
+        for attempt in range(retries):
+            if attempt:
+                await asyncio.sleep(DELAY_SECONDS)
+                logger.error(
+                    f"solana_client_manager.py | {method} | Retrying with all endpoints, {self._scoreboard.get_stats()}"
+                )
+            response = await self._endpoint_client.call_ranked(
+                self.endpoints,
+                lambda endpoint: self._request(endpoint, method, params, is_valid),
+                hedge=self.hedge_requests,
+            )
+            if response is not None:
+                return response
+        raise Exception(
+            f"solana_client_manager.py | {method} | All requests failed, params {params}"
         )
-        raise UnsupportedVersionError()
-
 
-def _try_all(iterable, func, message, randomize=False):
-    """Executes a function with retries across the iterable.
-    If all executions fail, raise an exception."""
-    items = list(enumerate(iterable))
-    items = items if not randomize else random.sample(items, k=len(items))
-    for index, value in items:
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        params: List[Any],
+        is_valid: Callable[[Dict], bool],
+    ) -> Optional[Dict]:
+        """Returns the response of endpoint if valid, recording how it did"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": method,
+            "params": params,
+        }
+        start = time.time()
         try:
-            return func(value, index)
-        except UnsupportedVersionError as e:
-            raise e
-        except Exception:
+            response = await self._post(endpoint, payload)
+            valid = is_valid(response)
+        except UnsupportedVersionError:
+            # the endpoint answered, the transaction itself can not be fetched
+            self._scoreboard.record_success(endpoint, time.time() - start)
+            raise
+        except Exception as e:
+            self._scoreboard.record_failure(endpoint)
             logger.error(
-                f"solana_client_manager.py | _try_all | Failed attempt at index {index} for function {func}"
+                f"solana_client_manager.py | {method} | Error from endpoint {endpoint}, {e}"
             )
-            if index < len(items) - 1:
-                logger.info("solana_client_manager.py | _try_all | Retrying")
-            continue
-    raise Exception(message)
-
-
-def _try_all_with_timeout(iterable, func, message, randomize=False):
-    """Do not use this function with ThreadPoolExecutor,
-    doesn't play well with futures
+            return None
+        if not valid and "error" not in response:
+            # e.g. a transaction the endpoint has not finalized yet, which does not
+            # make it less healthy
+            logger.info(
+                f"solana_client_manager.py | {method} | No result from endpoint {endpoint}"
+            )
+            return None
+        if not valid:
+            self._scoreboard.record_failure(endpoint)
+            logger.error(
+                f"solana_client_manager.py | {method} | Invalid response from endpoint {endpoint}, {response}"
+            )
+            return None
+        self._scoreboard.record_success(endpoint, time.time() - start)
+        return response
 
-    Executes a function with retries across the iterable.
-    If all executions fail, raise an exception."""
-    items = list(enumerate(iterable))
-    items = items if not randomize else random.sample(items, k=len(items))
-    for index, value in items:
+    async def _get_transactions_batch(
+        self, endpoint: str, tx_sigs: List[str], encoding: str, delay: float = 0
+    ) -> Dict[str, ConfirmedTransaction]:
+        """Returns tx_sig -> tx_info for the transactions of one batched request
+        that were fetched"""
+        if delay:
+            await asyncio.sleep(delay)
+        id_to_tx_sig = {next(self._request_ids): tx_sig for tx_sig in tx_sigs}
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "getTransaction",
+                "params": [tx_sig, {"encoding": encoding, "commitment": "finalized"}],
+            }
+            for request_id, tx_sig in id_to_tx_sig.items()
+        ]
+        start = time.time()
         try:
-            with timeout(30):
-                return func(value, index)
-        except Exception:
+            responses = await asyncio.wait_for(
+                self._post(endpoint, payload), RPC_CALL_DEADLINE_SECONDS
+            )
+        except Exception as e:
+            self._scoreboard.record_failure(endpoint)
             logger.error(
-                f"solana_client_manager.py | _try_all | Failed attempt at index {index} for function {func}"
+                f"solana_client_manager.py | get_sol_tx_infos | Error fetching {len(tx_sigs)} txs from endpoint {endpoint}, {e}"
             )
-            if index < len(items) - 1:
-                logger.info("solana_client_manager.py | _try_all | Retrying")
-            continue
-    raise Exception(message)
+            return {}
+        if not isinstance(responses, list):
+            self._scoreboard.record_failure(endpoint)
+            logger.error(
+                f"solana_client_manager.py | get_sol_tx_infos | Batched request rejected by endpoint {endpoint}, {responses}"
+            )
+            return {}
+        self._scoreboard.record_success(endpoint, time.time() - start)
+
+        tx_infos: Dict[str, ConfirmedTransaction] = {}
+        for response in responses:
+            tx_sig = id_to_tx_sig.get(response.get("id"))
+            if tx_sig is None:
+                continue
+            error = response.get("error")
+            if error:
+                # We currently only support "legacy" solana transactions. Transactions of a
+                # newer version, or that can not be fetched at all, raise this specific
+                # error so that they are skipped upstream.
+                _check_error(response, tx_sig)
+                logger.error(
+                    f"solana_client_manager.py | get_sol_tx_infos | Error fetching tx {tx_sig} from endpoint {endpoint}, {error}"
+                )
+            elif response.get("result") is not None:
+                tx_infos[tx_sig] = response
+        return tx_infos
+
+
+def _check_error(tx, tx_sig):
+    error = tx.get("error")
+    if error and error.get("code") not in TRANSIENT_RPC_ERROR_CODES:
+        logger.error(
+            f"solana_client_manager.py | _check_error | Transaction {tx_sig} can not be fetched, {error}"
+        )
+        raise UnsupportedVersionError()
+
+
+def _deadline_exceeded() -> Exception:
+    return Exception(
+        f"solana_client_manager.py | Call did not complete within {RPC_CALL_DEADLINE_SECONDS}s"
+    )
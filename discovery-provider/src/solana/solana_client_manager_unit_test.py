@@ -1,13 +1,42 @@
+import asyncio
 from unittest import mock
 
 import pytest
-from src.solana.solana_client_manager import SolanaClientManager
+from src.exceptions import UnsupportedVersionError
+from src.solana import solana_client_manager as solana_client_manager_module
+from src.solana.solana_client_manager import (
+    GET_MULTIPLE_ACCOUNTS_BATCH_SIZE,
+    UNSUPPORTED_VERSION_ERROR_CODE,
+    SolanaClientManager,
+)
 
 solana_client_manager = SolanaClientManager(
     "https://audius.rpcpool.com,https://api.mainnet-beta.solana.com,https://solana-api.projectserum.com"
 )
 
 
+@pytest.fixture(autouse=True)
+def no_delay(monkeypatch):
+    monkeypatch.setattr(solana_client_manager_module, "DELAY_SECONDS", 0)
+
+
+def mock_endpoint_responses(manager, responses, latencies=None):
+    """Mocks requests to the endpoints, responses[endpoint] returning the response
+    of each call or raising it if an exception. Returns the endpoints called."""
+    called = []
+
+    async def post(endpoint, payload):
+        called.append(endpoint)
+        await asyncio.sleep((latencies or {}).get(endpoint, 0))
+        response = responses[endpoint](payload)
+        if isinstance(response, Exception):
+            raise response
+        return {"jsonrpc": "2.0", "id": payload["id"], **response}
+
+    manager._post = post
+    return called
+
+
 @mock.patch("solana.rpc.api.Client")
 def test_get_client(_):
     # test exception raised if no clients
@@ -37,79 +66,292 @@ def test_get_client(_):
     assert returned_other_client == True
 
 
-@mock.patch("solana.rpc.api.Client")
-def test_get_sol_tx_info(_):
-    client_mocks = [
-        mock.Mock(name="first"),
-        mock.Mock(name="second"),
-        mock.Mock(name="third"),
-    ]
-    solana_client_manager.clients = client_mocks
+def test_get_sol_tx_info():
+    expected_result = {"slot": 1}
 
-    expected_response = {"result": "OK"}
+    # test that it returns the endpoint's response
+    manager = SolanaClientManager("http://first,http://second,http://third")
+    called = mock_endpoint_responses(
+        manager, {"http://first": lambda _: {"result": expected_result}}
+    )
+    assert manager.get_sol_tx_info("transaction signature")["result"] == expected_result
+    assert called == ["http://first"]
 
-    # test that it returns the client call response
-    client_mocks[0].get_transaction.return_value = expected_response
-    assert (
-        solana_client_manager.get_sol_tx_info("transaction signature")
-        == expected_response
+    # test that it moves on to the next endpoint right away if one fails
+    manager = SolanaClientManager("http://first,http://second,http://third")
+    called = mock_endpoint_responses(
+        manager,
+        {
+            "http://first": lambda _: Exception(),
+            "http://second": lambda _: {"error": {"code": -32005}},
+            "http://third": lambda _: {"result": expected_result},
+        },
+    )
+    assert manager.get_sol_tx_info("transaction signature", 2)["result"] == (
+        expected_result
     )
+    assert called == ["http://first", "http://second", "http://third"]
 
-    # test that it retries the same client before moving on to subsequent clients
-    # also test that it will try subsequent clients if first one fails
-    client_mocks[0].reset_mock()
-    client_mocks[1].reset_mock()
-    client_mocks[2].reset_mock()
+    # test that endpoints that failed are tried last
+    called.clear()
+    manager.get_sol_tx_info("transaction signature")
+    assert called == ["http://third"]
 
-    num_retries = 2
-    client_mocks[0].get_transaction.side_effect = Exception()
-    client_mocks[1].get_transaction.side_effect = Exception()
-    client_mocks[2].get_transaction.return_value = expected_response
-    assert (
-        solana_client_manager.get_sol_tx_info("transaction signature", num_retries)
-        == expected_response
+    # test exception raised once every endpoint failed in every round
+    manager = SolanaClientManager("http://first,http://second")
+    called = mock_endpoint_responses(
+        manager,
+        {
+            "http://first": lambda _: Exception(),
+            "http://second": lambda _: {"result": None},
+        },
+    )
+    with pytest.raises(Exception):
+        manager.get_sol_tx_info("transaction signature", 2)
+    assert sorted(called) == ["http://first"] * 2 + ["http://second"] * 2
+
+    # test that an endpoint without the transaction yet is not penalized
+    manager = SolanaClientManager("http://first,http://second")
+    called = mock_endpoint_responses(
+        manager,
+        {
+            "http://first": lambda _: {"result": None},
+            "http://second": lambda _: {"result": expected_result},
+        },
+    )
+    assert manager.get_sol_tx_info("transaction signature")["result"] == (
+        expected_result
     )
-    assert client_mocks[0].get_transaction.call_count == 2
-    assert client_mocks[1].get_transaction.call_count == 2
-    assert client_mocks[2].get_transaction.call_count == 1
+    assert called == ["http://first", "http://second"]
+    assert manager.get_endpoint_stats()["http://first"]["error_rate"] == 0
 
+    # test unsupported transaction versions and other errors specific to the
+    # transaction are raised without retries
+    for code in [UNSUPPORTED_VERSION_ERROR_CODE, -32602]:
+        manager = SolanaClientManager("http://first,http://second")
+        called = mock_endpoint_responses(
+            manager, {"http://first": lambda _: {"error": {"code": code}}}
+        )
+        with pytest.raises(UnsupportedVersionError):
+            manager.get_sol_tx_info("transaction signature")
+        assert called == ["http://first"]
 
-@mock.patch("solana.rpc.api.Client")
-def test_get_signatures_for_address(_):
-    client_mocks = [
-        mock.Mock(name="first"),
-        mock.Mock(name="second"),
-        mock.Mock(name="third"),
+
+def test_get_sol_tx_info_async():
+    manager = SolanaClientManager("http://first")
+    mock_endpoint_responses(manager, {"http://first": lambda _: {"result": "OK"}})
+
+    async def get_tx_infos():
+        return await asyncio.gather(
+            *(manager.get_sol_tx_info_async(f"sig{i}") for i in range(10))
+        )
+
+    tx_infos = asyncio.run(get_tx_infos())
+    assert [tx_info["result"] for tx_info in tx_infos] == ["OK"] * 10
+
+
+@mock.patch.object(solana_client_manager_module, "RPC_CALL_DEADLINE_SECONDS", 0.1)
+def test_get_sol_tx_info_async_deadline():
+    manager = SolanaClientManager("http://first")
+    mock_endpoint_responses(
+        manager,
+        {"http://first": lambda _: {"result": "OK"}},
+        latencies={"http://first": 5},
+    )
+
+    # test that calls fail once past their deadline
+    with pytest.raises(Exception, match="did not complete"):
+        asyncio.run(manager.get_sol_tx_info_async("transaction signature"))
+
+
+def test_hedge_requests():
+    manager = SolanaClientManager("http://slow,http://fast", hedge_requests=True)
+    called = mock_endpoint_responses(
+        manager,
+        {
+            "http://slow": lambda _: {"result": "slow"},
+            "http://fast": lambda _: {"result": "fast"},
+        },
+        latencies={"http://slow": 5},
+    )
+
+    # test that the next endpoint is asked once the first is slower than its p95
+    with mock.patch.object(manager._scoreboard, "hedge_delay", return_value=0.01):
+        assert manager.get_sol_tx_info("transaction signature")["result"] == "fast"
+    assert called == ["http://slow", "http://fast"]
+
+
+@mock.patch.object(solana_client_manager_module, "RPC_CALL_DEADLINE_SECONDS", 0.1)
+def test_call_deadline():
+    manager = SolanaClientManager("http://first")
+    mock_endpoint_responses(
+        manager,
+        {"http://first": lambda _: {"result": 1}},
+        latencies={"http://first": 5},
+    )
+
+    # test that calls fail once past their deadline
+    with pytest.raises(Exception):
+        manager.get_slot()
+
+
+def mock_endpoints(manager, failures):
+    """Mocks batched getTransaction requests, failing the first failures[tx_sig]
+    calls for tx_sig on any endpoint"""
+    sent = []
+
+    async def post(endpoint, payload):
+        sent.append((endpoint, [call["params"][0] for call in payload]))
+        responses = []
+        for call in payload:
+            tx_sig = call["params"][0]
+            if failures.get(tx_sig, 0) > 0:
+                failures[tx_sig] -= 1
+                responses.append({"id": call["id"], "result": None})
+            else:
+                responses.append({"id": call["id"], "result": {"sig": tx_sig}})
+        return responses
+
+    manager._post = post
+    return sent
+
+
+def test_get_sol_tx_infos():
+    manager = SolanaClientManager("http://first,http://second")
+
+    # test that it batches requests and only retries the failed signatures
+    sent = mock_endpoints(manager, {"b": 1, "d": 2})
+    tx_infos = dict(manager.get_sol_tx_infos(["a", "b", "c", "d", "e"], batch_size=2))
+    assert {
+        tx_sig: tx_info["result"]["sig"] for tx_sig, tx_info in tx_infos.items()
+    } == {tx_sig: tx_sig for tx_sig in ["a", "b", "c", "d", "e"]}
+    assert sorted(sent[:3]) == [
+        ("http://first", ["a", "b"]),
+        ("http://first", ["c", "d"]),
+        ("http://first", ["e"]),
     ]
-    solana_client_manager.clients = client_mocks
+    assert sent[3:] == [("http://second", ["b", "d"]), ("http://first", ["d"])]
+
+    # test exception raised if all requests fail
+    manager = SolanaClientManager("http://first,http://second")
+    sent = mock_endpoints(manager, {"a": 10})
+    with pytest.raises(Exception):
+        dict(manager.get_sol_tx_infos(["a"], retries=2))
+    assert [endpoint for endpoint, _ in sent] == ["http://first", "http://second"] * 2
+
+    # test that the transactions of a request past its deadline are retried
+    manager = SolanaClientManager("http://slow,http://fast")
+    sent = mock_endpoints(manager, {})
+    mocked_post = manager._post
+
+    async def post(endpoint, payload):
+        if endpoint == "http://slow":
+            sent.append((endpoint, [call["params"][0] for call in payload]))
+            await asyncio.sleep(5)
+        return await mocked_post(endpoint, payload)
+
+    manager._post = post
+    with mock.patch.object(
+        solana_client_manager_module, "RPC_CALL_DEADLINE_SECONDS", 0.1
+    ):
+        tx_infos = dict(manager.get_sol_tx_infos(["a"]))
+    assert tx_infos["a"]["result"] == {"sig": "a"}
+    assert [endpoint for endpoint, _ in sent] == ["http://slow", "http://fast"]
+
+    # test unsupported transaction versions are raised
+    async def post(endpoint, payload):
+        return [
+            {"id": payload[0]["id"], "error": {"code": UNSUPPORTED_VERSION_ERROR_CODE}}
+        ]
 
-    expected_response = {"result": "OK"}
+    manager._post = post
+    with pytest.raises(UnsupportedVersionError):
+        dict(manager.get_sol_tx_infos(["a"]))
 
-    # test that it returns the client call response
-    client_mocks[0].get_signatures_for_address.return_value = expected_response
+    # test transient errors are retried
+    manager = SolanaClientManager("http://first")
+    errors = iter([{"code": -32005}])
+
+    async def post(endpoint, payload):
+        error = next(errors, None)
+        if error:
+            return [{"id": payload[0]["id"], "error": error}]
+        return [{"id": payload[0]["id"], "result": {"sig": "a"}}]
+
+    manager._post = post
+    assert dict(manager.get_sol_tx_infos(["a"]))["a"]["result"] == {"sig": "a"}
+
+
+def test_get_signatures_for_address():
+    manager = SolanaClientManager("http://first,http://second,http://third")
+    params = []
+    expected_result = [{"signature": "sig"}]
+
+    def respond(payload):
+        params.append(payload["params"])
+        return {"result": expected_result}
+
+    # test that it returns the response and only sends the options given
+    mock_endpoint_responses(manager, {"http://first": respond})
     assert (
-        solana_client_manager.get_signatures_for_address(
-            "account", "before", "until", "limit"
-        )
-        == expected_response
+        manager.get_signatures_for_address("account", "before", None, 10)["result"]
+        == expected_result
     )
+    assert params == [
+        ["account", {"commitment": "finalized", "before": "before", "limit": 10}]
+    ]
 
-    # test that it will try subsequent clients if first one fails
-    client_mocks[0].get_signatures_for_address.side_effect = Exception()
-    client_mocks[1].get_signatures_for_address.side_effect = Exception()
-    client_mocks[2].get_signatures_for_address.return_value = expected_response
+    # test that it will try subsequent endpoints if first ones fail
+    manager = SolanaClientManager("http://first,http://second,http://third")
+    mock_endpoint_responses(
+        manager,
+        {
+            "http://first": lambda _: Exception(),
+            "http://second": lambda _: {"error": {"code": -32005}},
+            "http://third": lambda _: {"result": expected_result},
+        },
+    )
     assert (
-        solana_client_manager.get_signatures_for_address(
-            "account", "before", "until", "limit"
-        )
-        == expected_response
+        manager.get_signatures_for_address("account", "before", "until", 10)["result"]
+        == expected_result
     )
 
     # test exception raised if all requests fail
-    client_mocks[0].get_signatures_for_address.side_effect = Exception()
-    client_mocks[1].get_signatures_for_address.side_effect = Exception()
-    client_mocks[2].get_signatures_for_address.side_effect = Exception()
+    manager = SolanaClientManager("http://first,http://second,http://third")
+    mock_endpoint_responses(
+        manager,
+        {endpoint: lambda _: Exception() for endpoint in manager.endpoints},
+    )
     with pytest.raises(Exception):
-        solana_client_manager.get_signatures_for_address(
-            "account", "before", "until", "limit"
-        )
+        manager.get_signatures_for_address("account", "before", "until", 10)
+
+
+def test_get_multiple_accounts():
+    manager = SolanaClientManager("http://first")
+    sent = []
+
+    def respond(payload):
+        accounts = payload["params"][0]
+        sent.append(accounts)
+        return {
+            "result": {
+                "context": {"slot": 1},
+                # odd accounts do not exist
+                "value": [
+                    {"account": account} if int(account) % 2 == 0 else None
+                    for account in accounts
+                ],
+            }
+        }
+
+    mock_endpoint_responses(manager, {"http://first": respond})
+    accounts = [str(i) for i in range(GET_MULTIPLE_ACCOUNTS_BATCH_SIZE + 10)]
+
+    # test that accounts are fetched in batches and returned in order
+    assert manager.get_multiple_accounts(accounts) == [
+        {"account": account} if int(account) % 2 == 0 else None for account in accounts
+    ]
+    assert sorted(len(batch) for batch in sent) == [
+        10,
+        GET_MULTIPLE_ACCOUNTS_BATCH_SIZE,
+    ]
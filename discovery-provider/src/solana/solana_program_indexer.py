@@ -129,7 +129,7 @@ class SolanaProgramIndexer(IndexerBase):
         Parse an individual transaction, this will vary based on the program being indexed
         @param tx_sig: transaction signature to be parsed
         """
-        tx_info = self._solana_client_manager.get_sol_tx_info(tx_sig)
+        tx_info = await self._solana_client_manager.get_sol_tx_info_async(tx_sig)
         result: TransactionInfoResult = tx_info["result"]
         return {"tx_sig": tx_sig, "tx_metadata": {}, "result": result}
 
@@ -1,12 +1,10 @@
+import concurrent.futures
 import logging
 import time
 from typing import Dict, List, Optional, Set, Tuple, TypedDict
 
 from redis import Redis
-from solana.keypair import Keypair
 from solana.publickey import PublicKey
-from solana.rpc.api import Client
-from spl.token.client import Token
 from sqlalchemy import and_
 from sqlalchemy.orm.session import Session
 from src.app import get_eth_abi_values
@@ -20,9 +18,11 @@ from src.queries.get_balances import (
     LAZY_REFRESH_REDIS_PREFIX,
     does_user_balance_need_refresh,
 )
+from src.solana.solana_client_manager import SolanaClientManager
 from src.solana.solana_helpers import ASSOCIATED_TOKEN_PROGRAM_ID_PK, SPL_TOKEN_ID_PK
 from src.tasks.celery_app import celery
 from src.utils.config import shared_config
+from src.utils.eth_call_batcher import EthCallBatcher
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.redis_constants import user_balances_refresh_last_completion_redis_key
 from src.utils.session_manager import SessionManager
@@ -40,6 +40,9 @@ WAUDIO_MINT_PUBKEY = PublicKey(WAUDIO_MINT) if WAUDIO_MINT else None
 
 MAX_LAZY_REFRESH_USER_IDS = 100
 
+# Shared by every run of the task, see get_eth_call_batcher
+_eth_call_batcher: Optional[EthCallBatcher] = None
+
 
 class AssociatedWallets(TypedDict):
     eth: List[str]
@@ -107,7 +110,8 @@ def refresh_user_ids(
     delegate_manager_contract,
     staking_contract,
     eth_web3,
-    waudio_token,
+    eth_call_batcher: EthCallBatcher,
+    solana_client_manager: SolanaClientManager,
 ):
     with db.scoped_session() as session:
         lazy_refresh_user_ids = get_lazy_refresh_user_ids(redis, session)[
@@ -212,83 +216,124 @@ def refresh_user_ids(
         # mapping of user_id => balance change
         needs_balance_change_update: Dict[int, Dict] = {}
 
-        # Fetch balances
-        # pylint: disable=too-many-nested-blocks
+        # Gather the balance calls and token accounts of every wallet in the batch
+        # so they are fetched together rather than one user at a time
+        associated_balance_functions = [
+            (token_contract, "balanceOf"),
+            (delegate_manager_contract, "getTotalDelegatorStake"),
+            (staking_contract, "totalStakedFor"),
+        ]
+        balance_calls: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        user_eth_wallets: Dict[int, Tuple[str, List[str]]] = {}
+        user_sol_accounts: Dict[int, List[str]] = {}
         for user_id, wallets in user_id_metadata.items():
             try:
-                owner_wallet = wallets["owner_wallet"]
-                owner_wallet = eth_web3.toChecksumAddress(owner_wallet)
-                owner_wallet_balance = token_contract.functions.balanceOf(
-                    owner_wallet
-                ).call()
-                associated_balance = 0
-                waudio_balance: str = "0"
-                associated_sol_balance = 0
-
-                if "associated_wallets" in wallets:
-                    for wallet in wallets["associated_wallets"]["eth"]:
-                        wallet = eth_web3.toChecksumAddress(wallet)
-                        balance = token_contract.functions.balanceOf(wallet).call()
-                        delegation_balance = (
-                            delegate_manager_contract.functions.getTotalDelegatorStake(
-                                wallet
-                            ).call()
+                owner_wallet = eth_web3.toChecksumAddress(wallets["owner_wallet"])
+                associated_eth_wallets = [
+                    eth_web3.toChecksumAddress(wallet)
+                    for wallet in wallets["associated_wallets"]["eth"]
+                ]
+            except Exception as e:
+                logger.error(
+                    f"cache_user_balance.py | Error fetching balance for user {user_id}: {(e)}"
+                )
+                continue
+            balance_calls[("balanceOf", owner_wallet)] = get_balance_call(
+                token_contract, "balanceOf", owner_wallet
+            )
+            for wallet in associated_eth_wallets:
+                for contract, fn_name in associated_balance_functions:
+                    balance_calls[(fn_name, wallet)] = get_balance_call(
+                        contract, fn_name, wallet
+                    )
+            user_eth_wallets[user_id] = (owner_wallet, associated_eth_wallets)
+
+            user_sol_accounts[user_id] = []
+            if WAUDIO_MINT_PUBKEY is not None:
+                for wallet in wallets["associated_wallets"]["sol"]:
+                    try:
+                        user_sol_accounts[user_id].append(
+                            get_associated_token_account(wallet)
                         )
-                        stake_balance = staking_contract.functions.totalStakedFor(
-                            wallet
-                        ).call()
-                        associated_balance += (
-                            balance + delegation_balance + stake_balance
+                    except Exception as e:
+                        logger.error(
+                            " ".join(
+                                [
+                                    "cache_user_balance.py | Error fetching associated ",
+                                    "wallet balance for user %s, wallet %s: %s",
+                                ]
+                            ),
+                            user_id,
+                            wallet,
+                            e,
                         )
-                    if waudio_token is not None:
-                        for wallet in wallets["associated_wallets"]["sol"]:
-                            try:
-                                root_sol_account = PublicKey(wallet)
-                                derived_account, _ = PublicKey.find_program_address(
-                                    [
-                                        bytes(root_sol_account),
-                                        bytes(SPL_TOKEN_ID_PK),
-                                        bytes(WAUDIO_MINT_PUBKEY),  # type: ignore
-                                    ],
-                                    ASSOCIATED_TOKEN_PROGRAM_ID_PK,
-                                )
-
-                                bal_info = waudio_token.get_balance(derived_account)
-                                if (
-                                    "error" in bal_info
-                                    and "code" in bal_info["error"]
-                                    and bal_info["error"]["code"] == -32602
-                                ):
-                                    # Error is 'Invalid param: could not find account'
-                                    # meaning that the token account does not exist
-                                    continue
-                                associated_waudio_balance: str = bal_info["result"][
-                                    "value"
-                                ]["amount"]
-                                associated_sol_balance += int(associated_waudio_balance)
-                            except Exception as e:
-                                logger.error(
-                                    " ".join(
-                                        [
-                                            "cache_user_balance.py | Error fetching associated ",
-                                            "wallet balance for user %s, wallet %s: %s",
-                                        ]
-                                    ),
-                                    user_id,
-                                    wallet,
-                                    e,
-                                )
-
-                if wallets["bank_account"] is not None:
-                    if waudio_token is None:
+        sol_accounts = list(
+            {account for accounts in user_sol_accounts.values() for account in accounts}
+            | {
+                wallets["bank_account"]
+                for wallets in user_id_metadata.values()
+                if wallets["bank_account"] is not None
+            }
+        )
+
+        # Fetch every balance, the eth calls at the same block and the solana
+        # token accounts concurrently
+        blocknumber = eth_web3.eth.block_number
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            sol_future = (
+                executor.submit(
+                    solana_client_manager.get_multiple_accounts, sol_accounts
+                )
+                if sol_accounts and WAUDIO_MINT_PUBKEY is not None
+                else None
+            )
+            eth_results = eth_call_batcher.call(
+                list(balance_calls.values()), blocknumber
+            )
+            eth_balances = {
+                key: int(result, 16)
+                for key, result in zip(balance_calls.keys(), eth_results)
+                # "0x" is returned for calls to an address without code
+                if result not in (None, "0x")
+            }
+            sol_account_infos: Optional[Dict[str, Optional[Dict]]] = {}
+            if sol_future:
+                try:
+                    sol_account_infos = dict(zip(sol_accounts, sol_future.result()))
+                except Exception as e:
+                    logger.error(
+                        f"cache_user_balance.py | Error fetching solana balances: {e}"
+                    )
+                    sol_account_infos = None
+
+        for user_id, (owner_wallet, associated_eth_wallets) in user_eth_wallets.items():
+            try:
+                owner_wallet_balance = get_eth_balance(
+                    eth_balances, "balanceOf", owner_wallet
+                )
+                associated_balance = sum(
+                    get_eth_balance(eth_balances, fn_name, wallet)
+                    for wallet in associated_eth_wallets
+                    for _, fn_name in associated_balance_functions
+                )
+                waudio_balance: str = "0"
+                # token accounts that do not exist yet hold no wAUDIO
+                associated_sol_balance = sum(
+                    int(get_token_amount(sol_account_infos, account) or 0)
+                    for account in user_sol_accounts[user_id]
+                )
+
+                bank_account = user_id_metadata[user_id]["bank_account"]
+                if bank_account is not None:
+                    if WAUDIO_MINT_PUBKEY is None:
                         logger.error(
                             "cache_user_balance.py | Missing Required SPL Confirguration"
                         )
                     else:
-                        bal_info = waudio_token.get_balance(
-                            PublicKey(wallets["bank_account"])
-                        )
-                        waudio_balance = bal_info["result"]["value"]["amount"]
+                        bank_balance = get_token_amount(sol_account_infos, bank_account)
+                        if bank_balance is None:
+                            raise Exception(f"bank account {bank_account} not found")
+                        waudio_balance = bank_balance
 
                 # update the balance on the user model
                 user_balance = user_balances[user_id]
@@ -320,7 +365,7 @@ def refresh_user_ids(
                 # Write to user_balance_changes table
                 needs_balance_change_update[user_id] = {
                     "user_id": user_id,
-                    "blocknumber": eth_web3.eth.block_number,
+                    "blocknumber": blocknumber,
                     "current_balance": str(current_total_balance),
                     "previous_balance": str(prev_total_balance),
                 }
@@ -388,6 +433,54 @@ def refresh_user_ids(
             redis.srem(IMMEDIATE_REFRESH_REDIS_PREFIX, *immediate_refresh_user_ids)
 
 
+def get_balance_call(contract, fn_name: str, wallet: str) -> Tuple[str, str]:
+    """The (to, data) of the eth_call of a balance function of contract"""
+    return (contract.address, contract.encodeABI(fn_name=fn_name, args=[wallet]))
+
+
+def get_eth_balance(
+    eth_balances: Dict[Tuple[str, str], int], fn_name: str, wallet: str
+) -> int:
+    balance = eth_balances.get((fn_name, wallet))
+    if balance is None:
+        raise Exception(f"{fn_name} call failed for wallet {wallet}")
+    return balance
+
+
+def get_associated_token_account(wallet: str) -> str:
+    """The wAUDIO associated token account of a solana wallet"""
+    root_sol_account = PublicKey(wallet)
+    derived_account, _ = PublicKey.find_program_address(
+        [
+            bytes(root_sol_account),
+            bytes(SPL_TOKEN_ID_PK),
+            bytes(WAUDIO_MINT_PUBKEY),  # type: ignore
+        ],
+        ASSOCIATED_TOKEN_PROGRAM_ID_PK,
+    )
+    return str(derived_account)
+
+
+def get_token_amount(
+    account_infos: Optional[Dict[str, Optional[Dict]]], account: str
+) -> Optional[str]:
+    """The amount held by a token account, None if the account does not exist"""
+    if account_infos is None:
+        raise Exception("solana balances could not be fetched")
+    account_info = account_infos[account]
+    if account_info is None:
+        return None
+    return account_info["data"]["parsed"]["info"]["tokenAmount"]["amount"]
+
+
+def get_eth_call_batcher(config) -> EthCallBatcher:
+    """Returns the batcher shared by every run of the task, keeping its connections alive"""
+    global _eth_call_batcher  # pylint: disable=W0603
+    if _eth_call_batcher is None:
+        _eth_call_batcher = EthCallBatcher(config["web3"]["eth_provider_url"])
+    return _eth_call_batcher
+
+
 def get_token_address(eth_web3, config):
     eth_registry_address = eth_web3.toChecksumAddress(
         config["eth_contracts"]["registry"]
@@ -455,22 +548,6 @@ def get_staking_contract(eth_web3):
     return staking_instance
 
 
-SPL_TOKEN_PROGRAM_ID_PUBKEY = PublicKey("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-
-
-def get_audio_token(solana_client: Client):
-    if WAUDIO_MINT_PUBKEY is None:
-        logger.error("cache_user_balance.py | Missing Required SPL Confirguration")
-        return None
-    waudio_token = Token(
-        conn=solana_client,
-        pubkey=WAUDIO_MINT_PUBKEY,
-        program_id=SPL_TOKEN_PROGRAM_ID_PUBKEY,
-        payer=Keypair.generate(),  # not making any txs so payer is not required
-    )
-    return waudio_token
-
-
 @celery.task(name="update_user_balances", bind=True)
 @save_duration_metric(metric_group="celery_task")
 def update_user_balances_task(self):
@@ -495,7 +572,6 @@ def update_user_balances_task(self):
             token_inst = get_token_contract(
                 eth_web3, update_user_balances_task.shared_config
             )
-            waudio_token = get_audio_token(solana_client_manager.get_client())
             refresh_user_ids(
                 redis,
                 db,
@@ -503,7 +579,8 @@ def update_user_balances_task(self):
                 delegate_manager_inst,
                 staking_inst,
                 eth_web3,
-                waudio_token,
+                get_eth_call_batcher(update_user_balances_task.shared_config),
+                solana_client_manager,
             )
 
             end_time = time.time()
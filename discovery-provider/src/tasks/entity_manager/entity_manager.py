@@ -3,7 +3,8 @@ import time
 from collections import defaultdict
 from typing import Any, Dict, List, Set, Tuple
 
-from sqlalchemy import and_, or_
+from sqlalchemy import Integer, String, and_, bindparam, cast, column, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm.session import Session
 from src.challenges.challenge_event_bus import ChallengeEventBus
 from src.database_task import DatabaseTask
@@ -216,6 +217,7 @@ def entity_manager_update(
                         record.updated_at = params.block_datetime
                 records[-1].is_current = True
                 records_to_save.extend(records)
+                changed_entity_ids[record_type].add(entity_id)
 
                 # invalidate original record if it already existed in the DB
                 if (
@@ -294,6 +296,42 @@ def collect_entities_to_fetch(update_task, entity_manager_txs, metadata):
     return entities_to_fetch
 
 
+def get_composite_keys_table(name: str, columns: Dict[str, List]):
+    """
+    Returns an aliased `unnest` of one array per column that can be joined against to
+    look up records by composite key.
+
+    The keys are sent as one array parameter per column regardless of how many there
+    are, so postgres plans a single join instead of an OR of one AND per key.
+    String columns are passed as text, callers cast them to enums in the join.
+    """
+    column_types = {
+        column_name: String if isinstance(values[0], str) else Integer
+        for column_name, values in columns.items()
+    }
+    unnest_params = ", ".join(f":{column_name}" for column_name in columns)
+    return (
+        text(f"SELECT * FROM unnest({unnest_params}) AS {name}({', '.join(columns)})")
+        .bindparams(
+            *[
+                bindparam(
+                    column_name,
+                    value=values,
+                    type_=postgresql.ARRAY(column_types[column_name]),
+                )
+                for column_name, values in columns.items()
+            ]
+        )
+        .columns(
+            *[
+                column(column_name, column_type)
+                for column_name, column_type in column_types.items()
+            ]
+        )
+        .alias(name)
+    )
+
+
 def fetch_existing_entities(session: Session, entities_to_fetch: EntitiesToFetchDict):
     existing_entities: ExistingRecordDict = defaultdict(dict)
 
@@ -340,19 +378,26 @@ def fetch_existing_entities(session: Session, entities_to_fetch: EntitiesToFetch
     # FOLLOWS
     if entities_to_fetch[EntityType.FOLLOW]:
         follow_ops_to_fetch: Set[Tuple] = entities_to_fetch[EntityType.FOLLOW]
-        and_queries = []
-        for follow_to_fetch in follow_ops_to_fetch:
-            follower = follow_to_fetch[0]
-            # follows does not need entity type in follow_to_fetch[1]
-            followee = follow_to_fetch[2]
-            and_queries.append(
+        # follows does not need entity type in follow_to_fetch[1]
+        follow_keys = get_composite_keys_table(
+            "follow_keys",
+            {
+                "follower_user_id": [follow[0] for follow in follow_ops_to_fetch],
+                "followee_user_id": [follow[2] for follow in follow_ops_to_fetch],
+            },
+        )
+        follows: List[Follow] = (
+            session.query(Follow)
+            .join(
+                follow_keys,
                 and_(
-                    Follow.followee_user_id == followee,
-                    Follow.follower_user_id == follower,
-                    Follow.is_current == True,
-                )
+                    Follow.follower_user_id == follow_keys.c.follower_user_id,
+                    Follow.followee_user_id == follow_keys.c.followee_user_id,
+                ),
             )
-        follows: List[Follow] = session.query(Follow).filter(or_(*and_queries)).all()
+            .filter(Follow.is_current == True)
+            .all()
+        )
         existing_entities[EntityType.FOLLOW] = {
             get_record_key(
                 follow.follower_user_id, EntityType.USER, follow.followee_user_id
@@ -363,20 +408,27 @@ def fetch_existing_entities(session: Session, entities_to_fetch: EntitiesToFetch
     # SAVES
     if entities_to_fetch[EntityType.SAVE]:
         saves_to_fetch: Set[Tuple] = entities_to_fetch[EntityType.SAVE]
-        and_queries = []
-        for save_to_fetch in saves_to_fetch:
-            user_id = save_to_fetch[0]
-            entity_type = save_to_fetch[1]
-            entity_id = save_to_fetch[2]
-            and_queries.append(
+        save_keys = get_composite_keys_table(
+            "save_keys",
+            {
+                "user_id": [save[0] for save in saves_to_fetch],
+                "save_type": [save[1].lower() for save in saves_to_fetch],
+                "save_item_id": [save[2] for save in saves_to_fetch],
+            },
+        )
+        saves: List[Save] = (
+            session.query(Save)
+            .join(
+                save_keys,
                 and_(
-                    Save.user_id == user_id,
-                    Save.save_type == entity_type.lower(),
-                    Save.save_item_id == entity_id,
-                    Save.is_current == True,
-                )
+                    Save.user_id == save_keys.c.user_id,
+                    Save.save_type == cast(save_keys.c.save_type, Save.save_type.type),
+                    Save.save_item_id == save_keys.c.save_item_id,
+                ),
             )
-        saves: List[Save] = session.query(Save).filter(or_(*and_queries)).all()
+            .filter(Save.is_current == True)
+            .all()
+        )
         existing_entities[EntityType.SAVE] = {
             get_record_key(save.user_id, save.save_type, save.save_item_id): save
             for save in saves
@@ -385,20 +437,28 @@ def fetch_existing_entities(session: Session, entities_to_fetch: EntitiesToFetch
     # REPOSTS
     if entities_to_fetch[EntityType.REPOST]:
         reposts_to_fetch: Set[Tuple] = entities_to_fetch[EntityType.REPOST]
-        and_queries = []
-        for repost_to_fetch in reposts_to_fetch:
-            user_id = repost_to_fetch[0]
-            entity_type = repost_to_fetch[1]
-            entity_id = repost_to_fetch[2]
-            and_queries.append(
+        repost_keys = get_composite_keys_table(
+            "repost_keys",
+            {
+                "user_id": [repost[0] for repost in reposts_to_fetch],
+                "repost_type": [repost[1].lower() for repost in reposts_to_fetch],
+                "repost_item_id": [repost[2] for repost in reposts_to_fetch],
+            },
+        )
+        reposts: List[Repost] = (
+            session.query(Repost)
+            .join(
+                repost_keys,
                 and_(
-                    Repost.user_id == user_id,
-                    Repost.repost_type == entity_type.lower(),
-                    Repost.repost_item_id == entity_id,
-                    Repost.is_current == True,
-                )
+                    Repost.user_id == repost_keys.c.user_id,
+                    Repost.repost_type
+                    == cast(repost_keys.c.repost_type, Repost.repost_type.type),
+                    Repost.repost_item_id == repost_keys.c.repost_item_id,
+                ),
             )
-        reposts: List[Repost] = session.query(Repost).filter(or_(*and_queries)).all()
+            .filter(Repost.is_current == True)
+            .all()
+        )
         existing_entities[EntityType.REPOST] = {
             get_record_key(
                 repost.user_id, repost.repost_type, repost.repost_item_id
@@ -409,20 +469,27 @@ def fetch_existing_entities(session: Session, entities_to_fetch: EntitiesToFetch
     # SUBSCRIPTIONS
     if entities_to_fetch[EntityType.SUBSCRIPTION]:
         subscriptions_to_fetch: Set[Tuple] = entities_to_fetch[EntityType.SUBSCRIPTION]
-        and_queries = []
-        for subscription_to_fetch in subscriptions_to_fetch:
-            user_id = subscription_to_fetch[0]
-            # subscriptions does not need entity type in subscription_to_fetch[1]
-            entity_id = subscription_to_fetch[2]
-            and_queries.append(
+        # subscriptions does not need entity type in subscription_to_fetch[1]
+        subscription_keys = get_composite_keys_table(
+            "subscription_keys",
+            {
+                "subscriber_id": [
+                    subscription[0] for subscription in subscriptions_to_fetch
+                ],
+                "user_id": [subscription[2] for subscription in subscriptions_to_fetch],
+            },
+        )
+        subscriptions: List[Subscription] = (
+            session.query(Subscription)
+            .join(
+                subscription_keys,
                 and_(
-                    Subscription.subscriber_id == user_id,
-                    Subscription.user_id == entity_id,
-                    Subscription.is_current == True,
-                )
+                    Subscription.subscriber_id == subscription_keys.c.subscriber_id,
+                    Subscription.user_id == subscription_keys.c.user_id,
+                ),
             )
-        subscriptions: List[Subscription] = (
-            session.query(Subscription).filter(or_(*and_queries)).all()
+            .filter(Subscription.is_current == True)
+            .all()
         )
         existing_entities[EntityType.SUBSCRIPTION] = {
             get_record_key(
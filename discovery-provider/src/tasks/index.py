@@ -4,9 +4,10 @@ import concurrent.futures
 import json
 import logging
 import time
+from collections import defaultdict
 from datetime import datetime
 from operator import itemgetter, or_
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Set, Tuple
 
 from sqlalchemy.orm.session import Session
 from src.app import get_contract_addresses
@@ -14,6 +15,7 @@ from src.challenges.challenge_event_bus import ChallengeEventBus
 from src.challenges.trending_challenge import should_trending_challenge_update
 from src.models.indexing.block import Block
 from src.models.indexing.ursm_content_node import UrsmContentNode
+from src.models.notifications.notification_log import NotificationLog
 from src.models.playlists.playlist import Playlist
 from src.models.social.follow import Follow
 from src.models.social.repost import Repost
@@ -35,6 +37,7 @@ from src.queries.skipped_transactions import add_network_level_skipped_transacti
 from src.tasks.celery_app import celery
 from src.tasks.entity_manager.entity_manager import entity_manager_update
 from src.tasks.entity_manager.utils import Action, EntityType
+from src.tasks.notification_log import add_notifications_to_log
 from src.tasks.playlists import playlist_state_update
 from src.tasks.social_features import social_feature_state_update
 from src.tasks.sort_block_transactions import sort_block_transactions
@@ -44,6 +47,7 @@ from src.tasks.user_replica_set import user_replica_set_state_update
 from src.tasks.users import user_event_types_lookup, user_state_update
 from src.utils import helpers, multihash
 from src.utils.constants import CONTRACT_NAMES_ON_CHAIN, CONTRACT_TYPES
+from src.utils.entity_cache import get_entity_ids_to_invalidate, remove_cached_entities
 from src.utils.index_blocks_performance import (
     record_add_indexed_block_to_db_ms,
     record_fetch_metadata_ms,
@@ -58,13 +62,16 @@ from src.utils.prometheus_metric import (
     PrometheusMetricNames,
     save_duration_metric,
 )
+from src.utils.random_tracks_pool import invalidate_random_tracks_pool
 from src.utils.redis_constants import (
+    indexed_block_channel,
     latest_block_hash_redis_key,
     latest_block_redis_key,
     most_recent_indexed_block_hash_redis_key,
     most_recent_indexed_block_redis_key,
 )
 from src.utils.session_manager import SessionManager
+from src.utils.social_graph import invalidate_social_graphs
 from src.utils.user_event_constants import entity_manager_event_types_arr
 
 USER_FACTORY = CONTRACT_TYPES.USER_FACTORY.value
@@ -101,6 +108,15 @@ TX_TYPE_TO_HANDLER_MAP = {
     ENTITY_MANAGER: entity_manager_update,
 }
 
+# Entity type of the ids returned by the legacy *_state_update handlers,
+# entity_manager_update returns them keyed by entity type already
+TX_TYPE_TO_CHANGED_ENTITY_TYPE = {
+    USER_FACTORY: EntityType.USER,
+    TRACK_FACTORY: EntityType.TRACK,
+    PLAYLIST_FACTORY: EntityType.PLAYLIST,
+    USER_REPLICA_SET_MANAGER: EntityType.USER,
+}
+
 BLOCKS_PER_DAY = (24 * 60 * 60) / 5
 
 logger = logging.getLogger(__name__)
@@ -490,6 +506,7 @@ def add_indexed_block_to_db(db_session, block):
 def add_indexed_block_to_redis(block, redis):
     redis.set(most_recent_indexed_block_redis_key, block.number)
     redis.set(most_recent_indexed_block_hash_redis_key, block.hash.hex())
+    redis.publish(indexed_block_channel, block.number)
 
 
 def process_state_changes(
@@ -503,6 +520,7 @@ def process_state_changes(
         "number", "hash", "timestamp"
     )(block)
 
+    changed_entity_ids: Dict[str, Set] = defaultdict(set)
     for tx_type, bulk_processor in TX_TYPE_TO_HANDLER_MAP.items():
 
         txs_to_process = tx_type_to_grouped_lists_map[tx_type]
@@ -519,13 +537,21 @@ def process_state_changes(
 
         (
             total_changes_for_tx_type,
-            _,
+            changed_entity_ids_for_tx_type,
         ) = bulk_processor(*tx_processing_args)
+        if tx_type in TX_TYPE_TO_CHANGED_ENTITY_TYPE:
+            changed_entity_ids[TX_TYPE_TO_CHANGED_ENTITY_TYPE[tx_type]].update(
+                changed_entity_ids_for_tx_type
+            )
+        elif isinstance(changed_entity_ids_for_tx_type, dict):
+            for entity_type, entity_ids in changed_entity_ids_for_tx_type.items():
+                changed_entity_ids[entity_type].update(entity_ids)
 
         logger.info(
             f"index.py | {bulk_processor.__name__} completed"
             f" {tx_type}_state_changed={total_changes_for_tx_type > 0} for block={block_number}"
         )
+    return changed_entity_ids
 
 
 cid_types = ["track", "user", "playlist_data"]
@@ -590,6 +616,7 @@ def index_blocks(self, db, blocks_list):
         )
         challenge_bus: ChallengeEventBus = update_task.challenge_event_bus
 
+        entity_ids_to_invalidate: Dict[str, Set[int]] = {}
         with db.scoped_session() as session, challenge_bus.use_scoped_dispatch_queue():
             skip_tx_hash = get_tx_hash_to_skip(session, redis)
             skip_whole_block = skip_tx_hash == "commit"  # db tx failed at commit level
@@ -599,6 +626,7 @@ def index_blocks(self, db, blocks_list):
                 )
                 save_skipped_tx(session, redis)
                 add_indexed_block_to_db(session, block)
+                add_notifications_to_log(session, web3, block, is_skipped=True)
             else:
                 txs_grouped_by_type = {
                     USER_FACTORY: [],
@@ -713,13 +741,16 @@ def index_blocks(self, db, blocks_list):
                     # bulk process operations once all tx's for block have been parsed
                     # and get changed entity IDs for cache clearing
                     # after session commit
-                    process_state_changes(
+                    changed_entity_ids = process_state_changes(
                         self,
                         session,
                         cid_metadata,
                         txs_grouped_by_type,
                         block,
                     )
+                    entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+                        session, changed_entity_ids
+                    )
                     metric.save_time(
                         {"scope": "process_state_changes"},
                         start_time=process_state_changes_start_time,
@@ -727,6 +758,19 @@ def index_blocks(self, db, blocks_list):
                     logger.info(
                         f"index.py | index_blocks - process_state_changes in {time.time() - process_state_changes_start_time}s"
                     )
+
+                    """
+                    Add notifications of the state changes to the notification log
+                    """
+                    notification_log_start_time = time.time()
+                    add_notifications_to_log(session, web3, block)
+                    metric.save_time(
+                        {"scope": "add_notifications_to_log"},
+                        start_time=notification_log_start_time,
+                    )
+                    logger.info(
+                        f"index.py | index_blocks - add_notifications_to_log in {time.time() - notification_log_start_time}s"
+                    )
                     is_save_cid_enabled = shared_config["discprov"]["enable_save_cid"]
                     if is_save_cid_enabled:
                         """
@@ -787,6 +831,8 @@ def index_blocks(self, db, blocks_list):
             if skip_tx_hash:
                 clear_indexing_error(redis)
 
+        # clear cached entities changed by the block now that it is committed
+        remove_cached_entities(redis, entity_ids_to_invalidate)
         add_indexed_block_to_redis(block, redis)
         logger.info(
             f"index.py | update most recently processed block complete for block=${block_number}"
@@ -830,6 +876,7 @@ def revert_blocks(self, db, revert_blocks_list):
     logger.info(f"index.py | {self.request.id} | Reverting {num_revert_blocks} blocks")
     logger.info(revert_blocks_list)
 
+    reverted_entity_ids: Dict[str, Set[int]] = defaultdict(set)
     with db.scoped_session() as session:
 
         rebuild_playlist_index = False
@@ -1060,6 +1107,11 @@ def revert_blocks(self, db, revert_blocks_list):
                 logger.info(f"Reverting track route {track_route_to_revert}")
                 session.delete(track_route_to_revert)
 
+            # Remove notifications of the block from the notification log
+            session.query(NotificationLog).filter(
+                NotificationLog.blocknumber == revert_block_number
+            ).delete()
+
             # Remove outdated block entry
             session.query(Block).filter(Block.blockhash == revert_hash).delete()
 
@@ -1068,6 +1120,28 @@ def revert_blocks(self, db, revert_blocks_list):
             )
             rebuild_track_index = rebuild_track_index or bool(revert_track_entries)
             rebuild_user_index = rebuild_user_index or bool(revert_user_entries)
+
+            reverted_entity_ids[EntityType.PLAYLIST].update(
+                playlist.playlist_id for playlist in revert_playlist_entries
+            )
+            reverted_entity_ids[EntityType.TRACK].update(
+                track.track_id for track in revert_track_entries
+            )
+            reverted_entity_ids[EntityType.USER].update(
+                user.user_id for user in revert_user_entries
+            )
+            reverted_entity_ids[EntityType.FOLLOW].update(
+                (follow.follower_user_id, follow.followee_user_id)
+                for follow in revert_follow_entries
+            )
+        entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+            session, reverted_entity_ids
+        )
+    remove_cached_entities(update_task.redis, entity_ids_to_invalidate)
+    if reverted_entity_ids[EntityType.FOLLOW]:
+        invalidate_social_graphs(update_task.redis)
+    if reverted_entity_ids[EntityType.TRACK]:
+        invalidate_random_tracks_pool(update_task.redis)
     # TODO - if we enable revert, need to set the most_recent_indexed_block_redis_key key in redis
 
 
@@ -12,6 +12,7 @@ from src.tasks.aggregates import init_task_and_acquire_lock, update_aggregate_ta
 from src.tasks.celery_app import celery
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.redis_constants import (
+    indexed_sol_slot_channel,
     latest_sol_aggregate_tips_slot_key,
     latest_sol_user_bank_slot_key,
 )
@@ -201,6 +202,7 @@ def _update_aggregate_tips(session: Session, redis: Redis):
     if prev_slot == max_slot:
         if latest_user_bank_slot is not None:
             redis.set(latest_sol_aggregate_tips_slot_key, int(latest_user_bank_slot))
+            redis.publish(indexed_sol_slot_channel, int(latest_user_bank_slot))
         return
 
     ranks_before = _get_ranks(session, prev_slot, max_slot)
@@ -216,6 +218,7 @@ def _update_aggregate_tips(session: Session, redis: Redis):
     index_rank_ups(session, ranks_before, ranks_after, max_slot)
     if latest_user_bank_slot is not None:
         redis.set(latest_sol_aggregate_tips_slot_key, int(latest_user_bank_slot))
+        redis.publish(indexed_sol_slot_channel, int(latest_user_bank_slot))
 
 
 # ####### CELERY TASKS ####### #
@@ -11,7 +11,7 @@ index_challenges_last_event_key = ""
 
 def index_challenges(event_bus, db, redis):
     with db.scoped_session() as session:
-        num_processed = event_bus.process_events(session)
+        num_processed = event_bus.process_events(session, db=db)
         if num_processed:
             redis.set(challenges_last_processed_event_redis_key, int(time.time()))
 
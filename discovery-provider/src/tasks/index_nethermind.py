@@ -4,14 +4,16 @@ import concurrent.futures
 import logging
 import os
 import time
+from collections import defaultdict
 from datetime import datetime
 from operator import itemgetter, or_
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, TypedDict
 
 from src.challenges.challenge_event_bus import ChallengeEventBus
 from src.challenges.trending_challenge import should_trending_challenge_update
 from src.models.indexing.block import Block
 from src.models.indexing.ursm_content_node import UrsmContentNode
+from src.models.notifications.notification_log import NotificationLog
 from src.models.playlists.playlist import Playlist
 from src.models.social.follow import Follow
 from src.models.social.repost import Repost
@@ -34,9 +36,11 @@ from src.tasks.celery_app import celery
 from src.tasks.entity_manager.entity_manager import entity_manager_update
 from src.tasks.entity_manager.utils import Action, EntityType
 from src.tasks.index import save_cid_metadata
+from src.tasks.notification_log import add_notifications_to_log
 from src.tasks.sort_block_transactions import sort_block_transactions
 from src.utils import helpers, web3_provider
 from src.utils.constants import CONTRACT_NAMES_ON_CHAIN, CONTRACT_TYPES
+from src.utils.entity_cache import get_entity_ids_to_invalidate, remove_cached_entities
 from src.utils.index_blocks_performance import (
     record_add_indexed_block_to_db_ms,
     record_fetch_metadata_ms,
@@ -51,13 +55,17 @@ from src.utils.prometheus_metric import (
     PrometheusMetricNames,
     save_duration_metric,
 )
+from src.utils.random_tracks_pool import invalidate_random_tracks_pool
 from src.utils.redis_constants import (
+    indexed_block_channel,
     latest_block_hash_redis_key,
     latest_block_redis_key,
     most_recent_indexed_block_hash_redis_key,
     most_recent_indexed_block_redis_key,
 )
 from src.utils.session_manager import SessionManager
+from src.utils.social_graph import invalidate_social_graphs
+from src.utils.tx_receipt_fetcher import TxReceiptFetcher
 from src.utils.user_event_constants import entity_manager_event_types_arr
 from web3.datastructures import AttributeDict
 
@@ -73,6 +81,8 @@ BLOCKS_PER_DAY = (24 * 60 * 60) / 5
 
 logger = logging.getLogger(__name__)
 web3 = web3_provider.get_nethermind_web3()
+# Long-lived so receipt requests reuse keep-alive connections across blocks
+tx_receipt_fetcher = TxReceiptFetcher(os.getenv("audius_web3_nethermind_rpc"))
 
 # HELPER FUNCTIONS
 
@@ -188,35 +198,11 @@ def update_latest_block_redis():
     )
 
 
-def fetch_tx_receipt(transaction):
-    web3 = update_task.web3
-    tx_hash = web3.toHex(transaction["hash"])
-    receipt = web3.eth.get_transaction_receipt(tx_hash)
-    response = {}
-    response["tx_receipt"] = receipt
-    response["tx_hash"] = tx_hash
-    return response
-
-
 def fetch_tx_receipts(self, block):
     block_hash = web3.toHex(block.hash)
     block_number = block.number
     block_transactions = block.transactions
-    block_tx_with_receipts = {}
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future_to_tx_receipt = {
-            executor.submit(fetch_tx_receipt, tx): tx for tx in block_transactions
-        }
-        for future in concurrent.futures.as_completed(future_to_tx_receipt):
-            tx = future_to_tx_receipt[future]
-            try:
-                tx_receipt_info = future.result()
-                tx_hash = tx_receipt_info["tx_hash"]
-                block_tx_with_receipts[tx_hash] = tx_receipt_info["tx_receipt"]
-            except Exception as exc:
-                logger.error(
-                    f"index_nethermind.py | fetch_tx_receipts {tx} generated {exc}"
-                )
+    block_tx_with_receipts = tx_receipt_fetcher.fetch_block_receipts(block)
     num_processed_txs = len(block_tx_with_receipts.keys())
     num_submitted_txs = len(block_transactions)
     logger.info(
@@ -233,7 +219,7 @@ def fetch_tx_receipts(self, block):
     return block_tx_with_receipts
 
 
-def fetch_cid_metadata(db, entity_manager_txs):
+def fetch_cid_metadata(db, entity_manager_txs, allow_missing_cids=False):
     start_time = datetime.now()
     entity_manager_contract = update_task.entity_manager_contract
 
@@ -312,7 +298,11 @@ def fetch_cid_metadata(db, entity_manager_txs):
             )
         )
 
-    if cid_type and len(cid_metadata) != len(cid_type.keys()):
+    if (
+        cid_type
+        and len(cid_metadata) != len(cid_type.keys())
+        and not allow_missing_cids
+    ):
         missing_cids_msg = f"Did not fetch all CIDs - missing {[set(cid_type.keys()) - set(cid_metadata.keys())]} CIDs"
         raise Exception(missing_cids_msg)
 
@@ -394,6 +384,7 @@ def add_indexed_block_to_db(db_session, block):
 def add_indexed_block_to_redis(block, redis):
     redis.set(most_recent_indexed_block_redis_key, block.number)
     redis.set(most_recent_indexed_block_hash_redis_key, block.hash.hex())
+    redis.publish(indexed_block_channel, block.number)
 
 
 def process_state_changes(
@@ -407,6 +398,7 @@ def process_state_changes(
         "number", "hash", "timestamp"
     )(block)
 
+    changed_entity_ids: Dict[str, Set] = defaultdict(set)
     for tx_type, bulk_processor in TX_TYPE_TO_HANDLER_MAP.items():
 
         txs_to_process = tx_type_to_grouped_lists_map[tx_type]
@@ -423,13 +415,176 @@ def process_state_changes(
 
         (
             total_changes_for_tx_type,
-            _,
+            changed_entity_ids_for_tx_type,
         ) = bulk_processor(*tx_processing_args)
+        for entity_type, entity_ids in changed_entity_ids_for_tx_type.items():
+            changed_entity_ids[entity_type].update(entity_ids)
 
         logger.info(
             f"index_nethermind.py | {bulk_processor.__name__} completed"
             f" {tx_type}_state_changed={total_changes_for_tx_type > 0} for block={block_number}"
         )
+    return changed_entity_ids
+
+
+class PrefetchedBlock(TypedDict):
+    skip_tx_hash: Optional[str]
+    txs_grouped_by_type: Dict[str, List[Any]]
+    skipped_tx_hashes: List[str]
+    cid_metadata: Dict[str, Dict]
+    cid_type: Dict[str, str]
+    missing_cids: Set[str]
+    durations: Dict[str, float]  # scope -> seconds
+
+
+def get_block_prefetch_depth(shared_config) -> int:
+    """Number of blocks to prefetch ahead of the block being indexed, 0 disables it"""
+    depth = shared_config["discprov"].get("block_prefetch_depth") or 0
+    return max(int(depth), 0)
+
+
+def prefetch_block(
+    self,
+    db,
+    block,
+    skip_tx_hash,
+    indexing_transaction_index_sort_order_start_block,
+    allow_missing_cids=False,
+) -> PrefetchedBlock:
+    """
+    Fetches and parses everything for a block ahead of processing it: tx receipts,
+    the txs to process grouped by type and their CID metadata.
+
+    Does not write to the db so it is safe to run ahead of the block being committed.
+    Tx receipts do not depend on previous blocks, but the CID metadata is fetched
+    from the users' replica sets as committed when the prefetch runs, so a block
+    prefetched ahead of one that changes a replica set asks the old nodes.
+    Lookahead prefetches allow missing CIDs, which are fetched again once the
+    block is indexed, see get_prefetched_block.
+    """
+    web3 = update_task.web3
+    durations: Dict[str, float] = {}
+
+    fetch_tx_receipts_start_time = time.time()
+    tx_receipt_dict = fetch_tx_receipts(self, block)
+    durations["fetch_tx_receipts"] = time.time() - fetch_tx_receipts_start_time
+
+    parse_tx_receipts_start_time = time.time()
+    txs_grouped_by_type: Dict[str, List[Any]] = {
+        ENTITY_MANAGER: [],
+    }
+    skipped_tx_hashes = []
+    sorted_txs = sort_block_transactions(
+        block, indexing_transaction_index_sort_order_start_block
+    )
+
+    # Parse tx events in each block
+    for tx in sorted_txs:
+        tx_hash = web3.toHex(tx["hash"])
+        tx_target_contract_address = tx["to"] if tx["to"] else zero_address
+        tx_receipt = tx_receipt_dict[tx_hash]
+        should_skip_tx = (tx_target_contract_address == zero_address) or (
+            skip_tx_hash is not None and skip_tx_hash == tx_hash
+        )
+
+        if should_skip_tx:
+            logger.info(
+                f"index_nethermind.py | Skipping tx {tx_hash} targeting {tx_target_contract_address}"
+            )
+            skipped_tx_hashes.append(tx_hash)
+            continue
+        else:
+            contract_type = get_contract_type_for_tx(
+                txs_grouped_by_type, tx, tx_receipt
+            )
+            if contract_type:
+                txs_grouped_by_type[contract_type].append(tx_receipt)
+    durations["parse_tx_receipts"] = time.time() - parse_tx_receipts_start_time
+
+    fetch_metadata_start_time = time.time()
+    # pre-fetch cids asynchronously to not have it block in user_state_update
+    # and track_state_update
+    cid_metadata, cid_type = fetch_cid_metadata(
+        db,
+        txs_grouped_by_type[ENTITY_MANAGER],
+        allow_missing_cids=allow_missing_cids,
+    )
+    durations["fetch_metadata"] = time.time() - fetch_metadata_start_time
+
+    return PrefetchedBlock(
+        skip_tx_hash=skip_tx_hash,
+        txs_grouped_by_type=txs_grouped_by_type,
+        skipped_tx_hashes=skipped_tx_hashes,
+        cid_metadata=cid_metadata,
+        cid_type=cid_type,
+        missing_cids=set(cid_type.keys()) - set(cid_metadata.keys()),
+        durations=durations,
+    )
+
+
+def schedule_block_prefetches(
+    self,
+    db,
+    prefetch_executor,
+    prefetch_futures,
+    upcoming_blocks,
+    indexing_transaction_index_sort_order_start_block,
+):
+    """
+    Submits prefetches for upcoming blocks that do not have one in flight yet.
+
+    Skip tx hashes only ever apply to the first block indexed after an error,
+    so upcoming blocks are prefetched without one.
+    """
+    for block in upcoming_blocks:
+        if block.number in prefetch_futures:
+            continue
+        prefetch_futures[block.number] = prefetch_executor.submit(
+            prefetch_block,
+            self,
+            db,
+            block,
+            None,
+            indexing_transaction_index_sort_order_start_block,
+            True,
+        )
+
+
+def get_prefetched_block(
+    self,
+    db,
+    prefetch_futures,
+    block,
+    skip_tx_hash,
+    indexing_transaction_index_sort_order_start_block,
+) -> PrefetchedBlock:
+    """
+    Returns the prefetched data for a block, waiting on the lookahead fetch if one
+    is in flight. Falls back to fetching inline if there is none, if it failed, if it
+    was fetched with a different skip tx hash than the one now in effect, or if it
+    missed CIDs, which are then fetched from the replica sets now committed.
+    """
+    future = prefetch_futures.pop(block.number, None)
+    if future:
+        try:
+            prefetched_block = future.result()
+            if prefetched_block["missing_cids"]:
+                logger.info(
+                    f"index_nethermind.py | get_prefetched_block | prefetch missed {len(prefetched_block['missing_cids'])} CIDs for block={block.number}, fetching again"
+                )
+            elif prefetched_block["skip_tx_hash"] == skip_tx_hash:
+                return prefetched_block
+        except Exception as e:
+            logger.warning(
+                f"index_nethermind.py | get_prefetched_block | prefetch failed for block={block.number}, retrying {e}"
+            )
+    return prefetch_block(
+        self,
+        db,
+        block,
+        skip_tx_hash,
+        indexing_transaction_index_sort_order_start_block,
+    )
 
 
 def create_and_raise_indexing_error(err, redis):
@@ -458,227 +613,232 @@ def index_blocks(self, db, blocks_list):
     block_order_range = range(len(blocks_list) - 1, -1, -1)
     latest_block_timestamp = None
     metric = PrometheusMetric(PrometheusMetricNames.INDEX_BLOCKS_DURATION_SECONDS)
-    for i in block_order_range:
-        start_time = time.time()
-        metric.reset_timer()
-        block = blocks_list[i]
-        block_index = num_blocks - i
-        block_number, block_hash, latest_block_timestamp = itemgetter(
-            "number", "hash", "timestamp"
-        )(block)
-        logger.info(
-            f"index_nethermind.py | index_blocks | {self.request.id} | block {block.number} - {block_index}/{num_blocks}"
-        )
-        challenge_bus: ChallengeEventBus = update_task.challenge_event_bus
 
-        with db.scoped_session() as session, challenge_bus.use_scoped_dispatch_queue():
-            skip_tx_hash = get_tx_hash_to_skip(session, redis)
-            skip_whole_block = skip_tx_hash == "commit"  # db tx failed at commit level
-            if skip_whole_block:
-                logger.info(
-                    f"index_nethermind.py | Skipping all txs in block {block.hash} {block.number}"
-                )
-                save_skipped_tx(session, redis)
-                add_indexed_block_to_db(session, block)
-            else:
-                txs_grouped_by_type = {
-                    ENTITY_MANAGER: [],
-                }
-                try:
-                    """
-                    Fetch transaction receipts
-                    """
-                    fetch_tx_receipts_start_time = time.time()
-                    logger.info(f"index_nethermind.py fetching block {block}")
-                    tx_receipt_dict = fetch_tx_receipts(self, block)
-                    metric.save_time(
-                        {"scope": "fetch_tx_receipts"},
-                        start_time=fetch_tx_receipts_start_time,
+    # Blocks N+1..N+k are prefetched while block N is processed and committed.
+    # Commits still happen strictly in block order below.
+    block_prefetch_depth = get_block_prefetch_depth(shared_config)
+    prefetch_executor = None
+    if block_prefetch_depth > 0 and num_blocks > 1:
+        prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=block_prefetch_depth
+        )
+    prefetch_futures: Dict[int, concurrent.futures.Future] = {}
+    try:
+        for i in block_order_range:
+            start_time = time.time()
+            metric.reset_timer()
+            block = blocks_list[i]
+            block_index = num_blocks - i
+            block_number, block_hash, latest_block_timestamp = itemgetter(
+                "number", "hash", "timestamp"
+            )(block)
+            logger.info(
+                f"index_nethermind.py | index_blocks | {self.request.id} | block {block.number} - {block_index}/{num_blocks}"
+            )
+            challenge_bus: ChallengeEventBus = update_task.challenge_event_bus
+
+            entity_ids_to_invalidate: Dict[str, Set[int]] = {}
+            with db.scoped_session() as session, challenge_bus.use_scoped_dispatch_queue():
+                skip_tx_hash = get_tx_hash_to_skip(session, redis)
+                skip_whole_block = (
+                    skip_tx_hash == "commit"
+                )  # db tx failed at commit level
+                if prefetch_executor:
+                    schedule_block_prefetches(
+                        self,
+                        db,
+                        prefetch_executor,
+                        prefetch_futures,
+                        blocks_list[max(i - block_prefetch_depth, 0) : i],
+                        indexing_transaction_index_sort_order_start_block,
                     )
+                if skip_whole_block:
                     logger.info(
-                        f"index_nethermind.py | index_blocks - fetch_tx_receipts in {time.time() - fetch_tx_receipts_start_time}s"
+                        f"index_nethermind.py | Skipping all txs in block {block.hash} {block.number}"
                     )
-
-                    """
-                    Parse transaction receipts
-                    """
-                    parse_tx_receipts_start_time = time.time()
-
-                    sorted_txs = sort_block_transactions(
-                        block, indexing_transaction_index_sort_order_start_block
-                    )
-
-                    # Parse tx events in each block
-                    for tx in sorted_txs:
-                        tx_hash = web3.toHex(tx["hash"])
-                        tx_target_contract_address = (
-                            tx["to"] if tx["to"] else zero_address
+                    prefetch_futures.pop(block_number, None)
+                    save_skipped_tx(session, redis)
+                    add_indexed_block_to_db(session, block)
+                    add_notifications_to_log(session, web3, block, is_skipped=True)
+                else:
+                    try:
+                        """
+                        Fetch transaction receipts, parse them and fetch JSON metadata
+                        """
+                        prefetch_wait_start_time = time.time()
+                        prefetched_block = get_prefetched_block(
+                            self,
+                            db,
+                            prefetch_futures,
+                            block,
+                            skip_tx_hash,
+                            indexing_transaction_index_sort_order_start_block,
+                        )
+                        metric.save_time(
+                            {"scope": "prefetch_wait"},
+                            start_time=prefetch_wait_start_time,
+                        )
+                        for scope, duration in prefetched_block["durations"].items():
+                            metric.save(duration, {"scope": scope})
+                        logger.info(
+                            f"index_nethermind.py | index_blocks - prefetch_wait in {time.time() - prefetch_wait_start_time}s"
                         )
-                        tx_receipt = tx_receipt_dict[tx_hash]
-                        should_skip_tx = (
-                            tx_target_contract_address == zero_address
-                        ) or (skip_tx_hash is not None and skip_tx_hash == tx_hash)
 
-                        if should_skip_tx:
-                            logger.info(
-                                f"index_nethermind.py | Skipping tx {tx_hash} targeting {tx_target_contract_address}"
-                            )
+                        for _ in prefetched_block["skipped_tx_hashes"]:
                             save_skipped_tx(session, redis)
-                            continue
-                        else:
-                            contract_type = get_contract_type_for_tx(
-                                txs_grouped_by_type, tx, tx_receipt
-                            )
-                            if contract_type:
-                                txs_grouped_by_type[contract_type].append(tx_receipt)
-                    metric.save_time(
-                        {"scope": "parse_tx_receipts"},
-                        start_time=parse_tx_receipts_start_time,
-                    )
-                    logger.info(
-                        f"index_nethermind.py | index_blocks - parse_tx_receipts in {time.time() - parse_tx_receipts_start_time}s"
-                    )
+                        txs_grouped_by_type = prefetched_block["txs_grouped_by_type"]
+                        cid_metadata = prefetched_block["cid_metadata"]
+                        cid_type = prefetched_block["cid_type"]
 
-                    """
-                    Fetch JSON metadata
-                    """
-                    fetch_metadata_start_time = time.time()
-                    # pre-fetch cids asynchronously to not have it block in user_state_update
-                    # and track_state_update
-                    cid_metadata, cid_type = fetch_cid_metadata(
-                        db,
-                        txs_grouped_by_type[ENTITY_MANAGER],
-                    )
-                    logger.info(
-                        f"index_nethermind.py | index_blocks - fetch_metadata in {time.time() - fetch_metadata_start_time}s"
-                    )
-                    # Record the time this took in redis
-                    duration_ms = round(
-                        (time.time() - fetch_metadata_start_time) * 1000
-                    )
-                    record_fetch_metadata_ms(redis, duration_ms)
-                    metric.save_time(
-                        {"scope": "fetch_metadata"},
-                        start_time=fetch_metadata_start_time,
-                    )
-                    logger.info(
-                        f"index_nethermind.py | index_blocks - fetch_metadata in {duration_ms}ms"
-                    )
+                        # Record the time this took in redis
+                        duration_ms = round(
+                            prefetched_block["durations"]["fetch_metadata"] * 1000
+                        )
+                        record_fetch_metadata_ms(redis, duration_ms)
+                        logger.info(
+                            f"index_nethermind.py | index_blocks - fetch_metadata in {duration_ms}ms"
+                        )
 
-                    """
-                    Add block to db
-                    """
-                    add_indexed_block_to_db_start_time = time.time()
-                    add_indexed_block_to_db(session, block)
-                    # Record the time this took in redis
-                    duration_ms = round(
-                        (time.time() - add_indexed_block_to_db_start_time) * 1000
-                    )
-                    record_add_indexed_block_to_db_ms(redis, duration_ms)
-                    metric.save_time(
-                        {"scope": "add_indexed_block_to_db"},
-                        start_time=add_indexed_block_to_db_start_time,
-                    )
-                    logger.info(
-                        f"index_nethermind.py | index_blocks - add_indexed_block_to_db in {duration_ms}ms"
-                    )
+                        """
+                        Add block to db
+                        """
+                        add_indexed_block_to_db_start_time = time.time()
+                        add_indexed_block_to_db(session, block)
+                        # Record the time this took in redis
+                        duration_ms = round(
+                            (time.time() - add_indexed_block_to_db_start_time) * 1000
+                        )
+                        record_add_indexed_block_to_db_ms(redis, duration_ms)
+                        metric.save_time(
+                            {"scope": "add_indexed_block_to_db"},
+                            start_time=add_indexed_block_to_db_start_time,
+                        )
+                        logger.info(
+                            f"index_nethermind.py | index_blocks - add_indexed_block_to_db in {duration_ms}ms"
+                        )
 
-                    """
-                    Add state changes in block to db (users, tracks, etc.)
-                    """
-                    process_state_changes_start_time = time.time()
-                    # bulk process operations once all tx's for block have been parsed
-                    # and get changed entity IDs for cache clearing
-                    # after session commit
-                    process_state_changes(
-                        self,
-                        session,
-                        cid_metadata,
-                        txs_grouped_by_type,
-                        block,
-                    )
-                    metric.save_time(
-                        {"scope": "process_state_changes"},
-                        start_time=process_state_changes_start_time,
-                    )
-                    logger.info(
-                        f"index_nethermind.py | index_blocks - process_state_changes in {time.time() - process_state_changes_start_time}s"
-                    )
-                    is_save_cid_enabled = shared_config["discprov"]["enable_save_cid"]
-                    if is_save_cid_enabled:
                         """
-                        Add CID Metadata to db (cid -> json blob, etc.)
+                        Add state changes in block to db (users, tracks, etc.)
                         """
-                        save_cid_metadata_time = time.time()
+                        process_state_changes_start_time = time.time()
                         # bulk process operations once all tx's for block have been parsed
                         # and get changed entity IDs for cache clearing
                         # after session commit
-                        save_cid_metadata(session, cid_metadata, cid_type)
+                        changed_entity_ids = process_state_changes(
+                            self,
+                            session,
+                            cid_metadata,
+                            txs_grouped_by_type,
+                            block,
+                        )
+                        entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+                            session, changed_entity_ids
+                        )
                         metric.save_time(
-                            {"scope": "save_cid_metadata"},
-                            start_time=save_cid_metadata_time,
+                            {"scope": "process_state_changes"},
+                            start_time=process_state_changes_start_time,
                         )
                         logger.info(
-                            f"index.py | index_blocks - save_cid_metadata in {time.time() - save_cid_metadata_time}s"
+                            f"index_nethermind.py | index_blocks - process_state_changes in {time.time() - process_state_changes_start_time}s"
                         )
 
-                except Exception as e:
+                        """
+                        Add notifications of the state changes to the notification log
+                        """
+                        notification_log_start_time = time.time()
+                        add_notifications_to_log(session, web3, block)
+                        metric.save_time(
+                            {"scope": "add_notifications_to_log"},
+                            start_time=notification_log_start_time,
+                        )
+                        logger.info(
+                            f"index_nethermind.py | index_blocks - add_notifications_to_log in {time.time() - notification_log_start_time}s"
+                        )
+                        is_save_cid_enabled = shared_config["discprov"][
+                            "enable_save_cid"
+                        ]
+                        if is_save_cid_enabled:
+                            """
+                            Add CID Metadata to db (cid -> json blob, etc.)
+                            """
+                            save_cid_metadata_time = time.time()
+                            # bulk process operations once all tx's for block have been parsed
+                            # and get changed entity IDs for cache clearing
+                            # after session commit
+                            save_cid_metadata(session, cid_metadata, cid_type)
+                            metric.save_time(
+                                {"scope": "save_cid_metadata"},
+                                start_time=save_cid_metadata_time,
+                            )
+                            logger.info(
+                                f"index.py | index_blocks - save_cid_metadata in {time.time() - save_cid_metadata_time}s"
+                            )
+
+                    except Exception as e:
 
+                        blockhash = web3.toHex(block_hash)
+                        indexing_error = IndexingError(
+                            "prefetch-cids", block_number, blockhash, None, str(e)
+                        )
+                        create_and_raise_indexing_error(indexing_error, redis)
+
+                try:
+                    commit_start_time = time.time()
+                    session.commit()
+                    metric.save_time(
+                        {"scope": "commit_time"}, start_time=commit_start_time
+                    )
+                    logger.info(
+                        f"index_nethermind.py | session committed to db for block={block_number} in {time.time() - commit_start_time}s"
+                    )
+                except Exception as e:
+                    # Use 'commit' as the tx hash here.
+                    # We're at a point where the whole block can't be added to the database, so
+                    # we should skip it in favor of making progress
                     blockhash = web3.toHex(block_hash)
                     indexing_error = IndexingError(
-                        "prefetch-cids", block_number, blockhash, None, str(e)
+                        "session.commit", block_number, blockhash, "commit", str(e)
                     )
                     create_and_raise_indexing_error(indexing_error, redis)
-
-            try:
-                commit_start_time = time.time()
-                session.commit()
-                metric.save_time({"scope": "commit_time"}, start_time=commit_start_time)
-                logger.info(
-                    f"index_nethermind.py | session committed to db for block={block_number} in {time.time() - commit_start_time}s"
-                )
-            except Exception as e:
-                # Use 'commit' as the tx hash here.
-                # We're at a point where the whole block can't be added to the database, so
-                # we should skip it in favor of making progress
-                blockhash = web3.toHex(block_hash)
-                indexing_error = IndexingError(
-                    "session.commit", block_number, blockhash, "commit", str(e)
-                )
-                create_and_raise_indexing_error(indexing_error, redis)
-            try:
-                # Check the last block's timestamp for updating the trending challenge
-                [should_update, date] = should_trending_challenge_update(
-                    session, latest_block_timestamp
-                )
-                if should_update:
-                    celery.send_task(
-                        "calculate_trending_challenges", kwargs={"date": date}
+                try:
+                    # Check the last block's timestamp for updating the trending challenge
+                    [should_update, date] = should_trending_challenge_update(
+                        session, latest_block_timestamp
                     )
-            except Exception as e:
-                # Do not throw error, as this should not stop indexing
-                logger.error(
-                    f"index_nethermind.py | Error in calling update trending challenge {e}",
-                    exc_info=True,
-                )
-            if skip_tx_hash:
-                clear_indexing_error(redis)
+                    if should_update:
+                        celery.send_task(
+                            "calculate_trending_challenges", kwargs={"date": date}
+                        )
+                except Exception as e:
+                    # Do not throw error, as this should not stop indexing
+                    logger.error(
+                        f"index_nethermind.py | Error in calling update trending challenge {e}",
+                        exc_info=True,
+                    )
+                if skip_tx_hash:
+                    clear_indexing_error(redis)
 
-        add_indexed_block_to_redis(block, redis)
-        logger.info(
-            f"index_nethermind.py | update most recently processed block complete for block=${block_number}"
-        )
+            # clear cached entities changed by the block now that it is committed
+            remove_cached_entities(redis, entity_ids_to_invalidate)
+            add_indexed_block_to_redis(block, redis)
+            logger.info(
+                f"index_nethermind.py | update most recently processed block complete for block=${block_number}"
+            )
 
-        # Record the time this took in redis
-        metric.save_time({"scope": "full"})
-        duration_ms = round(time.time() - start_time * 1000)
-        record_index_blocks_ms(redis, duration_ms)
+            # Record the time this took in redis
+            metric.save_time({"scope": "full"})
+            duration_ms = round(time.time() - start_time * 1000)
+            record_index_blocks_ms(redis, duration_ms)
 
-        # Sweep records older than 30 days every day
-        if block_number % BLOCKS_PER_DAY == 0:
-            sweep_old_index_blocks_ms(redis, 30)
-            sweep_old_fetch_metadata_ms(redis, 30)
-            sweep_old_add_indexed_block_to_db_ms(redis, 30)
+            # Sweep records older than 30 days every day
+            if block_number % BLOCKS_PER_DAY == 0:
+                sweep_old_index_blocks_ms(redis, 30)
+                sweep_old_fetch_metadata_ms(redis, 30)
+                sweep_old_add_indexed_block_to_db_ms(redis, 30)
+    finally:
+        if prefetch_executor:
+            # Drop any lookahead work if indexing stopped early, e.g. on an error
+            prefetch_executor.shutdown(wait=False, cancel_futures=True)
 
     if num_blocks > 0:
         logger.info(f"index_nethermind.py | index_blocks | Indexed {num_blocks} blocks")
@@ -713,6 +873,7 @@ def revert_blocks(self, db, revert_blocks_list):
     )
     logger.info(revert_blocks_list)
 
+    reverted_entity_ids: Dict[str, Set[int]] = defaultdict(set)
     with db.scoped_session() as session:
 
         rebuild_playlist_index = False
@@ -943,6 +1104,11 @@ def revert_blocks(self, db, revert_blocks_list):
                 logger.info(f"Reverting track route {track_route_to_revert}")
                 session.delete(track_route_to_revert)
 
+            # Remove notifications of the block from the notification log
+            session.query(NotificationLog).filter(
+                NotificationLog.blocknumber == revert_block_number
+            ).delete()
+
             # Remove outdated block entry
             session.query(Block).filter(Block.blockhash == revert_hash).delete()
 
@@ -951,6 +1117,28 @@ def revert_blocks(self, db, revert_blocks_list):
             )
             rebuild_track_index = rebuild_track_index or bool(revert_track_entries)
             rebuild_user_index = rebuild_user_index or bool(revert_user_entries)
+
+            reverted_entity_ids[EntityType.PLAYLIST].update(
+                playlist.playlist_id for playlist in revert_playlist_entries
+            )
+            reverted_entity_ids[EntityType.TRACK].update(
+                track.track_id for track in revert_track_entries
+            )
+            reverted_entity_ids[EntityType.USER].update(
+                user.user_id for user in revert_user_entries
+            )
+            reverted_entity_ids[EntityType.FOLLOW].update(
+                (follow.follower_user_id, follow.followee_user_id)
+                for follow in revert_follow_entries
+            )
+        entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+            session, reverted_entity_ids
+        )
+    remove_cached_entities(update_task.redis, entity_ids_to_invalidate)
+    if reverted_entity_ids[EntityType.FOLLOW]:
+        invalidate_social_graphs(update_task.redis)
+    if reverted_entity_ids[EntityType.TRACK]:
+        invalidate_random_tracks_pool(update_task.redis)
     # TODO - if we enable revert, need to set the most_recent_indexed_block_redis_key key in redis
 
 
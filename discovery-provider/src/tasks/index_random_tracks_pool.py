@@ -0,0 +1,65 @@
+import logging
+import time
+
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+from src.utils.random_tracks_pool import (
+    get_random_tracks_pool_blocknumber,
+    rebuild_random_tracks_pool,
+    update_random_tracks_pool,
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_RANDOM_TRACKS_POOL_LOCK = "index_random_tracks_pool_lock"
+
+
+def _index_random_tracks_pool(session, redis):
+    blocknumber = get_random_tracks_pool_blocknumber(redis)
+    if blocknumber is None:
+        rebuild_random_tracks_pool(session, redis)
+    else:
+        num_tracks = update_random_tracks_pool(session, redis, blocknumber)
+        if num_tracks:
+            logger.info(
+                f"index_random_tracks_pool.py | updated {num_tracks} tracks after block {blocknumber}"
+            )
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="index_random_tracks_pool", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def index_random_tracks_pool(self):
+    # Cache custom task class properties
+    # Details regarding custom task context can be found in wiki
+    # Custom Task definition can be found in src/app.py
+    db = index_random_tracks_pool.db
+    redis = index_random_tracks_pool.redis
+    # Define lock acquired boolean
+    have_lock = False
+    # Define redis lock object
+    update_lock = redis.lock(INDEX_RANDOM_TRACKS_POOL_LOCK, timeout=600)
+    try:
+        # Attempt to acquire lock - do not block if unable to acquire
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+
+            with db.scoped_session() as session:
+                _index_random_tracks_pool(session, redis)
+
+            logger.debug(
+                f"index_random_tracks_pool.py | Finished in {time.time() - start_time} sec"
+            )
+        else:
+            logger.info(
+                "index_random_tracks_pool.py | Failed to acquire index_random_tracks_pool_lock"
+            )
+    except Exception as e:
+        logger.error(
+            "index_random_tracks_pool.py | Fatal error in main loop", exc_info=True
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
@@ -47,6 +47,7 @@ from src.utils.config import shared_config
 from src.utils.helpers import get_solana_tx_token_balances
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.redis_constants import (
+    indexed_sol_slot_channel,
     latest_sol_rewards_manager_db_tx_key,
     latest_sol_rewards_manager_program_tx_key,
     latest_sol_rewards_manager_slot_key,
@@ -617,8 +618,10 @@ def process_solana_rewards_manager(
     )
     if last_tx:
         redis.set(latest_sol_rewards_manager_slot_key, last_tx["slot"])
+        redis.publish(indexed_sol_slot_channel, last_tx["slot"])
     elif latest_global_slot is not None:
         redis.set(latest_sol_rewards_manager_slot_key, latest_global_slot)
+        redis.publish(indexed_sol_slot_channel, latest_global_slot)
 
 
 # ####### CELERY TASKS ####### #
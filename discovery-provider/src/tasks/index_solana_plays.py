@@ -24,6 +24,7 @@ from src.utils.config import shared_config
 from src.utils.helpers import split_list
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.redis_constants import (
+    indexed_sol_slot_channel,
     latest_sol_play_db_tx_key,
     latest_sol_play_program_tx_key,
     latest_sol_plays_slot_key,
@@ -32,6 +33,9 @@ from src.utils.redis_constants import (
 TRACK_LISTEN_PROGRAM = shared_config["solana"]["track_listen_count_address"]
 SIGNER_GROUP = shared_config["solana"]["signer_group_address"]
 SECP_PROGRAM = "KeccakSecp256k11111111111111111111111111111"
+# Fetch the transactions of a batch in batched JSON-RPC requests rather than
+# one request per transaction from a thread pool
+BATCH_FETCH_TXS = shared_config["solana"].getboolean("plays_batch_fetch", fallback=True)
 
 REDIS_TX_CACHE_QUEUE_PREFIX = "plays-tx-cache-queue"
 
@@ -161,14 +165,24 @@ def is_valid_tx(account_keys):
 
 
 def parse_sol_play_transaction(solana_client_manager: SolanaClientManager, tx_sig: str):
+    fetch_start_time = time.time()
     try:
-        fetch_start_time = time.time()
         tx_info = solana_client_manager.get_sol_tx_info(tx_sig)
-        fetch_completion_time = time.time()
-        fetch_time = fetch_completion_time - fetch_start_time
-        logger.info(
-            f"index_solana_plays.py | Got transaction: {tx_sig} in {fetch_time}"
+    except Exception as e:
+        logger.error(
+            f"index_solana_plays.py | Error processing {tx_sig}, {e}", exc_info=True
         )
+        raise e
+    fetch_completion_time = time.time()
+    fetch_time = fetch_completion_time - fetch_start_time
+    logger.info(f"index_solana_plays.py | Got transaction: {tx_sig} in {fetch_time}")
+    return parse_sol_play_tx_info(tx_info, tx_sig)
+
+
+def parse_sol_play_tx_info(tx_info, tx_sig: str):
+    """Returns the properties of the Play of a fetched transaction, or None if it
+    has none"""
+    try:
         meta = tx_info["result"]["meta"]
         error = meta["err"]
 
@@ -340,26 +354,17 @@ is found - these limiting parameters are defined as TX_SIGNATURES_MAX_BATCHES, T
 """
 
 
-def parse_sol_tx_batch(
-    db, solana_client_manager, redis, tx_sig_batch_records, retries=10
+def fetch_sol_plays_from_thread_pool(
+    solana_client_manager, tx_sig_batch_records, retries=10
 ):
     """
-    Parse a batch of solana transactions in parallel by calling parse_sol_play_transaction
-    with a ThreaPoolExecutor
+    Fetch and parse a batch of solana transactions in parallel by calling
+    parse_sol_play_transaction with a ThreaPoolExecutor
 
     This function also has a recursive retry upto a certain limit in case a future doesn't complete
     within the alloted time. It clears the futures thread queue and the batch is retried
     """
-    batch_start_time = time.time()
-    challenge_bus_events = []
-    plays = []
-
-    # Last record in this batch to be cached
-    # Important to note that the batch records are in time DESC order
-    last_tx_in_batch = tx_sig_batch_records[0]
-    challenge_bus = index_solana_plays.challenge_event_bus
-
-    # Process each batch in parallel
+    results = []
     with concurrent.futures.ThreadPoolExecutor() as executor:
         parse_sol_tx_futures = {
             executor.submit(
@@ -377,41 +382,7 @@ def parse_sol_tx_batch(
                 # can be None so check the value exists
                 result = future.result()
                 if result:
-                    (
-                        user_id,
-                        track_id,
-                        created_at,
-                        source,
-                        location,
-                        slot,
-                        tx_sig,
-                    ) = result
-
-                    # Append plays to a list that will be written if all plays are successfully retrieved
-                    # from the rpc pool
-                    play: PlayInfo = {
-                        "user_id": user_id,
-                        "play_item_id": track_id,
-                        "created_at": created_at,
-                        "updated_at": datetime.now(),
-                        "source": source,
-                        "city": location.get("city"),
-                        "region": location.get("region"),
-                        "country": location.get("country"),
-                        "slot": slot,
-                        "signature": tx_sig,
-                    }
-                    plays.append(play)
-                    # Only enqueue a challenge event if it's *not*
-                    # an anonymous listen
-                    if user_id is not None:
-                        challenge_bus_events.append(
-                            {
-                                "slot": slot,
-                                "user_id": user_id,
-                                "created_at": created_at.timestamp(),
-                            }
-                        )
+                    results.append(result)
 
         except Exception as exc:
             logger.error(
@@ -425,16 +396,92 @@ def parse_sol_tx_batch(
 
             # if we have retries left, recursively call this function again
             if retries > 0:
-                return parse_sol_tx_batch(
-                    db, solana_client_manager, redis, tx_sig_batch_records, retries - 1
+                return fetch_sol_plays_from_thread_pool(
+                    solana_client_manager, tx_sig_batch_records, retries - 1
                 )
 
             # if no more retries, raise
             raise exc
+    return results
+
+
+def fetch_sol_plays_batched(solana_client_manager, tx_sig_batch_records):
+    """
+    Fetch a batch of solana transactions in batched getTransaction requests, parsing
+    the transactions of each request as it completes. Only the transactions that
+    failed are fetched again.
+    """
+    results = []
+    for tx_sig, tx_info in solana_client_manager.get_sol_tx_infos(tx_sig_batch_records):
+        # Returns the properties for a Play object to be created in the db
+        # can be None so check the value exists
+        result = parse_sol_play_tx_info(tx_info, tx_sig)
+        if result:
+            results.append(result)
+    return results
+
 
-        # if the thread pool executor completes successfully without raising an exception
-        # the data is successfully fetched so we can add it to the db session and dispatch
-        # events to challenge bus
+def parse_sol_tx_batch(
+    db, solana_client_manager, redis, tx_sig_batch_records, retries=10
+):
+    """
+    Parse a batch of solana transactions and write their plays, fetching the
+    transactions in batched requests or from a thread pool depending on
+    BATCH_FETCH_TXS
+    """
+    batch_start_time = time.time()
+    challenge_bus_events = []
+    plays = []
+
+    # Last record in this batch to be cached
+    # Important to note that the batch records are in time DESC order
+    last_tx_in_batch = tx_sig_batch_records[0]
+    challenge_bus = index_solana_plays.challenge_event_bus
+
+    if BATCH_FETCH_TXS:
+        results = fetch_sol_plays_batched(solana_client_manager, tx_sig_batch_records)
+    else:
+        results = fetch_sol_plays_from_thread_pool(
+            solana_client_manager, tx_sig_batch_records, retries
+        )
+
+    # if fetching completes successfully without raising an exception
+    # the data is successfully fetched so we can add it to the db session and dispatch
+    # events to challenge bus
+    for (
+        user_id,
+        track_id,
+        created_at,
+        source,
+        location,
+        slot,
+        tx_sig,
+    ) in results:
+        # Append plays to a list that will be written if all plays are successfully retrieved
+        # from the rpc pool
+        play: PlayInfo = {
+            "user_id": user_id,
+            "play_item_id": track_id,
+            "created_at": created_at,
+            "updated_at": datetime.now(),
+            "source": source,
+            "city": location.get("city"),
+            "region": location.get("region"),
+            "country": location.get("country"),
+            "slot": slot,
+            "signature": tx_sig,
+        }
+        plays.append(play)
+        # Only enqueue a challenge event if it's *not*
+        # an anonymous listen
+        if user_id is not None:
+            challenge_bus_events.append(
+                {
+                    "slot": slot,
+                    "user_id": user_id,
+                    "created_at": created_at.timestamp(),
+                }
+            )
 
     # In the case where an entire batch is comprised of errors, wipe the cache to avoid a future find intersection loop
     # For example, if the transactions between the latest cached value and database tail are entirely errors, no Play record will be inserted.
@@ -666,12 +713,14 @@ def process_solana_plays(solana_client_manager: SolanaClientManager, redis: Redi
             f"index_solana_plays.py | Setting latest plays slot {latest_play_slot}"
         )
         redis.set(latest_sol_plays_slot_key, latest_play_slot)
+        redis.publish(indexed_sol_slot_channel, latest_play_slot)
 
     elif latest_global_slot is not None:
         logger.info(
             f"index_solana_plays.py | Setting latest plays slot as the latest global slot {latest_global_slot}"
         )
         redis.set(latest_sol_plays_slot_key, latest_global_slot)
+        redis.publish(indexed_sol_slot_channel, latest_global_slot)
 
 
 @celery.task(name="index_solana_plays", bind=True)
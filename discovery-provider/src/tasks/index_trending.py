@@ -8,8 +8,8 @@ from sqlalchemy.orm.session import Session
 from src.models.indexing.block import Block
 from src.models.tracks.track import Track
 from src.queries.get_trending_tracks import (
+    generate_all_unpopulated_trending_from_mat_views,
     generate_unpopulated_trending,
-    generate_unpopulated_trending_from_mat_views,
     make_trending_cache_key,
 )
 from src.queries.get_underground_trending import (
@@ -149,35 +149,40 @@ def index_trending(self, db: SessionManager, redis: Redis, timestamp):
             if strategy.use_mat_view:
                 strategy.update_track_score_query(session)
 
+        # Every trending is written in one pipeline once it has all been generated
+        pipe = redis.pipeline()
         for version in trending_track_versions:
             strategy = trending_strategy_factory.get_strategy(
                 TrendingType.TRACKS, version
             )
-            for genre in genres:
-                for time_range in time_ranges:
-                    cache_start_time = time.time()
-                    if strategy.use_mat_view:
-                        res = generate_unpopulated_trending_from_mat_views(
-                            session=session,
-                            genre=genre,
-                            time_range=time_range,
-                            strategy=strategy,
-                        )
-                    else:
-                        res = generate_unpopulated_trending(
-                            session=session,
-                            genre=genre,
-                            time_range=time_range,
-                            strategy=strategy,
-                        )
-                    key = make_trending_cache_key(time_range, genre, version)
-                    set_json_cached_key(redis, key, res)
-                    cache_end_time = time.time()
-                    total_time = cache_end_time - cache_start_time
-                    logger.info(
-                        f"index_trending.py | Cached trending ({version.name} version) \
-                        for {genre}-{time_range} in {total_time} seconds"
+            cache_start_time = time.time()
+            if strategy.use_mat_view:
+                trending = generate_all_unpopulated_trending_from_mat_views(
+                    session=session,
+                    genres=genres,
+                    time_ranges=time_ranges,
+                    strategy=strategy,
+                )
+            else:
+                trending = {
+                    (time_range, genre): generate_unpopulated_trending(
+                        session=session,
+                        genre=genre,
+                        time_range=time_range,
+                        strategy=strategy,
                     )
+                    for genre in genres
+                    for time_range in time_ranges
+                }
+            for (time_range, genre), res in trending.items():
+                key = make_trending_cache_key(time_range, genre, version)
+                set_json_cached_key(pipe, key, res)
+            cache_end_time = time.time()
+            total_time = cache_end_time - cache_start_time
+            logger.info(
+                f"index_trending.py | Generated trending ({version.name} version) \
+                for {len(genres)} genres in {total_time} seconds"
+            )
 
         # Cache underground trending
         underground_trending_versions = trending_strategy_factory.get_versions_for_type(
@@ -190,14 +195,20 @@ def index_trending(self, db: SessionManager, redis: Redis, timestamp):
             cache_start_time = time.time()
             res = make_get_unpopulated_tracks(session, redis, strategy)()
             key = make_underground_trending_cache_key(version)
-            set_json_cached_key(redis, key, res)
+            set_json_cached_key(pipe, key, res)
             cache_end_time = time.time()
             total_time = cache_end_time - cache_start_time
             logger.info(
-                f"index_trending.py | Cached underground trending ({version.name} version) \
+                f"index_trending.py | Generated underground trending ({version.name} version) \
                 in {total_time} seconds"
             )
 
+        cache_start_time = time.time()
+        pipe.execute()
+        logger.info(
+            f"index_trending.py | Cached trending in {time.time() - cache_start_time} seconds"
+        )
+
     update_end = time.time()
     update_total = update_end - update_start
     metric.save_time()
@@ -0,0 +1,60 @@
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm.session import Session
+from src.models.notifications.notification_log import NotificationLog
+from src.queries.notifications import (
+    get_entity_notifications,
+    to_notification_log_entry,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def add_notifications_to_log(session: Session, web3, block, is_skipped=False):
+    """
+    Adds the notifications of the block's state changes to the notification log in
+    the session of the block, so they are committed along with the block. Skipped
+    blocks are logged without notifications so /notifications can tell the log
+    covers them.
+    """
+    notifications = []
+    if not is_skipped:
+
+        def get_block_timestamps():
+            # only fetched for blocks that updated public playlists
+            parent_block = web3.eth.get_block(block.parentHash)
+            return (parent_block.timestamp, block.timestamp)
+
+        notifications = get_entity_notifications(
+            session, block.number - 1, block.number, get_block_timestamps
+        )
+
+    session.add(
+        NotificationLog(
+            blocknumber=block.number,
+            notifications=[
+                to_notification_log_entry(notification)
+                for notification in notifications
+            ],
+        )
+    )
+    logger.debug(
+        f"notification_log.py | logged {len(notifications)} notifications for block {block.number}"
+    )
+
+
+def prune_notification_log(session: Session, retention_blocks: int) -> int:
+    """
+    Deletes the notifications logged more than retention_blocks blocks before the latest
+    logged block. /notifications queries the blocks that are no longer logged from the
+    entity tables instead. Returns the number of blocks pruned.
+    """
+    latest_blocknumber = session.query(func.max(NotificationLog.blocknumber)).scalar()
+    if latest_blocknumber is None:
+        return 0
+    return (
+        session.query(NotificationLog)
+        .filter(NotificationLog.blocknumber <= latest_blocknumber - retention_blocks)
+        .delete(synchronize_session=False)
+    )
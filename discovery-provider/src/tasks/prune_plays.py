@@ -4,6 +4,7 @@ from datetime import datetime
 
 from sqlalchemy import text
 from src.tasks.celery_app import celery
+from src.tasks.notification_log import prune_notification_log
 from src.utils.prometheus_metric import save_duration_metric
 
 logger = logging.getLogger(__name__)
@@ -95,6 +96,20 @@ def prune_plays(self):
                 f"prune_plays.py | Finished pruning and archiving to \
                 {PLAYS_ARCHIVE_TABLE_NAME} in: {time.time()-start_time} sec"
             )
+
+            # /notifications queries older blocks from the entity tables
+            start_time = time.time()
+            retention_blocks = int(
+                prune_plays.shared_config["discprov"][
+                    "notification_log_retention_blocks"
+                ]
+            )
+            with db.scoped_session() as session:
+                pruned_blocks = prune_notification_log(session, retention_blocks)
+
+            logger.info(
+                f"prune_plays.py | Pruned {pruned_blocks} blocks from the notification log in: {time.time()-start_time} sec"
+            )
         else:
             logger.info("prune_plays.py | Failed to acquire prune_plays_lock")
     except Exception as e:
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timezone
-from typing import Any, List, Tuple, TypedDict, Union
+from typing import Any, Dict, List, Set, Tuple, TypedDict, Union
 
 import requests
 from redis import Redis
@@ -9,6 +9,11 @@ from src.models.tracks.track import Track
 from src.models.users.user import User
 from src.tasks.celery_app import celery
 from src.utils.config import shared_config
+from src.utils.entity_cache import (
+    TRACK,
+    get_entity_ids_to_invalidate,
+    remove_cached_entities,
+)
 from src.utils.eth_contracts_helpers import fetch_all_registered_content_nodes
 from src.utils.prometheus_metric import (
     PrometheusMetric,
@@ -77,6 +82,7 @@ def update_tracks_is_available_status(db: SessionManager, redis: Redis) -> None:
     for i in range(0, len(all_unavailable_track_ids), BATCH_SIZE):
         unavailable_track_ids_batch = all_unavailable_track_ids[i : i + BATCH_SIZE]
         try:
+            entity_ids_to_invalidate: Dict[str, Set[int]] = {}
             with db.scoped_session() as session:
                 track_ids_to_replica_set = query_replica_set_by_track_id(
                     session, unavailable_track_ids_batch
@@ -109,6 +115,7 @@ def update_tracks_is_available_status(db: SessionManager, redis: Redis) -> None:
 
                 # Update tracks with is_available status
                 tracks = query_tracks_by_track_ids(session, unavailable_track_ids_batch)
+                changed_track_ids = set()
                 for track in tracks:
                     is_available = track_id_to_is_available_status[track.track_id]
 
@@ -116,6 +123,12 @@ def update_tracks_is_available_status(db: SessionManager, redis: Redis) -> None:
                     if not is_available:
                         track.is_available = False
                         track.is_delete = True
+                        changed_track_ids.add(track.track_id)
+
+                entity_ids_to_invalidate = get_entity_ids_to_invalidate(
+                    session, {TRACK: changed_track_ids}
+                )
+            remove_cached_entities(redis, entity_ids_to_invalidate)
 
         except Exception as e:
             logger.warn(
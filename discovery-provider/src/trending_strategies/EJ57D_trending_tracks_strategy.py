@@ -59,77 +59,111 @@ class TrendingTracksStrategyEJ57D(BaseTrendingStrategy):
         )
 
     def update_track_score_query(self, session):
+        """
+        Updates the track_trending_scores of this strategy to the scores calculated
+        from the trending views.
+
+        Only the scores that changed are written, rather than deleting and inserting
+        every score, so unchanged tracks are not rewritten on every refresh. Time
+        decay is counted in whole days, so the score of a track without new plays,
+        reposts, saves or karma changes at most once a day.
+        """
         start_time = time.time()
         trending_track_query = text(
             """
-            begin;
-                DELETE FROM track_trending_scores WHERE type=:type AND version=:version;
-                INSERT INTO track_trending_scores
-                    (track_id, genre, type, version, time_range, score, created_at)
-                    select
-                        tp.track_id,
-                        tp.genre,
-                        :type,
-                        :version,
-                        :week_time_range,
-                        CASE
-                        WHEN tp.owner_follower_count < :y
-                            THEN 0
-                        WHEN EXTRACT(DAYS from now() - aip.created_at) > :week
-                            THEN greatest(1.0/:q, pow(:q, greatest(-10, 1.0 - 1.0*EXTRACT(DAYS from now() - aip.created_at)/:week))) * (:N * aip.week_listen_counts + :F * tp.repost_week_count + :O * tp.save_week_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
-                        ELSE (:N * aip.week_listen_counts + :F * tp.repost_week_count + :O * tp.save_week_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
-                        END as week_score,
-                        now()
-                    from trending_params tp
-                    inner join aggregate_interval_plays aip
-                        on tp.track_id = aip.track_id;
-                INSERT INTO track_trending_scores
-                    (track_id, genre, type, version, time_range, score, created_at)
-                    select
-                        tp.track_id,
-                        tp.genre,
-                        :type,
-                        :version,
-                        :month_time_range,
-                        CASE
-                        WHEN tp.owner_follower_count < :y
-                            THEN 0
-                        WHEN EXTRACT(DAYS from now() - aip.created_at) > :month
-                            THEN greatest(1.0/:q, pow(:q, greatest(-10, 1.0 - 1.0*EXTRACT(DAYS from now() - aip.created_at)/:month))) * (:N * aip.month_listen_counts + :F * tp.repost_month_count + :O * tp.save_month_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
-                        ELSE (:N * aip.month_listen_counts + :F * tp.repost_month_count + :O * tp.save_month_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
-                        END as month_score,
-                        now()
-                    from trending_params tp
-                    inner join aggregate_interval_plays aip
-                        on tp.track_id = aip.track_id;
+            WITH new_scores AS (
+                select
+                    tp.track_id,
+                    tp.genre,
+                    :week_time_range as time_range,
+                    CASE
+                    WHEN tp.owner_follower_count < :y
+                        THEN 0
+                    WHEN EXTRACT(DAYS from now() - aip.created_at) > :week
+                        THEN greatest(1.0/:q, pow(:q, greatest(-10, 1.0 - 1.0*EXTRACT(DAYS from now() - aip.created_at)/:week))) * (:N * aip.week_listen_counts + :F * tp.repost_week_count + :O * tp.save_week_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
+                    ELSE (:N * aip.week_listen_counts + :F * tp.repost_week_count + :O * tp.save_week_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
+                    END as score
+                from trending_params tp
+                inner join aggregate_interval_plays aip
+                    on tp.track_id = aip.track_id
+                union all
+                select
+                    tp.track_id,
+                    tp.genre,
+                    :month_time_range as time_range,
+                    CASE
+                    WHEN tp.owner_follower_count < :y
+                        THEN 0
+                    WHEN EXTRACT(DAYS from now() - aip.created_at) > :month
+                        THEN greatest(1.0/:q, pow(:q, greatest(-10, 1.0 - 1.0*EXTRACT(DAYS from now() - aip.created_at)/:month))) * (:N * aip.month_listen_counts + :F * tp.repost_month_count + :O * tp.save_month_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
+                    ELSE (:N * aip.month_listen_counts + :F * tp.repost_month_count + :O * tp.save_month_count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
+                    END as score
+                from trending_params tp
+                inner join aggregate_interval_plays aip
+                    on tp.track_id = aip.track_id
+                union all
+                select
+                    tp.track_id,
+                    tp.genre,
+                    :all_time_time_range as time_range,
+                    CASE
+                    WHEN tp.owner_follower_count < :y
+                        THEN 0
+                    ELSE (:N * ap.count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
+                    END as score
+                from trending_params tp
+                inner join aggregate_plays ap
+                    on tp.track_id = ap.play_item_id
+                inner join tracks t
+                    on ap.play_item_id = t.track_id
+                where -- same filtering for aggregate_interval_plays
+                    t.is_current is True AND
+                    t.is_delete is False AND
+                    t.is_unlisted is False AND
+                    t.stem_of is Null
+            ),
+            upserted_scores AS (
                 INSERT INTO track_trending_scores
                     (track_id, genre, type, version, time_range, score, created_at)
                     select
-                        tp.track_id,
-                        tp.genre,
+                        track_id,
+                        genre,
                         :type,
                         :version,
-                        :all_time_time_range,
-                        CASE
-                        WHEN tp.owner_follower_count < :y
-                            THEN 0
-                        ELSE (:N * ap.count + :R * tp.repost_count + :i * tp.save_count) * tp.karma
-                        END as all_time_score,
+                        time_range,
+                        score,
                         now()
-                    from trending_params tp
-                    inner join aggregate_plays ap
-                        on tp.track_id = ap.play_item_id
-                    inner join tracks t
-                        on ap.play_item_id = t.track_id
-                    where -- same filtering for aggregate_interval_plays
-                        t.is_current is True AND
-                        t.is_delete is False AND
-                        t.is_unlisted is False AND
-                        t.stem_of is Null;
-            commit;
+                    from new_scores
+                ON CONFLICT (track_id, type, version, time_range)
+                DO UPDATE SET
+                    genre = EXCLUDED.genre,
+                    score = EXCLUDED.score,
+                    created_at = EXCLUDED.created_at
+                WHERE
+                    track_trending_scores.score IS DISTINCT FROM EXCLUDED.score OR
+                    track_trending_scores.genre IS DISTINCT FROM EXCLUDED.genre
+                RETURNING 1
+            ),
+            deleted_scores AS (
+                DELETE FROM track_trending_scores tts
+                WHERE
+                    tts.type = :type AND
+                    tts.version = :version AND
+                    NOT EXISTS (
+                        select 1
+                        from new_scores
+                        where
+                            new_scores.track_id = tts.track_id AND
+                            new_scores.time_range = tts.time_range
+                    )
+                RETURNING 1
+            )
+            SELECT
+                (SELECT count(*) FROM upserted_scores) as upserted,
+                (SELECT count(*) FROM deleted_scores) as deleted;
         """
         )
-        session.execute(
+        upserted, deleted = session.execute(
             trending_track_query,
             {
                 "week": T["week"],
@@ -147,15 +181,19 @@ class TrendingTracksStrategyEJ57D(BaseTrendingStrategy):
                 "month_time_range": "month",
                 "all_time_time_range": "allTime",
             },
-        )
+        ).first()
+        session.commit()
         duration = time.time() - start_time
         logger.info(
-            f"trending_tracks_strategy | Finished calculating trending scores in {duration} seconds",
+            f"trending_tracks_strategy | Finished calculating trending scores in {duration} seconds, \
+            {upserted} scores written and {deleted} deleted",
             extra={
                 "id": "trending_strategy",
                 "type": self.trending_type.name,
                 "version": self.version.name,
                 "duration": duration,
+                "upserted": upserted,
+                "deleted": deleted,
             },
         )
 
@@ -0,0 +1,114 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Awaitable, Callable, Iterable, Optional, Set, TypeVar
+
+import aiohttp
+from src.utils.endpoint_scoreboard import EndpointScoreboard
+
+T = TypeVar("T")
+
+DNS_CACHE_TTL_SECONDS = 300
+
+
+class AsyncEndpointClient:
+    """
+    Runs requests to a set of interchangeable endpoints, e.g. content nodes or RPC
+    endpoints, ranked by how they did so far.
+
+    Requests run on an event loop in a daemon thread with one pooled aiohttp session,
+    so one client can be shared by sync and async callers from any thread. The loop is
+    recreated in forked celery workers since threads do not survive a fork.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_connections: int,
+        max_connections_per_endpoint: int,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        self._name = name
+        self._max_connections = max_connections
+        self._max_connections_per_endpoint = max_connections_per_endpoint
+        self._timeout = timeout
+        # Latency / error history per endpoint, safe to share between threads
+        self.scoreboard = EndpointScoreboard()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_pid: Optional[int] = None
+        self._loop_lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def get_event_loop(self) -> asyncio.AbstractEventLoop:
+        """Returns the event loop all requests run on, started on first use"""
+        with self._loop_lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name=self._name, daemon=True
+                ).start()
+                self._loop = loop
+                self._loop_pid = os.getpid()
+                self._session = None
+            return self._loop
+
+    def get_session(self) -> aiohttp.ClientSession:
+        # Only called from the client's event loop
+        if self._session is None or self._session.closed:
+            kwargs = {"timeout": self._timeout} if self._timeout else {}
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._max_connections,
+                    limit_per_host=self._max_connections_per_endpoint,
+                    ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+                ),
+                **kwargs,
+            )
+        return self._session
+
+    def submit(self, coro: Awaitable[T]) -> concurrent.futures.Future:
+        """Runs coro on the client's event loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.get_event_loop())
+
+    async def call_ranked(
+        self,
+        endpoints: Iterable[str],
+        request: Callable[[str], Awaitable[Optional[T]]],
+        hedge: bool = True,
+    ) -> Optional[T]:
+        """
+        Sends the request to the best ranked endpoint first. A failed request, one that
+        returns None, moves on to the next endpoint right away. With hedge, a slow one
+        does too once it has taken longer than its p95 latency. Returns the first result
+        that is not None, or None if every endpoint failed.
+        """
+        ranked_endpoints = self.scoreboard.rank(endpoints)
+        pending: Set[asyncio.Future] = set()
+        try:
+            for i, endpoint in enumerate(ranked_endpoints):
+                pending.add(asyncio.ensure_future(request(endpoint)))
+                is_last_endpoint = i == len(ranked_endpoints) - 1
+                hedge_delay = (
+                    self.scoreboard.hedge_delay(endpoint)
+                    if hedge and not is_last_endpoint
+                    else None
+                )
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=hedge_delay,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if not done:
+                        break  # hedge, ask the next endpoint too
+                    for future in done:
+                        result = future.result()
+                        if result is not None:
+                            return result
+                    if not is_last_endpoint:
+                        break  # everything in flight failed, try the next endpoint now
+            return None
+        finally:
+            for future in pending:
+                future.cancel()  # cancel other pending requests
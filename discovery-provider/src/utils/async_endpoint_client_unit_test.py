@@ -0,0 +1,51 @@
+import asyncio
+from unittest import mock
+
+from src.utils.async_endpoint_client import AsyncEndpointClient
+
+FAST = "https://fast.audius.co"
+SLOW = "https://slow.audius.co"
+DOWN = "https://down.audius.co"
+
+
+def call_ranked(client, endpoints, request, hedge=True):
+    return client.submit(client.call_ranked(endpoints, request, hedge)).result()
+
+
+def test_call_ranked_moves_on_from_failed_endpoints():
+    client = AsyncEndpointClient("test", 10, 10)
+    client.scoreboard.record_success(DOWN, 0.01)
+    client.scoreboard.record_success(FAST, 0.1)
+    requested = []
+
+    async def request(endpoint):
+        requested.append(endpoint)
+        return None if endpoint == DOWN else endpoint
+
+    assert call_ranked(client, [FAST, DOWN], request) == FAST
+    assert requested == [DOWN, FAST]
+
+    assert call_ranked(client, [DOWN], request) is None
+
+
+def test_call_ranked_hedges_slow_endpoints():
+    client = AsyncEndpointClient("test", 10, 10)
+    client.scoreboard.record_success(SLOW, 0.01)
+    client.scoreboard.record_success(FAST, 0.1)
+    cancelled = []
+
+    async def request(endpoint):
+        if endpoint == SLOW:
+            try:
+                await asyncio.sleep(0.5)
+            except asyncio.CancelledError:
+                cancelled.append(endpoint)
+                raise
+        return endpoint
+
+    with mock.patch.object(client.scoreboard, "hedge_delay", return_value=0.01):
+        assert call_ranked(client, [FAST, SLOW], request) == FAST
+        # the slow request still in flight is cancelled
+        assert cancelled == [SLOW]
+
+        assert call_ranked(client, [FAST, SLOW], request, hedge=False) == SLOW
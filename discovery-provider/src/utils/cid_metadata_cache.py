@@ -0,0 +1,170 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from src.models.indexing.cid_data import CIDData
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+from src.utils.redis_cache import get_cid_metadata_cache_key
+from src.utils.session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the serialized size of the metadata held in process
+DEFAULT_LRU_MAX_BYTES = 64 * 1024 * 1024
+# CIDs never change, the ttl only bounds how much of redis the cache can take up
+CID_METADATA_REDIS_TTL_SEC = 7 * 24 * 60 * 60
+
+
+class LRUBytesCache:
+    """Thread safe LRU of key -> serialized value, bounded by the total size of the values"""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CIDMetadataCache:
+    """
+    Content addressed cache for formatted CID metadata.
+
+    Lookups go through an in-process LRU, then redis, then the cid_data table. Hits in a
+    lower tier are written back to the tiers above it. Since CIDs are immutable entries
+    are never invalidated.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        db: Optional[SessionManager] = None,
+        lru_max_bytes: int = DEFAULT_LRU_MAX_BYTES,
+    ):
+        self._redis = redis
+        self._db = db
+        self._lru = LRUBytesCache(lru_max_bytes)
+        self._metric = PrometheusMetric(
+            PrometheusMetricNames.CID_METADATA_CACHE_LOOKUPS_TOTAL
+        )
+
+    def get_many(self, cids: Iterable[str]) -> Dict[str, Dict]:
+        """Returns cid -> metadata for the cids found in any tier"""
+        serialized: Dict[str, bytes] = {}
+        missing = []
+        for cid in set(cids):
+            value = self._lru.get(cid)
+            if value is None:
+                missing.append(cid)
+            else:
+                serialized[cid] = value
+        self._record("lru", len(serialized), len(missing))
+
+        if missing and self._redis:
+            missing = self._get_from_redis(missing, serialized)
+
+        if missing and self._db:
+            self._get_from_db(missing, serialized)
+
+        cid_metadata = {}
+        for cid, value in serialized.items():
+            # Deserialize on every hit so callers can't mutate a shared cached dict
+            cid_metadata[cid] = json.loads(value)
+        return cid_metadata
+
+    def set_many(self, cid_metadata: Dict[str, Dict]):
+        """Caches metadata fetched from content nodes in the lru and redis"""
+        if not cid_metadata:
+            return
+        serialized = {
+            cid: json.dumps(metadata).encode("utf-8")
+            for cid, metadata in cid_metadata.items()
+        }
+        for cid, value in serialized.items():
+            self._lru.set(cid, value)
+        self._set_in_redis(serialized)
+
+    def _get_from_redis(self, cids, serialized):
+        try:
+            values = self._redis.mget([get_cid_metadata_cache_key(cid) for cid in cids])
+        except Exception as e:
+            logger.warning(f"cid_metadata_cache.py | redis lookup failed {e}")
+            return cids
+
+        missing = []
+        for cid, value in zip(cids, values):
+            if value is None:
+                missing.append(cid)
+            else:
+                serialized[cid] = value
+                self._lru.set(cid, value)
+        self._record("redis", len(cids) - len(missing), len(missing))
+        return missing
+
+    def _get_from_db(self, cids, serialized):
+        try:
+            with self._db.scoped_session() as session:
+                rows = (
+                    session.query(CIDData.cid, CIDData.data)
+                    .filter(CIDData.cid.in_(cids))
+                    .all()
+                )
+        except Exception as e:
+            logger.warning(f"cid_metadata_cache.py | cid_data lookup failed {e}")
+            return
+
+        found = {cid: json.dumps(data).encode("utf-8") for cid, data in rows}
+        for cid, value in found.items():
+            serialized[cid] = value
+            self._lru.set(cid, value)
+        self._set_in_redis(found)
+        self._record("db", len(found), len(cids) - len(found))
+
+    def _set_in_redis(self, serialized: Dict[str, bytes]):
+        if not self._redis or not serialized:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for cid, value in serialized.items():
+                pipe.set(
+                    get_cid_metadata_cache_key(cid),
+                    value,
+                    ex=CID_METADATA_REDIS_TTL_SEC,
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"cid_metadata_cache.py | redis write failed {e}")
+
+    def _record(self, tier: str, hits: int, misses: int):
+        if hits:
+            self._metric.save(hits, {"tier": tier, "result": "hit"})
+        if misses:
+            self._metric.save(misses, {"tier": tier, "result": "miss"})
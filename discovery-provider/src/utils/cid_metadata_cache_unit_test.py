@@ -0,0 +1,55 @@
+import json
+
+from src.utils.cid_metadata_cache import CIDMetadataCache, LRUBytesCache
+from src.utils.redis_cache import get_cid_metadata_cache_key
+
+
+def test_lru_bytes_cache_evicts_least_recently_used():
+    lru = LRUBytesCache(max_bytes=10)
+    lru.set("a", b"1234")
+    lru.set("b", b"1234")
+    # touch "a" so "b" is the least recently used
+    assert lru.get("a") == b"1234"
+    lru.set("c", b"1234")
+
+    assert lru.get("b") is None
+    assert lru.get("a") == b"1234"
+    assert lru.get("c") == b"1234"
+    assert lru.size == 8
+
+    # values larger than the cache are never stored
+    lru.set("d", b"12345678901")
+    assert lru.get("d") is None
+    assert len(lru) == 2
+
+
+def test_cid_metadata_cache_set_and_get(redis_mock):
+    cache = CIDMetadataCache(redis_mock)
+    cache.set_many({"QmA": {"title": "a"}, "QmB": {"title": "b"}})
+
+    assert cache.get_many(["QmA", "QmB", "QmC"]) == {
+        "QmA": {"title": "a"},
+        "QmB": {"title": "b"},
+    }
+    assert json.loads(redis_mock.get(get_cid_metadata_cache_key("QmA"))) == {
+        "title": "a"
+    }
+
+
+def test_cid_metadata_cache_reads_through_redis(redis_mock):
+    redis_mock.set(get_cid_metadata_cache_key("QmA"), json.dumps({"title": "a"}))
+    cache = CIDMetadataCache(redis_mock)
+
+    assert cache.get_many(["QmA"]) == {"QmA": {"title": "a"}}
+
+    # served from the in-process tier once redis is gone
+    redis_mock.flushall()
+    assert cache.get_many(["QmA"]) == {"QmA": {"title": "a"}}
+
+
+def test_cid_metadata_cache_returns_copies(redis_mock):
+    cache = CIDMetadataCache(redis_mock)
+    cache.set_many({"QmA": {"title": "a"}})
+
+    cache.get_many(["QmA"])["QmA"]["title"] = "changed"
+    assert cache.get_many(["QmA"]) == {"QmA": {"title": "a"}}
@@ -1,7 +1,9 @@
 # pylint: disable=C0302
 import asyncio
+import concurrent.futures
 import logging
-from typing import Any, Dict, KeysView, Set, Tuple
+import time
+from typing import AbstractSet, Any, Dict, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 import aiohttp
@@ -10,6 +12,8 @@ from src.tasks.metadata import (
     track_metadata_format,
     user_metadata_format,
 )
+from src.utils.async_endpoint_client import AsyncEndpointClient
+from src.utils.cid_metadata_cache import CIDMetadataCache
 from src.utils.eth_contracts_helpers import fetch_all_registered_content_nodes
 
 logger = logging.getLogger(__name__)
@@ -17,6 +21,10 @@ logger = logging.getLogger(__name__)
 GET_METADATA_TIMEOUT_SECONDS = 2
 GET_METADATA_ALL_GATEWAY_TIMEOUT_SECONDS = 5
 
+# Connection pool limits of the session shared by all metadata requests
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_NODE = 10
+
 
 class CIDMetadataClient:
     """Helper class for Audius Discovery Provider + CID Metadata interaction"""
@@ -27,7 +35,17 @@ class CIDMetadataClient:
         shared_config=None,
         redis=None,
         eth_abi_values=None,
+        db=None,
     ):
+        # CIDs are immutable, so anything fetched or already saved to cid_data
+        # is served from here instead of the content nodes
+        self._cid_metadata_cache = CIDMetadataCache(redis, db)
+        self._endpoint_client = AsyncEndpointClient(
+            "cid_metadata_client", MAX_CONNECTIONS, MAX_CONNECTIONS_PER_NODE
+        )
+        # Latency / error history per content node used to pick which node to ask first
+        self._scoreboard = self._endpoint_client.scoreboard
+
         # Fetch list of registered content nodes to use during init.
         # During indexing, if cid metadata fetch fails, _cnode_endpoints and user_replica_set are empty
         # it might fail to find content and throw an error. To prevent race conditions between
@@ -65,6 +83,7 @@ class CIDMetadataClient:
 
     async def _get_metadata_async(self, async_session, multihash, gateway_endpoint):
         url = gateway_endpoint + "/content/" + multihash
+        start_time = time.time()
         # Skip URL if invalid
         try:
             validate_url = urlparse(url)
@@ -78,12 +97,30 @@ class CIDMetadataClient:
             ) as resp:
                 if resp.status == 200:
                     json_resp = await resp.json(content_type=None)
+                    self._scoreboard.record_success(
+                        gateway_endpoint, time.time() - start_time
+                    )
                     return (multihash, json_resp)
+                if resp.status >= 500:
+                    self._scoreboard.record_failure(gateway_endpoint)
+                # Anything else, e.g. a 404 from a node that does not have the CID,
+                # says nothing about its health, move on to the next node
+                return None
+        except asyncio.CancelledError:
+            # Cancelled because another node answered first, says nothing about this node
+            raise
         except asyncio.TimeoutError:
+            self._scoreboard.record_failure(gateway_endpoint)
             logger.info(
                 f"CIDMetadataClient | _get_metadata_async TimeoutError fetching gateway address - {url}"
             )
             return None
+        except aiohttp.ClientConnectionError as e:
+            self._scoreboard.record_failure(gateway_endpoint)
+            logger.info(
+                f"CIDMetadataClient | _get_metadata_async ClientConnectionError - {str(e)}"
+            )
+            return None
         except Exception as e:
             logger.info(f"CIDMetadataClient | _get_metadata_async Exception - {str(e)}")
             return None
@@ -102,9 +139,36 @@ class CIDMetadataClient:
 
         return self._cnode_endpoints
 
+    async def _get_formatted_metadata_async(
+        self, async_session, cid, gateway_endpoint, metadata_format
+    ) -> Optional[Dict]:
+        result = await self._get_metadata_async(async_session, cid, gateway_endpoint)
+        if not result:
+            return None
+        formatted_json = self._get_metadata_from_json(metadata_format, result[1])
+        if formatted_json == metadata_format:
+            return None
+        return formatted_json
+
+    async def _fetch_cid_hedged(
+        self, async_session, cid, gateway_endpoints, metadata_format
+    ) -> Optional[Dict]:
+        """
+        Fetches a CID from the best ranked node first. If it hasn't answered within its
+        p95 latency, the next best node is asked as well, and so on. Failed requests move
+        on to the next node right away. Returns the formatted metadata of the first
+        valid response.
+        """
+        return await self._endpoint_client.call_ranked(
+            gateway_endpoints,
+            lambda gateway_endpoint: self._get_formatted_metadata_async(
+                async_session, cid, gateway_endpoint, metadata_format
+            ),
+        )
+
     async def _fetch_metadata_from_gateway_endpoints(
         self,
-        fetched_cids: KeysView[str],
+        fetched_cids: AbstractSet[str],
         cids_txhash_set: Set[Tuple[str, str]],
         cid_to_user_id: Dict[str, int],
         user_to_replica_set: Dict[int, str],
@@ -121,94 +185,84 @@ class CIDMetadataClient:
         """
 
         cid_metadata = {}
+        async_session = self._endpoint_client.get_session()
+        cid_futures: Dict[asyncio.Future, str] = {}
+        requested_cids = set()
 
-        async with aiohttp.ClientSession() as async_session:
-            futures = []
-            cid_futures_map: Dict[str, set] = {}
+        for cid, _ in cids_txhash_set:
+            if cid in fetched_cids or cid in requested_cids:
+                continue  # already fetched
+            user_id = cid_to_user_id[cid]
 
-            for cid, _ in cids_txhash_set:
-                if cid in fetched_cids:
-                    continue  # already fetched
-                user_id = cid_to_user_id[cid]
-
-                gateway_endpoints = self._get_gateway_endpoints(
-                    should_fetch_from_replica_set, user_id, user_to_replica_set
+            gateway_endpoints = self._get_gateway_endpoints(
+                should_fetch_from_replica_set, user_id, user_to_replica_set
+            )
+            if not gateway_endpoints:
+                continue  # skip if user replica set is empty
+
+            metadata_format: Any = None
+            if cid_type[cid] == "track":
+                metadata_format = track_metadata_format
+            elif cid_type[cid] == "user":
+                metadata_format = user_metadata_format
+            elif cid_type[cid] == "playlist_data":
+                metadata_format = playlist_metadata_format
+            else:
+                raise Exception(f"Unknown metadata type ${cid_type[cid]}")
+
+            future = asyncio.ensure_future(
+                self._fetch_cid_hedged(
+                    async_session, cid, gateway_endpoints, metadata_format
                 )
-                if not gateway_endpoints:
-                    continue  # skip if user replica set is empty
+            )
+            cid_futures[future] = cid
+            requested_cids.add(cid)
 
-                for gateway_endpoint in gateway_endpoints:
-                    future = asyncio.ensure_future(
-                        self._get_metadata_async(async_session, cid, gateway_endpoint)
-                    )
-                    if cid not in cid_futures_map:
-                        cid_futures_map[cid] = set()
-                    cid_futures_map[cid].add(future)
-                    futures.append(future)
+        if not cid_futures:
+            return cid_metadata
 
+        done, pending = await asyncio.wait(
+            cid_futures.keys(), timeout=GET_METADATA_ALL_GATEWAY_TIMEOUT_SECONDS
+        )
+        if pending:
+            logger.info(
+                "CIDMetadataClient | fetch_metadata_from_gateway_endpoints TimeoutError"
+            )
+            for future in pending:
+                future.cancel()
+        for future in done:
             try:
-                for future in asyncio.as_completed(
-                    futures, timeout=GET_METADATA_ALL_GATEWAY_TIMEOUT_SECONDS
-                ):
-                    try:
-                        future_result = await future
-                    except asyncio.CancelledError:
-                        pass  # swallow canceled requests
-
-                    if not future_result:
-                        continue
-
-                    cid, metadata_json = future_result
-
-                    metadata_format: Any = None
-                    if cid_type[cid] == "track":
-                        metadata_format = track_metadata_format
-                    elif cid_type[cid] == "user":
-                        metadata_format = user_metadata_format
-                    elif cid_type[cid] == "playlist_data":
-                        metadata_format = playlist_metadata_format
-                    else:
-                        raise Exception(f"Unknown metadata type ${cid_type[cid]}")
-
-                    formatted_json = self._get_metadata_from_json(
-                        metadata_format, metadata_json
-                    )
-
-                    if formatted_json != metadata_format:
-                        cid_metadata[cid] = formatted_json
-
-                        if len(fetched_cids) + len(cid_metadata) == len(
-                            cids_txhash_set
-                        ):
-                            break  # fetched all metadata
-
-                        for other_future in cid_futures_map[cid]:
-                            if other_future == future:
-                                continue
-                            other_future.cancel()  # cancel other pending requests
-
-            except asyncio.TimeoutError:
-                logger.info(
-                    "CIDMetadataClient | fetch_metadata_from_gateway_endpoints TimeoutError"
-                )
+                formatted_json = future.result()
             except Exception as e:
                 logger.info("CIDMetadataClient | Error in fetch cid metadata")
                 raise e
+            if formatted_json:
+                cid_metadata[cid_futures[future]] = formatted_json
         return cid_metadata
 
-    # Used in POA indexing
-    def fetch_metadata_from_gateway_endpoints(
+    def _fetch_with_cache(
         self,
-        fetched_cids: KeysView[str],
+        fetched_cids: AbstractSet[str],
         cids_txhash_set: Set[Tuple[str, str]],
         cid_to_user_id: Dict[str, int],
         user_to_replica_set: Dict[int, str],
         cid_type: Dict[str, str],
-        should_fetch_from_replica_set: bool = True,
-    ):
-        return asyncio.run(
+        should_fetch_from_replica_set: bool,
+    ) -> Tuple[Dict[str, Dict], concurrent.futures.Future]:
+        """
+        Returns metadata found in the cache and a future for the rest, which is fetched
+        from content nodes on the client's event loop.
+        """
+        cached_metadata: Dict[str, Dict] = {}
+        # Only check the cache on the first attempt, CIDs that make it to the
+        # second attempt have already missed it
+        if should_fetch_from_replica_set:
+            cached_metadata = self._cid_metadata_cache.get_many(
+                cid for cid, _ in cids_txhash_set if cid not in fetched_cids
+            )
+        future = self._endpoint_client.submit(
             self._fetch_metadata_from_gateway_endpoints(
-                fetched_cids,
+                set(fetched_cids) | cached_metadata.keys(),
                 cids_txhash_set,
                 cid_to_user_id,
                 user_to_replica_set,
@@ -216,6 +270,60 @@ class CIDMetadataClient:
                 should_fetch_from_replica_set,
             )
         )
+        return cached_metadata, future
+
+    def _merge_fetched(self, cached_metadata, fetched_metadata):
+        self._cid_metadata_cache.set_many(fetched_metadata)
+        cid_metadata = dict(cached_metadata)
+        cid_metadata.update(fetched_metadata)
+        return cid_metadata
+
+    # Used in POA indexing
+    def fetch_metadata_from_gateway_endpoints(
+        self,
+        fetched_cids: AbstractSet[str],
+        cids_txhash_set: Set[Tuple[str, str]],
+        cid_to_user_id: Dict[str, int],
+        user_to_replica_set: Dict[int, str],
+        cid_type: Dict[str, str],
+        should_fetch_from_replica_set: bool = True,
+    ):
+        cached_metadata, future = self._fetch_with_cache(
+            fetched_cids,
+            cids_txhash_set,
+            cid_to_user_id,
+            user_to_replica_set,
+            cid_type,
+            should_fetch_from_replica_set,
+        )
+        return self._merge_fetched(cached_metadata, future.result())
+
+    async def _async_fetch_metadata(
+        self,
+        fetched_cids: AbstractSet[str],
+        cids_txhash_set: Set[Tuple[str, str]],
+        cid_to_user_id: Dict[str, int],
+        user_to_replica_set: Dict[int, str],
+        cid_type: Dict[str, str],
+        should_fetch_from_replica_set: bool,
+    ) -> Dict[str, Dict]:
+        # The cache is read and written with blocking redis and db calls, run them
+        # off the caller's event loop
+        loop = asyncio.get_running_loop()
+        cached_metadata, future = await loop.run_in_executor(
+            None,
+            self._fetch_with_cache,
+            fetched_cids,
+            cids_txhash_set,
+            cid_to_user_id,
+            user_to_replica_set,
+            cid_type,
+            should_fetch_from_replica_set,
+        )
+        fetched_metadata = await asyncio.wrap_future(future)
+        return await loop.run_in_executor(
+            None, self._merge_fetched, cached_metadata, fetched_metadata
+        )
 
     # Used in SOL indexing
     async def async_fetch_metadata_from_gateway_endpoints(
@@ -231,7 +339,7 @@ class CIDMetadataClient:
         try:
 
             cid_metadata.update(
-                await self._fetch_metadata_from_gateway_endpoints(
+                await self._async_fetch_metadata(
                     cid_metadata.keys(),
                     cids_txhash_set,
                     cid_to_user_id,
@@ -247,7 +355,7 @@ class CIDMetadataClient:
         # second attempt - fetch missing CIDs from other cnodes
         if len(cid_metadata) != len(cids_txhash_set):
             cid_metadata.update(
-                await self._fetch_metadata_from_gateway_endpoints(
+                await self._async_fetch_metadata(
                     cid_metadata.keys(),
                     cids_txhash_set,
                     cid_to_user_id,
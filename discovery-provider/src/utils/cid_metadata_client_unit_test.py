@@ -0,0 +1,68 @@
+import asyncio
+
+import aiohttp
+from src.utils.cid_metadata_client import CIDMetadataClient
+
+CID = "QmA"
+ENDPOINT = "https://cn.audius.co"
+
+
+class MockResponse:
+    def __init__(self, status, body=None):
+        self.status = status
+        self._body = body
+
+    async def json(self, content_type=None):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class MockSession:
+    def __init__(self, response=None, error=None):
+        self._response = response
+        self._error = error
+
+    def get(self, url, timeout=None):
+        if self._error:
+            raise self._error
+        return self._response
+
+
+def get_metadata(client, session):
+    return asyncio.run(client._get_metadata_async(session, CID, ENDPOINT))
+
+
+def get_error_rate(client):
+    return client._scoreboard.get_stats().get(ENDPOINT, {}).get("error_rate", 0)
+
+
+def test_get_metadata_records_success():
+    client = CIDMetadataClient()
+    session = MockSession(MockResponse(200, {"title": "a"}))
+
+    assert get_metadata(client, session) == (CID, {"title": "a"})
+    assert get_error_rate(client) == 0
+
+
+def test_get_metadata_not_found_is_not_a_failure():
+    client = CIDMetadataClient()
+
+    assert get_metadata(client, MockSession(MockResponse(404))) is None
+    assert get_error_rate(client) == 0
+
+
+def test_get_metadata_records_failures():
+    client = CIDMetadataClient()
+
+    assert get_metadata(client, MockSession(MockResponse(503))) is None
+    error_rate = get_error_rate(client)
+    assert error_rate > 0
+
+    session = MockSession(error=aiohttp.ClientConnectionError("connection refused"))
+    assert get_metadata(client, session) is None
+    assert get_error_rate(client) > error_rate
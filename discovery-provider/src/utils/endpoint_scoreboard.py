@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+# Weight of the newest sample in the latency / error rate moving averages
+EWMA_ALPHA = 0.2
+# Seconds added to an endpoint's score for an error rate of 1
+ERROR_PENALTY_SECONDS = 2.0
+
+# Consecutive failures before an endpoint is skipped, and for how long
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+CIRCUIT_BREAKER_OPEN_SECONDS = 30
+
+# Latency samples kept per endpoint to compute the p95 hedge delay
+LATENCY_SAMPLE_SIZE = 100
+MIN_LATENCY_SAMPLES_FOR_P95 = 10
+DEFAULT_HEDGE_DELAY_SECONDS = 0.5
+MIN_HEDGE_DELAY_SECONDS = 0.05
+MAX_HEDGE_DELAY_SECONDS = 1.0
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+
+    def score(self) -> float:
+        # Endpoints without any samples yet go first so they get measured
+        latency = self.latency_ewma if self.latency_ewma is not None else 0.0
+        return latency + self.error_rate * ERROR_PENALTY_SECONDS
+
+    def is_open(self, now: float) -> bool:
+        return self.open_until > now
+
+
+class EndpointScoreboard:
+    """
+    Tracks latency and errors per endpoint so requests go to the healthiest endpoint first.
+
+    Each endpoint keeps an EWMA of its latency and error rate. After
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failures its circuit opens and it is
+    ranked last for CIRCUIT_BREAKER_OPEN_SECONDS, after which one success closes it again.
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, endpoint: str) -> EndpointStats:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = EndpointStats()
+            self._stats[endpoint] = stats
+        return stats
+
+    def rank(self, endpoints: Iterable[str]) -> List[str]:
+        """Orders endpoints best first, endpoints with an open circuit go last"""
+        now = time.time()
+        with self._lock:
+            scored = [
+                (
+                    self._get_stats(endpoint).is_open(now),
+                    self._get_stats(endpoint).score(),
+                    endpoint,
+                )
+                for endpoint in endpoints
+            ]
+        scored.sort(key=lambda entry: (entry[0], entry[1]))
+        return [endpoint for _, _, endpoint in scored]
+
+    def hedge_delay(self, endpoint: str) -> float:
+        """Seconds to wait on an endpoint before also asking the next one, its p95 latency"""
+        with self._lock:
+            latencies = sorted(self._get_stats(endpoint).latencies)
+        if len(latencies) < MIN_LATENCY_SAMPLES_FOR_P95:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        return min(max(p95, MIN_HEDGE_DELAY_SECONDS), MAX_HEDGE_DELAY_SECONDS)
+
+    def record_success(self, endpoint: str, latency: float):
+        with self._lock:
+            stats = self._get_stats(endpoint)
+            stats.latency_ewma = (
+                latency
+                if stats.latency_ewma is None
+                else (1 - EWMA_ALPHA) * stats.latency_ewma + EWMA_ALPHA * latency
+            )
+            stats.error_rate = (1 - EWMA_ALPHA) * stats.error_rate
+            stats.consecutive_failures = 0
+            stats.open_until = 0.0
+            stats.latencies.append(latency)
+
+    def record_failure(self, endpoint: str):
+        with self._lock:
+            stats = self._get_stats(endpoint)
+            stats.error_rate = (1 - EWMA_ALPHA) * stats.error_rate + EWMA_ALPHA
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+                stats.open_until = time.time() + CIRCUIT_BREAKER_OPEN_SECONDS
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Snapshot of every endpoint's stats, for logging"""
+        now = time.time()
+        with self._lock:
+            return {
+                endpoint: {
+                    "latency_ewma": stats.latency_ewma,
+                    "error_rate": stats.error_rate,
+                    "circuit_open": stats.is_open(now),
+                }
+                for endpoint, stats in self._stats.items()
+            }
@@ -0,0 +1,60 @@
+from src.utils.endpoint_scoreboard import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_HEDGE_DELAY_SECONDS,
+    MAX_HEDGE_DELAY_SECONDS,
+    MIN_HEDGE_DELAY_SECONDS,
+    EndpointScoreboard,
+)
+
+FAST = "https://fast.audius.co"
+SLOW = "https://slow.audius.co"
+DOWN = "https://down.audius.co"
+NEW = "https://new.audius.co"
+
+
+def test_rank_prefers_fast_endpoints():
+    scoreboard = EndpointScoreboard()
+    for _ in range(5):
+        scoreboard.record_success(FAST, 0.05)
+        scoreboard.record_success(SLOW, 0.8)
+
+    assert scoreboard.rank([SLOW, FAST]) == [FAST, SLOW]
+    # unmeasured endpoints are tried first so they get measured
+    assert scoreboard.rank([SLOW, FAST, NEW]) == [NEW, FAST, SLOW]
+
+
+def test_rank_penalizes_errors():
+    scoreboard = EndpointScoreboard()
+    scoreboard.record_success(FAST, 0.05)
+    scoreboard.record_success(SLOW, 0.3)
+    scoreboard.record_failure(FAST)
+
+    assert scoreboard.rank([FAST, SLOW]) == [SLOW, FAST]
+
+
+def test_circuit_breaker_opens_and_closes():
+    scoreboard = EndpointScoreboard()
+    scoreboard.record_success(SLOW, 0.8)
+    for _ in range(CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        scoreboard.record_failure(DOWN)
+
+    assert scoreboard.get_stats()[DOWN]["circuit_open"]
+    assert scoreboard.rank([DOWN, SLOW]) == [SLOW, DOWN]
+
+    scoreboard.record_success(DOWN, 0.05)
+    assert not scoreboard.get_stats()[DOWN]["circuit_open"]
+
+
+def test_hedge_delay_uses_p95_latency():
+    scoreboard = EndpointScoreboard()
+    assert scoreboard.hedge_delay(FAST) == DEFAULT_HEDGE_DELAY_SECONDS
+
+    for i in range(100):
+        scoreboard.record_success(FAST, 0.1 if i < 95 else 0.4)
+    assert scoreboard.hedge_delay(FAST) == 0.4
+
+    for _ in range(100):
+        scoreboard.record_success(SLOW, 10)
+        scoreboard.record_success(NEW, 0.001)
+    assert scoreboard.hedge_delay(SLOW) == MAX_HEDGE_DELAY_SECONDS
+    assert scoreboard.hedge_delay(NEW) == MIN_HEDGE_DELAY_SECONDS
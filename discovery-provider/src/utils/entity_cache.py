@@ -0,0 +1,202 @@
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from redis.exceptions import WatchError
+from sqlalchemy.orm.session import Session
+from src.models.tracks.track import Track
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+from src.utils.redis_cache import (
+    get_playlist_id_cache_key,
+    get_track_id_cache_key,
+    get_track_stream_cache_key,
+    get_user_id_cache_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entries are invalidated by the indexer when an entity changes, the ttl only
+# bounds how long a missed invalidation can serve stale data
+ENTITY_CACHE_TTL_SEC = 5 * 60
+# Every invalidation writes a new version of the entry. Readers pass the version
+# read before querying the db to set_cached_entities, which skips entries that
+# were invalidated since. Versions only need to outlive a read.
+ENTITY_CACHE_VERSION_TTL_SEC = 5 * 60
+
+# Keyed by the EntityType values the indexers report changed entity ids with
+USER = "User"
+TRACK = "Track"
+PLAYLIST = "Playlist"
+# Stream route lookups, invalidated along with the track
+TRACK_STREAM = "TrackStream"
+
+entity_cache_key_getters: Dict[str, Callable[[int], str]] = {
+    USER: get_user_id_cache_key,
+    TRACK: get_track_id_cache_key,
+    PLAYLIST: get_playlist_id_cache_key,
+    TRACK_STREAM: get_track_stream_cache_key,
+}
+
+
+def get_cache_version_key(cache_key: str) -> str:
+    return f"{cache_key}:version"
+
+
+def restore_datetime_fields(entity: Dict, datetime_fields: Iterable[str]):
+    """JSON serializes datetimes as strings, parse them back in place"""
+    for field in datetime_fields:
+        value = entity.get(field)
+        if isinstance(value, str):
+            entity[field] = datetime.fromisoformat(value)
+
+
+def get_cached_entities(redis, entity_type: str, ids: Iterable[int]) -> Dict[int, Dict]:
+    """Returns id -> entity dict for the ids found in the cache, in one MGET"""
+    ids = list(ids)
+    if not ids:
+        return {}
+    get_cache_key = entity_cache_key_getters[entity_type]
+    try:
+        values = redis.mget([get_cache_key(id) for id in ids])
+    except Exception as e:
+        logger.warning(f"entity_cache.py | failed to get cached {entity_type}s {e}")
+        return {}
+
+    cached_entities = {}
+    for id, value in zip(ids, values):
+        if value is None:
+            continue
+        try:
+            cached_entities[id] = json.loads(value)
+        except Exception as e:
+            logger.warning(f"entity_cache.py | unable to deserialize {id} {e}")
+
+    metric = PrometheusMetric(PrometheusMetricNames.ENTITY_CACHE_LOOKUPS_TOTAL)
+    if cached_entities:
+        metric.save(len(cached_entities), {"entity_type": entity_type, "result": "hit"})
+    if len(ids) > len(cached_entities):
+        metric.save(
+            len(ids) - len(cached_entities),
+            {"entity_type": entity_type, "result": "miss"},
+        )
+    return cached_entities
+
+
+def get_cache_versions(
+    redis, entity_type: str, ids: Iterable[int]
+) -> Dict[int, Optional[bytes]]:
+    """
+    Returns the cache version of each id, to be read before querying the entities
+    that are then passed to set_cached_entities
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+    get_cache_key = entity_cache_key_getters[entity_type]
+    try:
+        versions = redis.mget([get_cache_version_key(get_cache_key(id)) for id in ids])
+    except Exception as e:
+        logger.warning(
+            f"entity_cache.py | failed to get {entity_type} cache versions {e}"
+        )
+        return {}
+    return dict(zip(ids, versions))
+
+
+def set_cached_entities(
+    redis,
+    entity_type: str,
+    entities: Dict[int, Dict],
+    cache_versions: Dict[int, Optional[bytes]],
+):
+    """
+    Caches id -> entity dict in one transaction. Entities invalidated since their
+    cache_versions were read are skipped, so an entity read before the indexer
+    committed a change is never cached after the change was invalidated.
+    """
+    ids = [id for id in entities if id in cache_versions]
+    if not ids:
+        return
+    get_cache_key = entity_cache_key_getters[entity_type]
+    version_keys = [get_cache_version_key(get_cache_key(id)) for id in ids]
+    try:
+        with redis.pipeline() as pipe:
+            # an invalidation landing between the check and the set fails the
+            # transaction
+            pipe.watch(*version_keys)
+            current_versions = pipe.mget(version_keys)
+            pipe.multi()
+            for id, current_version in zip(ids, current_versions):
+                if current_version != cache_versions[id]:
+                    continue
+                # Default converts datetime and other unparseables to str.
+                pipe.set(
+                    get_cache_key(id),
+                    json.dumps(entities[id], default=str),
+                    ex=ENTITY_CACHE_TTL_SEC,
+                )
+            pipe.execute()
+    except WatchError:
+        logger.info(
+            f"entity_cache.py | {entity_type}s invalidated while caching, skipping"
+        )
+    except Exception as e:
+        logger.warning(f"entity_cache.py | failed to cache {entity_type}s {e}")
+
+
+def get_entity_ids_to_invalidate(
+    session: Session, changed_entity_ids: Dict[str, Set[int]]
+) -> Dict[str, Set[int]]:
+    """
+    Returns the cached entities to invalidate for a set of changed entities.
+
+    Cached tracks embed their owner, so the tracks of changed users are
+    invalidated along with them, as are the stream lookups of those tracks. Must
+    be called before the changes are committed so it runs in the indexing
+    transaction.
+    """
+    entity_ids_to_invalidate: Dict[str, Set[int]] = {
+        entity_type: set(changed_entity_ids.get(entity_type, set()))
+        for entity_type in entity_cache_key_getters
+    }
+    changed_user_ids = entity_ids_to_invalidate[USER]
+    if changed_user_ids:
+        owned_tracks: List = (
+            session.query(Track.track_id)
+            .filter(
+                Track.is_current == True,
+                Track.owner_id.in_(changed_user_ids),
+            )
+            .all()
+        )
+        entity_ids_to_invalidate[TRACK].update(track_id for (track_id,) in owned_tracks)
+    entity_ids_to_invalidate[TRACK_STREAM].update(entity_ids_to_invalidate[TRACK])
+    return entity_ids_to_invalidate
+
+
+def remove_cached_entities(redis, entity_ids_to_invalidate: Dict[str, Set[int]]):
+    """
+    Deletes the cached entities and bumps their versions, called by every writer
+    of cached entities once its changes are committed
+    """
+    keys = [
+        entity_cache_key_getters[entity_type](id)
+        for entity_type, ids in entity_ids_to_invalidate.items()
+        if entity_type in entity_cache_key_getters
+        for id in ids
+    ]
+    if not keys:
+        return
+    version = uuid.uuid4().hex
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.delete(*keys)
+        for key in keys:
+            pipe.set(
+                get_cache_version_key(key), version, ex=ENTITY_CACHE_VERSION_TTL_SEC
+            )
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"entity_cache.py | failed to invalidate cached entities {e}")
@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from src.utils.entity_cache import (
+    PLAYLIST,
+    TRACK,
+    USER,
+    get_cache_versions,
+    get_cached_entities,
+    remove_cached_entities,
+    restore_datetime_fields,
+    set_cached_entities,
+)
+from src.utils.redis_cache import get_track_id_cache_key
+
+
+def test_set_and_get_cached_entities(redis_mock):
+    created_at = datetime(2022, 9, 1, 12, 30, 15, 123)
+    set_cached_entities(
+        redis_mock,
+        TRACK,
+        {
+            1: {"track_id": 1, "title": "one", "created_at": created_at},
+            2: {"track_id": 2, "title": "two", "created_at": created_at},
+        },
+        get_cache_versions(redis_mock, TRACK, [1, 2]),
+    )
+
+    cached_tracks = get_cached_entities(redis_mock, TRACK, [1, 2, 3])
+    assert set(cached_tracks.keys()) == {1, 2}
+    assert cached_tracks[1]["title"] == "one"
+    assert redis_mock.ttl(get_track_id_cache_key(1)) > 0
+
+    restore_datetime_fields(cached_tracks[1], ["created_at"])
+    assert cached_tracks[1]["created_at"] == created_at
+
+    # entity types are keyed separately
+    assert get_cached_entities(redis_mock, USER, [1, 2]) == {}
+
+
+def test_remove_cached_entities(redis_mock):
+    set_cached_entities(
+        redis_mock,
+        TRACK,
+        {1: {"track_id": 1}, 2: {"track_id": 2}},
+        get_cache_versions(redis_mock, TRACK, [1, 2]),
+    )
+    set_cached_entities(
+        redis_mock,
+        PLAYLIST,
+        {1: {"playlist_id": 1}},
+        get_cache_versions(redis_mock, PLAYLIST, [1]),
+    )
+
+    remove_cached_entities(
+        redis_mock,
+        {
+            TRACK: {1},
+            PLAYLIST: {1},
+            # entity types that are not cached are ignored
+            "Follow": {(1, "User", 2)},
+        },
+    )
+
+    assert set(get_cached_entities(redis_mock, TRACK, [1, 2]).keys()) == {2}
+    assert get_cached_entities(redis_mock, PLAYLIST, [1]) == {}
+
+
+def test_set_cached_entities_skips_invalidated(redis_mock):
+    # versions are read before the db query
+    cache_versions = get_cache_versions(redis_mock, TRACK, [1, 2])
+
+    # the indexer commits a change to track 1 and invalidates it before the
+    # stale read is cached
+    remove_cached_entities(redis_mock, {TRACK: {1}})
+    set_cached_entities(
+        redis_mock,
+        TRACK,
+        {1: {"track_id": 1, "title": "stale"}, 2: {"track_id": 2}},
+        cache_versions,
+    )
+    assert set(get_cached_entities(redis_mock, TRACK, [1, 2]).keys()) == {2}
+
+    # reads that started after the invalidation are cached
+    cache_versions = get_cache_versions(redis_mock, TRACK, [1])
+    set_cached_entities(
+        redis_mock, TRACK, {1: {"track_id": 1, "title": "fresh"}}, cache_versions
+    )
+    assert get_cached_entities(redis_mock, TRACK, [1])[1]["title"] == "fresh"
+
+
+def test_set_cached_entities_aborts_on_concurrent_invalidation(redis_mock, monkeypatch):
+    cache_versions = get_cache_versions(redis_mock, TRACK, [1])
+    pipeline = redis_mock.pipeline
+
+    def pipeline_invalidated_after_check(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        mget = pipe.mget
+
+        def mget_then_invalidate(*mget_args):
+            versions = mget(*mget_args)
+            remove_cached_entities(redis_mock, {TRACK: {1}})
+            return versions
+
+        pipe.mget = mget_then_invalidate
+        return pipe
+
+    monkeypatch.setattr(redis_mock, "pipeline", pipeline_invalidated_after_check)
+    set_cached_entities(redis_mock, TRACK, {1: {"track_id": 1}}, cache_versions)
+    assert get_cached_entities(redis_mock, TRACK, [1]) == {}
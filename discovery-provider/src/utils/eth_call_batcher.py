@@ -0,0 +1,100 @@
+import concurrent.futures
+import logging
+import random
+from typing import Any, List, Optional, Tuple
+
+from src.utils.json_rpc_client import JsonRpcClient
+
+logger = logging.getLogger(__name__)
+
+# Max number of eth_call calls sent in one batched JSON-RPC request
+ETH_CALLS_BATCH_SIZE = 100
+ETH_CALLS_REQUEST_TIMEOUT_SECONDS = 30
+# Max number of requests in flight at once, keeps bursts of calls under the
+# rate limits of the node
+MAX_CONCURRENT_REQUESTS = 4
+
+
+class EthCallBatcher:
+    """
+    Makes many read only eth_calls in batched JSON-RPC requests over one keep-alive session.
+
+    Calls are split into batches of ETH_CALLS_BATCH_SIZE sent concurrently, at most
+    MAX_CONCURRENT_REQUESTS at a time. Like MultiProvider, each batch goes to the
+    comma separated endpoints in random order until one answers. Endpoints that reject
+    batched requests are sent one request per call for a while, see JsonRpcClient.
+    """
+
+    def __init__(
+        self,
+        endpoints: str,
+        batch_size: int = ETH_CALLS_BATCH_SIZE,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+    ):
+        self._endpoints = endpoints.split(",")
+        self._batch_size = batch_size
+        self._client = JsonRpcClient(
+            pool_connections=len(self._endpoints),
+            pool_maxsize=max_concurrent_requests,
+            timeout=ETH_CALLS_REQUEST_TIMEOUT_SECONDS,
+        )
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent_requests
+        )
+
+    def call(
+        self, calls: List[Tuple[str, str]], block_identifier: Any = "latest"
+    ) -> List[Optional[str]]:
+        """
+        Returns the hex result of each (to, data) eth_call at block_identifier, None
+        for the calls that failed
+        """
+        block = (
+            hex(block_identifier)
+            if isinstance(block_identifier, int)
+            else block_identifier
+        )
+        results: List[Optional[str]] = [None] * len(calls)
+        future_to_start = {
+            self._executor.submit(
+                self._call_batch, calls[start : start + self._batch_size], block
+            ): start
+            for start in range(0, len(calls), self._batch_size)
+        }
+        for future in concurrent.futures.as_completed(future_to_start):
+            start = future_to_start[future]
+            try:
+                batch_results = future.result()
+            except Exception as e:
+                logger.error(f"eth_call_batcher.py | batch of eth_calls failed {e}")
+                continue
+            results[start : start + len(batch_results)] = batch_results
+        return results
+
+    def _call_batch(self, calls: List[Tuple[str, str]], block: str):
+        for endpoint in random.sample(self._endpoints, k=len(self._endpoints)):
+            try:
+                if self._client.supports_batch(endpoint):
+                    responses = self._client.call_batch(
+                        endpoint, [self._make_call(call, block) for call in calls]
+                    )
+                    if responses is not None:
+                        return [response.get("result") for response in responses]
+                return [self._call_single(endpoint, call, block) for call in calls]
+            except Exception as e:
+                logger.warning(
+                    f"eth_call_batcher.py | request to {endpoint} failed {e}"
+                )
+        raise Exception("eth_call_batcher.py | All requests failed")
+
+    def _make_call(self, call: Tuple[str, str], block: str) -> Tuple[str, List[Any]]:
+        to, data = call
+        return "eth_call", [{"to": to, "data": data}, block]
+
+    def _call_single(
+        self, endpoint: str, call: Tuple[str, str], block: str
+    ) -> Optional[str]:
+        response = self._client.call(endpoint, *self._make_call(call, block))
+        if "error" in response:
+            logger.error(f"eth_call_batcher.py | eth_call failed {response['error']}")
+        return response.get("result")
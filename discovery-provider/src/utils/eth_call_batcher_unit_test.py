@@ -0,0 +1,91 @@
+from src.utils import json_rpc_client
+from src.utils.eth_call_batcher import EthCallBatcher
+from src.utils.json_rpc_client import BATCH_RETRY_COOLDOWN_SECONDS
+
+CALLS = [(f"0x{i:040x}", f"0x70a08231{i:064x}") for i in range(1, 6)]
+
+
+def make_result(call):
+    return f"0x{int(call['params'][0]['data'][-64:], 16) * 10:064x}"
+
+
+def mock_node(batcher, supports_batch=True, failing_data=()):
+    sent = []
+
+    def post(endpoint, payload):
+        sent.append((endpoint, payload))
+        if isinstance(payload, list):
+            if not supports_batch:
+                return {"jsonrpc": "2.0", "error": {"code": -32600}}
+            return [
+                {"id": call["id"], "error": {"code": -32000}}
+                if call["params"][0]["data"] in failing_data
+                else {"id": call["id"], "result": make_result(call)}
+                for call in payload
+            ]
+        return {"id": payload["id"], "result": make_result(payload)}
+
+    batcher._client.post = post
+    return sent
+
+
+def expected_results():
+    return [f"0x{(i + 1) * 10:064x}" for i in range(len(CALLS))]
+
+
+def test_call_batches():
+    batcher = EthCallBatcher("http://localhost:8546", batch_size=2)
+    sent = mock_node(batcher, failing_data={CALLS[1][1]})
+
+    results = batcher.call(CALLS, 100)
+    # failed calls are None, the rest in the order of the calls
+    assert results == [
+        result if i != 1 else None for i, result in enumerate(expected_results())
+    ]
+    assert sorted(len(payload) for _, payload in sent) == [1, 2, 2]
+    # every call is made at the given block
+    assert {call["params"][1] for _, payload in sent for call in payload} == {"0x64"}
+
+
+def test_call_falls_back_to_single_requests():
+    batcher = EthCallBatcher("http://localhost:8546", batch_size=10)
+    sent = mock_node(batcher, supports_batch=False)
+
+    assert batcher.call(CALLS) == expected_results()
+    # batch attempt + a request per call
+    assert len(sent) == 1 + len(CALLS)
+
+    # batches are not retried while the node is cooling down
+    assert batcher.call(CALLS) == expected_results()
+    assert len(sent) == 1 + 2 * len(CALLS)
+
+
+def test_call_retries_batches_after_cooldown(monkeypatch):
+    batcher = EthCallBatcher("http://localhost:8546", batch_size=10)
+    sent = mock_node(batcher, supports_batch=False)
+    now = 1000.0
+    monkeypatch.setattr(json_rpc_client.time, "monotonic", lambda: now)
+
+    assert batcher.call(CALLS) == expected_results()
+    assert len(sent) == 1 + len(CALLS)
+
+    # batches are tried again once the cooldown is over
+    now += BATCH_RETRY_COOLDOWN_SECONDS
+    sent = mock_node(batcher)
+    assert batcher.call(CALLS) == expected_results()
+    assert len(sent) == 1
+
+
+def test_call_tries_other_endpoints():
+    batcher = EthCallBatcher("http://first,http://second")
+    sent = mock_node(batcher)
+    post = batcher._client.post
+
+    def post_or_fail(endpoint, payload):
+        if endpoint == "http://first":
+            raise Exception("connection refused")
+        return post(endpoint, payload)
+
+    batcher._client.post = post_or_fail
+    assert batcher.call(CALLS) == expected_results()
+    assert [endpoint for endpoint, _ in sent] == ["http://second"]
@@ -14,7 +14,6 @@ import requests
 from flask import g, request
 from hashids import Hashids
 from jsonformatter import JsonFormatter
-from sqlalchemy import inspect
 from src import exceptions
 from src.solana.solana_transaction_types import (
     ResultMeta,
@@ -143,10 +142,86 @@ def is_fqdn(endpoint_str):
     return False
 
 
+class ModelSerializer:
+    """Converts instances of one SQLAlchemy model class into dictionaries.
+
+    The columns, `@property` members and relationships to include are worked out
+    once per model class, so converting a row only reads its attributes.
+    Use `get_model_serializer` to get the cached serializer for a model class.
+    """
+
+    def __init__(self, model_class, exclude_keys=None):
+        columns = model_class.__table__.columns.keys()
+        relationships = model_class.__mapper__.relationships.keys()
+        properties = []
+        for key in set(dir(model_class)) - set(columns) - set(relationships):
+            if hasattr(model_class, key):
+                attr = getattr(model_class, key)
+                if not callable(attr) and isinstance(attr, property):
+                    properties.append(key)
+
+        exclude_keys = list(exclude_keys or [])
+        exclude_keys.extend(getattr(model_class, "exclude_keys", []))
+        assert set(exclude_keys).issubset(set(properties).union(columns))
+
+        def is_included(key):
+            return key not in exclude_keys and not key.startswith("_")
+
+        self.column_keys = columns
+        self._columns = [key for key in columns if is_included(key)]
+        self._properties = [key for key in properties if is_included(key)]
+        self._relationships = [key for key in relationships if is_included(key)]
+
+    def to_dictionary(self, model):
+        """Converts a model instance, relationships that are not loaded are skipped"""
+        # Loaded attributes live in the instance dict, reading them from it skips
+        # the instrumented attribute descriptors
+        values = model.__dict__
+        # Collect loaded relationships before evaluating properties, which may
+        # load them as a side effect
+        loaded_relationships = [key for key in self._relationships if key in values]
+
+        model_dict = {
+            key: values[key] if key in values else getattr(model, key)
+            for key in self._columns
+        }
+        for key in self._properties:
+            model_dict[key] = getattr(model, key)
+
+        for key in loaded_relationships:
+            attr = values[key]
+            if isinstance(attr, list):
+                model_dict[key] = query_result_to_list(attr)
+            elif attr is None:
+                model_dict[key] = None
+            else:
+                model_dict[key] = model_to_dictionary(attr)
+
+        return model_dict
+
+    def tuple_to_dictionary(self, t):
+        """Converts a tuple or core row selecting every column of the model"""
+        assert len(t) == len(self.column_keys)
+        return dict(zip(self.column_keys, t))
+
+
+_model_serializers = {}
+
+
+def get_model_serializer(model_class, exclude_keys=None) -> ModelSerializer:
+    """Returns the cached serializer for a model class and set of excluded keys"""
+    cache_key = (model_class, tuple(exclude_keys) if exclude_keys else ())
+    serializer = _model_serializers.get(cache_key)
+    if serializer is None:
+        serializer = ModelSerializer(model_class, exclude_keys)
+        _model_serializers[cache_key] = serializer
+    return serializer
+
+
 def query_result_to_list(query_result):
     results = []
     for row in query_result:
-        results.append(model_to_dictionary(row, None))
+        results.append(get_model_serializer(type(row)).to_dictionary(row))
     return results
 
 
@@ -161,47 +236,7 @@ def model_to_dictionary(model, exclude_keys=None):
     - Excludes any property or attribute with a leading underscore.
     - Excludes unloaded properties expressed in relationships.
     """
-    state = inspect(model)
-    # Collect the model members that are unloaded so we do not
-    # unintentionally cause them to load
-    unloaded = state.unloaded
-    model_dict = {}
-
-    columns = model.__table__.columns.keys()
-    relationships = model.__mapper__.relationships.keys()
-    properties = []
-    for key in list(set(dir(model)) - set(columns) - set(relationships)):
-        if hasattr(type(model), key):
-            attr = getattr(type(model), key)
-            if not callable(attr) and isinstance(attr, property):
-                properties.append(key)
-
-    if exclude_keys is None:
-        exclude_keys = []
-    if hasattr(model, "exclude_keys"):
-        exclude_keys.extend(model.exclude_keys)
-
-    assert set(exclude_keys).issubset(set(properties).union(columns))
-
-    for key in columns:
-        if key not in exclude_keys and not key.startswith("_"):
-            model_dict[key] = getattr(model, key)
-
-    for key in properties:
-        if key not in exclude_keys and not key.startswith("_"):
-            model_dict[key] = getattr(model, key)
-
-    for key in relationships:
-        if key not in exclude_keys and not key.startswith("_"):
-            if key in unloaded:
-                continue
-            attr = getattr(model, key)
-            if isinstance(attr, list):
-                model_dict[key] = query_result_to_list(attr)
-            else:
-                model_dict[key] = model_to_dictionary(attr)
-
-    return model_dict
+    return get_model_serializer(type(model), exclude_keys).to_dictionary(model)
 
 
 # Convert a tuple of model format into the proper model itself represented as a dictionary.
@@ -212,10 +247,7 @@ def model_to_dictionary(model, exclude_keys=None):
 # a dictionary with column keys.
 def tuple_to_model_dictionary(t, model):
     """Converts the given tuple into the proper SQLAlchemy model object in dictionary form."""
-    keys = model.__table__.columns.keys()
-    assert len(t) == len(keys)
-
-    return dict(zip(keys, t))
+    return get_model_serializer(model).tuple_to_dictionary(t)
 
 
 log_format = {
@@ -1,4 +1,12 @@
-from src.utils.helpers import is_fqdn, sanitize_slug
+from src.models.tracks.track import Track
+from src.models.tracks.track_route import TrackRoute
+from src.models.users.user import User
+from src.utils.helpers import (
+    is_fqdn,
+    model_to_dictionary,
+    query_result_to_list,
+    sanitize_slug,
+)
 
 
 def test_create_track_slug_normal_title():
@@ -61,3 +69,29 @@ def test_is_fqdn_url():
     assert is_fqdn("http://validurl2.subdomain.domain.com") == True
     assert is_fqdn("http://cn2_creator-node_1:4001") == True
     assert is_fqdn("http://www.example.$com\and%26here.html") == False
+
+
+def test_model_to_dictionary_skips_unloaded_relationships():
+    track = Track(track_id=1, owner_id=2, title="Karma Police", is_current=True)
+    track_dict = model_to_dictionary(track)
+
+    assert track_dict["track_id"] == 1
+    assert track_dict["title"] == "Karma Police"
+    assert track_dict["permalink"] == ""
+    # relationships that were never loaded and private members are left out
+    assert "block" not in track_dict
+    assert "_routes" not in track_dict
+    # the permalink property touches user, it is still not included
+    assert "user" not in track_dict
+
+
+def test_model_to_dictionary_includes_loaded_relationships():
+    track = Track(track_id=1, owner_id=2, title="Karma Police", is_current=True)
+    track.user = [User(user_id=2, handle="radiohead", is_current=True)]
+    track._routes = [TrackRoute(slug="karma-police", track_id=1, owner_id=2)]
+
+    [track_dict] = query_result_to_list([track])
+
+    assert track_dict["permalink"] == "/radiohead/karma-police"
+    assert track_dict["user"][0]["handle"] == "radiohead"
+    assert model_to_dictionary(track) == track_dict
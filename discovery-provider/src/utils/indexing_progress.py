@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from redis import Redis
+from src.utils.redis_constants import indexed_block_channel, indexed_sol_slot_channel
+
+logger = logging.getLogger(__name__)
+
+# Waiting requests check their condition at least this often, in case the
+# listener missed a message while resubscribing
+RECHECK_INTERVAL_SECONDS = 5
+RESUBSCRIBE_DELAY_SECONDS = 1
+
+
+class IndexingProgressListener:
+    """
+    Wakes up requests waiting for the indexers to make progress. One thread per
+    process subscribes to the channels the indexers publish to once they committed
+    a block or slot, rather than a redis connection per waiting request.
+    """
+
+    def __init__(self, redis: Redis):
+        self._redis = redis
+        self._condition = threading.Condition()
+        # bumped on every message so waiters can tell they missed none
+        self._generation = 0
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._thread_lock = threading.Lock()
+
+    def _start(self):
+        # the thread does not survive a fork, e.g. of a preloaded gunicorn app
+        with self._thread_lock:
+            if self._thread and self._thread_pid == os.getpid():
+                return
+            self._thread = threading.Thread(
+                target=self._listen, name="indexing-progress-listener", daemon=True
+            )
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(indexed_block_channel, indexed_sol_slot_channel)
+                for _ in pubsub.listen():
+                    with self._condition:
+                        self._generation += 1
+                        self._condition.notify_all()
+            except Exception as e:
+                logger.error(
+                    f"indexing_progress.py | Error listening to indexing progress {e}"
+                )
+                time.sleep(RESUBSCRIBE_DELAY_SECONDS)
+
+    def wait(self, is_ready: Callable[[], bool], timeout: float) -> bool:
+        """
+        Blocks until is_ready returns true, checking it whenever an indexer made
+        progress, or until the timeout. Returns whether it is ready.
+        """
+        self._start()
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                generation = self._generation
+            if is_ready():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._condition:
+                if self._generation == generation:
+                    self._condition.wait(min(remaining, RECHECK_INTERVAL_SECONDS))
+
+
+# Created on first use, shared by the requests of the process
+_indexing_progress_listener: Optional[IndexingProgressListener] = None
+_indexing_progress_listener_lock = threading.Lock()
+
+
+def get_indexing_progress_listener(redis: Redis) -> IndexingProgressListener:
+    global _indexing_progress_listener  # pylint: disable=W0603
+    with _indexing_progress_listener_lock:
+        if not _indexing_progress_listener:
+            _indexing_progress_listener = IndexingProgressListener(redis)
+        return _indexing_progress_listener
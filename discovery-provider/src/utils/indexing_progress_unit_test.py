@@ -0,0 +1,36 @@
+import threading
+import time
+
+from src.utils import indexing_progress
+from src.utils.indexing_progress import IndexingProgressListener
+from src.utils.redis_constants import indexed_block_channel
+
+
+def test_wait_ready(redis_mock):
+    listener = IndexingProgressListener(redis_mock)
+    assert listener.wait(lambda: True, 5)
+
+
+def test_wait_timeout(redis_mock):
+    listener = IndexingProgressListener(redis_mock)
+    start = time.monotonic()
+    assert not listener.wait(lambda: False, 0.2)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_wait_wakes_on_publish(redis_mock, monkeypatch):
+    # only a published message can wake the request in time
+    monkeypatch.setattr(indexing_progress, "RECHECK_INTERVAL_SECONDS", 60)
+    listener = IndexingProgressListener(redis_mock)
+    indexed = threading.Event()
+
+    def index_block():
+        # give the listener time to subscribe
+        time.sleep(0.5)
+        indexed.set()
+        redis_mock.publish(indexed_block_channel, 1)
+
+    threading.Thread(target=index_block, daemon=True).start()
+    start = time.monotonic()
+    assert listener.wait(indexed.is_set, 10)
+    assert time.monotonic() - start < 5
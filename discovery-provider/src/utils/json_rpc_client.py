@@ -0,0 +1,93 @@
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+JSON_RPC_REQUEST_TIMEOUT_SECONDS = 30
+# How long an endpoint that rejected a batched request is sent single requests
+# before batching is tried again
+BATCH_RETRY_COOLDOWN_SECONDS = 10 * 60
+
+
+class JsonRpcClient:
+    """
+    Sends single and batched JSON-RPC requests over one keep-alive session.
+
+    A node that answers a batch with anything but a list of responses, e.g. an
+    error object or a rate limit body from a proxy, is sent single requests for
+    BATCH_RETRY_COOLDOWN_SECONDS before batching is tried again. Requests that fail
+    outright do not change whether batches are sent.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 1,
+        pool_maxsize: int = 1,
+        timeout: float = JSON_RPC_REQUEST_TIMEOUT_SECONDS,
+        batch_retry_cooldown_seconds: float = BATCH_RETRY_COOLDOWN_SECONDS,
+    ):
+        self._timeout = timeout
+        self._batch_retry_cooldown_seconds = batch_retry_cooldown_seconds
+        # endpoint -> monotonic time until which it is sent single requests
+        self._unbatched_until: Dict[str, float] = {}
+        # itertools.count is safe to share between request threads
+        self._request_ids = itertools.count(1)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"Content-Type": "application/json"})
+
+    def make_request(self, method: str, params: List[Any]) -> Dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": method,
+            "params": params,
+        }
+
+    def post(self, endpoint: str, payload: Any) -> Any:
+        response = self._session.post(endpoint, json=payload, timeout=self._timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def call(self, endpoint: str, method: str, params: List[Any]) -> Dict:
+        """Returns the JSON-RPC response, holding either a result or an error"""
+        return self.post(endpoint, self.make_request(method, params))
+
+    def supports_batch(self, endpoint: str) -> bool:
+        return time.monotonic() >= self._unbatched_until.get(endpoint, 0)
+
+    def call_batch(
+        self, endpoint: str, calls: List[Tuple[str, List[Any]]]
+    ) -> Optional[List[Dict]]:
+        """
+        Sends the (method, params) calls in one batched request and returns their
+        responses in the order of the calls, an empty dict for the calls the node
+        did not answer. Returns None if the node rejected the batch.
+        """
+        payload = [self.make_request(method, params) for method, params in calls]
+        responses = self.post(endpoint, payload)
+        if not isinstance(responses, list):
+            logger.info(
+                f"json_rpc_client.py | batch rejected by {endpoint}, sending single requests for {self._batch_retry_cooldown_seconds}s {responses}"
+            )
+            self._unbatched_until[endpoint] = (
+                time.monotonic() + self._batch_retry_cooldown_seconds
+            )
+            return None
+
+        id_to_response = {
+            response.get("id"): response
+            for response in responses
+            if isinstance(response, dict)
+        }
+        return [id_to_response.get(request["id"], {}) for request in payload]
@@ -0,0 +1,57 @@
+import pytest
+from src.utils import json_rpc_client
+from src.utils.json_rpc_client import JsonRpcClient
+
+ENDPOINT = "http://localhost:8545"
+
+
+def mock_node(client, batch_response=None):
+    sent = []
+
+    def post(endpoint, payload):
+        sent.append(payload)
+        if batch_response is not None:
+            return batch_response
+        # answered out of order, without the last call
+        return [
+            {"id": request["id"], "result": request["params"][0]}
+            for request in reversed(payload[:-1])
+        ]
+
+    client.post = post
+    return sent
+
+
+def test_call_batch_matches_responses_to_calls():
+    client = JsonRpcClient()
+    mock_node(client)
+
+    responses = client.call_batch(ENDPOINT, [("eth_call", [i]) for i in range(3)])
+    assert [response.get("result") for response in responses] == [0, 1, None]
+
+
+def test_call_batch_rejected_until_cooldown(monkeypatch):
+    client = JsonRpcClient(batch_retry_cooldown_seconds=60)
+    mock_node(client, batch_response={"error": {"code": -32600}})
+    now = json_rpc_client.time.monotonic()
+    monkeypatch.setattr(json_rpc_client.time, "monotonic", lambda: now)
+
+    assert client.call_batch(ENDPOINT, [("eth_call", [1])]) is None
+    assert not client.supports_batch(ENDPOINT)
+    # other endpoints keep batching
+    assert client.supports_batch("http://other")
+
+    monkeypatch.setattr(json_rpc_client.time, "monotonic", lambda: now + 60)
+    assert client.supports_batch(ENDPOINT)
+
+
+def test_call_batch_failure_keeps_batching():
+    client = JsonRpcClient()
+
+    def post(endpoint, payload):
+        raise Exception("502 Bad Gateway")
+
+    client.post = post
+    with pytest.raises(Exception):
+        client.call_batch(ENDPOINT, [("eth_call", [1])])
+    assert client.supports_batch(ENDPOINT)
@@ -3,7 +3,7 @@ from functools import wraps
 from time import time
 from typing import Callable, Dict
 
-from prometheus_client import Gauge, Histogram, Summary
+from prometheus_client import Counter, Gauge, Histogram, Summary
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +98,8 @@ class PrometheusMetricNames:
     CELERY_TASK_ACTIVE_DURATION_SECONDS = "celery_task_active_duration_seconds"
     CELERY_TASK_DURATION_SECONDS = "celery_task_duration_seconds"
     CELERY_TASK_LAST_DURATION_SECONDS = "celery_task_last_duration_seconds"
+    CID_METADATA_CACHE_LOOKUPS_TOTAL = "cid_metadata_cache_lookups_total"
+    ENTITY_CACHE_LOOKUPS_TOTAL = "entity_cache_lookups_total"
     FLASK_ROUTE_DURATION_SECONDS = "flask_route_duration_seconds"
     HEALTH_CHECK = "health_check"
     INDEX_BLOCKS_DURATION_SECONDS = "index_blocks_duration_seconds"
@@ -168,6 +170,22 @@ PrometheusRegistry = {
             "success",
         ),
     ),
+    PrometheusMetricNames.CID_METADATA_CACHE_LOOKUPS_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.CID_METADATA_CACHE_LOOKUPS_TOTAL}",
+        "CID metadata cache lookups by tier and hit/miss",
+        (
+            "tier",
+            "result",
+        ),
+    ),
+    PrometheusMetricNames.ENTITY_CACHE_LOOKUPS_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.ENTITY_CACHE_LOOKUPS_TOTAL}",
+        "Track, user and playlist cache lookups by hit/miss",
+        (
+            "entity_type",
+            "result",
+        ),
+    ),
     PrometheusMetricNames.FLASK_ROUTE_DURATION_SECONDS: Histogram(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.FLASK_ROUTE_DURATION_SECONDS}",
         "Runtimes for flask routes",
@@ -273,6 +291,8 @@ class PrometheusMetric:
             this_metric.set(value)
         elif isinstance(this_metric, Summary):
             this_metric.observe(value)
+        elif isinstance(this_metric, Counter):
+            this_metric.inc(value)
 
     @classmethod
     def register_collector(cls, name, collector_func):
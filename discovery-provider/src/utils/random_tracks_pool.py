@@ -0,0 +1,134 @@
+import logging
+import random
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm.session import Session
+from src.models.tracks.track import Track
+from src.utils.redis_constants import (
+    random_tracks_pool_blocknumber_redis_key,
+    random_tracks_pool_redis_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of track ids added to the pool per SADD when it is rebuilt
+POOL_BUILD_CHUNK_SIZE = 10000
+# Extra ids sampled so tracks that became ineligible after they were sampled
+# and before the pool was updated do not shrink the response
+POOL_OVERSAMPLE = 10
+
+random_tracks_pool_build_redis_key = f"{random_tracks_pool_redis_key}:build"
+
+
+def is_track_eligible(track) -> bool:
+    """Whether a current track can be returned by get_random_tracks"""
+    return not track.is_delete and not track.is_unlisted and track.stem_of is None
+
+
+def filter_eligible_tracks(query):
+    return query.filter(
+        Track.is_current == True,
+        Track.is_delete == False,
+        Track.is_unlisted == False,
+        Track.stem_of == None,
+    )
+
+
+def sample_random_tracks_pool(redis, count: int) -> Optional[List[int]]:
+    """
+    Returns up to count distinct track ids picked uniformly at random from the pool,
+    in random order, or None if the pool has not been built
+    """
+    pipe = redis.pipeline()
+    pipe.exists(random_tracks_pool_blocknumber_redis_key)
+    pipe.srandmember(random_tracks_pool_redis_key, count)
+    is_built, track_ids = pipe.execute()
+    if not is_built:
+        return None
+
+    track_ids = [int(track_id) for track_id in track_ids]
+    # srandmember does not shuffle when count is close to the size of the set
+    random.shuffle(track_ids)
+    return track_ids
+
+
+def rebuild_random_tracks_pool(session: Session, redis):
+    """Replaces the pool with the ids of every eligible track"""
+    # read before the tracks so tracks indexed while they are read are applied by
+    # the next update
+    blocknumber = session.query(func.max(Track.blocknumber)).scalar() or 0
+    track_ids_query = filter_eligible_tracks(session.query(Track.track_id)).yield_per(
+        POOL_BUILD_CHUNK_SIZE
+    )
+
+    redis.delete(random_tracks_pool_build_redis_key)
+    num_tracks = 0
+    chunk: List[int] = []
+    for (track_id,) in track_ids_query:
+        chunk.append(track_id)
+        if len(chunk) == POOL_BUILD_CHUNK_SIZE:
+            redis.sadd(random_tracks_pool_build_redis_key, *chunk)
+            num_tracks += len(chunk)
+            chunk = []
+    if chunk:
+        redis.sadd(random_tracks_pool_build_redis_key, *chunk)
+        num_tracks += len(chunk)
+
+    pipe = redis.pipeline()
+    if num_tracks:
+        pipe.rename(random_tracks_pool_build_redis_key, random_tracks_pool_redis_key)
+    else:
+        pipe.delete(random_tracks_pool_redis_key)
+    pipe.set(random_tracks_pool_blocknumber_redis_key, blocknumber)
+    pipe.execute()
+
+    logger.info(
+        f"random_tracks_pool.py | rebuilt pool with {num_tracks} tracks at block {blocknumber}"
+    )
+    return num_tracks
+
+
+def update_random_tracks_pool(session: Session, redis, blocknumber: int):
+    """Adds and removes the tracks changed after blocknumber from the pool"""
+    tracks = (
+        session.query(
+            Track.track_id,
+            Track.blocknumber,
+            Track.is_delete,
+            Track.is_unlisted,
+            Track.stem_of,
+        )
+        .filter(Track.is_current == True, Track.blocknumber > blocknumber)
+        .all()
+    )
+    if not tracks:
+        return 0
+
+    added_track_ids = [track.track_id for track in tracks if is_track_eligible(track)]
+    removed_track_ids = [
+        track.track_id for track in tracks if not is_track_eligible(track)
+    ]
+
+    pipe = redis.pipeline()
+    if added_track_ids:
+        pipe.sadd(random_tracks_pool_redis_key, *added_track_ids)
+    if removed_track_ids:
+        pipe.srem(random_tracks_pool_redis_key, *removed_track_ids)
+    pipe.set(
+        random_tracks_pool_blocknumber_redis_key,
+        max(track.blocknumber for track in tracks),
+    )
+    pipe.execute()
+    return len(tracks)
+
+
+def get_random_tracks_pool_blocknumber(redis) -> Optional[int]:
+    blocknumber = redis.get(random_tracks_pool_blocknumber_redis_key)
+    return int(blocknumber) if blocknumber is not None else None
+
+
+def invalidate_random_tracks_pool(redis):
+    """Makes the next update rebuild the pool, tracks reverted by the indexer are
+    not picked up by updates since their previous rows are from earlier blocks"""
+    redis.delete(random_tracks_pool_blocknumber_redis_key)
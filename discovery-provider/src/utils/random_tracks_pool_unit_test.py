@@ -0,0 +1,32 @@
+from collections import Counter
+
+from src.utils.random_tracks_pool import sample_random_tracks_pool
+from src.utils.redis_constants import (
+    random_tracks_pool_blocknumber_redis_key,
+    random_tracks_pool_redis_key,
+)
+
+
+def test_sample_random_tracks_pool_not_built(redis_mock):
+    assert sample_random_tracks_pool(redis_mock, 10) is None
+
+
+def test_sample_random_tracks_pool(redis_mock):
+    redis_mock.sadd(random_tracks_pool_redis_key, *range(1, 21))
+    redis_mock.set(random_tracks_pool_blocknumber_redis_key, 1)
+
+    track_ids = sample_random_tracks_pool(redis_mock, 5)
+    assert len(track_ids) == 5
+    assert len(set(track_ids)) == 5
+    assert set(track_ids) <= set(range(1, 21))
+
+    # asking for more tracks than the pool has returns all of them
+    assert sorted(sample_random_tracks_pool(redis_mock, 30)) == list(range(1, 21))
+
+    # every track is about as likely to be picked
+    counts = Counter()
+    for _ in range(2000):
+        counts.update(sample_random_tracks_pool(redis_mock, 5))
+    assert len(counts) == 20
+    assert min(counts.values()) > 350
+    assert max(counts.values()) < 650
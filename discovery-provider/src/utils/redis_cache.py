@@ -172,10 +172,18 @@ def get_track_id_cache_key(id):
     return f"track:id:{id}"
 
 
+def get_track_stream_cache_key(id):
+    return f"track:stream:{id}"
+
+
 def get_playlist_id_cache_key(id):
     return f"playlist:id:{id}"
 
 
+def get_cid_metadata_cache_key(cid):
+    return f"cid:metadata:{cid}"
+
+
 def get_cn_sp_id_key(id):
     return f"sp:cn:id:{id}"
 
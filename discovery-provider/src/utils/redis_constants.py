@@ -20,6 +20,13 @@ oldest_unarchived_play_key = "oldest_unarchived_play_key"
 
 index_eth_last_completion_redis_key = "index_eth:last-completion"
 
+# Incremented when the indexer reverts follows so in memory social graphs are rebuilt
+social_graph_follows_reverted_redis_key = "social_graph:follows-reverted"
+
+# Set of the ids of tracks get_random_tracks can return, and the block it is updated to
+random_tracks_pool_redis_key = "random_tracks:pool"
+random_tracks_pool_blocknumber_redis_key = "random_tracks:pool:blocknumber"
+
 # Solana latest program keys
 latest_sol_play_program_tx_key = "latest_sol_program_tx:play:chain"
 latest_sol_play_db_tx_key = "latest_sol_program_tx:play:db"
@@ -46,6 +53,11 @@ latest_sol_user_bank_backfill_db_tx_key = "latest_sol_program_tx:user_bank_backf
 latest_sol_spl_token_program_tx_key = "latest_sol_program_tx:spl_token:chain"
 latest_sol_spl_token_db_key = "latest_sol_program_tx:spl_token:db"
 
+# Channels the indexers publish the block number or slot they committed to,
+# for requests waiting on new notifications
+indexed_block_channel = "indexing:block"
+indexed_sol_slot_channel = "indexing:sol_slot"
+
 # Solana latest slot per indexer
 # Used to get the latest processed slot of each indexing task, using the global slots instead of the per-program slots
 latest_sol_user_bank_slot_key = "latest_sol_slot:user_bank"
@@ -1,6 +1,11 @@
+import atexit
 import functools
 import json
 import logging  # pylint: disable=C0302
+import os
+import threading
+import time
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 
 import redis
@@ -25,7 +30,7 @@ from src.models.metrics.aggregate_monthly_unique_users_metrics import (
     AggregateMonthlyUniqueUsersMetric,
 )
 from src.utils.config import shared_config
-from src.utils.helpers import get_ip, redis_get_or_restore, redis_set_and_dump
+from src.utils.helpers import get_ip, redis_get_or_restore
 from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
 from src.utils.query_params import app_name_param, stringify_query_params
 from werkzeug.wrappers.response import Response as wResponse
@@ -48,14 +53,40 @@ metrics_prefix = "API_METRICS"
 metrics_routes = "routes"
 metrics_applications = "applications"
 metrics_visited_nodes = "visited_nodes"
+
+# Requests are counted in process and written to redis in one pipeline
+# every METRICS_FLUSH_INTERVAL_SEC or every METRICS_FLUSH_MAX_EVENTS requests
+METRICS_FLUSH_INTERVAL_SEC = 5
+METRICS_FLUSH_MAX_EVENTS = 500
+
+# Unique and per minute metrics are stored under <prefix>:<timestamp>
+# personal_*_metrics:<minute> hashes of ip or app name -> number of requests this minute
+# summed_unique_*_metrics:<day|month> HyperLogLogs of the ips seen by this node
+# *_route_metrics:<day|month> HyperLogLogs of the ips seen by all nodes
 personal_route_metrics = "personal_route_metrics"
-daily_route_metrics = "daily_route_metrics"
+personal_app_metrics = "personal_app_metrics"
 summed_unique_daily_metrics = "summed_unique_daily_metrics"
-monthly_route_metrics = "monthly_route_metrics"
 summed_unique_monthly_metrics = "summed_unique_monthly_metrics"
-personal_app_metrics = "personal_app_metrics"
-daily_app_metrics = "daily_app_metrics"
-monthly_app_metrics = "monthly_app_metrics"
+daily_route_metrics = "daily_route_metrics"
+monthly_route_metrics = "monthly_route_metrics"
+
+# Per minute metrics are read by the aggregate task and other nodes for
+# two METRICS_INTERVALs, daily metrics for two days and monthly ones for a month
+personal_metrics_ttl_sec = (METRICS_INTERVAL * 2 + 1) * 60
+daily_metrics_ttl_sec = 2 * 24 * 60 * 60
+monthly_metrics_ttl_sec = 32 * 24 * 60 * 60
+
+# Keys of the JSON blobs metrics were stored in before the layout above
+legacy_metrics_keys = [
+    personal_route_metrics,
+    personal_app_metrics,
+    summed_unique_daily_metrics,
+    summed_unique_monthly_metrics,
+    daily_route_metrics,
+    monthly_route_metrics,
+    "daily_app_metrics",
+    "monthly_app_metrics",
+]
 
 """
 NOTE: if you want to change the time interval to recording metrics,
@@ -74,6 +105,23 @@ def get_rounded_date_time():
     return datetime.utcnow().replace(minute=0, second=0, microsecond=0)
 
 
+def get_metrics_key(prefix, timestamp):
+    return f"{prefix}:{timestamp}"
+
+
+def remove_legacy_metrics(redis_handle):
+    """
+    Deletes the JSON metrics of the previous key layout and their disk dumps,
+    nothing reads them anymore. Run on startup.
+    """
+    redis_handle.delete(*legacy_metrics_keys)
+    for key in legacy_metrics_keys:
+        try:
+            os.remove(f"{key}_dump")
+        except FileNotFoundError:
+            pass
+
+
 def format_ip(ip):
     # Replace the `:` character with an `_`  because we use : as the redis key delimiter
     return ip.strip().replace(":", "_")
@@ -315,16 +363,27 @@ def persist_app_metrics(db, day, month, app_count):
             session.add(month_record)
 
 
+def add_unique_values(redis_handle, key, values, ttl_sec):
+    """
+    Adds values to the HyperLogLog at key and returns how many of them had not been
+    added before, as estimated by the change in its cardinality
+    """
+    pipe = redis_handle.pipeline(transaction=False)
+    pipe.pfcount(key)
+    pipe.pfadd(key, *values)
+    pipe.pfcount(key)
+    pipe.expire(key, ttl_sec)
+    count_before, _, count_after, _ = pipe.execute()
+    return max(count_after - count_before, 0)
+
+
 def merge_metrics(metrics, end_time, metric_type, db):
     """
     Merge this node's metrics to those received from other discovery nodes:
         Update unique and total, daily and monthly metrics for routes and apps
 
-        Dump the cached metrics so that if this node temporarily goes down,
-        we can recover the IPs and app names to perform the calculation and deduplication
-        when the node comes back up
-
-        Clean up old metrics from cache
+        Count the IPs that no node has been seen with today and this month
+        using the daily and monthly HyperLogLogs of every IP seen so far
 
         Persist metrics in the database
     """
@@ -332,74 +391,26 @@ def merge_metrics(metrics, end_time, metric_type, db):
     day = end_time.split(":")[0]
     month = f"{day[:7]}/01"
 
-    daily_key = daily_route_metrics if metric_type == "route" else daily_app_metrics
-    daily_metrics_str = redis_get_or_restore(REDIS, daily_key)
-    daily_metrics = json.loads(daily_metrics_str) if daily_metrics_str else {}
-
-    monthly_key = (
-        monthly_route_metrics if metric_type == "route" else monthly_app_metrics
-    )
-    monthly_metrics_str = redis_get_or_restore(REDIS, monthly_key)
-    monthly_metrics = json.loads(monthly_metrics_str) if monthly_metrics_str else {}
-
-    if day not in daily_metrics:
-        daily_metrics[day] = {}
-    if month not in monthly_metrics:
-        monthly_metrics[month] = {}
-
     # only relevant for unique users metrics
     unique_daily_count = 0
     unique_monthly_count = 0
 
-    # only relevant for app metrics
-    app_count = {}
-
-    # update daily and monthly metrics, which could be route metrics or app metrics
-    # if route metrics, new_value and new_count would be an IP and the number of requests from it
-    # otherwise, new_value and new_count would be an app and the number of requests from it
-    for new_value, new_count in metrics.items():
-        if metric_type == "route" and new_value not in daily_metrics[day]:
-            unique_daily_count += 1
-        if metric_type == "route" and new_value not in monthly_metrics[month]:
-            unique_monthly_count += 1
-        if metric_type == "app":
-            app_count[new_value] = new_count
-        daily_metrics[day][new_value] = (
-            daily_metrics[day][new_value] + new_count
-            if new_value in daily_metrics[day]
-            else new_count
+    # if route metrics, the metrics keys would be IPs and the values the number of requests from them
+    # otherwise, the keys would be apps and the values the number of requests from them
+    if metric_type == "route" and metrics:
+        unique_daily_count = add_unique_values(
+            REDIS,
+            get_metrics_key(daily_route_metrics, day),
+            metrics.keys(),
+            daily_metrics_ttl_sec,
         )
-        monthly_metrics[month][new_value] = (
-            monthly_metrics[month][new_value] + new_count
-            if new_value in monthly_metrics[month]
-            else new_count
+        unique_monthly_count = add_unique_values(
+            REDIS,
+            get_metrics_key(monthly_route_metrics, month),
+            metrics.keys(),
+            monthly_metrics_ttl_sec,
         )
-
-    # clean up metrics METRICS_INTERVAL after the end of the day from daily_metrics
-    yesterday_str = (datetime.utcnow() - timedelta(days=1)).strftime(
-        datetime_format_secondary
-    )
-    daily_metrics = {
-        timestamp: metrics
-        for timestamp, metrics in daily_metrics.items()
-        if timestamp > yesterday_str
-    }
-    if daily_metrics:
-        redis_set_and_dump(REDIS, daily_key, json.dumps(daily_metrics))
-    logger.info(f"updated cached daily {metric_type} metrics")
-
-    # clean up metrics METRICS_INTERVAL after the end of the month from monthly_metrics
-    thirty_one_days_ago = (datetime.utcnow() - timedelta(days=31)).strftime(
-        datetime_format_secondary
-    )
-    monthly_metrics = {
-        timestamp: metrics
-        for timestamp, metrics in monthly_metrics.items()
-        if timestamp > thirty_one_days_ago
-    }
-    if monthly_metrics:
-        redis_set_and_dump(REDIS, monthly_key, json.dumps(monthly_metrics))
-    logger.info(f"updated cached monthly {metric_type} metrics")
+        logger.info(f"updated cached daily and monthly {metric_type} metrics")
 
     # persist aggregated metrics from other nodes
     day_obj = datetime.strptime(day, day_format).date()
@@ -414,7 +425,7 @@ def merge_metrics(metrics, end_time, metric_type, db):
             unique_monthly_count,
         )
     else:
-        persist_app_metrics(db, day_obj, month_obj, app_count)
+        persist_app_metrics(db, day_obj, month_obj, dict(metrics))
 
 
 def merge_route_metrics(metrics, end_time, db):
@@ -426,62 +437,52 @@ def merge_app_metrics(metrics, end_time, db):
 
 
 def get_redis_metrics(redis_handle, start_time, metric_type):
-    redis_metrics_str = redis_get_or_restore(redis_handle, metric_type)
-    metrics = json.loads(redis_metrics_str) if redis_metrics_str else {}
-    if not metrics:
-        return {}
+    """
+    Sums the per minute metrics recorded after start_time.
+    Only the last two METRICS_INTERVALs are kept so earlier minutes are not read.
+    """
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    minute = max(
+        start_time.replace(second=0, microsecond=0) + timedelta(minutes=1),
+        now - timedelta(minutes=METRICS_INTERVAL * 2),
+    )
+    pipe = redis_handle.pipeline(transaction=False)
+    while minute <= now:
+        pipe.hgetall(
+            get_metrics_key(metric_type, minute.strftime(datetime_format_secondary))
+        )
+        minute += timedelta(minutes=1)
 
     # if route metrics, value and count would be an IP and the number of requests from it
     # otherwise, value and count would be an app and the number of requests from it
     result = {}
-    for datetime_str, value_counts in metrics.items():
-        datetime_obj = datetime.strptime(datetime_str, datetime_format_secondary)
-        if datetime_obj > start_time:
-            for value, count in value_counts.items():
-                result[value] = result[value] + count if value in result else count
+    for value_counts in pipe.execute():
+        for value_bstr, count_bstr in value_counts.items():
+            value = value_bstr.decode("utf-8")
+            count = int(count_bstr)
+            result[value] = result[value] + count if value in result else count
 
     return result
 
 
 def get_redis_route_metrics(start_time):
+    METRICS_BUFFER.flush()
     return get_redis_metrics(REDIS, start_time, personal_route_metrics)
 
 
 def get_redis_app_metrics(start_time):
+    METRICS_BUFFER.flush()
     return get_redis_metrics(REDIS, start_time, personal_app_metrics)
 
 
-def get_summed_unique_metrics(start_time):
+def get_summed_unique_metrics(start_time, redis_handle=REDIS):
     day = start_time.strftime(day_format)
     month = f"{day[:7]}/01"
 
-    summed_unique_daily_metrics_str = redis_get_or_restore(
-        REDIS, summed_unique_daily_metrics
-    )
-    summed_unique_daily_metrics_obj = (
-        json.loads(summed_unique_daily_metrics_str)
-        if summed_unique_daily_metrics_str
-        else {}
-    )
-    summed_unique_daily_count = (
-        len(summed_unique_daily_metrics_obj[day])
-        if day in summed_unique_daily_metrics_obj
-        else 0
-    )
-
-    summed_unique_monthly_metrics_str = redis_get_or_restore(
-        REDIS, summed_unique_monthly_metrics
-    )
-    summed_unique_monthly_metrics_obj = (
-        json.loads(summed_unique_monthly_metrics_str)
-        if summed_unique_monthly_metrics_str
-        else {}
-    )
-    summed_unique_monthly_count = (
-        len(summed_unique_monthly_metrics_obj[month])
-        if month in summed_unique_monthly_metrics_obj
-        else 0
-    )
+    pipe = redis_handle.pipeline(transaction=False)
+    pipe.pfcount(get_metrics_key(summed_unique_daily_metrics, day))
+    pipe.pfcount(get_metrics_key(summed_unique_monthly_metrics, month))
+    summed_unique_daily_count, summed_unique_monthly_count = pipe.execute()
 
     return {"daily": summed_unique_daily_count, "monthly": summed_unique_monthly_count}
 
@@ -530,103 +531,112 @@ def extract_route_key():
     return (route_key, route)
 
 
-def update_personal_metrics(key, old_timestamp, timestamp, value, metric_type):
-    values_str = redis_get_or_restore(REDIS, key)
-    values = json.loads(values_str) if values_str else {}
-    if timestamp in values:
-        values[timestamp][value] = (
-            values[timestamp][value] + 1 if value in values[timestamp] else 1
-        )
-    else:
-        values[timestamp] = {value: 1}
-
-    # clean up and update cached metrics
-    updated_metrics = {
-        timestamp: metrics
-        for timestamp, metrics in values.items()
-        if timestamp > old_timestamp
-    }
-    if updated_metrics:
-        redis_set_and_dump(REDIS, key, json.dumps(updated_metrics))
-    logger.debug(f"updated cached personal {metric_type} metrics")
-
-
-def update_summed_unique_metrics(now, ip):
-    thirty_one_days_ago = now - timedelta(days=31)
-    thirty_one_days_ago_str = thirty_one_days_ago.strftime(day_format)
-    yesterday = now - timedelta(days=1)
-    yesterday_str = yesterday.strftime(day_format)
+def update_personal_metrics(pipe, metric_type, timestamp, value, count=1):
+    key = get_metrics_key(metric_type, timestamp)
+    pipe.hincrby(key, value, count)
+    pipe.expire(key, personal_metrics_ttl_sec)
+
+
+def update_summed_unique_metrics(pipe, now, ips):
     today_str = now.strftime(day_format)
     this_month_str = f"{today_str[:7]}/01"
 
-    summed_unique_daily_metrics_str = redis_get_or_restore(
-        REDIS, summed_unique_daily_metrics
-    )
-    summed_unique_daily_metrics_obj = (
-        json.loads(summed_unique_daily_metrics_str)
-        if summed_unique_daily_metrics_str
-        else {}
-    )
-    if today_str not in summed_unique_daily_metrics_obj:
-        summed_unique_daily_metrics_obj[today_str] = [ip]
-    elif ip not in summed_unique_daily_metrics_obj[today_str]:
-        summed_unique_daily_metrics_obj[today_str] = summed_unique_daily_metrics_obj[
-            today_str
-        ] + [ip]
-    summed_unique_daily_metrics_obj = {
-        timestamp: ips
-        for timestamp, ips in summed_unique_daily_metrics_obj.items()
-        if timestamp >= yesterday_str
-    }
-    redis_set_and_dump(
-        REDIS, summed_unique_daily_metrics, json.dumps(summed_unique_daily_metrics_obj)
-    )
+    daily_key = get_metrics_key(summed_unique_daily_metrics, today_str)
+    pipe.pfadd(daily_key, *ips)
+    pipe.expire(daily_key, daily_metrics_ttl_sec)
 
-    summed_unique_monthly_metrics_str = redis_get_or_restore(
-        REDIS, summed_unique_monthly_metrics
-    )
-    summed_unique_monthly_metrics_obj = (
-        json.loads(summed_unique_monthly_metrics_str)
-        if summed_unique_monthly_metrics_str
-        else {}
-    )
-    if this_month_str not in summed_unique_monthly_metrics_obj:
-        summed_unique_monthly_metrics_obj[this_month_str] = [ip]
-    elif ip not in summed_unique_monthly_metrics_obj[this_month_str]:
-        summed_unique_monthly_metrics_obj[
-            this_month_str
-        ] = summed_unique_monthly_metrics_obj[this_month_str] + [ip]
-    summed_unique_monthly_metrics_obj = {
-        timestamp: ips
-        for timestamp, ips in summed_unique_monthly_metrics_obj.items()
-        if timestamp >= thirty_one_days_ago_str
-    }
-    redis_set_and_dump(
-        REDIS,
-        summed_unique_monthly_metrics,
-        json.dumps(summed_unique_monthly_metrics_obj),
-    )
+    monthly_key = get_metrics_key(summed_unique_monthly_metrics, this_month_str)
+    pipe.pfadd(monthly_key, *ips)
+    pipe.expire(monthly_key, monthly_metrics_ttl_sec)
 
 
-def record_aggregate_metrics():
-    now = datetime.utcnow()
-    timestamp = now.strftime(datetime_format_secondary)
-    old_timestamp = (now - timedelta(minutes=METRICS_INTERVAL * 2)).strftime(
-        datetime_format_secondary
-    )
-    ip = get_request_ip(request)
+class MetricsBuffer:
+    """
+    Per process accumulator for the metrics recorded on each request.
 
-    update_summed_unique_metrics(now, ip)
+    Requests only update in memory counters. The counters are written to redis in
+    a single pipeline by a background thread every flush_interval_sec, as soon as
+    max_events requests have been recorded, and when the process exits.
+    """
 
-    update_personal_metrics(
-        personal_route_metrics, old_timestamp, timestamp, ip, "route"
-    )
+    def __init__(
+        self,
+        redis_handle,
+        flush_interval_sec=METRICS_FLUSH_INTERVAL_SEC,
+        max_events=METRICS_FLUSH_MAX_EVENTS,
+    ):
+        self._redis = redis_handle
+        self._flush_interval_sec = flush_interval_sec
+        self._max_events = max_events
+        self._lock = threading.Lock()
+        # pid the flush thread was started in, gunicorn forks workers after import
+        self._flusher_pid = None
+        self._reset()
+
+    def _reset(self):
+        # (hourly key, route or app name) -> number of requests
+        self._hourly_counts = Counter()
+        # (personal metric type, minute, ip or app name) -> number of requests
+        self._personal_counts = Counter()
+        # day -> ips seen that day
+        self._unique_ips = defaultdict(set)
+        self._num_events = 0
+
+    def record(self, route_key, route, application_key, application_name, ip, now):
+        timestamp = now.strftime(datetime_format_secondary)
+        with self._lock:
+            self._start_flusher()
+            self._hourly_counts[(route_key, route)] += 1
+            self._personal_counts[(personal_route_metrics, timestamp, ip)] += 1
+            if application_name:
+                self._hourly_counts[(application_key, application_name)] += 1
+                self._personal_counts[
+                    (personal_app_metrics, timestamp, application_name)
+                ] += 1
+            self._unique_ips[now.date()].add(ip)
+            self._num_events += 1
+            should_flush = self._num_events >= self._max_events
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._num_events:
+                return
+            hourly_counts = self._hourly_counts
+            personal_counts = self._personal_counts
+            unique_ips = self._unique_ips
+            self._reset()
+
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for (key, value), count in hourly_counts.items():
+                pipe.hincrby(key, value, count)
+            for (metric_type, timestamp, value), count in personal_counts.items():
+                update_personal_metrics(pipe, metric_type, timestamp, value, count)
+            for day, ips in unique_ips.items():
+                update_summed_unique_metrics(pipe, day, ips)
+            pipe.execute()
+        except Exception as e:
+            logger.error("Error while flushing metrics: %s", e)
+
+    def _start_flusher(self):
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        self._flusher_pid = pid
+        threading.Thread(
+            target=self._flush_periodically, name="metrics_flusher", daemon=True
+        ).start()
+        atexit.register(self.flush)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self._flush_interval_sec)
+            self.flush()
 
-    application_name = request.args.get(app_name_param, type=str, default=None)
-    if application_name:
-        update_personal_metrics(
-            personal_app_metrics, old_timestamp, timestamp, application_name, "app"
-        )
+
+METRICS_BUFFER = MetricsBuffer(REDIS)
 
 
 # Metrics decorator.
@@ -635,22 +645,27 @@ def record_metrics(func):
     The metrics decorator records each time a route is hit in redis
     The number of times a route is hit and an app_name query param are used are recorded.
     A redis a redis hash map is used to store each of these values.
+    Counts are buffered in process and flushed by METRICS_BUFFER.
 
     NOTE: This must be placed before the cache decorator in order for the redis incr to occur
     """
 
     @functools.wraps(func)
     def wrap(*args, **kwargs):
+        route = request.path
         try:
             application_key, application_name = extract_app_name_key()
             route_key, route = extract_route_key()
-            REDIS.hincrby(route_key, route, 1)
-            if application_name:
-                REDIS.hincrby(application_key, application_name, 1)
-
-            record_aggregate_metrics()
+            METRICS_BUFFER.record(
+                route_key,
+                route,
+                application_key,
+                application_name,
+                get_request_ip(request),
+                datetime.utcnow(),
+            )
         except Exception as e:
-            logger.error("Error while recording metrics: %s", e.message)
+            logger.error("Error while recording metrics: %s", e)
 
         metric = PrometheusMetric(PrometheusMetricNames.FLASK_ROUTE_DURATION_SECONDS)
 
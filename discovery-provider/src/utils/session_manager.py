@@ -1,5 +1,5 @@
-import inspect
 import logging  # pylint: disable=C0302
+import sys
 from contextlib import contextmanager
 
 from sqlalchemy import create_engine
@@ -85,7 +85,9 @@ class SessionManager:
         session.expire_on_commit = expire_on_commit
 
         try:
-            session.info["src"] = inspect.stack()[2][3]  # get caller's function name
+            # get caller's function name, frame 1 is the contextmanager's __enter__.
+            # Unlike inspect.stack() this does not walk the stack or read source files
+            session.info["src"] = sys._getframe(2).f_code.co_name
         except Exception:
             pass
 
@@ -0,0 +1,22 @@
+from sqlalchemy import text
+from sqlalchemy.event import listen
+from src.utils.session_manager import SessionManager
+
+
+def query_from_caller(db):
+    with db.scoped_session() as session:
+        session.execute(text("SELECT 1"))
+
+
+def test_scoped_session_comments_caller():
+    db = SessionManager("sqlite://", {})
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    listen(db._engine, "before_cursor_execute", record_statement)
+
+    query_from_caller(db)
+
+    assert statements == ["-- query_from_caller \nSELECT 1"]
@@ -0,0 +1,382 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm.session import Session
+from src.models.social.follow import Follow
+from src.utils import redis_connection
+from src.utils.config import shared_config
+from src.utils.db_session import get_db_read_replica
+from src.utils.redis_constants import social_graph_follows_reverted_redis_key
+from src.utils.session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+# How often each process applies follows indexed since its graph was built
+SOCIAL_GRAPH_REFRESH_SEC = 2
+# Follows changed since the graph was built are kept in sets on top of the arrays,
+# the graph is rebuilt once there are this many of them
+SOCIAL_GRAPH_MAX_CHANGES = 100000
+# Number of follow rows read from postgres at a time when building the graph
+FOLLOW_ROWS_CHUNK_SIZE = 1000000
+
+EMPTY_IDS = np.zeros(0, dtype=np.int32)
+
+
+def is_social_graph_enabled():
+    return shared_config["discprov"].getboolean("enable_social_graph", fallback=False)
+
+
+def sorted_intersection(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Values two sorted arrays of unique ids have in common. Binary searches the values
+    of the smaller array in the larger one so it is cheap for users with millions of
+    followers, unlike np.intersect1d which sorts both.
+    """
+    smaller, larger = (a, b) if len(a) <= len(b) else (b, a)
+    if not len(smaller):
+        return EMPTY_IDS
+    indices = np.searchsorted(larger, smaller)
+    indices[indices == len(larger)] = 0
+    return smaller[larger[indices] == smaller]
+
+
+class AdjacencyCSR:
+    """
+    Adjacency lists in compressed sparse row form.
+
+    The neighbors of keys[i] are targets[offsets[i]:offsets[i + 1]], sorted so edges
+    are found with a binary search. Only users with at least one edge have a row,
+    which uses 4 bytes per edge plus 12 bytes per user with edges.
+    """
+
+    def __init__(self, edges: np.ndarray):
+        """Builds the rows from sorted unique edges packed as source << 32 | target"""
+        sources = (edges >> 32).astype(np.int32)
+        keys, counts = np.unique(sources, return_counts=True)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        self.keys = keys
+        self.offsets = offsets
+        self.targets = (edges & 0xFFFFFFFF).astype(np.int32)
+
+    def row(self, key: int) -> np.ndarray:
+        # search with the arrays' dtype, a python int makes numpy convert the array
+        i = int(self.keys.searchsorted(np.int32(key)))
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.targets[self.offsets[i] : self.offsets[i + 1]]
+        return EMPTY_IDS
+
+    def contains(self, key: int, target: int) -> bool:
+        row = self.row(key)
+        i = int(row.searchsorted(np.int32(target)))
+        return i < len(row) and row[i] == target
+
+    def degrees(self, keys: np.ndarray) -> np.ndarray:
+        if not len(self.keys):
+            return np.zeros(len(keys), dtype=np.int64)
+        indices = self.keys.searchsorted(keys)
+        indices[indices == len(self.keys)] = 0
+        found = self.keys[indices] == keys
+        return np.where(found, self.offsets[indices + 1] - self.offsets[indices], 0)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.offsets.nbytes + self.targets.nbytes
+
+
+def pack_edges(sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Sorted unique edges as source << 32 | target, sorting int64s is much faster
+    than sorting pairs"""
+    edges = np.sort((sources.astype(np.int64) << 32) | targets.astype(np.int64))
+    if not len(edges):
+        return edges
+    is_first = np.empty(len(edges), dtype=bool)
+    is_first[0] = True
+    np.not_equal(edges[1:], edges[:-1], out=is_first[1:])
+    return edges[is_first]
+
+
+class SocialGraph:
+    """
+    In memory graph of the current follows.
+
+    Edges are stored twice, as follower -> followees and followee -> followers
+    AdjacencyCSRs, about 8MB per million follows plus 24 bytes per user with follows
+    (11MB per million follows between 2M users in scripts/benchmark_social_graph.py).
+    Follows indexed after the graph was built are applied to sets of added and removed
+    edges checked on top of the arrays, which are rebuilt from postgres once there are
+    too many of them.
+    """
+
+    def __init__(
+        self, follower_ids: np.ndarray, followee_ids: np.ndarray, blocknumber: int
+    ):
+        # duplicate edges are dropped so counts match the follows table
+        self._followees = AdjacencyCSR(pack_edges(follower_ids, followee_ids))
+        self._followers = AdjacencyCSR(pack_edges(followee_ids, follower_ids))
+        # highest block of the follows applied to the graph
+        self.blocknumber = blocknumber
+
+        self._lock = threading.Lock()
+        self._added_followees: Dict[int, Set[int]] = defaultdict(set)
+        self._added_followers: Dict[int, Set[int]] = defaultdict(set)
+        self._removed_followees: Dict[int, Set[int]] = defaultdict(set)
+        self._removed_followers: Dict[int, Set[int]] = defaultdict(set)
+        self.num_changes = 0
+
+    def apply_follows(self, follows: Iterable[Tuple[int, int, bool, int]]):
+        """Applies (follower_user_id, followee_user_id, is_delete, blocknumber) rows"""
+        with self._lock:
+            for follower_user_id, followee_user_id, is_delete, blocknumber in follows:
+                self._apply_follow(follower_user_id, followee_user_id, is_delete)
+                self.blocknumber = max(self.blocknumber, blocknumber or 0)
+
+    def _apply_follow(self, follower_user_id, followee_user_id, is_delete):
+        in_arrays = self._followees.contains(follower_user_id, followee_user_id)
+        added_followees = self._added_followees[follower_user_id]
+        added_followers = self._added_followers[followee_user_id]
+        removed_followees = self._removed_followees[follower_user_id]
+        removed_followers = self._removed_followers[followee_user_id]
+
+        if is_delete:
+            added_followees.discard(followee_user_id)
+            added_followers.discard(follower_user_id)
+            if in_arrays:
+                removed_followees.add(followee_user_id)
+                removed_followers.add(follower_user_id)
+        else:
+            removed_followees.discard(followee_user_id)
+            removed_followers.discard(follower_user_id)
+            if not in_arrays:
+                added_followees.add(followee_user_id)
+                added_followers.add(follower_user_id)
+        self.num_changes += 1
+
+    def _get_row(self, csr, added, removed, user_id) -> np.ndarray:
+        row = csr.row(user_id)
+        with self._lock:
+            added_ids = list(added.get(user_id, ()))
+            removed_ids = list(removed.get(user_id, ()))
+        if removed_ids:
+            row = row[~np.isin(row, removed_ids)]
+        if added_ids:
+            row = np.union1d(row, np.array(added_ids, dtype=np.int32))
+        return row
+
+    def _get_degrees(self, csr, added, removed, user_ids) -> Dict[int, int]:
+        degrees = csr.degrees(np.array(user_ids, dtype=np.int32))
+        with self._lock:
+            return {
+                user_id: int(degree)
+                + len(added.get(user_id, ()))
+                - len(removed.get(user_id, ()))
+                for user_id, degree in zip(user_ids, degrees)
+            }
+
+    def get_followee_ids(self, user_id: int) -> np.ndarray:
+        """Sorted ids of the users user_id follows"""
+        return self._get_row(
+            self._followees, self._added_followees, self._removed_followees, user_id
+        )
+
+    def get_follower_ids(self, user_id: int) -> np.ndarray:
+        """Sorted ids of the users following user_id"""
+        return self._get_row(
+            self._followers, self._added_followers, self._removed_followers, user_id
+        )
+
+    def get_followee_counts(self, user_ids: List[int]) -> Dict[int, int]:
+        return self._get_degrees(
+            self._followees, self._added_followees, self._removed_followees, user_ids
+        )
+
+    def get_follower_counts(self, user_ids: List[int]) -> Dict[int, int]:
+        return self._get_degrees(
+            self._followers, self._added_followers, self._removed_followers, user_ids
+        )
+
+    def does_follow(self, follower_user_id: int, followee_user_id: int) -> bool:
+        with self._lock:
+            if followee_user_id in self._added_followees.get(follower_user_id, ()):
+                return True
+            if followee_user_id in self._removed_followees.get(follower_user_id, ()):
+                return False
+        return self._followees.contains(follower_user_id, followee_user_id)
+
+    def get_follow_intersection(
+        self, followee_user_id: int, follower_user_id: int
+    ) -> np.ndarray:
+        """Sorted ids of the followers of followee_user_id that follower_user_id follows"""
+        followee_ids = self.get_followee_ids(follower_user_id)
+        intersection = sorted_intersection(
+            followee_ids, self._followers.row(followee_user_id)
+        )
+        with self._lock:
+            added_ids = self._added_followers.get(followee_user_id, set())
+            removed_ids = self._removed_followers.get(followee_user_id, set())
+            if not added_ids and not removed_ids:
+                return intersection
+            added_ids = added_ids & set(followee_ids.tolist())
+            removed_ids = set(removed_ids)
+        return np.array(
+            sorted((set(intersection.tolist()) - removed_ids) | added_ids),
+            dtype=np.int32,
+        )
+
+    def get_followee_follow_counts(
+        self, current_user_id: int, user_ids: List[int]
+    ) -> Dict[int, int]:
+        """For each of user_ids, the number of users current_user_id follows who follow them"""
+        followee_ids = self.get_followee_ids(current_user_id)
+        followee_id_set = None
+        counts = {}
+        for user_id in user_ids:
+            count = len(sorted_intersection(followee_ids, self._followers.row(user_id)))
+            with self._lock:
+                added_ids = self._added_followers.get(user_id)
+                removed_ids = self._removed_followers.get(user_id)
+                if added_ids or removed_ids:
+                    if followee_id_set is None:
+                        followee_id_set = set(followee_ids.tolist())
+                    count += len(followee_id_set & (added_ids or set()))
+                    count -= len(followee_id_set & (removed_ids or set()))
+            counts[user_id] = count
+        return counts
+
+    @property
+    def num_follows(self) -> int:
+        """Number of follows in the arrays, excluding follows applied since they were built"""
+        return len(self._followees.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the follow arrays, excluding follows applied since they were built"""
+        return self._followees.nbytes + self._followers.nbytes
+
+
+def get_current_follows_query():
+    return select([Follow.follower_user_id, Follow.followee_user_id]).where(
+        (Follow.is_current == True) & (Follow.is_delete == False)
+    )
+
+
+def load_social_graph(session: Session) -> SocialGraph:
+    # follows indexed while the graph is loading are applied by the first refresh
+    blocknumber = session.query(func.max(Follow.blocknumber)).scalar() or 0
+
+    result = session.execute(
+        get_current_follows_query().execution_options(stream_results=True)
+    )
+    chunks = []
+    while True:
+        rows = result.fetchmany(FOLLOW_ROWS_CHUNK_SIZE)
+        if not rows:
+            break
+        chunks.append(np.array([tuple(row) for row in rows], dtype=np.int32))
+    edges = np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int32)
+
+    return SocialGraph(edges[:, 0], edges[:, 1], blocknumber)
+
+
+def get_follows_after_block(session: Session, blocknumber: int):
+    return (
+        session.query(
+            Follow.follower_user_id,
+            Follow.followee_user_id,
+            Follow.is_delete,
+            Follow.blocknumber,
+        )
+        .filter(Follow.is_current == True, Follow.blocknumber > blocknumber)
+        .order_by(Follow.blocknumber)
+        .all()
+    )
+
+
+def invalidate_social_graphs(redis):
+    """Makes every process rebuild its graph, follows reverted by the indexer are
+    not picked up by refreshes since their previous rows are from earlier blocks"""
+    redis.incr(social_graph_follows_reverted_redis_key)
+
+
+class SocialGraphUpdater:
+    """
+    Builds this process's SocialGraph in a background thread and keeps it up to date
+    with the follows the indexer writes to postgres, which are polled by blocknumber.
+    """
+
+    def __init__(self, db: SessionManager, redis):
+        self._db = db
+        self._redis = redis
+        self.graph: Optional[SocialGraph] = None
+        self._follows_reverted = None
+
+    def start(self):
+        threading.Thread(
+            target=self._update_periodically, name="social_graph_updater", daemon=True
+        ).start()
+
+    def _update_periodically(self):
+        while True:
+            try:
+                self.update()
+            except Exception as e:
+                logger.error(f"social_graph.py | Error updating social graph: {e}")
+            time.sleep(SOCIAL_GRAPH_REFRESH_SEC)
+
+    def update(self):
+        follows_reverted = self._redis.get(social_graph_follows_reverted_redis_key)
+        if (
+            self.graph is None
+            or follows_reverted != self._follows_reverted
+            or self.graph.num_changes > SOCIAL_GRAPH_MAX_CHANGES
+        ):
+            start_time = time.time()
+            with self._db.scoped_session() as session:
+                graph = load_social_graph(session)
+                graph.apply_follows(get_follows_after_block(session, graph.blocknumber))
+            self.graph = graph
+            self._follows_reverted = follows_reverted
+            logger.info(
+                f"social_graph.py | Built social graph of {graph.num_follows} follows, "
+                f"{graph.nbytes} bytes in {time.time() - start_time}s"
+            )
+            return
+
+        with self._db.scoped_session() as session:
+            follows = get_follows_after_block(session, self.graph.blocknumber)
+        self.graph.apply_follows(follows)
+
+
+social_graph_updater: Optional[SocialGraphUpdater] = None
+social_graph_updater_pid: Optional[int] = None
+social_graph_updater_lock = threading.Lock()
+
+
+def get_social_graph() -> Optional[SocialGraph]:
+    """
+    Returns this process's social graph, or None if it is disabled or still loading
+    so callers can fall back to querying the follows table
+    """
+    global social_graph_updater, social_graph_updater_pid  # pylint: disable=W0603
+    if not is_social_graph_enabled():
+        return None
+
+    pid = os.getpid()
+    if social_graph_updater_pid != pid:
+        with social_graph_updater_lock:
+            # gunicorn forks workers after import, each builds its own graph
+            if social_graph_updater_pid != pid:
+                social_graph_updater = SocialGraphUpdater(
+                    get_db_read_replica(), redis_connection.get_redis()
+                )
+                social_graph_updater.start()
+                social_graph_updater_pid = pid
+
+    return social_graph_updater.graph if social_graph_updater else None
@@ -0,0 +1,72 @@
+import numpy as np
+from src.utils.social_graph import SocialGraph
+
+# follower -> followees
+follows = {
+    1: [2, 3, 4],
+    2: [3, 4],
+    3: [4],
+    5: [3, 4, 1],
+}
+
+
+def build_graph():
+    edges = [
+        (follower_user_id, followee_user_id)
+        for follower_user_id, followee_user_ids in follows.items()
+        for followee_user_id in followee_user_ids
+    ]
+    # duplicate edges are ignored
+    edges.append((1, 2))
+    follower_ids = np.array([edge[0] for edge in edges])
+    followee_ids = np.array([edge[1] for edge in edges])
+    return SocialGraph(follower_ids, followee_ids, 10)
+
+
+def test_social_graph_queries():
+    graph = build_graph()
+
+    assert graph.num_follows == 9
+    assert graph.does_follow(1, 2)
+    assert not graph.does_follow(2, 1)
+    assert not graph.does_follow(6, 1)
+
+    assert graph.get_followee_ids(1).tolist() == [2, 3, 4]
+    assert graph.get_follower_ids(4).tolist() == [1, 2, 3, 5]
+    assert graph.get_follower_ids(6).tolist() == []
+    assert graph.get_followee_counts([1, 4, 6]) == {1: 3, 4: 0, 6: 0}
+    assert graph.get_follower_counts([1, 4, 6]) == {1: 1, 4: 4, 6: 0}
+
+    # followers of 4 that 5 follows
+    assert graph.get_follow_intersection(4, 5).tolist() == [1, 3]
+
+    # users 1 follows who follow 3 and 4
+    assert graph.get_followee_follow_counts(1, [3, 4, 5]) == {3: 1, 4: 2, 5: 0}
+
+
+def test_social_graph_apply_follows():
+    graph = build_graph()
+
+    graph.apply_follows(
+        [
+            # unfollow and refollow
+            (1, 2, True, 11),
+            (1, 2, False, 12),
+            # unfollow
+            (2, 3, True, 12),
+            # new follows
+            (4, 1, False, 13),
+            (6, 4, False, 13),
+        ]
+    )
+
+    assert graph.blocknumber == 13
+    assert graph.does_follow(1, 2)
+    assert not graph.does_follow(2, 3)
+    assert graph.does_follow(4, 1)
+
+    assert graph.get_followee_ids(2).tolist() == [4]
+    assert graph.get_follower_ids(4).tolist() == [1, 2, 3, 5, 6]
+    assert graph.get_followee_counts([2, 4]) == {2: 1, 4: 1}
+    assert graph.get_follower_counts([1, 3, 4]) == {1: 2, 3: 2, 4: 5}
+    assert graph.get_followee_follow_counts(1, [3, 4]) == {3: 0, 4: 2}
@@ -1,12 +1,17 @@
 import json
 from datetime import datetime, timedelta
 
-from src.utils.helpers import redis_set_and_dump
 from src.utils.redis_metrics import (
+    MetricsBuffer,
     datetime_format_secondary,
+    get_metrics_key,
     get_redis_metrics,
+    get_summed_unique_metrics,
     personal_app_metrics,
     personal_route_metrics,
+    remove_legacy_metrics,
+    update_personal_metrics,
+    update_summed_unique_metrics,
 )
 
 now = datetime.utcnow()
@@ -17,20 +22,30 @@ start_time = int((now - timedelta(minutes=3)).timestamp())
 start_time_obj = datetime.fromtimestamp(start_time)
 
 
+def record_personal_metrics(redis, metric_type, metrics):
+    pipe = redis.pipeline()
+    for date_time, value_counts in metrics.items():
+        timestamp = date_time.strftime(datetime_format_secondary)
+        for value, count in value_counts.items():
+            for _ in range(count):
+                update_personal_metrics(pipe, metric_type, timestamp, value)
+    pipe.execute()
+
+
 def test_get_cached_route_metrics(redis_mock):
     metrics = {
-        old_time.strftime(datetime_format_secondary): {"some-ip": 1, "other-ip": 2},
-        recent_time_1.strftime(datetime_format_secondary): {
+        old_time: {"some-ip": 1, "other-ip": 2},
+        recent_time_1: {
             "another-ip": 1,
             "some-other-ip": 2,
         },
-        recent_time_2.strftime(datetime_format_secondary): {
+        recent_time_2: {
             "1.2.3.4": 1,
             "some-ip": 2,
             "another-ip": 3,
         },
     }
-    redis_set_and_dump(redis_mock, personal_route_metrics, json.dumps(metrics))
+    record_personal_metrics(redis_mock, personal_route_metrics, metrics)
 
     result = get_redis_metrics(redis_mock, start_time_obj, personal_route_metrics)
 
@@ -43,18 +58,18 @@ def test_get_cached_route_metrics(redis_mock):
 
 def test_get_cached_app_metrics(redis_mock):
     metrics = {
-        old_time.strftime(datetime_format_secondary): {"some-app": 1, "other-app": 2},
-        recent_time_1.strftime(datetime_format_secondary): {
+        old_time: {"some-app": 1, "other-app": 2},
+        recent_time_1: {
             "another-app": 1,
             "some-other-app": 2,
         },
-        recent_time_2.strftime(datetime_format_secondary): {
+        recent_time_2: {
             "top-app": 1,
             "some-app": 2,
             "another-app": 3,
         },
     }
-    redis_set_and_dump(redis_mock, personal_app_metrics, json.dumps(metrics))
+    record_personal_metrics(redis_mock, personal_app_metrics, metrics)
 
     result = get_redis_metrics(redis_mock, start_time_obj, personal_app_metrics)
 
@@ -63,3 +78,76 @@ def test_get_cached_app_metrics(redis_mock):
     assert result["some-other-app"] == 2
     assert result["top-app"] == 1
     assert result["some-app"] == 2
+
+
+def test_get_summed_unique_metrics(redis_mock):
+    today = datetime(2022, 9, 15, 12)
+    earlier_this_month = datetime(2022, 9, 2, 12)
+
+    pipe = redis_mock.pipeline()
+    update_summed_unique_metrics(pipe, today, ["1.2.3.4", "5.6.7.8", "1.2.3.4"])
+    update_summed_unique_metrics(pipe, earlier_this_month, ["9.9.9.9", "1.2.3.4"])
+    pipe.execute()
+
+    summed_unique_metrics = get_summed_unique_metrics(today, redis_mock)
+
+    assert summed_unique_metrics["daily"] == 2
+    assert summed_unique_metrics["monthly"] == 3
+
+
+def test_metrics_buffer(redis_mock):
+    buffer = MetricsBuffer(redis_mock, flush_interval_sec=60, max_events=4)
+    route_key = "API_METRICS:routes:1.2.3.4:2022/09/15:12"
+    app_key = "API_METRICS:applications:1.2.3.4:2022/09/15:12"
+
+    for _ in range(3):
+        buffer.record(route_key, "/v1/tracks", app_key, "some-app", "1.2.3.4", now)
+
+    # nothing is written until the buffer is flushed
+    assert not redis_mock.keys()
+    assert get_redis_metrics(redis_mock, start_time_obj, personal_route_metrics) == {}
+
+    # recording max_events flushes
+    buffer.record(route_key, "/v1/users", app_key, None, "5.6.7.8", now)
+
+    assert redis_mock.hgetall(route_key) == {b"/v1/tracks": b"3", b"/v1/users": b"1"}
+    assert redis_mock.hgetall(app_key) == {b"some-app": b"3"}
+    assert get_redis_metrics(redis_mock, start_time_obj, personal_route_metrics) == {
+        "1.2.3.4": 3,
+        "5.6.7.8": 1,
+    }
+    assert get_redis_metrics(redis_mock, start_time_obj, personal_app_metrics) == {
+        "some-app": 3
+    }
+    assert get_summed_unique_metrics(now, redis_mock)["daily"] == 2
+
+    buffer.record(route_key, "/v1/tracks", app_key, None, "1.2.3.4", now)
+    buffer.flush()
+
+    assert redis_mock.hget(route_key, "/v1/tracks") == b"4"
+    assert (
+        redis_mock.hget(
+            get_metrics_key(
+                personal_route_metrics, now.strftime(datetime_format_secondary)
+            ),
+            "1.2.3.4",
+        )
+        == b"4"
+    )
+
+
+def test_remove_legacy_metrics(redis_mock, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    redis_mock.set(personal_route_metrics, json.dumps({"1.2.3.4": 1}))
+    (tmp_path / f"{personal_route_metrics}_dump").write_text("{}")
+    timestamp = now.strftime(datetime_format_secondary)
+    update_personal_metrics(redis_mock, personal_route_metrics, timestamp, "1.2.3.4")
+
+    remove_legacy_metrics(redis_mock)
+
+    assert redis_mock.get(personal_route_metrics) is None
+    assert not (tmp_path / f"{personal_route_metrics}_dump").exists()
+    assert (
+        redis_mock.hget(get_metrics_key(personal_route_metrics, timestamp), "1.2.3.4")
+        == b"1"
+    )
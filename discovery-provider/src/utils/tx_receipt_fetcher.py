@@ -0,0 +1,150 @@
+import concurrent.futures
+import logging
+from typing import Dict, List, Optional
+
+from src.utils.json_rpc_client import JsonRpcClient
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+
+logger = logging.getLogger(__name__)
+
+# Max number of eth_getTransactionReceipt calls sent in one batched JSON-RPC request
+RECEIPTS_BATCH_SIZE = 500
+RECEIPTS_REQUEST_TIMEOUT_SECONDS = 30
+# Used only for nodes that reject batched requests
+RECEIPTS_FALLBACK_WORKERS = 16
+
+# JSON-RPC error code for an unknown method
+METHOD_NOT_FOUND_CODE = -32601
+
+
+class TxReceiptFetcher:
+    """
+    Fetches every transaction receipt in a block over one long-lived keep-alive session.
+
+    Tries, in order:
+    * a single eth_getBlockReceipts call, if the node supports it
+    * batched eth_getTransactionReceipt calls, RECEIPTS_BATCH_SIZE per request
+    * one eth_getTransactionReceipt call per tx, for nodes that reject batches
+
+    Unsupported methods are remembered so later blocks go straight to the next option,
+    rejected batches are retried after the JsonRpcClient cooldown. Receipts are formatted the same way web3's get_transaction_receipt formats them.
+    """
+
+    def __init__(self, endpoint: str, batch_size: int = RECEIPTS_BATCH_SIZE):
+        self._endpoint = endpoint
+        self._batch_size = batch_size
+        self._supports_block_receipts = True
+        self._client = JsonRpcClient(
+            pool_maxsize=RECEIPTS_FALLBACK_WORKERS,
+            timeout=RECEIPTS_REQUEST_TIMEOUT_SECONDS,
+        )
+        self._fallback_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=RECEIPTS_FALLBACK_WORKERS
+        )
+
+    def fetch_block_receipts(self, block) -> Dict[str, AttributeDict]:
+        """Returns tx hash (hex) -> formatted receipt for every tx in the block"""
+        tx_hashes = [to_hex(tx["hash"]) for tx in block.transactions]
+        if not tx_hashes:
+            return {}
+
+        raw_receipts: Dict[str, Dict] = {}
+        if self._supports_block_receipts:
+            raw_receipts = self._fetch_with_block_receipts(block, tx_hashes)
+
+        missing = [tx_hash for tx_hash in tx_hashes if tx_hash not in raw_receipts]
+        if missing and self._client.supports_batch(self._endpoint):
+            raw_receipts.update(self._fetch_with_batch(missing))
+
+        missing = [tx_hash for tx_hash in tx_hashes if tx_hash not in raw_receipts]
+        if missing:
+            raw_receipts.update(self._fetch_individually(missing))
+
+        return {
+            tx_hash: AttributeDict.recursive(receipt_formatter(receipt))
+            for tx_hash, receipt in raw_receipts.items()
+        }
+
+    def _fetch_with_block_receipts(self, block, tx_hashes: List[str]):
+        try:
+            response = self._client.call(
+                self._endpoint, "eth_getBlockReceipts", [to_hex(block.hash)]
+            )
+        except Exception as e:
+            logger.warning(
+                f"tx_receipt_fetcher.py | eth_getBlockReceipts failed for block={block.number} {e}"
+            )
+            return {}
+
+        error = response.get("error")
+        if error:
+            if error.get("code") == METHOD_NOT_FOUND_CODE:
+                logger.info(
+                    "tx_receipt_fetcher.py | eth_getBlockReceipts not supported, using batched receipts"
+                )
+                self._supports_block_receipts = False
+            return {}
+
+        receipts = response.get("result") or []
+        wanted = set(tx_hashes)
+        return {
+            receipt["transactionHash"]: receipt
+            for receipt in receipts
+            if receipt and receipt.get("transactionHash") in wanted
+        }
+
+    def _fetch_with_batch(self, tx_hashes: List[str]):
+        raw_receipts: Dict[str, Dict] = {}
+        for i in range(0, len(tx_hashes), self._batch_size):
+            chunk = tx_hashes[i : i + self._batch_size]
+            try:
+                responses = self._client.call_batch(
+                    self._endpoint,
+                    [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk],
+                )
+            except Exception as e:
+                logger.warning(f"tx_receipt_fetcher.py | batch request failed {e}")
+                continue
+
+            if responses is None:
+                # the rest are fetched with single requests
+                break
+
+            for tx_hash, response in zip(chunk, responses):
+                result = response.get("result")
+                if result:
+                    raw_receipts[tx_hash] = result
+        return raw_receipts
+
+    def _fetch_receipt(self, tx_hash: str) -> Optional[Dict]:
+        response = self._client.call(
+            self._endpoint, "eth_getTransactionReceipt", [tx_hash]
+        )
+        if "error" in response:
+            raise Exception(response["error"])
+        return response.get("result")
+
+    def _fetch_individually(self, tx_hashes: List[str]):
+        raw_receipts: Dict[str, Dict] = {}
+        future_to_tx_hash = {
+            self._fallback_executor.submit(self._fetch_receipt, tx_hash): tx_hash
+            for tx_hash in tx_hashes
+        }
+        for future in concurrent.futures.as_completed(future_to_tx_hash):
+            tx_hash = future_to_tx_hash[future]
+            try:
+                receipt = future.result()
+                if receipt:
+                    raw_receipts[tx_hash] = receipt
+            except Exception as e:
+                logger.error(
+                    f"tx_receipt_fetcher.py | eth_getTransactionReceipt {tx_hash} generated {e}"
+                )
+        return raw_receipts
+
+
+def to_hex(value) -> str:
+    if isinstance(value, str):
+        return value if value.startswith("0x") else f"0x{value}"
+    return "0x" + bytes(value).hex()
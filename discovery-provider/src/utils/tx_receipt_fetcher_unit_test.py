@@ -0,0 +1,104 @@
+from src.utils import json_rpc_client
+from src.utils.tx_receipt_fetcher import TxReceiptFetcher, to_hex
+from web3.datastructures import AttributeDict
+
+BLOCK_HASH = "0x" + "ab" * 32
+TX_HASHES = ["0x" + f"{i:02x}" * 32 for i in range(1, 4)]
+
+
+def make_block():
+    return AttributeDict(
+        {
+            "hash": BLOCK_HASH,
+            "number": 10,
+            "transactions": [{"hash": tx_hash} for tx_hash in TX_HASHES],
+        }
+    )
+
+
+def make_receipt(tx_hash):
+    return {"transactionHash": tx_hash, "blockNumber": "0xa", "status": "0x1"}
+
+
+def mock_node(fetcher, supports_block_receipts, supports_batch):
+    sent = []
+
+    def post(endpoint, payload):
+        sent.append(payload)
+        if isinstance(payload, list):
+            if not supports_batch:
+                return {"jsonrpc": "2.0", "error": {"code": -32600}}
+            return [
+                {"id": req["id"], "result": make_receipt(req["params"][0])}
+                for req in payload
+            ]
+        if payload["method"] == "eth_getBlockReceipts":
+            if not supports_block_receipts:
+                return {"id": payload["id"], "error": {"code": -32601}}
+            return {
+                "id": payload["id"],
+                "result": [make_receipt(tx_hash) for tx_hash in TX_HASHES],
+            }
+        return {"id": payload["id"], "result": make_receipt(payload["params"][0])}
+
+    fetcher._client.post = post
+    return sent
+
+
+def assert_receipts(receipts):
+    assert set(receipts.keys()) == set(TX_HASHES)
+    for tx_hash, receipt in receipts.items():
+        assert to_hex(receipt.transactionHash) == tx_hash
+        assert receipt.blockNumber == 10
+        assert receipt.status == 1
+
+
+def test_fetch_block_receipts_with_block_receipts():
+    fetcher = TxReceiptFetcher("http://localhost:8545")
+    sent = mock_node(fetcher, supports_block_receipts=True, supports_batch=True)
+
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+    assert len(sent) == 1
+
+
+def test_fetch_block_receipts_with_batch():
+    fetcher = TxReceiptFetcher("http://localhost:8545", batch_size=2)
+    sent = mock_node(fetcher, supports_block_receipts=False, supports_batch=True)
+
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+    # eth_getBlockReceipts attempt + 2 batches
+    assert len(sent) == 3
+
+    # eth_getBlockReceipts is not retried once the node rejected it
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+    assert len(sent) == 5
+
+
+def test_fetch_block_receipts_falls_back_to_single_requests():
+    fetcher = TxReceiptFetcher("http://localhost:8545")
+    sent = mock_node(fetcher, supports_block_receipts=False, supports_batch=False)
+
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+    # eth_getBlockReceipts attempt + rejected batch + one call per tx
+    assert len(sent) == 2 + len(TX_HASHES)
+
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+    assert len(sent) == 2 + 2 * len(TX_HASHES)
+
+
+def test_fetch_block_receipts_retries_batch_after_cooldown(monkeypatch):
+    fetcher = TxReceiptFetcher("http://localhost:8545")
+    mock_node(fetcher, supports_block_receipts=False, supports_batch=False)
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+
+    # a rejected batch, e.g. a rate limited one, is tried again after the cooldown
+    sent = mock_node(fetcher, supports_block_receipts=False, supports_batch=True)
+    now = json_rpc_client.time.monotonic()
+    monkeypatch.setattr(
+        json_rpc_client.time,
+        "monotonic",
+        lambda: now + json_rpc_client.BATCH_RETRY_COOLDOWN_SECONDS,
+    )
+    assert_receipts(fetcher.fetch_block_receipts(make_block()))
+    # a single batch
+    assert len(sent) == 1